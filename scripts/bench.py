@@ -0,0 +1,372 @@
+"""
+Benchmark the parser, collector, repository and API against a baseline.
+
+Runs fixed-seed synthetic workloads at one of several scales and reports:
+  - parse_line and Collector.process_file throughput (lines/sec)
+  - Repository.get_run_value / get_run_stats latency (p50/p99)
+  - /api/runs and /api/runs/stats latency (p50/p99, uncached) and
+    queries per request
+
+Results can be saved as a baseline and later runs compared against it;
+the script exits with status 1 if any metric regressed past the tolerance
+(timings) or needs more queries than before. Baselines are per machine -
+save one on the machine you compare on.
+
+Usage:
+    python scripts/bench.py [--scale small|medium|large] [--repeat 3]
+    python scripts/bench.py --save-baseline bench_baseline.json
+    python scripts/bench.py --baseline bench_baseline.json [--tolerance 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from titrack.api.app import create_app  # noqa: E402
+from titrack.collector.collector import Collector  # noqa: E402
+from titrack.db.connection import Database  # noqa: E402
+from titrack.db.repository import Repository  # noqa: E402
+from titrack.parser.log_parser import parse_line  # noqa: E402
+from titrack.parser.patterns import FE_CONFIG_BASE_ID  # noqa: E402
+
+SEED = 20260126
+
+# (log lines, runs) per scale
+SCALES = {
+    "small": (10_000, 1_000),
+    "medium": (100_000, 10_000),
+    "large": (1_000_000, 100_000),
+}
+
+HUB_PATH = "/Game/Art/Maps/01SD/XZ_YuJinZhiXiBiNanSuo200/XZ_YuJinZhiXiBiNanSuo200"
+MAP_PATHS = [
+    "/Game/Art/Maps/02KD/KD_YuanSuKuangDong000/KD_YuanSuKuangDong000",
+    "/Game/Art/Maps/06SQ/SQ_NvShenQunBai100/SQ_NvShenQunBai100",
+]
+
+# Loot items (besides FE) and the map cost item of the synthetic workloads
+ITEM_IDS = list(range(200001, 200041))
+MAP_COST_ID = 300001
+
+PAGE_SIZE = 50
+
+
+# --- Workloads ---
+
+
+def generate_log_lines(count: int, seed: int = SEED) -> list[str]:
+    """
+    Synthetic game log: hub -> map -> pickups -> hub cycles.
+
+    Most lines of a real log match no pattern, so pickups are interleaved
+    with noise lines.
+    """
+    rng = random.Random(seed)
+    ts = datetime(2026, 1, 26, 10, 0, 0)
+    slots: dict[int, tuple[int, int]] = {0: (FE_CONFIG_BASE_ID, 0)}
+    lines: list[str] = []
+
+    def emit(message: str) -> None:
+        stamp = ts.strftime("%Y.%m.%d-%H.%M.%S") + f":{ts.microsecond // 1000:03d}"
+        lines.append(f"[{stamp}][  0]GameLog: Display: [Game] {message}\n")
+
+    def enter(path: str) -> None:
+        emit(f"SceneLevelMgr@ OpenMainWorld END! InMainLevelPath = {path}")
+
+    while len(lines) < count:
+        enter(HUB_PATH)
+        ts += timedelta(seconds=20)
+        enter(rng.choice(MAP_PATHS))
+        for _ in range(rng.randint(5, 15)):
+            ts += timedelta(seconds=rng.randint(2, 20))
+            for _ in range(rng.randint(2, 6)):
+                emit(f"UIMgr@ ShowPanel PanelName = Panel{rng.randint(1, 50)}")
+            emit("ItemChange@ ProtoName=PickItems start")
+            picks = [0] + rng.sample(range(1, 20), rng.randint(0, 2))
+            for slot_id in picks:
+                config_base_id, num = slots.get(slot_id, (rng.choice(ITEM_IDS), 0))
+                num += rng.randint(1, 50) if slot_id == 0 else 1
+                slots[slot_id] = (config_base_id, num)
+                emit(
+                    f"BagMgr@:Modfy BagItem PageId = 102 SlotId = {slot_id} "
+                    f"ConfigBaseId = {config_base_id} Num = {num}"
+                )
+            emit("ItemChange@ ProtoName=PickItems end")
+        ts += timedelta(seconds=30)
+    return lines[:count]
+
+
+def seed_runs(db: Database, count: int, seed: int = SEED) -> None:
+    """Insert count ended single-run maps with loot, map costs and prices."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    runs = []
+    deltas = []
+    ends = []
+    for run_id in range(1, count + 1):
+        run_start = start + timedelta(minutes=3 * run_id)
+        runs.append((
+            run_id, rng.choice(MAP_PATHS).rsplit("/", 1)[1], run_start.isoformat(),
+            3, run_id, 1, "p1",
+        ))
+        loot = [(FE_CONFIG_BASE_ID, rng.randint(20, 400), "PickItems", 102)]
+        loot += [
+            (config_base_id, rng.randint(1, 5), "PickItems", 102)
+            for config_base_id in rng.sample(ITEM_IDS, rng.randint(2, 8))
+        ]
+        loot.append((MAP_COST_ID, -1, "Spv3Open", 103))
+        for config_base_id, delta, proto_name, page_id in loot:
+            deltas.append((
+                page_id, 0, config_base_id, delta, "PICK_ITEMS", proto_name, run_id,
+                (run_start + timedelta(seconds=30)).isoformat(), 1, "p1",
+            ))
+        ends.append(((run_start + timedelta(minutes=2)).isoformat(), run_id))
+
+    prices = [
+        (config_base_id, 1, round(rng.uniform(0.1, 50), 3), "manual", start.isoformat())
+        for config_base_id in ITEM_IDS + [MAP_COST_ID]
+    ]
+
+    conn = db.connection
+    with db._lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """INSERT INTO prices (config_base_id, season_id, price_fe, source, updated_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                prices,
+            )
+            conn.executemany(
+                """INSERT INTO runs (id, zone_signature, start_ts, level_type, level_uid,
+                                     season_id, player_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                runs,
+            )
+            conn.executemany(
+                """INSERT INTO item_deltas (page_id, slot_id, config_base_id, delta, context,
+                                            proto_name, run_id, timestamp, season_id, player_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                deltas,
+            )
+            # Each run is its own listing entry; ending them fires the same
+            # triggers (drop stats, run values) as the collector does
+            conn.execute("UPDATE runs SET entry_id = id")
+            conn.executemany("UPDATE runs SET end_ts = ? WHERE id = ?", ends)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    repo = Repository(db)
+    repo.set_setting("map_costs_enabled", "true")
+    repo.set_player_context(1, "p1")
+    repo.rebuild_map_sessions()
+
+
+# --- Measurements ---
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def _latencies(fn, calls: list) -> dict[str, float]:
+    """p50/p99 latency of fn over the given argument list, in milliseconds."""
+    times = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": _percentile(times, 50), "p99_ms": _percentile(times, 99)}
+
+
+def bench_parser(lines: list[str], repeat: int) -> dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            parse_line(line)
+        best = min(best, time.perf_counter() - start)
+    return {"lines_per_sec": len(lines) / best}
+
+
+def bench_collector(lines: list[str], workdir: Path) -> dict[str, float]:
+    log_path = workdir / "bench.log"
+    log_path.write_text("".join(lines), encoding="utf-8")
+    db = Database(workdir / "collector.db")
+    db.connect()
+    try:
+        collector = Collector(db=db, log_path=log_path)
+        collector.initialize()
+        # The collector reports every zone change on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            processed = collector.process_file(from_beginning=True)
+            elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    return {"lines_per_sec": processed / elapsed}
+
+
+def bench_repository(db: Database, run_count: int, samples: int) -> dict[str, dict[str, float]]:
+    repo = Repository(db)
+    repo.set_player_context(1, "p1")
+    rng = random.Random(SEED)
+    run_ids = [(rng.randint(1, run_count),) for _ in range(samples)]
+    return {
+        "get_run_value": _latencies(repo.get_run_value, run_ids),
+        "get_run_stats": _latencies(repo.get_run_stats, [()] * samples),
+    }
+
+
+def bench_api(db: Database, run_count: int, samples: int) -> dict[str, dict[str, float]]:
+    app = create_app(db)
+    app.state.repo.set_player_context(1, "p1")
+    client = TestClient(app)
+    pages = max(1, min(run_count // PAGE_SIZE, 10000))
+
+    results = {}
+    for name, urls in (
+        ("runs", [f"/api/runs?page={i % pages + 1}&page_size={PAGE_SIZE}" for i in range(samples)]),
+        ("runs_stats", ["/api/runs/stats"] * samples),
+    ):
+        times = []
+        queries = 0
+        for url in urls:
+            # Measure the uncached path; the response cache would answer repeats
+            app.state.response_cache.clear()
+            statements = []
+            db.connection.set_trace_callback(statements.append)
+            try:
+                start = time.perf_counter()
+                response = client.get(url)
+                times.append((time.perf_counter() - start) * 1000)
+            finally:
+                db.connection.set_trace_callback(None)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+            queries = max(queries, len(statements))
+        results[name] = {
+            "p50_ms": _percentile(times, 50),
+            "p99_ms": _percentile(times, 99),
+            "queries": queries,
+        }
+    return results
+
+
+def run_benchmarks(scale: str, repeat: int, samples: int) -> dict[str, float]:
+    """Run every benchmark at a scale and return flat {metric: value} results."""
+    line_count, run_count = SCALES[scale]
+    results: dict[str, float] = {}
+
+    lines = generate_log_lines(line_count)
+    results["parser.lines_per_sec"] = bench_parser(lines, repeat)["lines_per_sec"]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        results["collector.lines_per_sec"] = bench_collector(lines, workdir)["lines_per_sec"]
+
+        db = Database(workdir / "runs.db")
+        db.connect()
+        try:
+            seed_runs(db, run_count)
+            for group in (bench_repository(db, run_count, samples), bench_api(db, run_count, samples)):
+                for name, metrics in group.items():
+                    prefix = "api" if name.startswith("runs") else "repository"
+                    for metric, value in metrics.items():
+                        results[f"{prefix}.{name}.{metric}"] = value
+        finally:
+            db.close()
+    return results
+
+
+# --- Baselines ---
+
+
+def compare(
+    results: dict[str, float],
+    baseline: dict[str, float],
+    tolerance: float,
+    min_delta_ms: float = 1.0,
+) -> list[str]:
+    """
+    Regressions of results against a baseline.
+
+    Throughput (*_per_sec) may drop and latency (*_ms) may rise by at most
+    tolerance (a fraction); latency changes under min_delta_ms are noise.
+    Query counts may not rise at all.
+    """
+    regressions = []
+    for metric, old in baseline.items():
+        new = results.get(metric)
+        if new is None or not old:
+            continue
+        if metric.endswith("_per_sec"):
+            worse = new < old * (1 - tolerance)
+        elif metric.endswith("_ms"):
+            worse = new > old * (1 + tolerance) and new - old >= min_delta_ms
+        else:
+            worse = new > old
+        if worse:
+            regressions.append(f"{metric}: {old:.6g} -> {new:.6g}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="Workload size")
+    parser.add_argument("--repeat", type=int, default=3, help="Parser repetitions (best time is reported)")
+    parser.add_argument("--samples", type=int, default=200, help="Calls per latency measurement")
+    parser.add_argument("--baseline", type=Path, help="Compare against this baseline file")
+    parser.add_argument("--save-baseline", type=Path, help="Store the results in this baseline file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed timing regression as a fraction (default 0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=1.0,
+        help="Latency changes smaller than this are not regressions (default 1.0)",
+    )
+    args = parser.parse_args()
+
+    line_count, run_count = SCALES[args.scale]
+    print(f"Scale {args.scale}: {line_count} log lines, {run_count} runs")
+    results = run_benchmarks(args.scale, args.repeat, args.samples)
+    for metric, value in results.items():
+        print(f"  {metric:40s} {value:12.2f}")
+
+    if args.save_baseline:
+        stored = json.loads(args.save_baseline.read_text()) if args.save_baseline.exists() else {}
+        stored[args.scale] = results
+        args.save_baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved {args.scale} baseline to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text()).get(args.scale)
+        if baseline is None:
+            print(f"\nNo {args.scale} baseline in {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\nRegressed against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Benchmark JSON serialization and compression of large API payloads.
+
+Builds synthetic run list, inventory and history responses and reports
+model build time (validated vs model_construct), JSON encoding time
+(json vs orjson) and payload size (raw, gzip, brotli).
+
+Usage:
+    python scripts/bench_serialization.py [--runs 500] [--repeat 5]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from titrack.api.schemas import (  # noqa: E402
+    InventoryItem,
+    InventoryResponse,
+    LootItem,
+    RunListResponse,
+    RunResponse,
+)
+from titrack.api.routes.stats import TimeSeriesPoint  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _timed(fn, repeat: int) -> float:
+    """Best wall time of fn over repeat calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def build_runs(count: int, construct: bool) -> RunListResponse:
+    """Run list with 30 loot lines per run."""
+    make_loot = LootItem.model_construct if construct else LootItem
+    start = datetime(2026, 1, 1)
+    runs = []
+    for i in range(count):
+        loot = [
+            make_loot(
+                config_base_id=100000 + j,
+                name=f"Item {j}",
+                quantity=j + 1,
+                icon_url=f"/api/icons/{100000 + j}",
+                price_fe=1.5,
+                total_value_fe=1.5 * (j + 1),
+            )
+            for j in range(30)
+        ]
+        runs.append(
+            RunResponse(
+                id=i,
+                zone_name=f"Zone {i % 20}",
+                zone_signature=f"zone_{i % 20}",
+                start_ts=start + timedelta(minutes=5 * i),
+                end_ts=start + timedelta(minutes=5 * i + 4),
+                duration_seconds=240.0,
+                is_hub=False,
+                fe_gained=120,
+                total_value=480.5,
+                loot=loot,
+            )
+        )
+    return RunListResponse(runs=runs, total=count, page=1, page_size=count)
+
+
+def build_inventory(count: int, construct: bool) -> InventoryResponse:
+    """Inventory with count distinct items."""
+    make_item = InventoryItem.model_construct if construct else InventoryItem
+    items = [
+        make_item(
+            config_base_id=200000 + i,
+            name=f"Item {i}",
+            quantity=i % 999 + 1,
+            icon_url=f"/api/icons/{200000 + i}",
+            price_fe=0.25,
+            total_value_fe=0.25 * (i % 999 + 1),
+        )
+        for i in range(count)
+    ]
+    return InventoryResponse(items=items, total_fe=1000, net_worth_fe=5000.0)
+
+
+def build_history(count: int, construct: bool) -> list:
+    """Cumulative value series with count points."""
+    make_point = TimeSeriesPoint.model_construct if construct else TimeSeriesPoint
+    start = datetime(2026, 1, 1)
+    return [
+        make_point(timestamp=start + timedelta(minutes=i), value=float(i) * 3.5)
+        for i in range(count)
+    ]
+
+
+def _dump_json(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def bench(name: str, builder, count: int, repeat: int) -> None:
+    validated_ms = _timed(lambda: builder(count, construct=False), repeat)
+    constructed_ms = _timed(lambda: builder(count, construct=True), repeat)
+
+    model = builder(count, construct=True)
+    if isinstance(model, list):
+        payload = [p.model_dump(mode="json") for p in model]
+        pydantic_ms = _timed(lambda: [p.model_dump_json() for p in model], repeat)
+    else:
+        payload = model.model_dump(mode="json")
+        pydantic_ms = _timed(model.model_dump_json, repeat)
+
+    raw = _dump_json(payload)
+    json_ms = _timed(lambda: _dump_json(payload), repeat)
+    orjson_ms = _timed(lambda: orjson.dumps(payload), repeat) if orjson else None
+    gzip_size = len(gzip.compress(raw, compresslevel=6))
+    br_size = len(brotli.compress(raw, quality=4)) if brotli else None
+
+    print(f"\n{name} ({count} records)")
+    print(f"  build validated     {validated_ms:8.2f} ms")
+    print(f"  build construct     {constructed_ms:8.2f} ms")
+    print(f"  pydantic dump_json  {pydantic_ms:8.2f} ms")
+    print(f"  json.dumps          {json_ms:8.2f} ms")
+    print(f"  orjson.dumps        {orjson_ms:8.2f} ms" if orjson_ms is not None else "  orjson.dumps        (not installed)")
+    print(f"  size raw            {len(raw):8d} bytes")
+    print(f"  size gzip           {gzip_size:8d} bytes ({gzip_size / len(raw):.1%})")
+    if br_size is not None:
+        print(f"  size brotli         {br_size:8d} bytes ({br_size / len(raw):.1%})")
+    else:
+        print("  size brotli         (not installed)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=500, help="Runs in the run list payload")
+    parser.add_argument("--items", type=int, default=2000, help="Items in the inventory payload")
+    parser.add_argument("--points", type=int, default=10000, help="Points in the history payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions (best time is reported)")
+    args = parser.parse_args()
+
+    bench("Run list", build_runs, args.runs, args.repeat)
+    bench("Inventory", build_inventory, args.items, args.repeat)
+    bench("History", build_history, args.points, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
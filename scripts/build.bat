@@ -19,6 +19,15 @@ if errorlevel 1 (
     pip install pyinstaller
 )
 
+echo.
+echo Building item catalogue...
+python -m titrack build-catalogue --seed tlidb_items_seed_en.json --output tlidb_items_en.db
+if errorlevel 1 (
+    echo.
+    echo ERROR: Item catalogue build failed!
+    exit /b 1
+)
+
 echo.
 echo Building with PyInstaller...
 echo.
@@ -57,11 +66,11 @@ if not exist "dist\TITrack\TITrack.exe" (
 )
 echo   [OK] TITrack.exe
 
-if not exist "dist\TITrack\tlidb_items_seed_en.json" (
-    echo ERROR: Items seed file not found!
+if not exist "dist\TITrack\tlidb_items_en.db" (
+    echo ERROR: Item catalogue not found!
     exit /b 1
 )
-echo   [OK] tlidb_items_seed_en.json
+echo   [OK] tlidb_items_en.db
 
 if not exist "dist\TITrack\titrack\web\static\index.html" (
     echo ERROR: Static web files not found!
@@ -1,5 +1,6 @@
 """FastAPI application factory."""
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
@@ -7,14 +8,47 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from titrack.api.routes import cloud, icons, inventory, items, prices, runs, settings, stats, update
+from titrack.api.cache import ResponseCache, ResponseCacheMiddleware
+from titrack.api.compression import CompressionMiddleware
+from titrack.api.executor import db_route
+from titrack.api.icon_cache import ICON_CACHE_DIRNAME, IconCache
+from titrack.api.responses import get_default_response_class
+from titrack.api.routes import (
+    cloud,
+    dashboard,
+    export,
+    icons,
+    inventory,
+    items,
+    prices,
+    runs,
+    settings,
+    stats,
+    update,
+)
 from titrack.api.schemas import PlayerResponse, StatusResponse
+from titrack.api.sprites import SpriteCache
 from titrack.config.paths import get_static_dir
 from titrack.db.connection import Database
 from titrack.db.repository import Repository
 from titrack.parser.player_parser import get_effective_player_id, PlayerInfo
 from titrack.version import __version__
 
+# /api/status is the UI's liveness check; answer quickly or not at all
+STATUS_TIMEOUT = 3.0
+
+
+def prefetch_icons(app: FastAPI) -> None:
+    """Warm the icon cache for the current inventory and recent loot in the background."""
+    app.state.icon_cache.start_prefetch(app.state.repo.get_prefetch_icon_urls)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background work when the server starts."""
+    prefetch_icons(app)
+    yield
+
 
 def create_app(
     db: Database,
@@ -24,6 +58,7 @@ def create_app(
     player_info: Optional[PlayerInfo] = None,
     sync_manager: Optional[object] = None,
     browser_mode: bool = False,
+    icon_cache: Optional[IconCache] = None,
 ) -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -33,6 +68,7 @@ def create_app(
         log_path: Path to log file being monitored
         collector_running: Whether the collector is actively running
         player_info: Current player info for data isolation
+        icon_cache: Icon cache (defaults to one in the database's directory)
 
     Returns:
         Configured FastAPI application
@@ -41,8 +77,16 @@ def create_app(
         title="TITrack API",
         description="Torchlight Infinite Local Loot Tracker API",
         version=__version__,
+        default_response_class=get_default_response_class(),
+        lifespan=lifespan,
     )
 
+    # Cache for read endpoints. Middleware added later wraps it, so the order
+    # is Compression -> CORS -> ResponseCache: cached responses still get CORS
+    # headers and are compressed per request.
+    response_cache = ResponseCache()
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
     # CORS middleware for local development
     app.add_middleware(
         CORSMiddleware,
@@ -52,16 +96,26 @@ def create_app(
         allow_headers=["*"],
     )
 
+    # Compress large payloads (runs, inventory, history, exports)
+    app.add_middleware(CompressionMiddleware)
+
+    if icon_cache is None:
+        icon_cache = IconCache(Path(db.db_path).parent / ICON_CACHE_DIRNAME)
+
     # Create repository with player context for filtering
     repo = Repository(db)
     if player_info:
         effective_id = get_effective_player_id(player_info)
         repo.set_player_context(player_info.season_id, effective_id)
 
-    # Dependency override for repository injection
-    def get_repository() -> Repository:
+    # Dependency override for repository injection (async so resolving it
+    # never waits for a threadpool slot)
+    async def get_repository() -> Repository:
         return repo
 
+    async def get_icon_cache() -> IconCache:
+        return icon_cache
+
     # Apply dependency overrides to all routers
     app.dependency_overrides[runs.get_repository] = get_repository
     app.dependency_overrides[inventory.get_repository] = get_repository
@@ -69,8 +123,11 @@ def create_app(
     app.dependency_overrides[prices.get_repository] = get_repository
     app.dependency_overrides[stats.get_repository] = get_repository
     app.dependency_overrides[icons.get_repository] = get_repository
+    app.dependency_overrides[icons.get_icon_cache] = get_icon_cache
     app.dependency_overrides[settings.get_repository] = get_repository
     app.dependency_overrides[cloud.get_repository] = get_repository
+    app.dependency_overrides[dashboard.get_repository] = get_repository
+    app.dependency_overrides[export.get_repository] = get_repository
 
     # Include routers
     app.include_router(runs.router)
@@ -82,6 +139,8 @@ def create_app(
     app.include_router(settings.router)
     app.include_router(cloud.router)
     app.include_router(update.router)
+    app.include_router(dashboard.router)
+    app.include_router(export.router)
 
     # Initialize update manager
     try:
@@ -101,20 +160,22 @@ def create_app(
     app.state.player_info = player_info
     app.state.sync_manager = sync_manager
     app.state.browser_mode = browser_mode
+    app.state.response_cache = response_cache
+    app.state.icon_cache = icon_cache
+    app.state.sprite_cache = SpriteCache()
 
-    @app.get("/api/status", response_model=StatusResponse, tags=["status"])
+    @db_route(
+        app.get("/api/status", response_model=StatusResponse, tags=["status"]),
+        timeout=STATUS_TIMEOUT,
+    )
     def get_status() -> StatusResponse:
-        """Get server status."""
-        return StatusResponse(
-            status="ok",
-            collector_running=app.state.collector_running,
-            db_path=str(db.db_path),
-            log_path=str(log_path) if log_path else None,
-            log_path_missing=log_path is None,
-            item_count=repo.get_item_count(),
-            run_count=len(repo.get_recent_runs(limit=10000)),
-            awaiting_player=app.state.player_info is None,
-        )
+        """
+        Get server status.
+
+        Polled frequently by the UI, so counts come from maintained counters
+        and collector health is read from memory (plus one file stat).
+        """
+        return dashboard.build_status(app.state, repo)
 
     @app.get("/api/browser-mode", tags=["status"])
     def get_browser_mode() -> dict:
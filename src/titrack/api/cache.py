@@ -0,0 +1,164 @@
+"""Response cache for read endpoints, keyed by the global data version."""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from titrack.api.executor import get_db_executor
+
+# Read endpoints whose JSON is a pure function of database state + query params
+CACHED_PATHS = frozenset({
+    "/api/runs",
+    "/api/runs/stats",
+    "/api/inventory",
+    "/api/stats/history",
+    "/api/stats/history/series",
+    "/api/stats/net-worth",
+    "/api/stats/zones/analytics",
+    "/api/stats/drops",
+    "/api/prices",
+    "/api/cloud/prices",
+})
+
+# Endpoints that also depend on the clock (e.g. a "last N hours" window);
+# their entries are additionally keyed by the current minute
+TIME_DEPENDENT_PATHS = frozenset({
+    "/api/stats/history",
+    "/api/stats/history/series",
+    "/api/stats/net-worth",
+})
+
+MAX_CACHED_RESPONSES = 256
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized JSON responses with single-flight computation.
+
+    Keys include the data version, so writes (which bump data_versions via
+    triggers) invalidate entries; when the version moves on, everything
+    cached for older versions is dropped at once. Only used from the event
+    loop, so no locking is needed.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+        self._in_flight: dict[tuple, asyncio.Event] = {}
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def observe_version(self, version: int) -> None:
+        """Drop all entries if the data version changed since the last request."""
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: tuple) -> Optional[tuple[bytes, str]]:
+        """Get (body, media_type) for a key, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, body: bytes, media_type: str) -> None:
+        """Store a response body, evicting the least recently used entry if full."""
+        self._entries[key] = (body, media_type)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def in_flight(self, key: tuple) -> Optional[asyncio.Event]:
+        """Get the event of a computation already running for key, if any."""
+        return self._in_flight.get(key)
+
+    def start(self, key: tuple) -> asyncio.Event:
+        """Mark key as being computed; identical requests wait on the returned event."""
+        event = asyncio.Event()
+        self._in_flight[key] = event
+        return event
+
+    def finish(self, key: tuple) -> None:
+        """Mark the computation for key as done and wake up waiting requests."""
+        event = self._in_flight.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Serve cached JSON for CACHED_PATHS.
+
+    The key is (path, query params, data version, player context, whether
+    cloud sync is attached). On a
+    miss the first request computes the response while concurrent identical
+    requests wait for it and are then served from the cache.
+    """
+
+    def __init__(self, app, cache: ResponseCache) -> None:
+        super().__init__(app)
+        self.cache = cache
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        path = request.url.path
+        if request.method != "GET" or path not in CACHED_PATHS:
+            return await call_next(request)
+
+        repo = request.app.state.repo
+        version = await get_db_executor().read(repo.get_data_version)
+        self.cache.observe_version(version)
+
+        key = (
+            path,
+            tuple(sorted(request.query_params.multi_items())),
+            version,
+            repo.context,
+            getattr(request.app.state, "sync_manager", None) is not None,
+            datetime.now().strftime("%Y%m%d%H%M") if path in TIME_DEPENDENT_PATHS else None,
+        )
+
+        cached = self.cache.get(key)
+        in_flight = self.cache.in_flight(key) if cached is None else None
+        if in_flight is not None:
+            # Single flight: wait for the identical request already computing
+            await in_flight.wait()
+            cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.hits += 1
+            body, media_type = cached
+            return Response(body, media_type=media_type, headers={"X-Cache": "HIT"})
+
+        self.cache.misses += 1
+        self.cache.start(key)
+        try:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            media_type = response.media_type or response.headers.get(
+                "content-type", "application/json"
+            )
+            self.cache.put(key, body, media_type)
+
+            headers = {
+                k: v for k, v in response.headers.items() if k.lower() != "content-length"
+            }
+            headers["X-Cache"] = "MISS"
+            return Response(body, status_code=200, headers=headers, media_type=media_type)
+        finally:
+            self.cache.finish(key)
@@ -0,0 +1,154 @@
+"""Response compression middleware (Brotli when available, otherwise GZip)."""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional - install with: pip install titrack[fast]
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+DEFAULT_MINIMUM_SIZE = 1024
+
+# Already-compressed content is passed through as is (SVG is text and still compressed)
+INCOMPRESSIBLE_PREFIXES = ("image/", "audio/", "video/", "font/woff")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Choose a content encoding from an Accept-Encoding header.
+
+    Returns:
+        "br" if Brotli is installed and accepted, else "gzip" if accepted,
+        else None.
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if token and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(token.strip().lower())
+
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk; flush so streamed chunks reach the client promptly."""
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses above a size threshold.
+
+    Uses Brotli when the brotli package is installed and the client accepts
+    it, GZip otherwise. Streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = DEFAULT_MINIMUM_SIZE,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Rewrites the outgoing messages of one response."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._passthrough = False
+        self._compressor: Optional[_Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the start message until the first body chunk shows the size
+            self._start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self._passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or (
+                    content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+                    and not content_type.startswith("image/svg")
+                )
+            )
+            if self._passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self._send(self._start)
+                await self._send(message)
+                return
+
+            self._compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = MutableHeaders(raw=self._start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            compressed = self._compressor.compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self._send(self._start)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = self._compressor.compress(body, final=not more_body)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
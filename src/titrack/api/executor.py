@@ -0,0 +1,138 @@
+"""Dedicated thread pools for database work done by API routes."""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+# Route timeouts in seconds (overridable per endpoint)
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_WRITE_TIMEOUT = 30.0
+
+# Reader threads; they share one connection, so more would only queue on its lock
+READ_WORKERS = 2
+
+# Calls beyond this many unfinished ones are rejected with 503
+MAX_PENDING = 64
+
+
+class DatabaseExecutor:
+    """
+    Run blocking database calls off the event loop.
+
+    Reads and writes get separate pools so a long read (an export, a big
+    history window) never delays a settings change, and neither touches
+    Starlette's shared threadpool that serves static files. The writer pool
+    has a single thread, matching SQLite's one-writer model. Calls that do
+    not finish within their timeout are answered with 503; the query itself
+    still runs to completion in the background.
+    """
+
+    def __init__(self, read_workers: int = READ_WORKERS, max_pending: int = MAX_PENDING) -> None:
+        self._read_pool = ThreadPoolExecutor(
+            max_workers=read_workers, thread_name_prefix="titrack-db-read"
+        )
+        self._write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="titrack-db-write")
+        self._max_pending = max_pending
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted calls that have not finished yet."""
+        return self._pending
+
+    async def read(self, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """Run a read-only call on the reader pool."""
+        return await self._run(self._read_pool, fn, timeout or DEFAULT_READ_TIMEOUT)
+
+    async def write(self, fn: Callable[[], T], timeout: Optional[float] = None) -> T:
+        """Run a call that writes to the database on the writer thread."""
+        return await self._run(self._write_pool, fn, timeout or DEFAULT_WRITE_TIMEOUT)
+
+    async def _run(self, pool: ThreadPoolExecutor, fn: Callable[[], T], timeout: float) -> T:
+        with self._pending_lock:
+            if self._pending >= self._max_pending:
+                raise HTTPException(status_code=503, detail="Database busy, try again")
+            self._pending += 1
+
+        try:
+            future = pool.submit(fn)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the work finishes, not when the caller stops waiting
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503, detail=f"Database query timed out after {timeout:g}s"
+            )
+
+    def _release(self) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop both pools (waits for running calls)."""
+        self._read_pool.shutdown(wait=True)
+        self._write_pool.shutdown(wait=True)
+
+
+_executor: Optional[DatabaseExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DatabaseExecutor:
+    """Get the process-wide database executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = DatabaseExecutor()
+        return _executor
+
+
+def db_route(
+    register: Callable[[Callable], Any],
+    *,
+    write: bool = False,
+    timeout: Optional[float] = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Register a sync route function as an async endpoint run on the DB executor.
+
+    Usage:
+        @db_route(router.get("/stats", response_model=RunStatsResponse))
+        def get_stats(...):
+            ...
+
+    FastAPI sees an async endpoint with the same signature, so parameter
+    parsing and dependencies are unchanged. The decorated function itself is
+    returned as is and stays callable from other routes and tests.
+
+    Args:
+        register: A route decorator such as router.get(...)
+        write: Run on the writer thread instead of the reader pool
+        timeout: Seconds before answering 503 (defaults per read/write)
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        async def endpoint(*args: Any, **kwargs: Any) -> T:
+            call = functools.partial(fn, *args, **kwargs)
+            executor = get_db_executor()
+            if write:
+                return await executor.write(call, timeout)
+            return await executor.read(call, timeout)
+
+        register(endpoint)
+        return fn
+
+    return decorator
@@ -0,0 +1,262 @@
+"""Two-tier icon cache: bounded in-memory LRU over a persistent on-disk store."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+# Directory (inside the data dir) holding cached icons
+ICON_CACHE_DIRNAME = "icon_cache"
+
+# Memory tier budget; icons are a few KB each
+DEFAULT_MEMORY_BYTES = 8 * 1024 * 1024
+
+# How long a failed URL is skipped before it is tried again
+NEGATIVE_TTL_SECONDS = 3600.0
+
+FETCH_TIMEOUT = 10
+PREFETCH_WORKERS = 8
+
+# CDN request headers
+CDN_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Referer": "https://tlidb.com/",
+    "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
+}
+
+
+def fetch_url(url: str) -> Optional[bytes]:
+    """Fetch icon bytes from the CDN. Returns None on any HTTP/network error."""
+    try:
+        req = urllib.request.Request(url, headers=CDN_HEADERS)
+        with urllib.request.urlopen(req, timeout=FETCH_TIMEOUT) as resp:
+            return resp.read()
+    except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError, OSError):
+        return None
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedIcon:
+    """Icon bytes plus their content hash."""
+
+    data: bytes
+    digest: str
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag (the content hash)."""
+        return f'"{self.digest}"'
+
+
+class IconCache:
+    """
+    Icon cache keyed by CDN URL.
+
+    Icons are stored on disk content-addressed (blobs/<sha256 of bytes>),
+    with a small ref file per URL (refs/<sha256 of url>) pointing at the
+    blob, so identical icons are stored once and the cache survives
+    restarts. A byte-bounded LRU keeps hot icons in memory. URLs that fail
+    to download are remembered for NEGATIVE_TTL_SECONDS. Concurrent
+    requests for the same URL share one download. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path],
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        negative_ttl: float = NEGATIVE_TTL_SECONDS,
+        fetcher: Callable[[str], Optional[bytes]] = fetch_url,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            cache_dir: Directory for the disk tier (None keeps icons in memory only)
+            max_memory_bytes: Memory tier budget
+            negative_ttl: Seconds to skip a URL after a failed download
+            fetcher: Downloads a URL, returning None on failure
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.cache_dir = cache_dir
+        self._max_memory_bytes = max_memory_bytes
+        self._negative_ttl = negative_ttl
+        self._fetcher = fetcher
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, CachedIcon] = OrderedDict()
+        self._memory_bytes = 0
+        self._failed: dict[str, float] = {}  # url -> retry-after (clock time)
+        self._in_flight: dict[str, threading.Event] = {}
+        self.fetches = 0
+
+    # --- Lookup ---
+
+    def get(self, url: str) -> Optional[CachedIcon]:
+        """Get an icon from memory, disk or the CDN (in that order)."""
+        while True:
+            icon = self.get_cached(url)
+            if icon is not None:
+                return icon
+
+            with self._lock:
+                retry_after = self._failed.get(url)
+                if retry_after is not None:
+                    if self._clock() < retry_after:
+                        return None
+                    del self._failed[url]
+
+                event = self._in_flight.get(url)
+                if event is None:
+                    event = threading.Event()
+                    self._in_flight[url] = event
+                    break
+
+            # Another thread is downloading this URL; use its result
+            event.wait()
+            with self._lock:
+                if url in self._failed:
+                    return None
+
+        try:
+            return self._download(url)
+        finally:
+            with self._lock:
+                self._in_flight.pop(url, None)
+            event.set()
+
+    def get_cached(self, url: str) -> Optional[CachedIcon]:
+        """Get an icon from memory or disk without touching the network."""
+        with self._lock:
+            icon = self._memory.get(url)
+            if icon is not None:
+                self._memory.move_to_end(url)
+                return icon
+
+        icon = self._read_disk(url)
+        if icon is not None:
+            self._remember(url, icon)
+        return icon
+
+    def _download(self, url: str) -> Optional[CachedIcon]:
+        with self._lock:
+            self.fetches += 1
+        data = self._fetcher(url)
+        if not data:
+            with self._lock:
+                self._failed[url] = self._clock() + self._negative_ttl
+            return None
+
+        icon = CachedIcon(data=data, digest=_sha256(data))
+        self._write_disk(url, icon)
+        self._remember(url, icon)
+        return icon
+
+    # --- Memory tier ---
+
+    def _remember(self, url: str, icon: CachedIcon) -> None:
+        """Add to the memory LRU, evicting least recently used icons over budget."""
+        if len(icon.data) > self._max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(url, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.data)
+            self._memory[url] = icon
+            self._memory_bytes += len(icon.data)
+            while self._memory_bytes > self._max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.data)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes currently held by the memory tier."""
+        return self._memory_bytes
+
+    # --- Disk tier ---
+
+    def _ref_path(self, url: str) -> Path:
+        key = _sha256(url.encode("utf-8"))
+        return self.cache_dir / "refs" / key[:2] / key
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.cache_dir / "blobs" / digest[:2] / digest
+
+    def _read_disk(self, url: str) -> Optional[CachedIcon]:
+        if self.cache_dir is None:
+            return None
+        try:
+            digest = self._ref_path(url).read_text(encoding="ascii").strip()
+            data = self._blob_path(digest).read_bytes()
+        except (OSError, ValueError):
+            return None
+        if _sha256(data) != digest:
+            # Truncated or corrupted blob - refetch
+            return None
+        return CachedIcon(data=data, digest=digest)
+
+    def _write_disk(self, url: str, icon: CachedIcon) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            blob = self._blob_path(icon.digest)
+            if not blob.exists():
+                _atomic_write(blob, icon.data)
+            _atomic_write(self._ref_path(url), icon.digest.encode("ascii"))
+        except OSError:
+            pass  # The memory tier still has it; disk is best effort
+
+    # --- Prefetch ---
+
+    def prefetch(self, urls: Iterable[str], workers: int = PREFETCH_WORKERS) -> int:
+        """
+        Download icons that are not cached yet, several at a time.
+
+        Returns:
+            Number of icons downloaded
+        """
+        missing = [url for url in dict.fromkeys(urls) if url and self.get_cached(url) is None]
+        if not missing:
+            return 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="titrack-icons") as pool:
+            return sum(1 for icon in pool.map(self.get, missing) if icon is not None)
+
+    def start_prefetch(self, urls_provider: Callable[[], Iterable[str]]) -> threading.Thread:
+        """Run prefetch(urls_provider()) on a background daemon thread."""
+
+        def run() -> None:
+            try:
+                self.prefetch(urls_provider())
+            except Exception as e:
+                print(f"Icon prefetch failed: {e}")
+
+        thread = threading.Thread(target=run, name="titrack-icon-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write a file via a temp file + rename so readers never see partial data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
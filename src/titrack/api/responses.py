@@ -0,0 +1,36 @@
+"""JSON response classes."""
+
+from typing import Any
+
+from fastapi import responses
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional - install with: pip install titrack[fast]
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def get_default_response_class() -> type[JSONResponse]:
+    """
+    Pick the response class for the app.
+
+    Newer FastAPI versions serialize response models straight to JSON bytes
+    with Pydantic (and mark their own ORJSONResponse deprecated); a custom
+    class would only get in the way there. Older versions build Python
+    objects first and dump them with the json module, where orjson is
+    several times faster.
+    """
+    builtin_orjson = getattr(responses, "ORJSONResponse", None)
+    if orjson is None or getattr(builtin_orjson, "__deprecated__", None):
+        return JSONResponse
+    return FastJSONResponse
@@ -6,11 +6,15 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
+from titrack.api.executor import db_route
 from titrack.db.repository import Repository
 from titrack.sync.manager import SyncManager, SyncStatus
 
 router = APIRouter(prefix="/api/cloud", tags=["cloud"])
 
+# Sync and debug calls talk to the cloud backend, so allow them more time
+SYNC_TIMEOUT = 60.0
+
 
 def get_repository() -> Repository:
     """Dependency injection for repository - set by app factory."""
@@ -99,7 +103,7 @@ class CloudPriceHistoryResponse(BaseModel):
     history: list[PriceHistoryPoint]
 
 
-@router.get("/status", response_model=CloudStatusResponse)
+@db_route(router.get("/status", response_model=CloudStatusResponse))
 def get_cloud_status(
     request: Request,
     repo: Repository = Depends(get_repository),
@@ -135,7 +139,7 @@ def get_cloud_status(
     )
 
 
-@router.post("/toggle", response_model=CloudToggleResponse)
+@db_route(router.post("/toggle", response_model=CloudToggleResponse), write=True)
 def toggle_cloud_sync(
     request_body: CloudToggleRequest,
     request: Request,
@@ -165,7 +169,7 @@ def toggle_cloud_sync(
         return CloudToggleResponse(success=True, enabled=False)
 
 
-@router.post("/sync", response_model=CloudSyncResponse)
+@db_route(router.post("/sync", response_model=CloudSyncResponse), write=True, timeout=SYNC_TIMEOUT)
 def trigger_sync(
     request: Request,
     repo: Repository = Depends(get_repository),
@@ -189,7 +193,7 @@ def trigger_sync(
     )
 
 
-@router.get("/prices", response_model=CloudPriceListResponse)
+@db_route(router.get("/prices", response_model=CloudPriceListResponse))
 def get_cloud_prices(
     request: Request,
     repo: Repository = Depends(get_repository),
@@ -201,7 +205,7 @@ def get_cloud_prices(
         return CloudPriceListResponse(prices=[], total=0)
 
     # Get season from repository context
-    season_id = repo._current_season_id
+    season_id = repo.context.season_id
 
     prices = sync_manager.get_cached_cloud_prices(season_id)
 
@@ -224,7 +228,7 @@ def get_cloud_prices(
     )
 
 
-@router.get("/debug")
+@db_route(router.get("/debug"), timeout=SYNC_TIMEOUT)
 def get_cloud_debug(
     request: Request,
     repo: Repository = Depends(get_repository),
@@ -233,8 +237,8 @@ def get_cloud_debug(
     sync_manager = get_sync_manager(request)
 
     result = {
-        "repo_season_id": repo._current_season_id,
-        "repo_player_id": repo._current_player_id,
+        "repo_season_id": repo.context.season_id,
+        "repo_player_id": repo.context.player_id,
     }
 
     if sync_manager:
@@ -267,7 +271,7 @@ def get_cloud_debug(
     return result
 
 
-@router.get("/prices/{config_base_id}/history", response_model=CloudPriceHistoryResponse)
+@db_route(router.get("/prices/{config_base_id}/history", response_model=CloudPriceHistoryResponse))
 def get_cloud_price_history(
     config_base_id: int,
     request: Request,
@@ -276,7 +280,7 @@ def get_cloud_price_history(
     """Get price history for an item (for sparklines and charts)."""
     sync_manager = get_sync_manager(request)
 
-    season_id = repo._current_season_id or 0
+    season_id = repo.context.season_id or 0
 
     if sync_manager is None:
         return CloudPriceHistoryResponse(
@@ -0,0 +1,128 @@
+"""Dashboard API route - everything the main page shows in one response."""
+
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import BaseModel
+
+from titrack.api.executor import db_route
+from titrack.api.routes import inventory, runs, stats
+from titrack.api.schemas import (
+    ActiveRunResponse,
+    InventoryResponse,
+    RunListResponse,
+    RunStatsResponse,
+    StatusResponse,
+)
+from titrack.db.repository import Repository
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+def get_repository() -> Repository:
+    """Dependency injection for repository - set by app factory."""
+    raise NotImplementedError("Repository not configured")
+
+
+class DashboardResponse(BaseModel):
+    """Status, stats, runs, active run, inventory and chart data in one payload."""
+
+    data_version: int
+    status: StatusResponse
+    stats: RunStatsResponse
+    runs: RunListResponse
+    active_run: Optional[ActiveRunResponse] = None
+    inventory: InventoryResponse
+    history: stats.SeriesResponse  # Downsampled chart series
+
+
+def build_status(state, repo: Repository, include_health: bool = True) -> StatusResponse:
+    """
+    Build the server status from app state (shared with /api/status).
+
+    Counts come from maintained counters; collector health is read from
+    memory plus one file stat.
+    """
+    health = {}
+    collector = getattr(state, "collector", None)
+    if include_health and collector is not None and hasattr(collector, "get_health"):
+        health = collector.get_health()
+
+    return StatusResponse(
+        status="ok",
+        collector_running=state.collector_running,
+        db_path=str(state.db.db_path),
+        log_path=str(state.log_path) if state.log_path else None,
+        log_path_missing=state.log_path is None,
+        item_count=repo.get_item_count(),
+        run_count=repo.get_run_count(),
+        awaiting_player=state.player_info is None,
+        collector_lag_bytes=health.get("lag_bytes"),
+        last_event_at=health.get("last_event_at"),
+        last_poll_at=health.get("last_poll_at"),
+    )
+
+
+def _etag(repo: Repository, data_version: int, params: tuple) -> str:
+    """
+    ETag for a dashboard response.
+
+    Built from the data version and the player context (plus the request
+    parameters, which select the variant) only, so polls keep getting 304s
+    until something is written or the context changes.
+    """
+    key = (data_version, repo.context, params)
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in tags or etag[2:] in tags
+
+
+@db_route(router.get("", response_model=DashboardResponse))
+def get_dashboard(
+    request: Request,
+    response: Response,
+    page_size: int = Query(20, ge=1, le=100, description="Runs on the first page"),
+    sort_by: inventory.SortField = Query(inventory.SortField.VALUE, description="Inventory sort field"),
+    sort_order: inventory.SortOrder = Query(inventory.SortOrder.DESC, description="Inventory sort order"),
+    hours: int = Query(24, ge=1, le=168, description="Hours of chart history"),
+    max_points: int = Query(500, ge=3, le=10000, description="Most points per chart series"),
+    repo: Repository = Depends(get_repository),
+):
+    """
+    Get everything the dashboard shows in one response.
+
+    The response carries an ETag derived from the global data version, so
+    a poll with a matching If-None-Match gets a 304 without recomputing
+    anything. Collector health is left out here (it changes on every poll);
+    use /api/status for liveness checks.
+    """
+    state = request.app.state
+    data_version = repo.get_data_version()
+    etag = _etag(
+        repo, data_version, (page_size, sort_by.value, sort_order.value, hours, max_points)
+    )
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return DashboardResponse(
+        data_version=data_version,
+        status=build_status(state, repo, include_health=False),
+        stats=runs.build_run_stats(repo),
+        runs=runs.build_run_page(repo, page_size),
+        active_run=runs.build_active_run(repo),
+        inventory=inventory.build_inventory(repo, sort_by, sort_order),
+        history=stats.build_series(repo, hours, max_points=max_points),
+    )
@@ -0,0 +1,85 @@
+"""Export API routes."""
+
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from titrack.api.executor import get_db_executor
+from titrack.core.run_export import MEDIA_TYPES, encode_batches
+from titrack.db.repository import Repository
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+# Timeout for each chunk of a streamed export
+EXPORT_CHUNK_TIMEOUT = 60.0
+
+
+class ExportFormat(str, Enum):
+    """Run export formats."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ExportUnit(str, Enum):
+    """What one exported record is."""
+    RUN = "run"
+    SESSION = "session"
+
+
+def get_repository() -> Repository:
+    """Dependency injection for repository - set by app factory."""
+    raise NotImplementedError("Repository not configured")
+
+
+@router.get("/runs")
+async def export_runs(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Output format"),
+    unit: ExportUnit = Query(
+        ExportUnit.RUN, description="One record per run, or per session (split runs merged)"
+    ),
+    since: Optional[datetime] = Query(None, description="Only runs started at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only runs started before this time"),
+    historical_prices: bool = Query(
+        False, description="Value runs at the prices in effect when they ended"
+    ),
+    repo: Repository = Depends(get_repository),
+) -> StreamingResponse:
+    """
+    Stream the complete run history with per-item loot, costs and values.
+
+    Records are read off one database cursor and written out chunk by
+    chunk, oldest first, so any length of history exports in constant
+    memory.
+    """
+    executor = get_db_executor()
+    chunks = encode_batches(
+        repo.iter_run_export(
+            since=since,
+            until=until,
+            sessions=unit == ExportUnit.SESSION,
+            as_of=historical_prices,
+        ),
+        format.value,
+    )
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await executor.read(lambda: next(chunks, None), EXPORT_CHUNK_TIMEOUT)
+                if chunk is None:
+                    break
+                yield chunk.encode("utf-8")
+        finally:
+            chunks.close()
+
+    extension = "csv" if format == ExportFormat.CSV else "ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[format.value],
+        headers={
+            "Content-Disposition": f"attachment; filename=titrack_{unit.value}s.{extension}"
+        },
+    )
@@ -1,12 +1,19 @@
 """Icon proxy routes - fetches icons from CDN with proper headers."""
 
-import urllib.request
-import urllib.error
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import Response as FastAPIResponse
-
+from pydantic import BaseModel
+
+from titrack.api.icon_cache import IconCache
+from titrack.api.sprites import (
+    MAX_SPRITE_ICONS,
+    SPRITE_CELL_SIZE,
+    SpriteCache,
+    build_sprite_sheet,
+    set_hash,
+)
 from titrack.db.repository import Repository
 
 
@@ -14,46 +21,152 @@ def get_repository() -> Repository:
     """Dependency injection for repository - set by app factory."""
     raise NotImplementedError("Repository not configured")
 
+
+def get_icon_cache() -> IconCache:
+    """Dependency injection for the icon cache - set by app factory."""
+    raise NotImplementedError("Icon cache not configured")
+
 router = APIRouter(prefix="/api/icons", tags=["icons"])
 
-# In-memory cache for icons (icon_url -> bytes)
-# In production, consider using a disk cache or Redis
-_icon_cache: dict[str, bytes] = {}
-_failed_urls: set[str] = set()
 
-# CDN request headers
-CDN_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-    "Referer": "https://tlidb.com/",
-    "Accept": "image/webp,image/apng,image/*,*/*;q=0.8",
-}
+class SpriteOffset(BaseModel):
+    """Top-left corner of an icon's cell in the sheet (pixels)."""
+
+    x: int
+    y: int
+
+
+class SpriteMapResponse(BaseModel):
+    """Where to find each requested icon in a sprite sheet."""
+
+    sheet_url: str
+    cell_size: int
+    columns: int
+    rows: int
+    icons: dict[int, SpriteOffset]
+    missing: list[int]  # Requested ids with no icon (yet - uncached ones are being fetched)
+
+
+def content_type_for(url: str) -> str:
+    """Determine an icon's content type from its URL."""
+    if url.endswith(".png"):
+        return "image/png"
+    if url.endswith(".jpg") or url.endswith(".jpeg"):
+        return "image/jpeg"
+    return "image/webp"
+
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
 
-def fetch_icon(url: str) -> Optional[bytes]:
-    """Fetch icon from CDN with proper headers."""
-    if url in _failed_urls:
-        return None
 
-    if url in _icon_cache:
-        return _icon_cache[url]
+def _get_sprite_cache(request: Request) -> SpriteCache:
+    """Get the sprite cache from app state."""
+    cache = getattr(request.app.state, "sprite_cache", None)
+    if cache is None:
+        cache = request.app.state.sprite_cache = SpriteCache()
+    return cache
 
+
+def _parse_ids(ids: str) -> list[int]:
+    """Parse a comma-separated id list (400 on bad input)."""
     try:
-        req = urllib.request.Request(url, headers=CDN_HEADERS)
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = resp.read()
-            _icon_cache[url] = data
-            return data
-    except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError):
-        _failed_urls.add(url)
-        return None
+        parsed = sorted({int(part) for part in ids.split(",") if part.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(parsed) > MAX_SPRITE_ICONS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_SPRITE_ICONS} icons per sprite sheet"
+        )
+    return parsed
+
+
+@router.get("/sprite", response_model=SpriteMapResponse)
+def get_sprite_map(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated config base ids"),
+    repo: Repository = Depends(get_repository),
+    cache: IconCache = Depends(get_icon_cache),
+) -> SpriteMapResponse:
+    """
+    Combine many icons into one sprite sheet.
+
+    Returns the sheet's URL and each icon's offset in it, so a table of
+    items needs two requests instead of one per row. The sheet only holds
+    icons already in the icon cache, so this never waits on the CDN; the
+    others are reported as missing and downloaded in the background for a
+    later request. Sheets are cached by the hash of the requested id set; a
+    set is rebuilt only while some of its icons are still missing.
+    """
+    config_base_ids = _parse_ids(ids)
+    sprites = _get_sprite_cache(request)
+    set_key = set_hash(config_base_ids)
+
+    sheet = sprites.get_for_set(set_key)
+    if sheet is None or sheet.missing:
+        items = repo.get_items(config_base_ids)
+        urls = {cid: item.icon_url for cid, item in items.items() if item.icon_url}
+
+        icons = {}
+        uncached = []
+        for cid, url in urls.items():
+            icon = cache.get_cached(url)
+            if icon is not None:
+                icons[cid] = (icon, content_type_for(url))
+            else:
+                uncached.append(url)
+        missing = [cid for cid in config_base_ids if cid not in icons]
+        if uncached:
+            cache.start_prefetch(lambda: uncached)
+
+        sheet = build_sprite_sheet(icons, missing)
+        sprites.put(set_key, sheet)
+
+    return SpriteMapResponse(
+        sheet_url=f"{router.prefix}/sprite/{sheet.sheet_id}.svg",
+        cell_size=SPRITE_CELL_SIZE,
+        columns=sheet.columns,
+        rows=sheet.rows,
+        icons={cid: SpriteOffset(x=x, y=y) for cid, (x, y) in sheet.offsets.items()},
+        missing=sheet.missing,
+    )
+
+
+@router.get("/sprite/{sheet_id}.svg")
+def get_sprite_sheet(sheet_id: str, request: Request) -> Response:
+    """
+    Get a sprite sheet image built by /api/icons/sprite.
+
+    Sheet ids are content hashes, so the image can be cached forever.
+    """
+    sheet = _get_sprite_cache(request).get_sheet(sheet_id)
+    if sheet is None:
+        raise HTTPException(status_code=404, detail="Sprite sheet expired; request it again")
+
+    etag = f'"{sheet.sheet_id}"'
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return FastAPIResponse(status_code=304, headers=headers)
+    return FastAPIResponse(content=sheet.svg, media_type="image/svg+xml", headers=headers)
 
 
 @router.get("/{config_base_id}")
-def get_icon(config_base_id: int, repo: Repository = Depends(get_repository)) -> Response:
+def get_icon(
+    config_base_id: int,
+    request: Request,
+    repo: Repository = Depends(get_repository),
+    cache: IconCache = Depends(get_icon_cache),
+) -> Response:
     """
     Proxy icon for an item.
 
-    Fetches the icon from the CDN with proper headers and caches it.
+    Served from the memory/disk icon cache; only a miss goes to the CDN.
+    Responses carry a strong ETag (content hash), so revalidations get 304.
     Returns 404 if no icon URL exists or the CDN returns an error.
     """
     # Look up item to get icon URL
@@ -61,22 +174,19 @@ def get_icon(config_base_id: int, repo: Repository = Depends(get_repository)) ->
     if not item or not item.icon_url:
         raise HTTPException(status_code=404, detail="No icon available")
 
-    # Fetch from CDN (with caching)
-    icon_data = fetch_icon(item.icon_url)
-    if icon_data is None:
+    icon = cache.get(item.icon_url)
+    if icon is None:
         raise HTTPException(status_code=404, detail="Icon not available from CDN")
 
-    # Determine content type from URL
-    content_type = "image/webp"
-    if item.icon_url.endswith(".png"):
-        content_type = "image/png"
-    elif item.icon_url.endswith(".jpg") or item.icon_url.endswith(".jpeg"):
-        content_type = "image/jpeg"
+    headers = {
+        "Cache-Control": "public, max-age=86400",  # Cache for 24 hours
+        "ETag": icon.etag,
+    }
+    if _etag_matches(request.headers.get("if-none-match"), icon.etag):
+        return FastAPIResponse(status_code=304, headers=headers)
 
     return FastAPIResponse(
-        content=icon_data,
-        media_type=content_type,
-        headers={
-            "Cache-Control": "public, max-age=86400",  # Cache for 24 hours
-        },
+        content=icon.data,
+        media_type=content_type_for(item.icon_url),
+        headers=headers,
     )
@@ -4,6 +4,7 @@ from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 
+from titrack.api.executor import db_route
 from titrack.api.schemas import InventoryItem, InventoryResponse
 from titrack.db.repository import Repository
 from titrack.parser.patterns import FE_CONFIG_BASE_ID
@@ -29,13 +30,10 @@ def get_repository() -> Repository:
     raise NotImplementedError("Repository not configured")
 
 
-@router.get("", response_model=InventoryResponse)
-def get_inventory(
-    sort_by: SortField = Query(SortField.VALUE, description="Field to sort by"),
-    sort_order: SortOrder = Query(SortOrder.DESC, description="Sort order"),
-    repo: Repository = Depends(get_repository),
+def build_inventory(
+    repo: Repository, sort_by: SortField, sort_order: SortOrder
 ) -> InventoryResponse:
-    """Get current inventory state."""
+    """Build the current inventory state (shared with the dashboard)."""
     states = repo.get_all_slot_states()
 
     # Aggregate by item
@@ -113,3 +111,13 @@ def get_inventory(
         total_fe=total_fe,
         net_worth_fe=round(net_worth, 2),
     )
+
+
+@db_route(router.get("", response_model=InventoryResponse))
+def get_inventory(
+    sort_by: SortField = Query(SortField.VALUE, description="Field to sort by"),
+    sort_order: SortOrder = Query(SortOrder.DESC, description="Sort order"),
+    repo: Repository = Depends(get_repository),
+) -> InventoryResponse:
+    """Get current inventory state."""
+    return build_inventory(repo, sort_by, sort_order)
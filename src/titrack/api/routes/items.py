@@ -2,6 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from titrack.api.executor import db_route
 from titrack.api.schemas import ItemListResponse, ItemResponse, ItemUpdateRequest
 from titrack.db.repository import Repository
 
@@ -13,30 +14,20 @@ def get_repository() -> Repository:
     raise NotImplementedError("Repository not configured")
 
 
-@router.get("", response_model=ItemListResponse)
+@db_route(router.get("", response_model=ItemListResponse))
 def list_items(
-    search: str = Query(None, description="Search by name"),
-    limit: int = Query(100, le=1000),
+    search: str = Query(None, description="Search by name (substring, English or Chinese)"),
+    limit: int = Query(100, ge=1, le=1000),
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     repo: Repository = Depends(get_repository),
 ) -> ItemListResponse:
-    """List all items, optionally filtered by search term."""
-    all_items = repo.get_all_items()
+    """
+    List items, optionally filtered by search term.
 
-    # Filter by search if provided
-    if search:
-        search_lower = search.lower()
-        all_items = [
-            i
-            for i in all_items
-            if (i.name_en and search_lower in i.name_en.lower())
-            or (i.name_cn and search_lower in i.name_cn)
-        ]
-
-    # Sort by name
-    all_items.sort(key=lambda x: x.name_en or "")
-
-    # Apply limit
-    items = all_items[:limit]
+    Searches use the items_fts index; results are ranked (exact name,
+    then prefix, then other matches) and paginated with limit/page.
+    """
+    items, total = repo.search_items(search, limit=limit, offset=(page - 1) * limit)
 
     return ItemListResponse(
         items=[
@@ -51,11 +42,13 @@ def list_items(
             )
             for i in items
         ],
-        total=len(all_items),
+        total=total,
+        page=page,
+        page_size=limit,
     )
 
 
-@router.get("/{config_base_id}", response_model=ItemResponse)
+@db_route(router.get("/{config_base_id}", response_model=ItemResponse))
 def get_item(
     config_base_id: int,
     repo: Repository = Depends(get_repository),
@@ -76,7 +69,7 @@ def get_item(
     )
 
 
-@router.patch("/{config_base_id}", response_model=ItemResponse)
+@db_route(router.patch("/{config_base_id}", response_model=ItemResponse), write=True)
 def update_item(
     config_base_id: int,
     request: ItemUpdateRequest,
@@ -1,99 +1,136 @@
 """Prices API routes."""
 
+import json
 from datetime import datetime
-from typing import Any
+from enum import Enum
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
+from titrack.api.executor import db_route, get_db_executor
+from titrack.api.routes.inventory import SortOrder
 from titrack.api.schemas import PriceListResponse, PriceResponse, PriceUpdateRequest
 from titrack.core.models import Price
 from titrack.db.repository import Repository
 
 router = APIRouter(prefix="/api/prices", tags=["prices"])
 
+# Timeout for each batch of the streamed export
+EXPORT_TIMEOUT = 60.0
+
 
 def get_repository() -> Repository:
     """Dependency injection for repository - set by app factory."""
     raise NotImplementedError("Repository not configured")
 
 
-@router.get("", response_model=PriceListResponse)
+class PriceSortField(str, Enum):
+    """Price list sort fields."""
+    NAME = "name"
+    PRICE = "price"
+    UPDATED = "updated"
+    SOURCE = "source"
+
+
+def _price_responses(listing: list[tuple[Price, str]]) -> list[PriceResponse]:
+    return [
+        PriceResponse(
+            config_base_id=price.config_base_id,
+            name=name,
+            price_fe=price.price_fe,
+            source=price.source,
+            updated_at=price.updated_at,
+        )
+        for price, name in listing
+    ]
+
+
+@db_route(router.get("", response_model=PriceListResponse))
 def list_prices(
+    search: Optional[str] = Query(None, description="Filter by item name (English or Chinese)"),
+    source: Optional[str] = Query(None, description="Filter by price source"),
+    sort_by: PriceSortField = Query(PriceSortField.NAME, description="Sort field"),
+    sort_order: SortOrder = Query(SortOrder.ASC, description="Sort order"),
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1, le=1000, description="Prices per page (all if omitted)"),
     repo: Repository = Depends(get_repository),
 ) -> PriceListResponse:
-    """List all item prices."""
-    all_prices = repo.get_all_prices()
-
-    prices = []
-    for price in all_prices:
-        item = repo.get_item(price.config_base_id)
-        prices.append(
-            PriceResponse(
-                config_base_id=price.config_base_id,
-                name=item.name_en if item else f"Unknown {price.config_base_id}",
-                price_fe=price.price_fe,
-                source=price.source,
-                updated_at=price.updated_at,
-            )
-        )
-
-    # Sort by name
-    prices.sort(key=lambda x: x.name)
+    """List item prices, filtered, sorted and paginated in the database."""
+    listing, total = repo.get_price_listing(
+        search=search,
+        source=source,
+        sort_by=sort_by.value,
+        descending=sort_order == SortOrder.DESC,
+        limit=page_size,
+        offset=(page - 1) * page_size if page_size else 0,
+    )
 
     return PriceListResponse(
-        prices=prices,
-        total=len(prices),
+        prices=_price_responses(listing),
+        total=total,
+        page=page,
+        page_size=page_size,
     )
 
 
 @router.get("/export")
-def export_prices(
+async def export_prices(
     repo: Repository = Depends(get_repository),
-) -> JSONResponse:
-    """Export all prices as a seed-compatible JSON file."""
-    all_prices = repo.get_all_prices()
-
-    prices_data = []
-    for price in all_prices:
-        item = repo.get_item(price.config_base_id)
-        prices_data.append({
-            "id": str(price.config_base_id),
-            "name_en": item.name_en if item else None,
-            "price_fe": price.price_fe,
-            "source": price.source,
-        })
-
-    # Sort by name for readability
-    prices_data.sort(key=lambda x: x.get("name_en") or "")
-
-    export_data: dict[str, Any] = {
-        "meta": {
-            "exported_at_utc": datetime.utcnow().isoformat() + "Z",
-            "count": len(prices_data),
-            "notes": [
-                "Price seed file for TITrack.",
-                "Prices are in FE (Flame Elementium).",
-                "These values will be overwritten when users search the AH.",
-            ],
-        },
-        "prices": prices_data,
-    }
+) -> StreamingResponse:
+    """
+    Export all prices as a seed-compatible JSON file.
 
-    return JSONResponse(
-        content=export_data,
+    The document is streamed: rows are written out batch by batch as they
+    come off the database cursor instead of being built in memory first.
+    """
+    executor = get_db_executor()
+    count = await executor.read(repo.get_price_count)
+    meta = {
+        "exported_at_utc": datetime.utcnow().isoformat() + "Z",
+        "count": count,
+        "notes": [
+            "Price seed file for TITrack.",
+            "Prices are in FE (Flame Elementium).",
+            "These values will be overwritten when users search the AH.",
+        ],
+    }
+    batches = repo.iter_price_export()
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            yield ('{"meta":' + _dump(meta) + ',"prices":[').encode("utf-8")
+            first = True
+            while True:
+                batch = await executor.read(lambda: next(batches, None), EXPORT_TIMEOUT)
+                if batch is None:
+                    break
+                chunk = ",".join(_dump(entry) for entry in batch)
+                yield (chunk if first else "," + chunk).encode("utf-8")
+                first = False
+            yield b"]}"
+        finally:
+            batches.close()
+
+    return StreamingResponse(
+        body(),
+        media_type="application/json",
         headers={
             "Content-Disposition": "attachment; filename=titrack_prices_seed.json"
         },
     )
 
 
+def _dump(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
 class MigratePricesResponse(PriceListResponse):
     """Response for migrate prices endpoint."""
     migrated: int
 
 
-@router.post("/migrate-legacy", response_model=MigratePricesResponse)
+@db_route(router.post("/migrate-legacy", response_model=MigratePricesResponse), write=True)
 def migrate_legacy_prices(
     repo: Repository = Depends(get_repository),
 ) -> MigratePricesResponse:
@@ -102,39 +139,26 @@ def migrate_legacy_prices(
 
     Use this to recover prices that were saved before multi-season support.
     """
-    if repo._current_season_id is None:
+    if repo.context.season_id is None:
         raise HTTPException(
             status_code=400,
             detail="No season context set. Please ensure a character is detected."
         )
 
     # Migrate legacy prices
-    migrated = repo.migrate_legacy_prices(repo._current_season_id)
+    migrated = repo.migrate_legacy_prices(repo.context.season_id)
 
     # Return updated price list
-    all_prices = repo.get_all_prices()
-    prices = []
-    for price in all_prices:
-        item = repo.get_item(price.config_base_id)
-        prices.append(
-            PriceResponse(
-                config_base_id=price.config_base_id,
-                name=item.name_en if item else f"Unknown {price.config_base_id}",
-                price_fe=price.price_fe,
-                source=price.source,
-                updated_at=price.updated_at,
-            )
-        )
-    prices.sort(key=lambda x: x.name)
+    listing, total = repo.get_price_listing()
 
     return MigratePricesResponse(
-        prices=prices,
-        total=len(prices),
+        prices=_price_responses(listing),
+        total=total,
         migrated=migrated,
     )
 
 
-@router.get("/{config_base_id}", response_model=PriceResponse)
+@db_route(router.get("/{config_base_id}", response_model=PriceResponse))
 def get_price(
     config_base_id: int,
     repo: Repository = Depends(get_repository),
@@ -155,7 +179,7 @@ def get_price(
     )
 
 
-@router.put("/{config_base_id}", response_model=PriceResponse)
+@db_route(router.put("/{config_base_id}", response_model=PriceResponse), write=True)
 def update_price(
     config_base_id: int,
     request: PriceUpdateRequest,
@@ -170,7 +194,7 @@ def update_price(
         price_fe=request.price_fe,
         source=request.source,
         updated_at=datetime.now(),
-        season_id=repo._current_season_id,  # Tag with current season
+        season_id=repo.context.season_id,  # Tag with current season
     )
     repo.upsert_price(price)
 
@@ -1,11 +1,15 @@
 """Runs API routes."""
 
+import base64
+import binascii
 from collections import defaultdict
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
 
+from titrack.api.executor import db_route
 from titrack.api.schemas import (
     ActiveRunResponse,
     LootItem,
@@ -13,17 +17,15 @@ from titrack.api.schemas import (
     RunResponse,
     RunStatsResponse,
 )
-from titrack.core.models import Run
+from titrack.core.consolidation import LEVEL_TYPE_NIGHTMARE, LEVEL_TYPE_NORMAL, group_sessions
+from titrack.core.models import MapSession, Run
+from titrack.core.valuation import value_runs
 from titrack.data.zones import get_zone_display_name
 from titrack.db.repository import Repository
 from titrack.parser.patterns import FE_CONFIG_BASE_ID
 
 router = APIRouter(prefix="/api/runs", tags=["runs"])
 
-# Level type constants (from game logs)
-LEVEL_TYPE_NORMAL = 3
-LEVEL_TYPE_NIGHTMARE = 11
-
 
 class ResetResponse(BaseModel):
     """Response model for reset endpoint."""
@@ -38,15 +40,84 @@ def get_repository() -> Repository:
     raise NotImplementedError("Repository not configured")
 
 
-def _build_loot(summary: dict[int, int], repo: Repository) -> list[LootItem]:
-    """Build loot items from a run summary."""
+class RunData:
+    """
+    Loot, costs, prices and item metadata for a set of runs, loaded in bulk.
+
+    Building responses run by run costs several queries per run and one per
+    item; this loads everything for a page with a fixed number of grouped
+    queries up front.
+    """
+
+    def __init__(
+        self,
+        repo: Repository,
+        run_ids: list[int],
+        map_costs_enabled: bool = False,
+        run_times: Optional[dict[int, datetime]] = None,
+    ) -> None:
+        """
+        Args:
+            run_times: Value these runs at the prices in effect at the given
+                       times (see Repository.get_prices_as_of) instead of today's.
+        """
+        self.summaries = repo.get_run_summaries(run_ids)
+        self.cost_summaries = repo.get_run_cost_summaries(run_ids) if map_costs_enabled else {}
+
+        config_ids = {FE_CONFIG_BASE_ID}
+        for summary in (*self.summaries.values(), *self.cost_summaries.values()):
+            config_ids.update(summary)
+        config_ids = sorted(config_ids)
+
+        # Effective prices (cloud-first, local overrides if newer)
+        self.prices = repo.get_effective_prices(config_ids)
+        self.items = repo.get_items(config_ids)
+        self.tax_multiplier = repo.get_trade_tax_multiplier()
+
+        self.run_prices: dict[int, dict[int, Optional[float]]] = {}
+        if run_times:
+            history = repo.get_price_history(config_ids)
+            for run_id, when in run_times.items():
+                run_items = {*self.summary(run_id), *self.cost_summaries.get(run_id, {})}
+                self.run_prices[run_id] = history.prices_at(run_items, when, self.prices)
+
+        self.valuations = value_runs(
+            run_ids,
+            self.summaries,
+            self.cost_summaries,
+            self.prices,
+            self.tax_multiplier,
+            run_prices=self.run_prices,
+        )
+
+    def summary(self, run_id: int) -> dict[int, int]:
+        return self.summaries.get(run_id, {})
+
+    def prices_for(self, run_id: int) -> dict[int, Optional[float]]:
+        """Prices the run is valued at."""
+        return self.run_prices.get(run_id, self.prices)
+
+    def value(self, run_id: int) -> tuple[int, float]:
+        """(raw_fe_gained, total_value_fe) as Repository.get_run_value."""
+        valuation = self.valuations[run_id]
+        return valuation.fe_gained, valuation.total_value
+
+    def cost(self, run_id: int) -> tuple[dict[int, int], float, list[int]]:
+        """(cost_summary, total_cost_fe, unpriced_ids) as Repository.get_run_cost."""
+        valuation = self.valuations[run_id]
+        return self.cost_summaries.get(run_id, {}), valuation.total_cost, valuation.unpriced
+
+
+def _build_loot(
+    summary: dict[int, int], data: RunData, prices: Optional[dict[int, Optional[float]]] = None
+) -> list[LootItem]:
+    """Build loot items from a run summary (priced at data.prices unless given)."""
+    prices = data.prices if prices is None else prices
     loot = []
     for config_id, quantity in summary.items():
         if quantity != 0:
-            item = repo.get_item(config_id)
-
-            # Use effective price (cloud-first, local overrides if newer)
-            item_price_fe = repo.get_effective_price(config_id)
+            item = data.items.get(config_id)
+            item_price_fe = prices.get(config_id)
 
             # FE currency is worth 1:1
             if config_id == FE_CONFIG_BASE_ID:
@@ -65,13 +136,18 @@ def _build_loot(summary: dict[int, int], repo: Repository) -> list[LootItem]:
     return sorted(loot, key=lambda x: abs(x.quantity), reverse=True)
 
 
-def _build_cost_items(cost_summary: dict[int, int], repo: Repository) -> list[LootItem]:
-    """Build cost items from a run's map cost summary."""
+def _build_cost_items(
+    cost_summary: dict[int, int],
+    data: RunData,
+    prices: Optional[dict[int, Optional[float]]] = None,
+) -> list[LootItem]:
+    """Build cost items from a run's map cost summary (priced at data.prices unless given)."""
+    prices = data.prices if prices is None else prices
     cost_items = []
     for config_id, quantity in cost_summary.items():
         if quantity != 0:
-            item = repo.get_item(config_id)
-            item_price_fe = repo.get_effective_price(config_id)
+            item = data.items.get(config_id)
+            item_price_fe = prices.get(config_id)
             # Use absolute quantity for display (costs are negative)
             abs_qty = abs(quantity)
             item_total = item_price_fe * abs_qty if item_price_fe else None
@@ -88,10 +164,53 @@ def _build_cost_items(cost_summary: dict[int, int], repo: Repository) -> list[Lo
     return sorted(cost_items, key=lambda x: abs(x.total_value_fe or 0), reverse=True)
 
 
+def _build_run_response(run: Run, data: RunData, map_costs_enabled: bool = False) -> RunResponse:
+    """Build the response for a single (unconsolidated) run."""
+    summary = data.summary(run.id)
+    fe_gained, total_value = data.value(run.id)
+
+    # Get costs if enabled
+    cost_items = None
+    cost_fe = None
+    net_value = None
+    has_unpriced_costs = False
+    if map_costs_enabled:
+        cost_summary, cost_value, unpriced = data.cost(run.id)
+        if cost_summary:
+            cost_items = _build_cost_items(cost_summary, data, data.prices_for(run.id))
+            cost_fe = round(cost_value, 2)
+            net_value = round(total_value - cost_value, 2)
+            has_unpriced_costs = bool(unpriced)
+
+    is_nightmare = run.level_type == LEVEL_TYPE_NIGHTMARE
+    zone_name = get_zone_display_name(run.zone_signature, run.level_id)
+    if is_nightmare:
+        zone_name += " (Nightmare)"
+
+    return RunResponse(
+        id=run.id,
+        zone_name=zone_name,
+        zone_signature=run.zone_signature,
+        start_ts=run.start_ts,
+        end_ts=run.end_ts,
+        duration_seconds=run.duration_seconds,
+        is_hub=run.is_hub,
+        is_nightmare=is_nightmare,
+        fe_gained=fe_gained,
+        total_value=round(total_value, 2),
+        loot=_build_loot(summary, data, data.prices_for(run.id)),
+        map_cost_items=cost_items,
+        map_cost_fe=cost_fe,
+        map_cost_has_unpriced=has_unpriced_costs,
+        net_value_fe=net_value,
+    )
+
+
 def _consolidate_runs(
     all_runs_including_hubs: list[Run],
     repo: Repository,
     map_costs_enabled: bool = False,
+    data: Optional[RunData] = None,
 ) -> list[RunResponse]:
     """
     Consolidate runs from the same map instance.
@@ -105,45 +224,19 @@ def _consolidate_runs(
 
     This handles the Twinightmare mechanic where entering nightmare
     creates a zone transition but it's part of the same map run.
+
+    Pass data when the runs' loot is already loaded (e.g. for a whole page).
     """
-    # Sort all runs by start time (ascending) to detect consecutive runs
-    sorted_runs = sorted(all_runs_including_hubs, key=lambda r: r.start_ts)
+    if data is None:
+        data = RunData(
+            repo,
+            [r.id for r in all_runs_including_hubs if not r.is_hub],
+            map_costs_enabled=map_costs_enabled,
+        )
 
     # Build sessions: consecutive non-hub runs with same level_uid
     # A hub run breaks the session
-    sessions: list[list[Run]] = []
-    current_session: list[Run] = []
-    current_uid: Optional[int] = None
-
-    for run in sorted_runs:
-        if run.is_hub:
-            # Hub breaks the session
-            if current_session:
-                sessions.append(current_session)
-                current_session = []
-                current_uid = None
-        else:
-            # Non-hub run
-            if run.level_uid is None:
-                # No level_uid - treat as its own session
-                if current_session:
-                    sessions.append(current_session)
-                sessions.append([run])
-                current_session = []
-                current_uid = None
-            elif run.level_uid == current_uid:
-                # Same level_uid, add to current session
-                current_session.append(run)
-            else:
-                # Different level_uid, start new session
-                if current_session:
-                    sessions.append(current_session)
-                current_session = [run]
-                current_uid = run.level_uid
-
-    # Don't forget the last session
-    if current_session:
-        sessions.append(current_session)
+    sessions = group_sessions(all_runs_including_hubs)
 
     result = []
 
@@ -173,10 +266,9 @@ def _consolidate_runs(
 
             for run in normal_runs:
                 run_ids.append(run.id)
-                summary = repo.get_run_summary(run.id)
-                for config_id, qty in summary.items():
+                for config_id, qty in data.summary(run.id).items():
                     combined_summary[config_id] += qty
-                fe, value = repo.get_run_value(run.id)
+                fe, value = data.value(run.id)
                 total_fe += fe
                 total_value += value
                 if run.duration_seconds:
@@ -184,7 +276,7 @@ def _consolidate_runs(
 
                 # Aggregate costs if enabled
                 if map_costs_enabled:
-                    cost_summary, cost_value, unpriced = repo.get_run_cost(run.id)
+                    cost_summary, cost_value, unpriced = data.cost(run.id)
                     for config_id, qty in cost_summary.items():
                         combined_cost_summary[config_id] += qty
                     total_cost += cost_value
@@ -196,7 +288,7 @@ def _consolidate_runs(
             cost_fe = None
             net_value = None
             if map_costs_enabled and combined_cost_summary:
-                cost_items = _build_cost_items(dict(combined_cost_summary), repo)
+                cost_items = _build_cost_items(dict(combined_cost_summary), data)
                 cost_fe = round(total_cost, 2)
                 net_value = round(total_value - total_cost, 2)
 
@@ -212,7 +304,7 @@ def _consolidate_runs(
                     is_nightmare=False,
                     fe_gained=total_fe,
                     total_value=round(total_value, 2),
-                    loot=_build_loot(dict(combined_summary), repo),
+                    loot=_build_loot(dict(combined_summary), data),
                     consolidated_run_ids=run_ids if len(run_ids) > 1 else None,
                     map_cost_items=cost_items,
                     map_cost_fe=cost_fe,
@@ -223,130 +315,181 @@ def _consolidate_runs(
 
         # Keep nightmare runs separate
         for run in nightmare_runs:
-            summary = repo.get_run_summary(run.id)
-            fe_gained, total_value = repo.get_run_value(run.id)
-
-            # Get costs if enabled
-            cost_items = None
-            cost_fe = None
-            net_value = None
-            has_unpriced_costs = False
-            if map_costs_enabled:
-                cost_summary, cost_value, unpriced = repo.get_run_cost(run.id)
-                if cost_summary:
-                    cost_items = _build_cost_items(cost_summary, repo)
-                    cost_fe = round(cost_value, 2)
-                    net_value = round(total_value - cost_value, 2)
-                    has_unpriced_costs = bool(unpriced)
-
-            result.append(
-                RunResponse(
-                    id=run.id,
-                    zone_name=get_zone_display_name(run.zone_signature, run.level_id) + " (Nightmare)",
-                    zone_signature=run.zone_signature,
-                    start_ts=run.start_ts,
-                    end_ts=run.end_ts,
-                    duration_seconds=run.duration_seconds,
-                    is_hub=run.is_hub,
-                    is_nightmare=True,
-                    fe_gained=fe_gained,
-                    total_value=round(total_value, 2),
-                    loot=_build_loot(summary, repo),
-                    map_cost_items=cost_items,
-                    map_cost_fe=cost_fe,
-                    map_cost_has_unpriced=has_unpriced_costs,
-                    net_value_fe=net_value,
-                )
-            )
+            result.append(_build_run_response(run, data, map_costs_enabled=map_costs_enabled))
 
     # Sort by start time descending
     result.sort(key=lambda r: r.start_ts, reverse=True)
     return result
 
 
+def _session_to_response(
+    session: MapSession,
+    data: RunData,
+    map_costs_enabled: bool = False,
+) -> RunResponse:
+    """Build a listing entry from a finished map session's aggregates (valued live)."""
+    combined_summary: dict[int, int] = defaultdict(int)
+    combined_cost_summary: dict[int, int] = defaultdict(int)
+    for run_id in session.run_ids:
+        for config_id, qty in data.summary(run_id).items():
+            combined_summary[config_id] += qty
+        if map_costs_enabled:
+            for config_id, qty in data.cost_summaries.get(run_id, {}).items():
+                combined_cost_summary[config_id] += qty
+
+    cost_items = None
+    cost_fe = None
+    net_value = None
+    if map_costs_enabled and combined_cost_summary:
+        cost_items = _build_cost_items(dict(combined_cost_summary), data)
+        cost_fe = round(session.map_cost_fe, 2)
+        net_value = round(session.total_value - session.map_cost_fe, 2)
+
+    zone_name = get_zone_display_name(session.zone_signature, session.level_id)
+    if session.is_nightmare:
+        zone_name += " (Nightmare)"
+
+    return RunResponse(
+        id=session.id,
+        zone_name=zone_name,
+        zone_signature=session.zone_signature,
+        start_ts=session.start_ts,
+        end_ts=session.end_ts,
+        duration_seconds=session.duration_seconds or None,
+        is_hub=False,
+        is_nightmare=session.is_nightmare,
+        fe_gained=session.fe_gained,
+        total_value=round(session.total_value, 2),
+        loot=_build_loot(dict(combined_summary), data),
+        consolidated_run_ids=session.run_ids if len(session.run_ids) > 1 else None,
+        map_cost_items=cost_items,
+        map_cost_fe=cost_fe,
+        map_cost_has_unpriced=map_costs_enabled and session.map_cost_has_unpriced,
+        net_value_fe=net_value,
+    )
+
+
 # Validation limits
 MAX_PAGE_SIZE = 100
 MAX_PAGE = 10000
 
 
-@router.get("", response_model=RunListResponse)
-def list_runs(
+def encode_cursor(start_ts: str, run_id: int) -> str:
+    """Encode a listing position as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"{start_ts}|{run_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Decode a cursor from encode_cursor into (start_ts, run_id)."""
+    try:
+        start_ts, run_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return start_ts, int(run_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_run_page(
+    repo: Repository,
+    page_size: int,
     page: int = 1,
-    page_size: int = 20,
-    exclude_hubs: bool = True,
-    repo: Repository = Depends(get_repository),
+    before: Optional[tuple[str, int]] = None,
 ) -> RunListResponse:
-    """List recent runs with pagination and consolidation."""
-    # Validate pagination parameters
-    if page < 1:
-        page = 1
-    if page > MAX_PAGE:
-        raise HTTPException(status_code=400, detail=f"page cannot exceed {MAX_PAGE}")
-    if page_size < 1:
-        page_size = 1
-    if page_size > MAX_PAGE_SIZE:
-        raise HTTPException(status_code=400, detail=f"page_size cannot exceed {MAX_PAGE_SIZE}")
-
-    # Get more runs than needed to handle filtering and consolidation
-    fetch_limit = page_size * 5
-    offset = (page - 1) * page_size
+    """
+    Build one page of the run listing (shared with the dashboard).
 
+    Args:
+        repo: Repository with the player context set.
+        page_size: Entries per page.
+        page: 1-based page number.
+        before: Decoded cursor (start_ts, run_id) of the previous page's last entry.
+    """
     # Check if map costs are enabled
     map_costs_enabled = repo.get_setting("map_costs_enabled") == "true"
 
-    # Fetch all runs INCLUDING hubs for session detection
-    all_runs = repo.get_recent_runs(limit=fetch_limit + offset * 2)
+    # Entries come pre-grouped by the maintained runs.entry_id, so only this
+    # page's runs are loaded
+    entries = repo.get_run_entries(
+        limit=page_size, before=before, offset=(page - 1) * page_size
+    )
+
+    # Finished sessions come from map_sessions; only open entries are valued live
+    sessions = repo.get_map_sessions([entry_runs[0].id for entry_runs in entries])
 
-    # Consolidate runs (merges normal runs in same map instance, uses hubs to detect session breaks)
-    # This function receives all runs including hubs but only returns non-hub consolidated results
-    consolidated = _consolidate_runs(all_runs, repo, map_costs_enabled=map_costs_enabled)
+    # Load loot, costs and prices for the whole page at once
+    data = RunData(
+        repo,
+        [run.id for entry_runs in entries for run in entry_runs],
+        map_costs_enabled=map_costs_enabled,
+    )
+
+    runs: list[RunResponse] = []
+    for entry_runs in entries:
+        session = sessions.get(entry_runs[0].id)
+        if session is not None:
+            runs.append(_session_to_response(session, data, map_costs_enabled=map_costs_enabled))
+        else:
+            runs.extend(
+                _consolidate_runs(entry_runs, repo, map_costs_enabled=map_costs_enabled, data=data)
+            )
 
-    # Apply pagination to consolidated results
-    paginated = consolidated[offset : offset + page_size]
+    next_cursor = None
+    if len(entries) == page_size:
+        # An entry's runs are in start order, so the first one is its head
+        head = entries[-1][0]
+        next_cursor = encode_cursor(head.start_ts.isoformat(), head.id)
 
     return RunListResponse(
-        runs=paginated,
-        total=len(consolidated),
+        runs=runs,
+        total=repo.get_run_entry_count(),
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
-@router.get("/stats", response_model=RunStatsResponse)
-def get_stats(
+@db_route(router.get("", response_model=RunListResponse))
+def list_runs(
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
     exclude_hubs: bool = True,
     repo: Repository = Depends(get_repository),
-) -> RunStatsResponse:
-    """Get summary statistics for all runs."""
-    # Check if map costs are enabled
-    map_costs_enabled = repo.get_setting("map_costs_enabled") == "true"
+) -> RunListResponse:
+    """
+    List recent runs with pagination and consolidation.
 
-    all_runs = repo.get_recent_runs(limit=1000)
+    Pass the previous response's next_cursor as cursor to page through the
+    list; page is still accepted for the first pages.
+    """
+    # Validate pagination parameters
+    if page < 1:
+        page = 1
+    if page > MAX_PAGE:
+        raise HTTPException(status_code=400, detail=f"page cannot exceed {MAX_PAGE}")
+    if page_size < 1:
+        page_size = 1
+    if page_size > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size cannot exceed {MAX_PAGE_SIZE}")
 
-    if exclude_hubs:
-        all_runs = [r for r in all_runs if not r.is_hub]
+    before = decode_cursor(cursor) if cursor else None
+    return build_run_page(repo, page_size, page=page, before=before)
 
-    total_fe = 0
-    total_value = 0.0
-    total_cost = 0.0
-    total_duration = 0.0
 
-    for run in all_runs:
-        fe_gained, run_value = repo.get_run_value(run.id)
-        total_fe += fe_gained
-        total_value += run_value
-        if run.duration_seconds:
-            total_duration += run.duration_seconds
+def build_run_stats(repo: Repository) -> RunStatsResponse:
+    """Build the run summary statistics (shared with the dashboard)."""
+    # Check if map costs are enabled
+    map_costs_enabled = repo.get_setting("map_costs_enabled") == "true"
 
-        # Subtract costs if enabled
-        if map_costs_enabled:
-            _, cost_value, _ = repo.get_run_cost(run.id)
-            total_cost += cost_value
+    stats = repo.get_run_stats()
+    total_runs = stats["entries"]
+    total_fe = stats["fe_gained"]
+    total_duration = stats["duration_seconds"]
 
     # Use net value if costs are enabled
-    net_value = total_value - total_cost if map_costs_enabled else total_value
+    net_value = stats["total_value"]
+    if map_costs_enabled:
+        net_value -= stats["map_cost_fe"]
 
-    total_runs = len(all_runs)
     avg_fe = total_fe / total_runs if total_runs > 0 else 0
     avg_value = net_value / total_runs if total_runs > 0 else 0
     fe_per_hour = (total_fe / total_duration * 3600) if total_duration > 0 else 0
@@ -364,11 +507,23 @@ def get_stats(
     )
 
 
-@router.get("/active", response_model=Optional[ActiveRunResponse])
-def get_active_run(
+@db_route(router.get("/stats", response_model=RunStatsResponse))
+def get_stats(
+    exclude_hubs: bool = True,
     repo: Repository = Depends(get_repository),
-) -> Optional[ActiveRunResponse]:
-    """Get the currently active run with live loot drops."""
+) -> RunStatsResponse:
+    """
+    Get summary statistics for all runs.
+
+    Runs are counted as listing entries (split runs of one map instance
+    count once). Totals cover ended runs and come from one SQL aggregate,
+    memoized by the repository until the next run end or price change.
+    """
+    return build_run_stats(repo)
+
+
+def build_active_run(repo: Repository) -> Optional[ActiveRunResponse]:
+    """Build the active map run with live loot drops (shared with the dashboard)."""
     from datetime import datetime
 
     active_run = repo.get_active_run()
@@ -384,8 +539,9 @@ def get_active_run(
     map_costs_enabled = repo.get_setting("map_costs_enabled") == "true"
 
     # Get loot for this run
-    summary = repo.get_run_summary(active_run.id)
-    fe_gained, total_value = repo.get_run_value(active_run.id)
+    data = RunData(repo, [active_run.id], map_costs_enabled=map_costs_enabled)
+    summary = data.summary(active_run.id)
+    fe_gained, total_value = data.value(active_run.id)
 
     # Get costs if enabled
     cost_items = None
@@ -393,9 +549,9 @@ def get_active_run(
     net_value = None
     has_unpriced_costs = False
     if map_costs_enabled:
-        cost_summary, cost_value, unpriced = repo.get_run_cost(active_run.id)
+        cost_summary, cost_value, unpriced = data.cost(active_run.id)
         if cost_summary:
-            cost_items = _build_cost_items(cost_summary, repo)
+            cost_items = _build_cost_items(cost_summary, data)
             cost_fe = round(cost_value, 2)
             net_value = round(total_value - cost_value, 2)
             has_unpriced_costs = bool(unpriced)
@@ -414,7 +570,7 @@ def get_active_run(
         duration_seconds=round(duration, 1),
         fe_gained=fe_gained,
         total_value=round(total_value, 2),
-        loot=_build_loot(summary, repo),
+        loot=_build_loot(summary, data),
         map_cost_items=cost_items,
         map_cost_fe=cost_fe,
         map_cost_has_unpriced=has_unpriced_costs,
@@ -422,7 +578,15 @@ def get_active_run(
     )
 
 
-@router.post("/reset", response_model=ResetResponse)
+@db_route(router.get("/active", response_model=Optional[ActiveRunResponse]))
+def get_active_run(
+    repo: Repository = Depends(get_repository),
+) -> Optional[ActiveRunResponse]:
+    """Get the currently active run with live loot drops."""
+    return build_active_run(repo)
+
+
+@db_route(router.post("/reset", response_model=ResetResponse), write=True)
 def reset_stats(
     request: Request,
     repo: Repository = Depends(get_repository),
@@ -443,9 +607,12 @@ def reset_stats(
     )
 
 
-@router.get("/{run_id}", response_model=RunResponse)
+@db_route(router.get("/{run_id}", response_model=RunResponse))
 def get_run(
     run_id: int,
+    historical_prices: bool = Query(
+        False, description="Value at the prices in effect when the run ended"
+    ),
     repo: Repository = Depends(get_repository),
 ) -> RunResponse:
     """Get a single run by ID."""
@@ -456,41 +623,6 @@ def get_run(
     # Check if map costs are enabled
     map_costs_enabled = repo.get_setting("map_costs_enabled") == "true"
 
-    summary = repo.get_run_summary(run.id)
-    fe_gained, total_value = repo.get_run_value(run.id)
-
-    # Get costs if enabled
-    cost_items = None
-    cost_fe = None
-    net_value = None
-    has_unpriced_costs = False
-    if map_costs_enabled:
-        cost_summary, cost_value, unpriced = repo.get_run_cost(run.id)
-        if cost_summary:
-            cost_items = _build_cost_items(cost_summary, repo)
-            cost_fe = round(cost_value, 2)
-            net_value = round(total_value - cost_value, 2)
-            has_unpriced_costs = bool(unpriced)
-
-    is_nightmare = run.level_type == LEVEL_TYPE_NIGHTMARE
-    zone_name = get_zone_display_name(run.zone_signature, run.level_id)
-    if is_nightmare:
-        zone_name += " (Nightmare)"
-
-    return RunResponse(
-        id=run.id,
-        zone_name=zone_name,
-        zone_signature=run.zone_signature,
-        start_ts=run.start_ts,
-        end_ts=run.end_ts,
-        duration_seconds=run.duration_seconds,
-        is_hub=run.is_hub,
-        is_nightmare=is_nightmare,
-        fe_gained=fe_gained,
-        total_value=round(total_value, 2),
-        loot=_build_loot(summary, repo),
-        map_cost_items=cost_items,
-        map_cost_fe=cost_fe,
-        map_cost_has_unpriced=has_unpriced_costs,
-        net_value_fe=net_value,
-    )
+    run_times = {run.id: run.end_ts or run.start_ts} if historical_prices else None
+    data = RunData(repo, [run.id], map_costs_enabled=map_costs_enabled, run_times=run_times)
+    return _build_run_response(run, data, map_costs_enabled=map_costs_enabled)
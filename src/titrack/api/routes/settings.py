@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
+from titrack.api.executor import db_route
 from titrack.config.settings import validate_game_directory
 from titrack.db.repository import Repository
 
@@ -45,7 +46,7 @@ class SettingUpdateRequest(BaseModel):
     value: str
 
 
-@router.get("/{key}", response_model=SettingResponse)
+@db_route(router.get("/{key}", response_model=SettingResponse))
 def get_setting(
     key: str,
     repo: Repository = Depends(get_repository),
@@ -62,7 +63,7 @@ def get_setting(
     return SettingResponse(key=key, value=value)
 
 
-@router.put("/{key}", response_model=SettingResponse)
+@db_route(router.put("/{key}", response_model=SettingResponse), write=True)
 def update_setting(
     key: str,
     request: SettingUpdateRequest,
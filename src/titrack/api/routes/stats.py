@@ -1,11 +1,14 @@
 """Stats API routes for time-series data."""
 
 from datetime import datetime, timedelta
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
 from pydantic import BaseModel
 
+from titrack.api.executor import db_route
+from titrack.core.downsample import downsample
 from titrack.data.zones import get_zone_display_name
 from titrack.db.repository import Repository
 from titrack.parser.patterns import FE_CONFIG_BASE_ID
@@ -18,6 +21,135 @@ def get_repository() -> Repository:
     raise NotImplementedError("Repository not configured")
 
 
+# Rolling value/hour window
+RATE_WINDOW = timedelta(hours=1)
+
+
+def _finished_entries(
+    repo: Repository, season_id: Optional[int] = None, since: Optional[datetime] = None
+) -> tuple[list[tuple[datetime, int, float, float]], int, float]:
+    """
+    Get (end_ts, fe_gained, total_value, duration) per listing entry, oldest first.
+
+    Finished sessions come from map_sessions; for the current season the
+    ended runs of entries still being played are valued live.
+
+    Args:
+        repo: Repository with the player context set.
+        season_id: Season to read (default: current).
+        since: Only return entries that ended at or after this time.
+
+    Returns:
+        Tuple of (entries, baseline_fe, baseline_value) where the baseline is
+        the cumulative FE/value of everything that ended before since, taken
+        from the session totals (0 when since is None).
+    """
+    entries = [
+        (s.end_ts, s.fe_gained, s.total_value, s.duration_seconds)
+        for s in repo.get_finished_sessions(season_id, since=since)
+        if s.end_ts is not None
+    ]
+
+    baseline_fe = 0
+    baseline_value = 0.0
+    if since is not None:
+        total_fe, total_value = repo.get_session_totals()
+        baseline_fe = total_fe - sum(e[1] for e in entries)
+        baseline_value = total_value - sum(e[2] for e in entries)
+
+    if season_id is None or season_id == repo.context.season_id:
+        open_entries = [
+            [r for r in entry_runs if r.end_ts is not None]
+            for entry_runs in repo.get_open_entries()
+        ]
+        # Persisted values of all their ended runs in one read
+        values = repo.get_run_values([r.id for ended in open_entries for r in ended])
+        for ended in open_entries:
+            if not ended:
+                continue
+            fe_gained = 0
+            total_value = 0.0
+            for run in ended:
+                fe, value, _ = values.get(run.id, (0, 0.0, 0.0))
+                fe_gained += fe
+                total_value += value
+            duration = sum(r.duration_seconds or 0 for r in ended)
+            end_ts = max(r.end_ts for r in ended)
+            if since is not None and end_ts < since:
+                baseline_fe += fe_gained
+                baseline_value += total_value
+            else:
+                entries.append((end_ts, fe_gained, total_value, duration))
+
+    entries.sort(key=lambda e: e[0])
+    return entries, baseline_fe, baseline_value
+
+
+def _history_series(
+    repo: Repository, hours: int, season_id: Optional[int]
+) -> tuple[list[datetime], list[float], list[float], list[int]]:
+    """
+    Compute the chart series, one point per finished map session.
+
+    Past seasons are returned in full; otherwise only the requested window
+    is charted, plus a lead-in so the first points have a full rate window.
+
+    Returns:
+        Tuple of (timestamps, cumulative_value, value_per_hour, cumulative_fe),
+        parallel lists in time order.
+    """
+    if season_id is not None and season_id != repo.context.season_id:
+        cutoff = None
+        since = None
+    else:
+        cutoff = datetime.now() - timedelta(hours=hours)
+        since = cutoff - RATE_WINDOW
+
+    # Finished map sessions (and ended runs of open ones), oldest first
+    runs, cumulative_fe, cumulative_value = _finished_entries(repo, season_id, since)
+
+    # Prefix sums of value and duration, so any window total is one subtraction
+    value_prefix = [0.0]
+    duration_prefix = [0.0]
+    for _, _, total_value, duration in runs:
+        value_prefix.append(value_prefix[-1] + total_value)
+        duration_prefix.append(duration_prefix[-1] + (duration or 0))
+
+    timestamps = []
+    cumulative_values = []
+    value_rates = []
+    cumulative_fes = []
+
+    # Two-pointer sliding window: window_start only ever moves forward
+    window_start = 0
+    for i, (end_ts, fe_gained, total_value, _) in enumerate(runs):
+        cumulative_fe += fe_gained
+        cumulative_value += total_value
+
+        while runs[window_start][0] < end_ts - RATE_WINDOW:
+            window_start += 1
+
+        # Lead-in entries only feed the cumulative baseline and the rate window
+        if cutoff is not None and end_ts < cutoff:
+            continue
+
+        window_value = value_prefix[i + 1] - value_prefix[window_start]
+        window_duration = duration_prefix[i + 1] - duration_prefix[window_start]
+
+        # Calculate rate (value per hour)
+        if window_duration > 0:
+            value_rate = (window_value / window_duration) * 3600
+        else:
+            value_rate = 0
+
+        timestamps.append(end_ts)
+        cumulative_values.append(round(cumulative_value, 2))
+        value_rates.append(round(value_rate, 2))
+        cumulative_fes.append(cumulative_fe)
+
+    return timestamps, cumulative_values, value_rates, cumulative_fes
+
+
 class TimeSeriesPoint(BaseModel):
     """Single point in time series."""
 
@@ -33,95 +165,127 @@ class TimeSeriesResponse(BaseModel):
     cumulative_fe: list[TimeSeriesPoint]  # Raw FE over time (legacy)
 
 
-@router.get("/history", response_model=TimeSeriesResponse)
+@db_route(router.get("/history", response_model=TimeSeriesResponse))
 def get_stats_history(
     hours: int = Query(24, ge=1, le=168, description="Hours of history to return"),
+    season_id: Optional[int] = Query(None, description="Season to chart (default: current)"),
     repo: Repository = Depends(get_repository),
 ) -> TimeSeriesResponse:
     """
     Get time-series stats for charting.
 
     Returns cumulative value and rolling value/hour over time.
-    Values include FE + priced items.
+    Values include FE + priced items. When a past season is requested the
+    whole season is returned, read from its archive if it has one.
     """
-    # Get all non-hub runs
-    all_runs = repo.get_recent_runs(limit=10000)
-    runs = [r for r in all_runs if not r.is_hub and r.end_ts is not None]
-    runs.sort(key=lambda r: r.start_ts)  # Oldest first
-
-    if not runs:
-        return TimeSeriesResponse(
-            cumulative_value=[],
-            value_per_hour=[],
-            cumulative_fe=[],
-        )
-
-    # Calculate cumulative value at each run completion
-    cumulative_value_points = []
-    cumulative_fe_points = []
-    cumulative_value = 0.0
-    cumulative_fe = 0
-
-    # Pre-calculate run values for efficiency
-    run_values = {}
-    for run in runs:
-        fe_gained, total_value = repo.get_run_value(run.id)
-        run_values[run.id] = (fe_gained, total_value)
-
-    for run in runs:
-        fe_gained, total_value = run_values[run.id]
-        cumulative_fe += fe_gained
-        cumulative_value += total_value
-        cumulative_value_points.append(
-            TimeSeriesPoint(timestamp=run.end_ts, value=round(cumulative_value, 2))
-        )
-        cumulative_fe_points.append(
-            TimeSeriesPoint(timestamp=run.end_ts, value=cumulative_fe)
-        )
-
-    # Calculate rolling value/hour (using 1-hour windows)
-    value_per_hour_points = []
-    window_minutes = 60
-
-    for i, run in enumerate(runs):
-        # Find runs in the last hour window
-        window_start = run.end_ts - timedelta(minutes=window_minutes)
-        window_runs = [
-            r for r in runs[:i+1]
-            if r.end_ts and r.end_ts >= window_start
-        ]
+    timestamps, cumulative_value, value_per_hour, cumulative_fe = _history_series(
+        repo, hours, season_id
+    )
 
-        if window_runs:
-            # Sum value in window
-            window_value = 0.0
-            window_duration = 0.0
-            for wr in window_runs:
-                _, total_value = run_values[wr.id]
-                window_value += total_value
-                if wr.duration_seconds:
-                    window_duration += wr.duration_seconds
-
-            # Calculate rate (value per hour)
-            if window_duration > 0:
-                value_rate = (window_value / window_duration) * 3600
-            else:
-                value_rate = 0
+    def points(values: list) -> list[TimeSeriesPoint]:
+        return [TimeSeriesPoint(timestamp=t, value=v) for t, v in zip(timestamps, values)]
+
+    return TimeSeriesResponse(
+        cumulative_value=points(cumulative_value),
+        value_per_hour=points(value_per_hour),
+        cumulative_fe=points(cumulative_fe),
+    )
 
-            value_per_hour_points.append(
-                TimeSeriesPoint(timestamp=run.end_ts, value=round(value_rate, 2))
-            )
 
-    # Filter to requested time window
-    cutoff = datetime.now() - timedelta(hours=hours)
+class Series(BaseModel):
+    """A chart series in columnar form."""
 
-    filtered_cumulative_value = [p for p in cumulative_value_points if p.timestamp >= cutoff]
-    filtered_value_rate = [p for p in value_per_hour_points if p.timestamp >= cutoff]
-    filtered_cumulative_fe = [p for p in cumulative_fe_points if p.timestamp >= cutoff]
+    t: list[int]  # Timestamps, epoch milliseconds
+    v: list[float]
 
-    return TimeSeriesResponse(
-        cumulative_value=filtered_cumulative_value,
-        value_per_hour=filtered_value_rate,
-        cumulative_fe=filtered_cumulative_fe,
+
+class SeriesResponse(BaseModel):
+    """Downsampled chart series."""
+
+    cumulative_value: Series
+    value_per_hour: Series
+    cumulative_fe: Series
+    total_points: int  # Points per series before downsampling
+
+
+def build_series(
+    repo: Repository, hours: int, season_id: Optional[int] = None, max_points: int = 500
+) -> SeriesResponse:
+    """Build the downsampled chart series (shared with the dashboard)."""
+    timestamps, cumulative_value, value_per_hour, cumulative_fe = _history_series(
+        repo, hours, season_id
+    )
+    epoch_ms = [int(t.timestamp() * 1000) for t in timestamps]
+
+    def series(values: list) -> Series:
+        t, v = downsample(epoch_ms, values, max_points)
+        return Series(t=t, v=v)
+
+    return SeriesResponse(
+        cumulative_value=series(cumulative_value),
+        value_per_hour=series(value_per_hour),
+        cumulative_fe=series(cumulative_fe),
+        total_points=len(timestamps),
+    )
+
+
+@db_route(router.get("/history/series", response_model=SeriesResponse))
+def get_stats_series(
+    hours: int = Query(24, ge=1, le=168, description="Hours of history to return"),
+    season_id: Optional[int] = Query(None, description="Season to chart (default: current)"),
+    max_points: int = Query(
+        500, ge=3, le=10000, description="Most points to return per series"
+    ),
+    repo: Repository = Depends(get_repository),
+) -> SeriesResponse:
+    """
+    Get the /history series as columnar {t, v} arrays, each downsampled to
+    at most max_points with Largest-Triangle-Three-Buckets.
+
+    LTTB keeps the first and last point and the peaks and dips in between,
+    so a long history charts the same at a fraction of the payload.
+    """
+    return build_series(repo, hours, season_id, max_points)
+
+
+class NetWorthSeriesResponse(BaseModel):
+    """Net worth over time, from stored snapshots."""
+
+    net_worth: Series
+    total_fe: Series
+    total_points: int  # Snapshots before downsampling
+
+
+@db_route(router.get("/net-worth", response_model=NetWorthSeriesResponse))
+def get_net_worth_series(
+    hours: Optional[int] = Query(
+        None, ge=1, description="Hours of history to return (default: all of the season)"
+    ),
+    max_points: int = Query(
+        500, ge=3, le=10000, description="Most points to return per series"
+    ),
+    repo: Repository = Depends(get_repository),
+) -> NetWorthSeriesResponse:
+    """
+    Get net worth history as columnar {t, v} series, LTTB-downsampled.
+
+    The collector stores a snapshot whenever net worth moves past a
+    threshold, so the series is a step function: each value holds until
+    the next point. With a window, the snapshot in effect when it opened
+    is included as the first point.
+    """
+    since = datetime.now() - timedelta(hours=hours) if hours is not None else None
+    snapshots = repo.get_net_worth_history(since=since)
+    epoch_ms = [int(timestamp.timestamp() * 1000) for timestamp, _, _ in snapshots]
+
+    def series(values: list) -> Series:
+        t, v = downsample(epoch_ms, values, max_points)
+        return Series(t=t, v=v)
+
+    return NetWorthSeriesResponse(
+        net_worth=series([net_worth for _, net_worth, _ in snapshots]),
+        total_fe=series([total_fe for _, _, total_fe in snapshots]),
+        total_points=len(snapshots),
     )
 
 
@@ -141,7 +305,7 @@ class ZonesResponse(BaseModel):
     untranslated: int
 
 
-@router.get("/zones", response_model=ZonesResponse)
+@db_route(router.get("/zones", response_model=ZonesResponse))
 def get_zones(
     repo: Repository = Depends(get_repository),
 ) -> ZonesResponse:
@@ -168,3 +332,163 @@ def get_zones(
         total=len(zones),
         untranslated=untranslated,
     )
+
+
+class ZoneStats(BaseModel):
+    """Profitability of one zone over its finished map sessions."""
+
+    zone_signature: str
+    zone_name: str
+    level_id: Optional[int] = None
+    runs: int  # Map sessions (split runs of one map count once)
+    nightmare_runs: int
+    nightmare_share: float  # 0..1
+    total_fe: int
+    total_value: float
+    mean_value: float
+    median_value: float
+    p90_value: float
+    avg_duration_seconds: float
+    fe_per_hour: float
+    value_per_hour: float
+
+
+class ZoneStatsResponse(BaseModel):
+    """Per-zone analytics."""
+
+    zones: list[ZoneStats]
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+@db_route(router.get("/zones/analytics", response_model=ZoneStatsResponse))
+def get_zone_analytics(
+    since: Optional[datetime] = Query(None, description="Only runs started at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only runs started before this time"),
+    repo: Repository = Depends(get_repository),
+) -> ZoneStatsResponse:
+    """
+    Get per-zone profitability: run count, mean/median/p90 value per run,
+    FE and value per hour, average duration and nightmare share.
+
+    Computed over finished map sessions, valued at current prices and trade
+    tax; values are net of map costs when map cost tracking is enabled.
+    """
+    map_costs_enabled = repo.get_setting("map_costs_enabled") == "true"
+
+    zones = []
+    for row in repo.get_zone_stats(since, until, subtract_map_costs=map_costs_enabled):
+        entries = row["entries"]
+        duration = row["duration_seconds"] or 0.0
+        hours = duration / 3600
+        zones.append(ZoneStats(
+            zone_signature=row["zone_signature"],
+            zone_name=get_zone_display_name(row["zone_signature"], row["level_id"]),
+            level_id=row["level_id"],
+            runs=entries,
+            nightmare_runs=row["nightmare_entries"],
+            nightmare_share=round(row["nightmare_entries"] / entries, 4),
+            total_fe=row["fe_gained"],
+            total_value=round(row["total_value"], 2),
+            mean_value=round(row["mean_value"], 2),
+            median_value=round(row["median_value"], 2),
+            p90_value=round(row["p90_value"], 2),
+            avg_duration_seconds=round(duration / entries, 2),
+            fe_per_hour=round(row["fe_gained"] / hours, 2) if hours > 0 else 0,
+            value_per_hour=round(row["total_value"] / hours, 2) if hours > 0 else 0,
+        ))
+
+    return ZoneStatsResponse(zones=zones, since=since, until=until)
+
+
+class ItemDropStats(BaseModel):
+    """How often one item drops in one zone and what it adds per run."""
+
+    zone_signature: str
+    zone_name: str
+    level_id: Optional[int] = None
+    config_base_id: int
+    name: str
+    icon_url: Optional[str] = None
+    runs: int  # Finished runs in the zone
+    runs_with_drop: int
+    drop_rate: float  # 0..1, share of runs that dropped the item
+    quantity_per_run: float
+    quantity_per_hour: float
+    price_fe: Optional[float] = None
+    value_per_run: float  # Expected FE per run from this item (after tax)
+    value_per_hour: float
+
+
+class DropStatsResponse(BaseModel):
+    """Per-zone item drop statistics, highest value per run first."""
+
+    drops: list[ItemDropStats]
+
+
+@db_route(router.get("/drops", response_model=DropStatsResponse))
+def get_drop_stats(
+    zone_signature: Optional[str] = Query(None, description="Only this zone"),
+    config_base_id: Optional[int] = Query(None, description="Only this item"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum rows"),
+    repo: Repository = Depends(get_repository),
+) -> DropStatsResponse:
+    """
+    Get drop rates per zone and item: how many runs dropped it, quantity
+    per run and per hour, and its expected value contribution per run.
+
+    Served from aggregates updated as each run ends, so this stays cheap
+    regardless of how much history is stored.
+    """
+    rows = repo.get_drop_stats(zone_signature, config_base_id, limit)
+    items = repo.get_items(list({row["config_base_id"] for row in rows}))
+
+    drops = []
+    for row in rows:
+        item = items.get(row["config_base_id"])
+        runs = row["runs"]
+        hours = (row["duration_seconds"] or 0.0) / 3600
+        drops.append(ItemDropStats(
+            zone_signature=row["zone_signature"],
+            zone_name=get_zone_display_name(row["zone_signature"], row["level_id"]),
+            level_id=row["level_id"],
+            config_base_id=row["config_base_id"],
+            name=item.name_en if item and item.name_en else f"Unknown {row['config_base_id']}",
+            icon_url=item.icon_url if item else None,
+            runs=runs,
+            runs_with_drop=row["runs_with_drop"],
+            drop_rate=round(row["runs_with_drop"] / runs, 4),
+            quantity_per_run=round(row["total_quantity"] / runs, 4),
+            quantity_per_hour=round(row["total_quantity"] / hours, 2) if hours > 0 else 0,
+            price_fe=row["price_fe"],
+            value_per_run=round(row["value_per_run"], 4),
+            value_per_hour=round(row["value_per_run"] * runs / hours, 2) if hours > 0 else 0,
+        ))
+
+    return DropStatsResponse(drops=drops)
+
+
+class SeasonInfo(BaseModel):
+    """Season with stored run count."""
+
+    season_id: int
+    run_count: int
+    archived: bool
+
+
+class SeasonsResponse(BaseModel):
+    """List of seasons with data."""
+
+    seasons: list[SeasonInfo]
+    current_season_id: Optional[int] = None
+
+
+@db_route(router.get("/seasons", response_model=SeasonsResponse))
+def get_seasons(
+    repo: Repository = Depends(get_repository),
+) -> SeasonsResponse:
+    """Get all seasons with stored runs, including archived ones."""
+    return SeasonsResponse(
+        seasons=[SeasonInfo(**s) for s in repo.get_seasons()],
+        current_season_id=repo.context.season_id,
+    )
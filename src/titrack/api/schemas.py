@@ -46,6 +46,7 @@ class RunListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
 
 
 class ActiveRunResponse(BaseModel):
@@ -114,7 +115,9 @@ class ItemListResponse(BaseModel):
     """List of items."""
 
     items: list[ItemResponse]
-    total: int
+    total: int  # Matches across all pages
+    page: int = 1
+    page_size: int = 100
 
 
 class ItemUpdateRequest(BaseModel):
@@ -138,6 +141,8 @@ class PriceListResponse(BaseModel):
 
     prices: list[PriceResponse]
     total: int
+    page: int = 1
+    page_size: Optional[int] = None  # None when all prices are returned
 
 
 class PriceUpdateRequest(BaseModel):
@@ -158,6 +163,10 @@ class StatusResponse(BaseModel):
     item_count: int
     run_count: int
     awaiting_player: bool = False
+    # Collector health (None when no collector is attached)
+    collector_lag_bytes: Optional[int] = None  # Unread bytes behind end of log
+    last_event_at: Optional[datetime] = None  # Last parsed log event
+    last_poll_at: Optional[datetime] = None  # Last completed log read
 
 
 class PlayerResponse(BaseModel):
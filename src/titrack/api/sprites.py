@@ -0,0 +1,123 @@
+"""Icon sprite sheets - many cached icons combined into one image."""
+
+import base64
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from titrack.api.icon_cache import CachedIcon
+
+# Each icon is drawn into a square cell of this size (pixels)
+SPRITE_CELL_SIZE = 64
+
+# Most icons one sheet may hold
+MAX_SPRITE_ICONS = 500
+
+MAX_CACHED_SHEETS = 32
+
+
+@dataclass
+class SpriteSheet:
+    """A generated sheet and where each icon sits in it."""
+
+    sheet_id: str  # Hash of the (id, icon digest) pairs drawn
+    svg: bytes
+    columns: int
+    rows: int
+    offsets: dict[int, tuple[int, int]]  # config_base_id -> (x, y) in pixels
+    missing: list[int] = field(default_factory=list)  # Requested ids without an icon
+
+
+def set_hash(config_base_ids: list[int]) -> str:
+    """Hash of a set of config ids (order and duplicates don't matter)."""
+    key = ",".join(str(i) for i in sorted(set(config_base_ids)))
+    return hashlib.sha256(key.encode("ascii")).hexdigest()[:16]
+
+
+def build_sprite_sheet(
+    icons: dict[int, tuple[CachedIcon, str]],
+    missing: list[int],
+    cell_size: int = SPRITE_CELL_SIZE,
+) -> SpriteSheet:
+    """
+    Lay icons out on a near-square grid and render them as one SVG.
+
+    The SVG embeds each icon's original bytes as a data URI, so no image
+    decoding or re-encoding is needed and any format the browser can show
+    (webp, png, jpeg) works.
+
+    Args:
+        icons: config_base_id -> (icon, content type)
+        missing: Requested ids that have no icon (reported back to the client)
+        cell_size: Cell width/height in pixels
+    """
+    ids = sorted(icons)
+    columns = max(1, math.ceil(math.sqrt(len(ids))))
+    rows = max(1, math.ceil(len(ids) / columns))
+    width, height = columns * cell_size, rows * cell_size
+
+    digest = hashlib.sha256()
+    offsets: dict[int, tuple[int, int]] = {}
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+    ]
+    for index, config_base_id in enumerate(ids):
+        icon, content_type = icons[config_base_id]
+        x, y = (index % columns) * cell_size, (index // columns) * cell_size
+        offsets[config_base_id] = (x, y)
+        digest.update(f"{config_base_id}:{icon.digest};".encode("ascii"))
+        data = base64.b64encode(icon.data).decode("ascii")
+        parts.append(
+            f'<image x="{x}" y="{y}" width="{cell_size}" height="{cell_size}" '
+            f'preserveAspectRatio="xMidYMid meet" href="data:{content_type};base64,{data}"/>'
+        )
+    parts.append("</svg>")
+
+    return SpriteSheet(
+        sheet_id=digest.hexdigest()[:16],
+        svg="".join(parts).encode("utf-8"),
+        columns=columns,
+        rows=rows,
+        offsets=offsets,
+        missing=sorted(missing),
+    )
+
+
+class SpriteCache:
+    """
+    Recently built sheets, looked up by the requested id set's hash or by
+    sheet id (for serving the image). LRU-bounded and thread-safe.
+    """
+
+    def __init__(self, max_sheets: int = MAX_CACHED_SHEETS) -> None:
+        self._max_sheets = max_sheets
+        self._lock = threading.Lock()
+        self._by_set: OrderedDict[str, SpriteSheet] = OrderedDict()
+
+    def get_for_set(self, set_key: str) -> Optional[SpriteSheet]:
+        """Get the sheet built for a set of ids, if still cached."""
+        with self._lock:
+            sheet = self._by_set.get(set_key)
+            if sheet is not None:
+                self._by_set.move_to_end(set_key)
+            return sheet
+
+    def get_sheet(self, sheet_id: str) -> Optional[SpriteSheet]:
+        """Get a sheet by its id."""
+        with self._lock:
+            for sheet in self._by_set.values():
+                if sheet.sheet_id == sheet_id:
+                    return sheet
+            return None
+
+    def put(self, set_key: str, sheet: SpriteSheet) -> None:
+        """Store a sheet, evicting the least recently used one if full."""
+        with self._lock:
+            self._by_set[set_key] = sheet
+            self._by_set.move_to_end(set_key)
+            while len(self._by_set) > self._max_sheets:
+                self._by_set.popitem(last=False)
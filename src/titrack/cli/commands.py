@@ -14,6 +14,7 @@ from titrack.collector.collector import Collector
 from titrack.config.logging import setup_logging, get_logger
 from titrack.config.settings import Settings, find_log_file
 from titrack.core.models import Item, ItemDelta, Price, Run
+from titrack.core.run_export import EXPORT_FORMATS, encode_batches
 from titrack.data.zones import get_zone_display_name
 from titrack.db.connection import Database
 from titrack.db.repository import Repository
@@ -106,7 +107,12 @@ def cmd_init(args: argparse.Namespace) -> int:
 
 
 def seed_items(repo: Repository, seed_file: Path) -> int:
-    """Load items from seed file into database."""
+    """Load items from seed file (JSON seed or prebuilt catalogue) into database."""
+    if seed_file.suffix == ".db":
+        from titrack.db.catalogue import apply_catalogue
+
+        return apply_catalogue(repo.db.connection.cursor(), seed_file)
+
     with open(seed_file, "r", encoding="utf-8") as f:
         data = json.load(f)
 
@@ -129,6 +135,24 @@ def seed_items(repo: Repository, seed_file: Path) -> int:
     return len(items)
 
 
+def cmd_build_catalogue(args: argparse.Namespace) -> int:
+    """Compile the JSON item seed into a prebuilt SQLite catalogue."""
+    from titrack.config.paths import get_items_catalogue_path, get_items_seed_path
+    from titrack.db.catalogue import build_catalogue
+
+    seed_path = Path(args.seed) if args.seed else get_items_seed_path()
+    output_path = Path(args.output) if args.output else get_items_catalogue_path()
+
+    if not seed_path.exists():
+        print(f"Error: Seed file not found: {seed_path}")
+        return 1
+
+    print(f"Building item catalogue from: {seed_path}")
+    count = build_catalogue(seed_path, output_path)
+    print(f"  Wrote {count} items to {output_path}")
+    return 0
+
+
 def seed_prices(repo: Repository, seed_file: Path) -> int:
     """Load prices from seed file into database."""
     with open(seed_file, "r", encoding="utf-8") as f:
@@ -346,6 +370,97 @@ def cmd_show_runs(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_archive_season(args: argparse.Namespace) -> int:
+    """Move a finished season's data into its archive database."""
+    settings = Settings.from_args(
+        db_path=args.db,
+        portable=args.portable,
+    )
+
+    db = Database(settings.db_path)
+    db.connect()
+
+    repo = Repository(db)
+
+    if args.list or args.season is None:
+        seasons = repo.get_seasons()
+        if not seasons:
+            print("No seasons recorded")
+        for season in seasons:
+            archived_str = " (archived)" if season["archived"] else ""
+            print(f"  Season {season['season_id']}: {season['run_count']} runs{archived_str}")
+        db.close()
+        return 0
+
+    try:
+        moved = repo.archive_season(args.season, force=args.force)
+    except ValueError as e:
+        print(f"Error: {e} (season {args.season} has the latest recorded runs)")
+        print("Use --force if the season has ended")
+        db.close()
+        return 1
+
+    print(
+        f"Archived season {args.season} to {db.get_archive_path(args.season)}: "
+        f"{moved['runs']} runs, {moved['item_deltas']} deltas, {moved['prices']} prices"
+    )
+
+    db.close()
+    return 0
+
+
+def cmd_export_runs(args: argparse.Namespace) -> int:
+    """Export the run history with loot as NDJSON or CSV."""
+    settings = Settings.from_args(
+        db_path=args.db,
+        portable=args.portable,
+    )
+
+    try:
+        since = datetime.fromisoformat(args.since) if args.since else None
+        until = datetime.fromisoformat(args.until) if args.until else None
+    except ValueError as e:
+        print(f"Error: invalid date: {e}")
+        return 1
+
+    db = Database(settings.db_path)
+    db.connect()
+
+    repo = Repository(db)
+    batches = repo.iter_run_export(since=since, until=until, sessions=args.sessions)
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in encode_batches(batches, args.format):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        db.close()
+
+    if args.output:
+        print(f"Exported run history to {args.output}")
+    return 0
+
+
+def cmd_rebuild_drops(args: argparse.Namespace) -> int:
+    """Recompute per-zone drop statistics from the stored run history."""
+    settings = Settings.from_args(
+        db_path=args.db,
+        portable=args.portable,
+    )
+
+    db = Database(settings.db_path)
+    db.connect()
+
+    repo = Repository(db)
+    rows = repo.rebuild_zone_drops()
+    print(f"Rebuilt drop statistics: {rows} zone/item rows")
+
+    db.close()
+    return 0
+
+
 def cmd_serve(args: argparse.Namespace) -> int:
     """Start the web server with optional background collector."""
     from titrack.config.paths import is_frozen
@@ -409,7 +524,7 @@ def cmd_serve(args: argparse.Namespace) -> int:
 def _serve_browser_mode(args: argparse.Namespace, settings: Settings, logger) -> int:
     """Run server in browser mode (original behavior)."""
     import uvicorn
-    from titrack.api.app import create_app
+    from titrack.api.app import create_app, prefetch_icons
 
     collector = None
     collector_thread = None
@@ -505,6 +620,8 @@ def _serve_browser_mode(args: argparse.Namespace, settings: Settings, logger) ->
                         new_player_info.season_id,
                         effective_id
                     )
+                    # Warm icons for the new character's inventory and loot
+                    prefetch_icons(app)
                 # Update sync manager season context
                 if hasattr(app.state, 'sync_manager') and app.state.sync_manager:
                     app.state.sync_manager.set_season_context(new_player_info.season_id)
@@ -587,7 +704,7 @@ def _serve_with_window(args: argparse.Namespace, settings: Settings, logger) ->
         return _serve_browser_mode(args, settings, logger)
 
     import uvicorn
-    from titrack.api.app import create_app
+    from titrack.api.app import create_app, prefetch_icons
 
     collector = None
     collector_thread = None
@@ -702,6 +819,7 @@ def _serve_with_window(args: argparse.Namespace, settings: Settings, logger) ->
                         new_player_info.season_id,
                         effective_id
                     )
+                    prefetch_icons(app)
                 if hasattr(app.state, 'sync_manager') and app.state.sync_manager:
                     app.state.sync_manager.set_season_context(new_player_info.season_id)
             player_change_callback[0] = update_app_player
@@ -789,7 +907,7 @@ def create_parser() -> argparse.ArgumentParser:
     init_parser.add_argument(
         "--seed",
         type=str,
-        help="Path to item seed JSON file",
+        help="Path to item seed JSON file or prebuilt catalogue (.db)",
     )
     init_parser.add_argument(
         "--prices-seed",
@@ -797,6 +915,21 @@ def create_parser() -> argparse.ArgumentParser:
         help="Path to price seed JSON file",
     )
 
+    # build-catalogue command
+    catalogue_parser = subparsers.add_parser(
+        "build-catalogue", help="Compile item seed JSON into a prebuilt SQLite catalogue"
+    )
+    catalogue_parser.add_argument(
+        "--seed",
+        type=str,
+        help="Path to item seed JSON file (default: bundled tlidb_items_seed_en.json)",
+    )
+    catalogue_parser.add_argument(
+        "--output",
+        type=str,
+        help="Output catalogue path (default: tlidb_items_en.db beside the seed)",
+    )
+
     # parse-file command
     parse_parser = subparsers.add_parser("parse-file", help="Parse a log file")
     parse_parser.add_argument(
@@ -838,6 +971,65 @@ def create_parser() -> argparse.ArgumentParser:
         help="Number of runs to show (default: 20)",
     )
 
+    # archive-season command
+    archive_parser = subparsers.add_parser(
+        "archive-season",
+        help="Move a finished season into its own archive database (run with the app closed)",
+    )
+    archive_parser.add_argument(
+        "season",
+        type=int,
+        nargs="?",
+        help="Season ID to archive",
+    )
+    archive_parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List seasons and whether they are archived",
+    )
+    archive_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Archive the season even if it has the latest recorded runs",
+    )
+
+    # export-runs command
+    export_parser = subparsers.add_parser(
+        "export-runs", help="Export run history with loot as NDJSON or CSV"
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="ndjson",
+        help="Output format (default: ndjson)",
+    )
+    export_parser.add_argument(
+        "--sessions",
+        action="store_true",
+        help="One record per map session (split runs merged) instead of per run",
+    )
+    export_parser.add_argument(
+        "--since",
+        type=str,
+        help="Only runs started at or after this time (ISO format, e.g. 2026-01-31)",
+    )
+    export_parser.add_argument(
+        "--until",
+        type=str,
+        help="Only runs started before this time (ISO format)",
+    )
+    export_parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        help="Output file (default: stdout)",
+    )
+
+    # rebuild-drops command
+    subparsers.add_parser(
+        "rebuild-drops", help="Recompute per-zone drop statistics from run history"
+    )
+
     # serve command
     serve_parser = subparsers.add_parser("serve", help="Start web server")
     serve_parser.add_argument(
@@ -897,10 +1089,14 @@ def main() -> int:
 
     commands = {
         "init": cmd_init,
+        "build-catalogue": cmd_build_catalogue,
         "parse-file": cmd_parse_file,
         "tail": cmd_tail,
         "show-state": cmd_show_state,
         "show-runs": cmd_show_runs,
+        "archive-season": cmd_archive_season,
+        "export-runs": cmd_export_runs,
+        "rebuild-drops": cmd_rebuild_drops,
         "serve": cmd_serve,
     }
 
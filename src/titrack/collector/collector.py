@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Callable, Optional
 
+from titrack.core.consolidation import SessionTracker
 from titrack.core.delta_calculator import DeltaCalculator
 from titrack.core.models import (
     EventContext,
@@ -16,7 +17,10 @@ from titrack.core.models import (
     ParsedPlayerDataEvent,
     Price,
     Run,
+    SlotKey,
+    SlotState,
 )
+from titrack.core.net_worth import NetWorthTracker
 from titrack.core.run_segmenter import RunSegmenter
 from titrack.db.connection import Database
 from titrack.db.repository import Repository
@@ -111,14 +115,25 @@ class Collector:
         # Map cost tracking: buffer costs until run starts
         self._pending_map_costs: list[ItemDelta] = []
 
+        # Map session tracking: open listing entries, finalized when they close
+        self._session_tracker = SessionTracker()
+
         # InitBagData batch tracking: page_id -> last init timestamp
         # Used to detect new init batches and clear stale slot states
         self._last_init_page: Optional[int] = None
         self._last_init_time: Optional[datetime] = None
         self._init_batch_threshold_seconds = 2.0  # New batch if > 2 seconds gap
 
+        # Net worth snapshots: value kept current from slot and price changes
+        self._net_worth = NetWorthTracker()
+        self._net_worth_versions: dict[str, int] = {}
+
         self._running = False
 
+        # Health tracking for the status endpoint
+        self._last_event_time: Optional[datetime] = None
+        self._last_poll_time: Optional[datetime] = None
+
     def set_sync_manager(self, sync_manager: Optional[object]) -> None:
         """
         Set the sync manager for cloud price submissions.
@@ -149,6 +164,13 @@ class Collector:
         max_run_id = self.repository.get_max_run_id()
         self.run_segmenter.set_next_run_id(max_run_id + 1)
 
+        # Finalize sessions that closed while not tracked, then resume open ones
+        self.repository.rebuild_map_sessions()
+        self._session_tracker = SessionTracker(
+            self.repository.get_open_session_heads(self._season_id, self._player_id)
+        )
+        self._reset_net_worth()
+
         # Load log position and apply to tailer
         position_data = self.repository.get_log_position()
         if position_data:
@@ -204,10 +226,18 @@ class Collector:
         if ended_run:
             self.repository.update_run_end(ended_run.id, ended_run.end_ts)
 
+        # The old character's sessions are over; start tracking the new one's
+        for entry_id in self._session_tracker.close_all():
+            self.repository.finalize_map_session(entry_id)
+        self._session_tracker = SessionTracker(
+            self.repository.get_open_session_heads(self._season_id, self._player_id)
+        )
+
         # Clear and reload slot states for new player
         self.delta_calc.clear_state()
         states = self.repository.get_all_slot_states(player_id=self._player_id)
         self.delta_calc.load_state(states)
+        self._reset_net_worth()
 
         # Notify callback if registered
         if self._on_player_change:
@@ -225,10 +255,14 @@ class Collector:
         self.run_segmenter._current_run = None
         max_run_id = self.repository.get_max_run_id()
         self.run_segmenter.set_next_run_id(max_run_id + 1)
+        self._session_tracker = SessionTracker(
+            self.repository.get_open_session_heads(self._season_id, self._player_id)
+        )
 
         # Reload slot states
         states = self.repository.get_all_slot_states()
         self.delta_calc.load_state(states)
+        self._reset_net_worth()
 
         # Load log position
         position_data = self.repository.get_log_position()
@@ -253,6 +287,7 @@ class Collector:
         # Reset in-memory state
         self.run_segmenter._current_run = None
         self.run_segmenter.set_next_run_id(1)
+        self._session_tracker = SessionTracker()
 
         # Update log position to current position so we don't re-parse old events
         self.repository.save_log_position(
@@ -276,6 +311,7 @@ class Collector:
         # Try exchange message parsing first (multi-line stateful)
         exchange_event = self.exchange_parser.parse_line(line)
         if exchange_event is not None:
+            self._last_event_time = timestamp
             self._handle_exchange_event(exchange_event, timestamp)
 
         # Standard single-line event parsing
@@ -284,6 +320,8 @@ class Collector:
         if event is None:
             return
 
+        self._last_event_time = timestamp
+
         if isinstance(event, ParsedContextMarker):
             self._handle_context_marker(event)
         elif isinstance(event, ParsedBagEvent):
@@ -333,7 +371,7 @@ class Collector:
                     if key.page_id == event.page_id
                 ]
                 for key in keys_to_remove:
-                    del self.delta_calc._slot_states[key]
+                    self._net_worth_slot_change(self.delta_calc._slot_states.pop(key), None)
 
             self._last_init_page = event.page_id
             self._last_init_time = timestamp
@@ -341,6 +379,7 @@ class Collector:
         current_run = self.run_segmenter.get_current_run()
         run_id = current_run.id if current_run and not current_run.is_hub else None
 
+        old_state = self.delta_calc.get_state(SlotKey(event.page_id, event.slot_id))
         delta, new_state = self.delta_calc.process_event(
             event=event,
             context=self._current_context,
@@ -353,6 +392,7 @@ class Collector:
 
         # Persist slot state
         self.repository.upsert_slot_state(new_state)
+        self._net_worth_slot_change(old_state, new_state)
 
         # For init events (inventory snapshot), only update slot state, don't create deltas
         # This prevents pollution of loot tracking when user sorts inventory
@@ -408,6 +448,10 @@ class Collector:
                     self.repository.insert_delta(cost_delta)
                 self._pending_map_costs = []
 
+            # Entering a hub or another map instance closes the previous session
+            for entry_id in self._session_tracker.add_run(new_run):
+                self.repository.finalize_map_session(entry_id)
+
             if self._on_run_start:
                 self._on_run_start(new_run)
 
@@ -466,6 +510,62 @@ class Collector:
                 # Clear pending data after successful change
                 self._pending_player_data = {}
 
+    def _reset_net_worth(self) -> None:
+        """Rebuild the net worth tracker from the loaded slot states."""
+        quantities: dict[int, int] = {}
+        for state in self.delta_calc.get_all_states():
+            if state.num > 0:
+                quantities[state.config_base_id] = quantities.get(state.config_base_id, 0) + state.num
+        self._net_worth_versions = self.repository.get_data_versions(["prices", "settings"])
+        self._net_worth = NetWorthTracker(
+            quantities,
+            self.repository.get_effective_prices(list(quantities)),
+            self.repository.get_trade_tax_multiplier(),
+        )
+        # Continue from the last stored snapshot rather than recording a new one
+        previous = self.repository.get_latest_net_worth_snapshot()
+        if previous is not None:
+            self._net_worth.mark_snapshot(previous[1])
+
+    def _net_worth_slot_change(
+        self, old_state: Optional[SlotState], new_state: Optional[SlotState]
+    ) -> None:
+        """Apply a slot's change of item or quantity to the net worth."""
+        if old_state is not None and old_state.num > 0:
+            self._net_worth.add_quantity(old_state.config_base_id, -old_state.num)
+        if new_state is not None and new_state.num > 0:
+            config_base_id = new_state.config_base_id
+            if not self._net_worth.has_price(config_base_id):
+                self._net_worth.set_price(
+                    config_base_id, self.repository.get_effective_price(config_base_id)
+                )
+            self._net_worth.add_quantity(config_base_id, new_state.num)
+
+    def _record_net_worth(self) -> None:
+        """
+        Record a net worth snapshot if the value moved past the threshold.
+
+        Prices (local, exchange or cloud) and the trade tax setting can change
+        outside the log; when their data versions moved, the cached prices of
+        held items are refreshed first.
+        """
+        if self._player_id is None:
+            return
+
+        versions = self.repository.get_data_versions(["prices", "settings"])
+        if versions != self._net_worth_versions:
+            self._net_worth_versions = versions
+            self._net_worth.set_prices(
+                self.repository.get_effective_prices(self._net_worth.item_ids)
+            )
+            self._net_worth.set_tax_multiplier(self.repository.get_trade_tax_multiplier())
+
+        if self._net_worth.should_snapshot():
+            self.repository.insert_net_worth_snapshot(
+                datetime.now(), self._net_worth.value, self._net_worth.total_fe
+            )
+            self._net_worth.mark_snapshot()
+
     def _cleanup_stale_pending_searches(self, current_time: datetime) -> None:
         """Remove pending price searches older than TTL."""
         stale_keys = [
@@ -506,7 +606,8 @@ class Collector:
             # Calculate reference price (10th percentile by default)
             ref_price = calculate_reference_price(event.prices_fe, method="percentile_10")
 
-            # Create and store price (tagged with season_id for isolation)
+            # Create and store price (tagged with season_id for isolation);
+            # exchange prices are also appended to the local price history
             price = Price(
                 config_base_id=config_base_id,
                 price_fe=ref_price,
@@ -556,9 +657,27 @@ class Collector:
             self.tailer.position,
             self.tailer.file_size,
         )
+        self._record_net_worth()
+        self._last_poll_time = datetime.now()
 
         return line_count
 
+    def get_health(self) -> dict:
+        """
+        Get collector health for liveness checks.
+
+        Returns:
+            Dict with running, lag_bytes (unread bytes behind the end of the
+            log, None if the log is missing), last_event_at (time of the last
+            parsed event) and last_poll_at (time of the last completed read).
+        """
+        return {
+            "running": self._running,
+            "lag_bytes": self.tailer.get_lag_bytes(),
+            "last_event_at": self._last_event_time,
+            "last_poll_at": self._last_poll_time,
+        }
+
     def tail(self, poll_interval: float = 0.5) -> None:
         """
         Continuously tail the log file.
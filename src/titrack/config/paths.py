@@ -107,3 +107,16 @@ def get_items_seed_path() -> Path:
         Path to tlidb_items_seed_en.json
     """
     return get_resource_path("tlidb_items_seed_en.json")
+
+
+def get_items_catalogue_path() -> Path:
+    """
+    Get the path to the prebuilt items catalogue.
+
+    Built from the JSON seed by ``titrack build-catalogue`` and shipped
+    with release builds in place of the JSON file.
+
+    Returns:
+        Path to tlidb_items_en.db
+    """
+    return get_resource_path("tlidb_items_en.db")
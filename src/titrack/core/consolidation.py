@@ -0,0 +1,152 @@
+"""Run consolidation - group split runs of one map instance into entries."""
+
+from typing import Optional
+
+from titrack.core.models import Run
+
+# Level type constants (from game logs)
+LEVEL_TYPE_NORMAL = 3
+LEVEL_TYPE_NIGHTMARE = 11
+
+
+def group_sessions(runs: list[Run]) -> list[list[Run]]:
+    """
+    Group runs into map sessions.
+
+    A session is a sequence of consecutive non-hub runs with the same
+    level_uid (same map instance). A hub run breaks the session, and a
+    run without a level_uid is always a session of its own.
+
+    Args:
+        runs: Runs including hubs, in any order
+
+    Returns:
+        Sessions in start order, each a list of runs in start order
+    """
+    sorted_runs = sorted(runs, key=lambda r: r.start_ts)
+
+    sessions: list[list[Run]] = []
+    current_session: list[Run] = []
+    current_uid: Optional[int] = None
+
+    for run in sorted_runs:
+        if run.is_hub:
+            # Hub breaks the session
+            if current_session:
+                sessions.append(current_session)
+                current_session = []
+                current_uid = None
+        elif run.level_uid is None:
+            # No level_uid - treat as its own session
+            if current_session:
+                sessions.append(current_session)
+            sessions.append([run])
+            current_session = []
+            current_uid = None
+        elif run.level_uid == current_uid:
+            # Same level_uid, add to current session
+            current_session.append(run)
+        else:
+            # Different level_uid, start new session
+            if current_session:
+                sessions.append(current_session)
+            current_session = [run]
+            current_uid = run.level_uid
+
+    if current_session:
+        sessions.append(current_session)
+
+    return sessions
+
+
+def assign_entry_ids(runs: list[Run]) -> dict[int, Optional[int]]:
+    """
+    Map each run to the id of the listing entry it is shown under.
+
+    Normal runs of a session are merged into one entry headed by the
+    session's first normal run; nightmare runs are entries of their own.
+    Hub runs are not listed and map to None.
+
+    Args:
+        runs: Runs including hubs, in any order
+
+    Returns:
+        Dict mapping run id -> entry (head run) id
+    """
+    entry_ids: dict[int, Optional[int]] = {r.id: None for r in runs if r.is_hub}
+
+    for session in group_sessions(runs):
+        head_id: Optional[int] = None
+        for run in session:
+            if run.level_type == LEVEL_TYPE_NIGHTMARE:
+                entry_ids[run.id] = run.id
+            else:
+                if head_id is None:
+                    head_id = run.id
+                entry_ids[run.id] = head_id
+
+    return entry_ids
+
+
+def session_closed_by(head: Run, next_run: Run) -> bool:
+    """
+    Check whether starting next_run closes the entry headed by head.
+
+    A nightmare entry is a single run, so it closes as soon as any later run
+    starts. A normal entry stays open while the player keeps re-entering the
+    same map instance (same level_uid, no hub in between).
+    """
+    if head.level_type == LEVEL_TYPE_NIGHTMARE:
+        return True
+    if next_run.is_hub or next_run.level_uid is None or head.level_uid is None:
+        return True
+    return next_run.level_uid != head.level_uid
+
+
+class SessionTracker:
+    """
+    Track listing entries that are still open as runs arrive in order.
+
+    Used by the collector to finalize map sessions at run end, and to
+    replay stored runs when rebuilding sessions.
+    """
+
+    def __init__(self, open_heads: Optional[list[Run]] = None) -> None:
+        self._open: list[Run] = list(open_heads or [])
+
+    @property
+    def open_heads(self) -> list[Run]:
+        """Head runs of entries that have not closed yet."""
+        return list(self._open)
+
+    def add_run(self, run: Run) -> list[int]:
+        """
+        Register a newly started run.
+
+        Args:
+            run: The run that just started (must have its id set)
+
+        Returns:
+            Entry ids closed by this run, oldest first
+        """
+        closed = [head.id for head in self._open if session_closed_by(head, run)]
+        self._open = [head for head in self._open if head.id not in closed]
+
+        if not run.is_hub and not self._continues_open_entry(run):
+            self._open.append(run)
+        return closed
+
+    def close_all(self) -> list[int]:
+        """Close every open entry (e.g. on character change). Returns their ids."""
+        closed = [head.id for head in self._open]
+        self._open = []
+        return closed
+
+    def _continues_open_entry(self, run: Run) -> bool:
+        """True if run is a normal run joining an open entry of the same map instance."""
+        if run.level_type == LEVEL_TYPE_NIGHTMARE or run.level_uid is None:
+            return False
+        return any(
+            head.level_type != LEVEL_TYPE_NIGHTMARE and head.level_uid == run.level_uid
+            for head in self._open
+        )
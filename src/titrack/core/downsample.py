@@ -0,0 +1,64 @@
+"""Time-series downsampling for charts (Largest-Triangle-Three-Buckets)."""
+
+from typing import Sequence
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], max_points: int) -> list[int]:
+    """
+    Pick which points to keep so a line chart of them looks like the full series.
+
+    The first and last points are always kept. The points in between are
+    split into max_points - 2 equal buckets; from each bucket the point that
+    forms the largest triangle with the previously kept point and the
+    average of the next bucket is kept, which preserves peaks and dips.
+
+    Args:
+        xs: X values (e.g. timestamps), ascending
+        ys: Y values, same length as xs
+        max_points: Most points to keep (at least 3)
+
+    Returns:
+        Ascending indices of the kept points (all indices if the series
+        already fits).
+    """
+    n = len(xs)
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+    if n <= max_points:
+        return list(range(n))
+
+    bucket_size = (n - 2) / (max_points - 2)
+    kept = [0]
+    a = 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        kept.append(best)
+        a = best
+
+    kept.append(n - 1)
+    return kept
+
+
+def downsample(
+    xs: Sequence[float], ys: Sequence[float], max_points: int
+) -> tuple[list[float], list[float]]:
+    """Downsample a series with LTTB, returning the kept (xs, ys)."""
+    indices = lttb_indices(xs, ys, max_points)
+    return [xs[i] for i in indices], [ys[i] for i in indices]
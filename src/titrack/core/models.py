@@ -111,6 +111,26 @@ class Price:
     season_id: Optional[int] = None  # Season/league for price isolation
 
 
+@dataclass
+class MapSession:
+    """A finished listing entry: a map instance's normal runs, or one nightmare run."""
+
+    id: int  # Head run ID (runs.entry_id)
+    zone_signature: str
+    start_ts: datetime
+    end_ts: Optional[datetime]
+    run_ids: list[int]  # Member runs in start order
+    level_id: Optional[int] = None
+    is_nightmare: bool = False
+    duration_seconds: float = 0.0  # Sum of member run durations
+    fe_gained: int = 0
+    total_value: float = 0.0  # Gross value at current prices and tax
+    map_cost_fe: float = 0.0  # Priced map costs at current prices and tax
+    map_cost_has_unpriced: bool = False
+    season_id: Optional[int] = None
+    player_id: Optional[str] = None
+
+
 # Parsed event types
 
 
@@ -0,0 +1,120 @@
+"""Incremental net worth tracking for periodic snapshots."""
+
+from typing import Optional
+
+from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+# A snapshot is recorded once net worth moved by at least this much FE...
+NET_WORTH_MIN_CHANGE_FE = 10.0
+
+# ...and by at least this share of the last snapshot
+NET_WORTH_MIN_CHANGE_RATIO = 0.005
+
+
+class NetWorthTracker:
+    """
+    Keep the inventory's net worth up to date as slots and prices change.
+
+    Holds per-item quantities and a cached price vector, and adjusts the
+    total by each change's difference instead of re-valuing the whole
+    inventory. Values match the inventory endpoint: FE counts 1:1, other
+    priced items at price * trade tax multiplier, unpriced items as 0.
+
+    Used by the collector to decide when the value has moved far enough
+    from the last snapshot to record a new one.
+    """
+
+    def __init__(
+        self,
+        quantities: Optional[dict[int, int]] = None,
+        prices: Optional[dict[int, Optional[float]]] = None,
+        tax_multiplier: float = 1.0,
+        min_change_fe: float = NET_WORTH_MIN_CHANGE_FE,
+        min_change_ratio: float = NET_WORTH_MIN_CHANGE_RATIO,
+    ) -> None:
+        self._quantities: dict[int, int] = {
+            config_base_id: quantity
+            for config_base_id, quantity in (quantities or {}).items()
+            if quantity
+        }
+        self._prices: dict[int, Optional[float]] = dict(prices or {})
+        self._tax_multiplier = tax_multiplier
+        self._min_change_fe = min_change_fe
+        self._min_change_ratio = min_change_ratio
+        self._value = sum(
+            quantity * self._unit_value(config_base_id)
+            for config_base_id, quantity in self._quantities.items()
+        )
+        self._last_snapshot: Optional[float] = None
+
+    @property
+    def value(self) -> float:
+        """Current net worth in FE."""
+        return self._value
+
+    @property
+    def total_fe(self) -> int:
+        """FE currently held."""
+        return self._quantities.get(FE_CONFIG_BASE_ID, 0)
+
+    @property
+    def item_ids(self) -> list[int]:
+        """Items currently held (the ones whose prices matter)."""
+        return list(self._quantities)
+
+    def has_price(self, config_base_id: int) -> bool:
+        """True if the item's price is cached (priced or known to be unpriced)."""
+        return config_base_id == FE_CONFIG_BASE_ID or config_base_id in self._prices
+
+    def _unit_value(self, config_base_id: int) -> float:
+        if config_base_id == FE_CONFIG_BASE_ID:
+            return 1.0
+        price = self._prices.get(config_base_id)
+        return price * self._tax_multiplier if price and price > 0 else 0.0
+
+    # --- Changes ---
+
+    def add_quantity(self, config_base_id: int, delta: int) -> None:
+        """Apply a change in how many of an item are held."""
+        if not delta:
+            return
+        quantity = self._quantities.get(config_base_id, 0) + delta
+        if quantity:
+            self._quantities[config_base_id] = quantity
+        else:
+            self._quantities.pop(config_base_id, None)
+        self._value += delta * self._unit_value(config_base_id)
+
+    def set_price(self, config_base_id: int, price: Optional[float]) -> None:
+        """Update one item's effective price (in FE, None if unpriced)."""
+        old_unit = self._unit_value(config_base_id)
+        self._prices[config_base_id] = price
+        quantity = self._quantities.get(config_base_id, 0)
+        if quantity:
+            self._value += quantity * (self._unit_value(config_base_id) - old_unit)
+
+    def set_prices(self, prices: dict[int, Optional[float]]) -> None:
+        """Update several items' effective prices."""
+        for config_base_id, price in prices.items():
+            self.set_price(config_base_id, price)
+
+    def set_tax_multiplier(self, tax_multiplier: float) -> None:
+        """Change the trade tax multiplier applied to non-FE items."""
+        if tax_multiplier == self._tax_multiplier:
+            return
+        fe_value = float(self.total_fe)
+        self._value = fe_value + (self._value - fe_value) * tax_multiplier / self._tax_multiplier
+        self._tax_multiplier = tax_multiplier
+
+    # --- Snapshots ---
+
+    def should_snapshot(self) -> bool:
+        """True if nothing was recorded yet or the value moved past the threshold."""
+        if self._last_snapshot is None:
+            return True
+        change = abs(self._value - self._last_snapshot)
+        return change >= max(self._min_change_fe, abs(self._last_snapshot) * self._min_change_ratio)
+
+    def mark_snapshot(self, value: Optional[float] = None) -> None:
+        """Remember the value a snapshot was recorded at (default: current)."""
+        self._last_snapshot = self._value if value is None else value
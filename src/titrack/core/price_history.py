@@ -0,0 +1,72 @@
+"""As-of lookups over the local price history."""
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, Optional
+
+
+class PriceHistory:
+    """
+    Observed prices per item over time.
+
+    Each item's observations are kept as parallel sorted arrays of times
+    and prices, so the price in effect at any moment is found by bisecting
+    instead of scanning. Load the items needed once, then look up as many
+    (item, time) pairs as required.
+    """
+
+    def __init__(self, observations: Iterable[tuple[int, datetime, float]] = ()) -> None:
+        self._series: dict[int, tuple[list[datetime], list[float]]] = {}
+        for config_base_id, timestamp, price_fe in observations:
+            self.add(config_base_id, timestamp, price_fe)
+
+    def __len__(self) -> int:
+        return sum(len(times) for times, _ in self._series.values())
+
+    @property
+    def item_ids(self) -> list[int]:
+        """Items with at least one observation."""
+        return list(self._series)
+
+    def add(self, config_base_id: int, timestamp: datetime, price_fe: float) -> None:
+        """Record an observation (cheapest when added in time order)."""
+        times, prices = self._series.setdefault(config_base_id, ([], []))
+        if not times or timestamp >= times[-1]:
+            times.append(timestamp)
+            prices.append(price_fe)
+            return
+        index = bisect_right(times, timestamp)
+        times.insert(index, timestamp)
+        prices.insert(index, price_fe)
+
+    def update(self, other: "PriceHistory") -> None:
+        """Take over another history's items (replacing any already held)."""
+        self._series.update(other._series)
+
+    def price_at(self, config_base_id: int, when: datetime) -> Optional[float]:
+        """The last price observed at or before when (None if none yet)."""
+        series = self._series.get(config_base_id)
+        if series is None:
+            return None
+        times, prices = series
+        index = bisect_right(times, when)
+        return prices[index - 1] if index else None
+
+    def prices_at(
+        self,
+        config_base_ids: Iterable[int],
+        when: datetime,
+        fallback: Optional[dict[int, Optional[float]]] = None,
+    ) -> dict[int, Optional[float]]:
+        """
+        Prices of several items at one moment.
+
+        Items not observed by then take their price from fallback (e.g. the
+        current effective prices), or None.
+        """
+        fallback = fallback or {}
+        result = {}
+        for config_base_id in config_base_ids:
+            price = self.price_at(config_base_id, when)
+            result[config_base_id] = price if price is not None else fallback.get(config_base_id)
+        return result
@@ -0,0 +1,139 @@
+"""Run history export - NDJSON and CSV encoding of exported run records."""
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+from titrack.data.zones import get_zone_display_name
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# CSV has one row per run and item; run columns repeat on each of its rows
+CSV_COLUMNS = [
+    "id",
+    "run_ids",
+    "zone_name",
+    "zone_signature",
+    "is_nightmare",
+    "start_ts",
+    "end_ts",
+    "duration_seconds",
+    "fe_gained",
+    "total_value",
+    "map_cost_fe",
+    "net_value_fe",
+    "line_type",
+    "config_base_id",
+    "item_name",
+    "quantity",
+    "price_fe",
+    "total_value_fe",
+]
+
+
+def _zone_name(record: dict) -> str:
+    zone_name = get_zone_display_name(record["zone_signature"], record["level_id"])
+    if record["is_nightmare"]:
+        zone_name += " (Nightmare)"
+    return zone_name
+
+
+def to_json_record(record: dict) -> dict:
+    """Shape a Repository.iter_run_export record for JSON output."""
+    return {
+        "id": record["id"],
+        "run_ids": record["run_ids"],
+        "zone_name": _zone_name(record),
+        "zone_signature": record["zone_signature"],
+        "is_nightmare": record["is_nightmare"],
+        "start_ts": record["start_ts"].isoformat(),
+        "end_ts": record["end_ts"].isoformat() if record["end_ts"] else None,
+        "duration_seconds": record["duration_seconds"],
+        "fe_gained": record["fe_gained"],
+        "total_value": record["total_value"],
+        "map_cost_fe": record["map_cost_fe"],
+        "map_cost_has_unpriced": record["map_cost_has_unpriced"],
+        "net_value_fe": round(record["total_value"] - record["map_cost_fe"], 2),
+        "loot": record["loot"],
+        "map_costs": record["map_costs"],
+    }
+
+
+def encode_ndjson(records: Iterable[dict]) -> str:
+    """Encode records as newline-delimited JSON, one record per line."""
+    return "".join(
+        json.dumps(to_json_record(record), ensure_ascii=False, separators=(",", ":")) + "\n"
+        for record in records
+    )
+
+
+def csv_header() -> str:
+    """The CSV header line."""
+    return _csv_lines([CSV_COLUMNS])
+
+
+def encode_csv(records: Iterable[dict]) -> str:
+    """
+    Encode records as CSV rows (without the header).
+
+    Each loot and map cost line becomes a row; a run without any gets one
+    row with the item columns left empty.
+    """
+    rows = []
+    for record in records:
+        data = to_json_record(record)
+        base = [
+            data["id"],
+            " ".join(str(run_id) for run_id in data["run_ids"]),
+            data["zone_name"],
+            data["zone_signature"],
+            int(data["is_nightmare"]),
+            data["start_ts"],
+            data["end_ts"] or "",
+            _blank(data["duration_seconds"]),
+            data["fe_gained"],
+            data["total_value"],
+            data["map_cost_fe"],
+            data["net_value_fe"],
+        ]
+        lines = [("loot", line) for line in data["loot"]]
+        lines += [("map_cost", line) for line in data["map_costs"]]
+        if not lines:
+            rows.append(base + [""] * 6)
+        for line_type, line in lines:
+            rows.append(base + [
+                line_type,
+                line["config_base_id"],
+                line["name"],
+                line["quantity"],
+                _blank(line["price_fe"]),
+                _blank(line["total_value_fe"]),
+            ])
+    return _csv_lines(rows)
+
+
+def encode_batches(batches: Iterable[list[dict]], fmt: str) -> Iterator[str]:
+    """Encode batches of records in the given format, header first for CSV."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "csv":
+        yield csv_header()
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    for batch in batches:
+        yield encode(batch)
+
+
+def _blank(value) -> object:
+    return "" if value is None else value
+
+
+def _csv_lines(rows: list[list]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
@@ -0,0 +1,222 @@
+"""Run loot and map cost valuation against resolved prices."""
+
+from typing import NamedTuple, Optional
+
+from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+try:
+    import numpy as np
+except ImportError:  # Optional - install with: pip install titrack[fast]
+    np = None
+
+# Below this many runs the per-call array setup costs more than the loops
+NUMPY_MIN_RUNS = 64
+
+
+class RunValuation(NamedTuple):
+    """Loot value and map cost of one run."""
+
+    fe_gained: int
+    total_value: float
+    total_cost: float
+    unpriced: list[int]
+
+    @property
+    def net_value(self) -> float:
+        return self.total_value - self.total_cost
+
+
+def value_summary(
+    summary: dict[int, int], prices: dict[int, Optional[float]], tax_multiplier: float
+) -> tuple[int, float]:
+    """
+    Value a loot summary against already-resolved prices.
+
+    FE counts 1:1 (negative FE included); other items picked up are valued
+    at price * tax multiplier, unpriced ones are skipped.
+
+    Returns:
+        Tuple of (raw_fe_gained, total_value_fe), as Repository.get_run_value.
+    """
+    raw_fe = summary.get(FE_CONFIG_BASE_ID, 0)
+    total_value = float(raw_fe)
+
+    for config_id, quantity in summary.items():
+        if config_id == FE_CONFIG_BASE_ID:
+            continue
+        if quantity <= 0:
+            continue
+
+        price_fe = prices.get(config_id)
+        if price_fe and price_fe > 0:
+            # Apply trade tax to non-FE items (would need to sell them)
+            total_value += price_fe * quantity * tax_multiplier
+
+    return raw_fe, total_value
+
+
+def value_cost_summary(
+    summary: dict[int, int], prices: dict[int, Optional[float]], tax_multiplier: float
+) -> tuple[float, list[int]]:
+    """
+    Value a map cost summary against already-resolved prices.
+
+    Returns:
+        Tuple of (total_cost_fe, unpriced_config_ids), as Repository.get_run_cost.
+    """
+    total_cost = 0.0
+    unpriced: list[int] = []
+
+    for config_id, quantity in summary.items():
+        price_fe = prices.get(config_id)
+        if price_fe and price_fe > 0:
+            # Use absolute value since quantity is negative (consumption)
+            total_cost += abs(quantity) * price_fe * tax_multiplier
+        else:
+            unpriced.append(config_id)
+
+    return total_cost, unpriced
+
+
+def value_runs(
+    run_ids: list[int],
+    summaries: dict[int, dict[int, int]],
+    cost_summaries: dict[int, dict[int, int]],
+    prices: dict[int, Optional[float]],
+    tax_multiplier: float,
+    use_numpy: Optional[bool] = None,
+    run_prices: Optional[dict[int, dict[int, Optional[float]]]] = None,
+) -> dict[int, RunValuation]:
+    """
+    Value the loot and map costs of many runs at once.
+
+    Results are identical to calling value_summary and value_cost_summary
+    run by run, which is what happens without NumPy. With NumPy, each
+    side is laid out as a runs x items sparse matrix (CSR: item columns
+    and quantities per run, in summary order) against a dense price
+    vector, and every run's total is accumulated in one pass.
+
+    Args:
+        run_ids: Runs to value (missing summaries count as empty).
+        summaries: {run_id: {config_base_id: quantity}} loot per run.
+        cost_summaries: {run_id: {config_base_id: quantity}} map costs per run.
+        prices: Effective price per item (None if unpriced).
+        tax_multiplier: Trade tax multiplier for non-FE items.
+        use_numpy: Force (True) or skip (False) the NumPy path; by default
+                   it is used when installed and there are enough runs.
+        run_prices: Prices to use instead of prices for some runs, e.g.
+                    the ones in effect when each run happened.
+
+    Returns:
+        {run_id: RunValuation}
+    """
+    if use_numpy is None:
+        use_numpy = np is not None and len(run_ids) >= NUMPY_MIN_RUNS
+    if use_numpy and np is None:
+        raise RuntimeError("NumPy is not installed (pip install titrack[fast])")
+    if use_numpy and run_ids:
+        return _value_runs_numpy(
+            run_ids, summaries, cost_summaries, prices, tax_multiplier, run_prices or {}
+        )
+
+    run_prices = run_prices or {}
+    result = {}
+    for run_id in run_ids:
+        priced_at = run_prices.get(run_id, prices)
+        fe_gained, total_value = value_summary(summaries.get(run_id, {}), priced_at, tax_multiplier)
+        total_cost, unpriced = value_cost_summary(
+            cost_summaries.get(run_id, {}), priced_at, tax_multiplier
+        )
+        result[run_id] = RunValuation(fe_gained, total_value, total_cost, unpriced)
+    return result
+
+
+def _value_runs_numpy(
+    run_ids: list[int],
+    summaries: dict[int, dict[int, int]],
+    cost_summaries: dict[int, dict[int, int]],
+    prices: dict[int, Optional[float]],
+    tax_multiplier: float,
+    run_prices: dict[int, dict[int, Optional[float]]],
+) -> dict[int, RunValuation]:
+    # Compact item ordinals; column 0 is FE
+    columns: dict[int, int] = {FE_CONFIG_BASE_ID: 0}
+
+    def csr(per_run: dict[int, dict[int, int]], fe_first: bool):
+        indptr = [0]
+        indices: list[int] = []
+        data: list[int] = []
+        # Entries of runs with their own prices, as (position, price)
+        own: list[tuple[int, float]] = []
+        for run_id in run_ids:
+            summary = per_run.get(run_id, {})
+            own_prices = run_prices.get(run_id)
+            if fe_first and FE_CONFIG_BASE_ID in summary:
+                # Loot totals start from the raw FE, as value_summary does
+                indices.append(0)
+                data.append(summary[FE_CONFIG_BASE_ID])
+            for config_id, quantity in summary.items():
+                if fe_first and config_id == FE_CONFIG_BASE_ID:
+                    continue
+                if own_prices is not None:
+                    own.append((len(indices), own_prices.get(config_id) or 0.0))
+                indices.append(columns.setdefault(config_id, len(columns)))
+                data.append(quantity)
+            indptr.append(len(indices))
+        rows = np.repeat(np.arange(len(run_ids)), np.diff(indptr))
+        return rows, np.array(indices, dtype=np.intp), np.array(data, dtype=np.int64), own
+
+    loot_rows, loot_cols, loot_qty, loot_own = csr(summaries, fe_first=True)
+    cost_rows, cost_cols, cost_qty, cost_own = csr(cost_summaries, fe_first=False)
+
+    config_ids = list(columns)
+    price_vector = np.zeros(len(config_ids), dtype=np.float64)
+    for column, config_id in enumerate(config_ids):
+        price = prices.get(config_id)
+        if price and price > 0:
+            price_vector[column] = price
+
+    def entry_prices(cols, own):
+        # Dense price vector lookup, with per-run prices laid over it
+        result = price_vector[cols]
+        if own:
+            positions, values = zip(*own)
+            result[list(positions)] = values
+        return result
+
+    n = len(run_ids)
+
+    # Loot: FE at 1:1, other items picked up at price * tax. bincount adds
+    # weights in input order, so each total sums in the same order as the loop.
+    is_fe = loot_cols == 0
+    loot_prices = entry_prices(loot_cols, loot_own)
+    loot_terms = np.where(
+        is_fe,
+        loot_qty.astype(np.float64),
+        np.where(
+            (loot_qty > 0) & (loot_prices > 0),
+            loot_prices * loot_qty * tax_multiplier,
+            0.0,
+        ),
+    )
+    total_value = np.bincount(loot_rows, weights=loot_terms, minlength=n)
+    fe_gained = np.zeros(n, dtype=np.int64)
+    fe_gained[loot_rows[is_fe]] = loot_qty[is_fe]
+
+    # Costs: all priced items at |quantity| * price * tax
+    cost_prices = entry_prices(cost_cols, cost_own)
+    cost_priced = cost_prices > 0
+    cost_terms = np.where(cost_priced, np.abs(cost_qty) * cost_prices * tax_multiplier, 0.0)
+    total_cost = np.bincount(cost_rows, weights=cost_terms, minlength=n)
+
+    unpriced: list[list[int]] = [[] for _ in range(n)]
+    unpriced_at = ~cost_priced
+    for row, column in zip(cost_rows[unpriced_at].tolist(), cost_cols[unpriced_at].tolist()):
+        unpriced[row].append(config_ids[column])
+
+    return {
+        run_id: RunValuation(fe, value, cost, missing)
+        for run_id, fe, value, cost, missing in zip(
+            run_ids, fe_gained.tolist(), total_value.tolist(), total_cost.tolist(), unpriced
+        )
+    }
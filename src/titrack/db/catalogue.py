@@ -0,0 +1,177 @@
+"""Prebuilt item catalogue - compiled SQLite snapshot of the item seed."""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from titrack.db.schema import CREATE_ITEMS
+
+# Columns shared by the catalogue and the main items table
+CATALOGUE_COLUMNS = (
+    "config_base_id",
+    "name_en",
+    "name_cn",
+    "type_cn",
+    "icon_url",
+    "url_en",
+    "url_cn",
+)
+
+# Settings key recording which catalogue version was last applied
+CATALOGUE_VERSION_SETTING = "items_catalogue_version"
+
+CREATE_CATALOGUE_META = """
+CREATE TABLE IF NOT EXISTS catalogue_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+)
+"""
+
+
+def build_catalogue(seed_path: Path, output_path: Path) -> int:
+    """
+    Compile the JSON item seed into a ready-to-attach SQLite file.
+
+    The catalogue contains an items table with the same layout as the
+    main database, plus a version derived from the seed contents so
+    that updates can be detected and applied as diffs.
+
+    Args:
+        seed_path: Path to tlidb_items_seed_en.json
+        output_path: Path of the catalogue file to write
+
+    Returns:
+        Number of items written
+    """
+    raw = seed_path.read_bytes()
+    data = json.loads(raw.decode("utf-8"))
+    version = hashlib.sha256(raw).hexdigest()[:16]
+
+    rows = [
+        (
+            int(item["id"]),
+            item.get("name_en"),
+            item.get("name_cn"),
+            item.get("type_cn"),
+            item.get("img"),
+            item.get("url_en"),
+            item.get("url_cn"),
+        )
+        for item in data.get("items", [])
+    ]
+
+    # Build into a temp file and swap in, so a failed build never
+    # leaves a half-written catalogue behind
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.execute(CREATE_ITEMS)
+        conn.execute(CREATE_CATALOGUE_META)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO items ({', '.join(CATALOGUE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(CATALOGUE_COLUMNS))})",
+            rows,
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO catalogue_meta (key, value) VALUES (?, ?)",
+            [("version", version), ("count", str(len(rows)))],
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    tmp_path.replace(output_path)
+    return len(rows)
+
+
+def get_catalogue_version(catalogue_path: Path) -> str | None:
+    """Read the version stamp of a catalogue file, or None if unreadable."""
+    try:
+        conn = sqlite3.connect(f"file:{catalogue_path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        row = conn.execute("SELECT value FROM catalogue_meta WHERE key = 'version'").fetchone()
+        return row[0] if row else None
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def apply_catalogue(cursor: sqlite3.Cursor, catalogue_path: Path) -> int:
+    """
+    Bring the items table up to date with a prebuilt catalogue.
+
+    The catalogue is attached and only rows that are missing or differ
+    from the local copy are written, so a first run is a single
+    INSERT ... SELECT and later catalogue updates touch only changed items.
+    A local name is kept when the catalogue has no English name for the
+    item (e.g. names filled in by hand for untranslated entries).
+
+    Args:
+        cursor: Cursor on the main database (autocommit mode)
+        catalogue_path: Path to the catalogue SQLite file
+
+    Returns:
+        Number of items inserted or updated
+    """
+    row = cursor.execute(
+        "SELECT value FROM settings WHERE key = ?", (CATALOGUE_VERSION_SETTING,)
+    ).fetchone()
+    applied_version = row[0] if row else None
+
+    cursor.execute("ATTACH DATABASE ? AS catalogue", (str(catalogue_path),))
+    try:
+        row = cursor.execute(
+            "SELECT value FROM catalogue.catalogue_meta WHERE key = 'version'"
+        ).fetchone()
+        version = row[0] if row else None
+        if version is not None and version == applied_version:
+            return 0
+
+        columns = ", ".join(CATALOGUE_COLUMNS)
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute(
+                f"""INSERT INTO items ({columns})
+                    SELECT {columns} FROM catalogue.items AS c
+                    WHERE c.config_base_id NOT IN (SELECT config_base_id FROM items)"""
+            )
+            inserted = cursor.rowcount
+            cursor.execute(
+                """UPDATE items SET
+                       name_en = COALESCE(c.name_en, items.name_en),
+                       name_cn = c.name_cn,
+                       type_cn = c.type_cn,
+                       icon_url = c.icon_url,
+                       url_en = c.url_en,
+                       url_cn = c.url_cn
+                   FROM catalogue.items AS c
+                   WHERE items.config_base_id = c.config_base_id
+                   AND (COALESCE(c.name_en, items.name_en) IS NOT items.name_en
+                        OR c.name_cn IS NOT items.name_cn
+                        OR c.type_cn IS NOT items.type_cn
+                        OR c.icon_url IS NOT items.icon_url
+                        OR c.url_en IS NOT items.url_en
+                        OR c.url_cn IS NOT items.url_cn)"""
+            )
+            updated = cursor.rowcount
+            if version is not None:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                    (CATALOGUE_VERSION_SETTING, version),
+                )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        return inserted + updated
+    finally:
+        cursor.execute("DETACH DATABASE catalogue")
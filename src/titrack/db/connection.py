@@ -5,9 +5,24 @@ import sqlite3
 import threading
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
-
-from titrack.db.schema import ALL_CREATE_STATEMENTS, SCHEMA_VERSION
+from typing import Generator, Iterator
+
+from titrack.db.schema import (
+    ALL_CREATE_STATEMENTS,
+    ARCHIVE_CREATE_STATEMENTS,
+    ARCHIVED_TABLES,
+    BACKFILL_PRICE_HISTORY,
+    ITEMS_FTS_STATEMENTS,
+    POST_MIGRATION_STATEMENTS,
+    REBUILD_RUN_VALUES_STATEMENTS,
+    REBUILD_ZONE_DROPS_STATEMENTS,
+    SCHEMA_VERSION,
+    qualify_ddl,
+)
+
+# SQLite's default limit is 10 attached databases; leave headroom for
+# temporary attachments such as the item catalogue
+MAX_ATTACHED_ARCHIVES = 8
 
 
 class Database:
@@ -22,7 +37,11 @@ class Database:
         """
         self.db_path = db_path
         self._connection: sqlite3.Connection | None = None
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        # Attached season archives: season_id -> schema name
+        self._archives: dict[int, str] = {}
+        # Whether the items_fts search index exists (needs FTS5 with trigram)
+        self.has_item_search_index = False
 
     def connect(self) -> None:
         """Open database connection and initialize schema."""
@@ -47,26 +66,82 @@ class Database:
         # Initialize schema
         self._init_schema()
 
+        # Attach archived seasons so cross-season history stays queryable
+        self._attach_existing_archives()
+        self._refresh_archive_views()
+
     def _init_schema(self) -> None:
-        """Create tables if they don't exist."""
+        """
+        Create tables if they don't exist and bring existing ones up to date.
+
+        DDL, migrations and backfills only run when PRAGMA user_version is
+        behind SCHEMA_VERSION; an up-to-date (or newer) database just gets
+        its item catalogue updates.
+        """
         cursor = self._connection.cursor()
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            self.has_item_search_index = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'items_fts'"
+            ).fetchone() is not None
+            self._auto_seed_items(cursor)
+            return
+
         for statement in ALL_CREATE_STATEMENTS:
             cursor.execute(statement)
 
         # Run migrations for existing databases
-        self._run_migrations(cursor)
+        backfill_entries = self._run_migrations(cursor)
+
+        # Derived tables/counters created below start out empty for existing data
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master")}
+
+        for statement in POST_MIGRATION_STATEMENTS:
+            cursor.execute(statement)
+
+        if backfill_entries:
+            self._backfill_run_entries(cursor)
+
+        if "run_loot" not in existing:
+            self._backfill_run_loot(cursor)
+
+        if "trg_session_totals_insert" in existing:
+            self._drop_session_totals(cursor)
+
+        if "trg_run_count_insert" not in existing:
+            self._backfill_row_counts(cursor)
+
+        if "zone_drops" not in existing:
+            for statement in REBUILD_ZONE_DROPS_STATEMENTS:
+                cursor.execute(statement)
+
+        # Values left stale by price rows moved between seasons before the
+        # trg_revalue_*_move triggers existed are recomputed once
+        if "run_values" not in existing or "trg_revalue_prices_move" not in existing:
+            for statement in REBUILD_RUN_VALUES_STATEMENTS:
+                cursor.execute(statement)
+
+        if "price_history" not in existing:
+            cursor.execute(BACKFILL_PRICE_HISTORY)
+
+        self._init_item_search_index(cursor, rebuild="items_fts" not in existing)
 
         # Store schema version
         cursor.execute(
             "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
             ("schema_version", str(SCHEMA_VERSION)),
         )
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
         # Auto-seed items if table is empty (first run experience)
         self._auto_seed_items(cursor)
 
-    def _run_migrations(self, cursor: sqlite3.Cursor) -> None:
-        """Run database migrations for schema changes."""
+    def _run_migrations(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Run database migrations for schema changes.
+
+        Returns:
+            True if runs need their listing entries backfilled.
+        """
         # Check existing columns in runs table
         cursor.execute("PRAGMA table_info(runs)")
         runs_columns = [row[1] for row in cursor.fetchall()]
@@ -92,6 +167,12 @@ class Database:
             cursor.execute("ALTER TABLE runs ADD COLUMN player_id TEXT")
             print("Migration: Added player_id column to runs table")
 
+        backfill_entries = False
+        if "entry_id" not in runs_columns:
+            cursor.execute("ALTER TABLE runs ADD COLUMN entry_id INTEGER")
+            print("Migration: Added entry_id column to runs table")
+            backfill_entries = True
+
         # Check item_deltas columns
         cursor.execute("PRAGMA table_info(item_deltas)")
         deltas_columns = [row[1] for row in cursor.fetchall()]
@@ -155,13 +236,123 @@ class Database:
             cursor.execute("ALTER TABLE slot_state_new RENAME TO slot_state")
             print("Migration: Recreated slot_state table with player_id")
 
+        return backfill_entries
+
+    def _backfill_run_loot(self, cursor: sqlite3.Cursor) -> None:
+        """Materialize per-run item totals for deltas recorded before run_loot existed."""
+        from titrack.data.inventory import EXCLUDED_PAGES
+
+        excluded = ", ".join(str(p) for p in sorted(EXCLUDED_PAGES)) or "NULL"
+        cursor.execute(
+            f"""INSERT INTO run_loot (run_id, config_base_id, kind, quantity)
+                SELECT run_id, config_base_id,
+                       CASE WHEN proto_name = 'Spv3Open' THEN 'cost' ELSE 'loot' END AS kind,
+                       SUM(delta)
+                FROM item_deltas
+                WHERE run_id IS NOT NULL
+                AND (proto_name = 'Spv3Open' OR page_id NOT IN ({excluded}))
+                GROUP BY run_id, config_base_id, kind"""
+        )
+        if cursor.rowcount > 0:
+            print(f"Migration: Materialized loot totals for {cursor.rowcount} run items")
+
+    def _drop_session_totals(self, cursor: sqlite3.Cursor) -> None:
+        """Remove the stored map session running totals (sessions are valued live now)."""
+        for event in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_session_totals_{event}")
+        cursor.execute("DELETE FROM counters WHERE name IN ('session_fe', 'session_value')")
+        print("Migration: Dropped stored map session totals")
+
+    def _init_item_search_index(self, cursor: sqlite3.Cursor, rebuild: bool) -> None:
+        """Create the items_fts search index, filling it from items when new."""
+        try:
+            for statement in ITEMS_FTS_STATEMENTS:
+                cursor.execute(statement)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5/trigram (< 3.34) - search scans instead
+            print(f"Item search index unavailable: {e}")
+            return
+
+        if rebuild:
+            cursor.execute("DELETE FROM items_fts")
+            cursor.execute(
+                """INSERT INTO items_fts (rowid, name_en, name_cn)
+                   SELECT config_base_id, name_en, name_cn FROM items"""
+            )
+        self.has_item_search_index = True
+
+    def _backfill_row_counts(self, cursor: sqlite3.Cursor) -> None:
+        """Recompute the runs and items counters from the tables."""
+        cursor.execute("DELETE FROM counters WHERE name IN ('runs', 'items')")
+        cursor.execute(
+            """INSERT INTO counters (name, season_id, player_id, value)
+               SELECT 'runs', COALESCE(season_id, 0), COALESCE(player_id, ''), COUNT(*)
+               FROM runs
+               GROUP BY COALESCE(season_id, 0), COALESCE(player_id, '')"""
+        )
+        cursor.execute(
+            "INSERT INTO counters (name, value) SELECT 'items', COUNT(*) FROM items"
+        )
+
+    def _backfill_run_entries(self, cursor: sqlite3.Cursor) -> None:
+        """Assign listing entries to existing runs (the counter triggers tally them)."""
+        from datetime import datetime
+
+        from titrack.core.consolidation import assign_entry_ids
+        from titrack.core.models import Run
+
+        rows = cursor.execute(
+            """SELECT id, zone_signature, start_ts, is_hub, level_type, level_uid,
+                      season_id, player_id
+               FROM runs"""
+        ).fetchall()
+
+        # Consolidate each season/player's runs separately
+        scopes: dict[tuple, list[Run]] = {}
+        for row in rows:
+            scopes.setdefault((row[6], row[7]), []).append(Run(
+                id=row[0],
+                zone_signature=row[1],
+                start_ts=datetime.fromisoformat(row[2]),
+                is_hub=bool(row[3]),
+                level_type=row[4],
+                level_uid=row[5],
+            ))
+
+        updates = []
+        for runs in scopes.values():
+            for run_id, entry_id in assign_entry_ids(runs).items():
+                if entry_id is not None:
+                    updates.append((entry_id, run_id))
+
+        if updates:
+            cursor.execute("BEGIN")
+            cursor.executemany("UPDATE runs SET entry_id = ? WHERE id = ?", updates)
+            cursor.execute("COMMIT")
+            print(f"Migration: Assigned listing entries for {len(updates)} runs")
+
     def _auto_seed_items(self, cursor: sqlite3.Cursor) -> None:
         """
-        Auto-seed items table on first run if empty.
+        Auto-seed items table on first run and apply catalogue updates.
 
-        Loads items from bundled tlidb_items_seed_en.json for
-        immediate item name display without manual seeding.
+        Prefers the prebuilt tlidb_items_en.db catalogue, which is attached
+        and diffed against the items table. Falls back to parsing the
+        bundled tlidb_items_seed_en.json when no catalogue is available
+        (e.g. running from source without a build step).
         """
+        from titrack.config.paths import get_items_catalogue_path, get_items_seed_path
+        from titrack.db.catalogue import apply_catalogue
+
+        catalogue_path = get_items_catalogue_path()
+        if catalogue_path.exists():
+            try:
+                changed = apply_catalogue(cursor, catalogue_path)
+                if changed:
+                    print(f"Applied {changed} item changes from {catalogue_path.name}")
+                return
+            except sqlite3.Error as e:
+                print(f"Failed to apply item catalogue, falling back to JSON seed: {e}")
+
         # Check if items table has any data
         result = cursor.execute("SELECT COUNT(*) FROM items").fetchone()
         if result[0] > 0:
@@ -169,8 +360,6 @@ class Database:
 
         # Try to find and load the seed file
         try:
-            from titrack.config.paths import get_items_seed_path
-
             seed_path = get_items_seed_path()
             if not seed_path.exists():
                 print(f"Items seed file not found: {seed_path}")
@@ -203,17 +392,124 @@ class Database:
                     item.get("url_cn"),
                 ))
 
-            cursor.executemany(insert_sql, items_to_insert)
+            # One transaction instead of one per row
+            cursor.execute("BEGIN")
+            try:
+                cursor.executemany(insert_sql, items_to_insert)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
             print(f"Seeded {len(items_to_insert)} items from {seed_path.name}")
 
         except Exception as e:
             print(f"Failed to auto-seed items: {e}")
 
+    # --- Season archives ---
+
+    @property
+    def archive_dir(self) -> Path:
+        """Directory holding per-season archive databases."""
+        return self.db_path.parent / "archive"
+
+    def get_archive_path(self, season_id: int) -> Path:
+        """Get the archive file path for a season."""
+        return self.archive_dir / f"season_{season_id}.db"
+
+    def get_archive_schema(self, season_id: int) -> str | None:
+        """Get the attached schema name for an archived season, if attached."""
+        return self._archives.get(season_id)
+
+    @property
+    def archived_seasons(self) -> list[int]:
+        """Season IDs whose archives are attached."""
+        return sorted(self._archives)
+
+    def _attach_existing_archives(self) -> None:
+        """Attach archive files found beside the database (newest seasons first)."""
+        if not self.archive_dir.exists():
+            return
+        season_ids = []
+        for path in self.archive_dir.glob("season_*.db"):
+            try:
+                season_ids.append(int(path.stem.split("_", 1)[1]))
+            except ValueError:
+                continue
+        for season_id in sorted(season_ids, reverse=True):
+            if len(self._archives) >= MAX_ATTACHED_ARCHIVES:
+                print(f"Too many season archives, not attaching season {season_id}")
+                continue
+            self.attach_archive(season_id)
+
+    def attach_archive(self, season_id: int, create: bool = False) -> str | None:
+        """
+        Attach a season archive database to this connection.
+
+        Args:
+            season_id: Season whose archive to attach
+            create: Create the archive file if it doesn't exist yet
+
+        Returns:
+            Schema name of the attached archive, or None if it doesn't exist
+        """
+        if season_id in self._archives:
+            return self._archives[season_id]
+
+        path = self.get_archive_path(season_id)
+        if not path.exists() and not create:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        schema = f"season_{season_id}"
+        with self._lock:
+            conn = self.connection
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+            for statement in ARCHIVE_CREATE_STATEMENTS:
+                conn.execute(qualify_ddl(statement, schema))
+            self._sync_archive_columns(schema)
+            self._archives[season_id] = schema
+            self._refresh_archive_views()
+        return schema
+
+    def _sync_archive_columns(self, schema: str) -> None:
+        """Add columns the main tables gained since an archive was created."""
+        conn = self.connection
+        for table in ARCHIVED_TABLES:
+            main_cols = conn.execute(f"PRAGMA main.table_info({table})").fetchall()
+            archive_cols = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+            for row in main_cols:
+                name, col_type = row[1], row[2]
+                if name not in archive_cols:
+                    conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {name} {col_type}")
+
+    def _refresh_archive_views(self) -> None:
+        """
+        Rebuild the cross-season views (runs_all, item_deltas_all, prices_all).
+
+        These are TEMP views on this connection that union the main tables
+        with every attached archive, for history views spanning seasons.
+        """
+        conn = self.connection
+        for table in ARCHIVED_TABLES:
+            columns = ", ".join(
+                row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")
+            )
+            selects = [f"SELECT {columns} FROM main.{table}"]
+            selects += [
+                f"SELECT {columns} FROM {schema}.{table}"
+                for schema in self._archives.values()
+            ]
+            conn.execute(f"DROP VIEW IF EXISTS temp.{table}_all")
+            conn.execute(
+                f"CREATE TEMP VIEW {table}_all AS " + " UNION ALL ".join(selects)
+            )
+
     def close(self) -> None:
         """Close database connection."""
         if self._connection:
             self._connection.close()
             self._connection = None
+            self._archives = {}
 
     @property
     def connection(self) -> sqlite3.Connection:
@@ -263,3 +559,45 @@ class Database:
         with self._lock:
             cursor = self.connection.execute(sql, params)
             return cursor.fetchall()
+
+    def iterate(
+        self, sql: str, params: tuple = (), batch_size: int = 500
+    ) -> Iterator[list[sqlite3.Row]]:
+        """
+        Execute SQL and yield the rows in batches as they come out of the cursor.
+
+        The query runs in one read transaction on its own read-only
+        connection, so every batch comes from the same snapshot of the
+        database (WAL keeps it while the transaction is open) even as other
+        threads write and commit in between, and the shared connection and
+        its lock stay free while the caller processes (or streams out) a
+        batch. Season archives are attached to it as well.
+        """
+        reader = self._open_reader()
+        try:
+            reader.execute("BEGIN")
+            cursor = reader.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            reader.close()
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open a read-only connection to the database with the same archives attached."""
+        reader = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        reader.row_factory = sqlite3.Row
+        reader.execute("PRAGMA busy_timeout=30000")
+        for season_id, schema in self._archives.items():
+            reader.execute(
+                f"ATTACH DATABASE ? AS {schema}",
+                (f"{self.get_archive_path(season_id).resolve().as_uri()}?mode=ro",),
+            )
+        return reader
@@ -1,20 +1,50 @@
 """Repository - CRUD operations for all entities."""
 
+import json
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, NamedTuple, Optional
 
+from titrack.core.consolidation import LEVEL_TYPE_NIGHTMARE, SessionTracker
 from titrack.core.models import (
     EventContext,
     Item,
     ItemDelta,
+    MapSession,
     Price,
     Run,
     SlotState,
 )
+from titrack.core.price_history import PriceHistory
+from titrack.core.valuation import value_cost_summary, value_summary
 from titrack.db.connection import Database
+from titrack.db.schema import (
+    REBUILD_RUN_VALUES_STATEMENTS,
+    REBUILD_ZONE_DROPS_STATEMENTS,
+    legacy_run_value_sql,
+)
 from titrack.data.inventory import EXCLUDED_PAGES
 
+# Sortable columns of the price listing
+PRICE_SORT_COLUMNS = {
+    "name": "name COLLATE NOCASE",
+    "price": "p.price_fe",
+    "updated": "p.updated_at",
+    "source": "p.source",
+}
+
+
+def _like_pattern(term: str) -> str:
+    """Escape LIKE wildcards in a search term (use with ESCAPE '\\')."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class PlayerContext(NamedTuple):
+    """The season and player queries are filtered by (None until set)."""
+
+    season_id: Optional[int]
+    player_id: Optional[str]
+
 
 class Repository:
     """Data access layer for all entities."""
@@ -24,16 +54,34 @@ class Repository:
         # Current player context for filtering (set externally)
         self._current_season_id: Optional[int] = None
         self._current_player_id: Optional[str] = None
+        # (key, stats) of the last get_run_stats result
+        self._run_stats_cache: Optional[tuple[tuple, dict]] = None
 
     def set_player_context(self, season_id: Optional[int], player_id: Optional[str]) -> None:
         """Set the current player context for filtering queries."""
         self._current_season_id = season_id
         self._current_player_id = player_id
 
+    @property
+    def context(self) -> PlayerContext:
+        """The current player context."""
+        return PlayerContext(self._current_season_id, self._current_player_id)
+
     def has_player_context(self) -> bool:
         """Return True if a player context has been set."""
         return self._current_player_id is not None
 
+    def _partition(self, season_id: Optional[int]) -> str:
+        """
+        Get the schema holding a season's runs, deltas and prices.
+
+        The active season always lives in the main database; an explicitly
+        requested other season is read from its attached archive if it has one.
+        """
+        if season_id is None or season_id == self._current_season_id:
+            return "main"
+        return self.db.get_archive_schema(season_id) or "main"
+
     # --- Settings ---
 
     def get_setting(self, key: str) -> Optional[str]:
@@ -67,7 +115,39 @@ class Repository:
                 run.player_id,
             ),
         )
-        return cursor.lastrowid
+        run_id = cursor.lastrowid
+
+        entry_id = self._resolve_entry_id(run, run_id)
+        if entry_id is not None:
+            # Setting a head's entry_id bumps the run_entries counter (trigger)
+            self.db.execute("UPDATE runs SET entry_id = ? WHERE id = ?", (entry_id, run_id))
+        return run_id
+
+    def _resolve_entry_id(self, run: Run, run_id: int) -> Optional[int]:
+        """
+        Work out which listing entry a newly inserted run belongs to.
+
+        Mirrors the consolidation rules: a normal run continuing the current
+        map instance (same level_uid, no hub in between) joins the entry of
+        the instance's first normal run; anything else starts its own entry.
+        """
+        if run.is_hub:
+            return None
+        if run.level_type == LEVEL_TYPE_NIGHTMARE or run.level_uid is None:
+            return run_id
+
+        rows = self.db.fetchall(
+            """SELECT is_hub, level_uid, level_type, entry_id FROM runs
+               WHERE id < ? AND season_id IS ? AND player_id IS ?
+               ORDER BY start_ts DESC, id DESC LIMIT 50""",
+            (run_id, run.season_id, run.player_id),
+        )
+        for row in rows:
+            if row["is_hub"] or row["level_uid"] != run.level_uid:
+                break
+            if row["level_type"] != LEVEL_TYPE_NIGHTMARE and row["entry_id"] is not None:
+                return row["entry_id"]
+        return run_id
 
     def update_run_end(self, run_id: int, end_ts: datetime) -> None:
         """Update a run's end timestamp."""
@@ -122,10 +202,11 @@ class Repository:
             return []
 
         if season_id is not None:
+            schema = self._partition(season_id)
             # Filter: show data where season/player matches OR is NULL (legacy/untagged)
             # This excludes data explicitly tagged for a DIFFERENT season/player
             rows = self.db.fetchall(
-                """SELECT * FROM runs
+                f"""SELECT * FROM {schema}.runs
                    WHERE (season_id IS NULL OR season_id = ?)
                    AND (player_id IS NULL OR player_id = ?)
                    ORDER BY start_ts DESC LIMIT ?""",
@@ -142,6 +223,404 @@ class Repository:
         row = self.db.fetchone("SELECT MAX(id) as max_id FROM runs")
         return row["max_id"] or 0
 
+    def get_run_entry_count(self) -> int:
+        """
+        Get the number of listing entries (consolidated runs) in the current context.
+
+        Read from the maintained run_entries counter, so it costs the same
+        regardless of how many runs are stored.
+        """
+        if self._current_player_id is None:
+            return 0
+
+        if self._current_season_id is not None:
+            row = self.db.fetchone(
+                """SELECT COALESCE(SUM(value), 0) as total FROM counters
+                   WHERE name = 'run_entries'
+                   AND season_id IN (0, ?) AND player_id IN ('', ?)""",
+                (self._current_season_id, self._current_player_id),
+            )
+        else:
+            row = self.db.fetchone(
+                "SELECT COALESCE(SUM(value), 0) as total FROM counters WHERE name = 'run_entries'"
+            )
+        return row["total"] if row else 0
+
+    def get_run_count(self) -> int:
+        """
+        Get the number of stored runs (including hubs) in the current context.
+
+        Read from the maintained runs counter, like get_run_entry_count.
+        """
+        if self._current_player_id is None:
+            return 0
+
+        if self._current_season_id is not None:
+            row = self.db.fetchone(
+                """SELECT COALESCE(SUM(value), 0) as total FROM counters
+                   WHERE name = 'runs'
+                   AND season_id IN (0, ?) AND player_id IN ('', ?)""",
+                (self._current_season_id, self._current_player_id),
+            )
+        else:
+            row = self.db.fetchone(
+                "SELECT COALESCE(SUM(value), 0) as total FROM counters WHERE name = 'runs'"
+            )
+        return row["total"] if row else 0
+
+    def get_run_entries(
+        self,
+        limit: int = 20,
+        before: Optional[tuple[str, int]] = None,
+        offset: int = 0,
+    ) -> list[list[Run]]:
+        """
+        Get a page of listing entries, newest first.
+
+        Each entry is the list of runs consolidated under one head run
+        (see core.consolidation). Paging walks the heads index by
+        (start_ts, id), so a page costs the same at any depth.
+
+        Args:
+            limit: Maximum number of entries to return.
+            before: Keyset cursor - raw (start_ts, id) of the last head on
+                    the previous page. Takes precedence over offset.
+            offset: Number of entries to skip (when no cursor is given).
+
+        Returns:
+            List of entries, each a list of runs in start order.
+        """
+        if self._current_player_id is None:
+            return []
+
+        where = ["entry_id = id"]
+        params: list = []
+        if self._current_season_id is not None:
+            where.append("(season_id IS NULL OR season_id = ?)")
+            where.append("(player_id IS NULL OR player_id = ?)")
+            params += [self._current_season_id, self._current_player_id]
+        if before is not None:
+            where.append("(start_ts < ? OR (start_ts = ? AND id < ?))")
+            params += [before[0], before[0], before[1]]
+            offset = 0
+
+        head_rows = self.db.fetchall(
+            f"""SELECT * FROM runs WHERE {' AND '.join(where)}
+                ORDER BY start_ts DESC, id DESC LIMIT ? OFFSET ?""",
+            (*params, limit, max(offset, 0)),
+        )
+        return self._load_entries([row["id"] for row in head_rows])
+
+    def _load_entries(self, head_ids: list[int]) -> list[list[Run]]:
+        """Load the member runs of each entry, keeping the order of head_ids."""
+        if not head_ids:
+            return []
+
+        placeholders = ",".join("?" * len(head_ids))
+        member_rows = self.db.fetchall(
+            f"""SELECT * FROM runs WHERE entry_id IN ({placeholders})
+                ORDER BY start_ts, id""",
+            tuple(head_ids),
+        )
+
+        members: dict[int, list[Run]] = {head_id: [] for head_id in head_ids}
+        for row in member_rows:
+            members[row["entry_id"]].append(self._row_to_run(row))
+        return [members[head_id] for head_id in head_ids]
+
+    def get_open_entries(self) -> list[list[Run]]:
+        """
+        Get listing entries in the current context with no finished map session.
+
+        These are the entries still being played (normally only the latest
+        one or two while the collector runs), newest first.
+        """
+        if self._current_player_id is None:
+            return []
+
+        if self._current_season_id is not None:
+            rows = self.db.fetchall(
+                """SELECT id FROM runs r
+                   WHERE entry_id = id
+                   AND (season_id IS NULL OR season_id = ?)
+                   AND (player_id IS NULL OR player_id = ?)
+                   AND NOT EXISTS (SELECT 1 FROM map_sessions s WHERE s.id = r.id)
+                   ORDER BY start_ts DESC, id DESC""",
+                (self._current_season_id, self._current_player_id),
+            )
+        else:
+            rows = self.db.fetchall(
+                """SELECT id FROM runs r
+                   WHERE entry_id = id
+                   AND NOT EXISTS (SELECT 1 FROM map_sessions s WHERE s.id = r.id)
+                   ORDER BY start_ts DESC, id DESC"""
+            )
+        return self._load_entries([row["id"] for row in rows])
+
+    # --- Map Sessions ---
+
+    def finalize_map_session(self, entry_id: int) -> Optional[MapSession]:
+        """
+        Aggregate a closed listing entry into its map_sessions row.
+
+        Only the entry's shape is stored (runs, times, duration); its values
+        are read live from the run values of its runs, so they follow price
+        and trade tax changes. Finalizing again updates the row in place.
+
+        Args:
+            entry_id: Head run id of the entry.
+
+        Returns:
+            The stored session, or None if the entry has no runs.
+        """
+        entries = self._load_entries([entry_id])
+        runs = entries[0] if entries else []
+        if not runs:
+            return None
+
+        head = runs[0]
+        duration = sum(r.duration_seconds for r in runs if r.duration_seconds)
+        end_times = [r.end_ts for r in runs if r.end_ts is not None]
+        self.db.execute(
+            """INSERT INTO map_sessions
+               (id, zone_signature, level_id, is_nightmare, start_ts, end_ts, duration_seconds,
+                run_ids, season_id, player_id, finalized_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (id) DO UPDATE SET
+                   zone_signature = excluded.zone_signature,
+                   level_id = excluded.level_id,
+                   is_nightmare = excluded.is_nightmare,
+                   start_ts = excluded.start_ts,
+                   end_ts = excluded.end_ts,
+                   duration_seconds = excluded.duration_seconds,
+                   run_ids = excluded.run_ids,
+                   season_id = excluded.season_id,
+                   player_id = excluded.player_id,
+                   finalized_at = excluded.finalized_at""",
+            (
+                head.id,
+                head.zone_signature,
+                head.level_id,
+                1 if head.level_type == LEVEL_TYPE_NIGHTMARE else 0,
+                head.start_ts.isoformat(),
+                max(end_times).isoformat() if end_times else None,
+                float(duration),
+                json.dumps([r.id for r in runs]),
+                head.season_id,
+                head.player_id,
+                datetime.now().isoformat(),
+            ),
+        )
+        return self.get_map_sessions([head.id]).get(head.id)
+
+    def get_map_sessions(self, entry_ids: list[int]) -> dict[int, MapSession]:
+        """Get finished map sessions by entry id (missing ids are still open)."""
+        if not entry_ids:
+            return {}
+        placeholders = ",".join("?" * len(entry_ids))
+        sessions = self._select_sessions(f"s.id IN ({placeholders})", tuple(entry_ids))
+        return {session.id: session for session in sessions}
+
+    def get_finished_sessions(
+        self, season_id: Optional[int] = None, since: Optional[datetime] = None
+    ) -> list[MapSession]:
+        """
+        Get finished map sessions of a season (default: current), oldest first.
+
+        Args:
+            season_id: Season to read, from its archive if it has one.
+            since: Only sessions that ended at or after this time.
+        """
+        if self._current_player_id is None:
+            return []
+
+        season_id = season_id if season_id is not None else self._current_season_id
+        schema = self._partition(season_id)
+        conditions = []
+        params: list = []
+        if season_id is not None:
+            conditions.append("(s.season_id IS NULL OR s.season_id = ?)")
+            conditions.append("(s.player_id IS NULL OR s.player_id = ?)")
+            params.extend([season_id, self._current_player_id])
+        if since is not None:
+            conditions.append("s.end_ts >= ?")
+            params.append(since.isoformat())
+
+        return self._select_sessions(
+            " AND ".join(conditions), tuple(params), schema=schema, order="s.start_ts"
+        )
+
+    def _select_sessions(
+        self, where: str = "", params: tuple = (), schema: str = "main", order: str = "s.id"
+    ) -> list[MapSession]:
+        """Load map sessions (alias s) matching a condition, with their values."""
+        if schema != "main":
+            # Archived seasons keep the values stored when they were archived
+            where = f"WHERE {where}" if where else ""
+            rows = self.db.fetchall(
+                f"SELECT s.* FROM {schema}.map_sessions s {where} ORDER BY {order}",
+                params,
+            )
+        else:
+            sql, value_params = self._valued_sessions_sql(where)
+            rows = self.db.fetchall(
+                f"SELECT * FROM ({sql}) AS s ORDER BY {order}", (*value_params, *params)
+            )
+        return [self._row_to_map_session(row) for row in rows]
+
+    def _valued_sessions_sql(self, where: str = "") -> tuple[str, tuple]:
+        """
+        SQL for live map sessions (alias s) with their current values.
+
+        Sessions store no values while their season is live: fe_gained,
+        total_value, map_cost_fe and map_cost_has_unpriced are summed from
+        the run values of each session's ended runs, with trade tax applied
+        as in get_run_values, so they agree with get_run_stats.
+
+        Args:
+            where: Condition on map_sessions s; its parameters follow the
+                   returned ones.
+
+        Returns:
+            Tuple of (SELECT statement with the columns of map_sessions,
+            parameters preceding those of where).
+        """
+        item_value, map_cost = self._run_value_sql()
+        # Legacy runs take their prices from the current season, as above
+        price_season = f"COALESCE(r.season_id, {int(self._current_season_id or 0)})"
+        where = f"WHERE {where}" if where else ""
+        tax_multiplier = self.get_trade_tax_multiplier()
+        sql = f"""SELECT s.id, s.zone_signature, s.level_id, s.is_nightmare, s.start_ts, s.end_ts,
+                       s.duration_seconds, s.run_ids, s.season_id, s.player_id,
+                       COALESCE(SUM(v.fe_gained), 0) AS fe_gained,
+                       COALESCE(SUM(v.fe_gained + {item_value} * ?), 0) AS total_value,
+                       COALESCE(SUM({map_cost} * ?), 0) AS map_cost_fe,
+                       COALESCE(MAX(EXISTS (
+                           SELECT 1 FROM run_loot l
+                           LEFT JOIN valued_prices p
+                               ON p.config_base_id = l.config_base_id AND p.season_id = {price_season}
+                           WHERE l.run_id = r.id AND l.kind = 'cost' AND COALESCE(p.price_fe, 0) <= 0
+                       )), 0) AS map_cost_has_unpriced
+                FROM map_sessions s
+                LEFT JOIN runs r ON r.entry_id = s.id AND r.end_ts IS NOT NULL
+                LEFT JOIN run_values v ON v.run_id = r.id
+                {where}
+                GROUP BY s.id"""
+        return sql, (tax_multiplier, tax_multiplier)
+
+    def get_session_totals(self) -> tuple[int, float]:
+        """
+        Get the totals of finished map sessions in the current context.
+
+        Every ended non-hub run belongs to a listing entry, so this is the
+        run totals of get_run_stats less the ended runs of entries that
+        are still open (normally one or two).
+
+        Returns:
+            Tuple of (fe_gained, total_value).
+        """
+        if self._current_player_id is None:
+            return 0, 0.0
+
+        stats = self.get_run_stats()
+        fe_gained, total_value = stats["fe_gained"], stats["total_value"]
+        open_runs = [
+            run.id
+            for entry_runs in self.get_open_entries()
+            for run in entry_runs
+            if run.end_ts is not None
+        ]
+        for run_fe, run_value, _ in self.get_run_values(open_runs).values():
+            fe_gained -= run_fe
+            total_value -= run_value
+        return fe_gained, total_value
+
+    def get_open_session_heads(
+        self, season_id: Optional[int], player_id: Optional[str]
+    ) -> list[Run]:
+        """Get head runs of a season/player's entries that have no session yet, oldest first."""
+        rows = self.db.fetchall(
+            """SELECT * FROM runs r
+               WHERE entry_id = id AND season_id IS ? AND player_id IS ?
+               AND NOT EXISTS (SELECT 1 FROM map_sessions s WHERE s.id = r.id)
+               ORDER BY start_ts, id""",
+            (season_id, player_id),
+        )
+        return [self._row_to_run(row) for row in rows]
+
+    def rebuild_map_sessions(self) -> int:
+        """
+        Finalize every closed entry that has no map session yet.
+
+        Stored runs are replayed through the same SessionTracker the collector
+        uses, starting at the oldest unfinalized entry of each season/player.
+
+        Returns:
+            Number of sessions written.
+        """
+        scopes = self.db.fetchall(
+            """SELECT season_id, player_id, MIN(start_ts) as since FROM runs r
+               WHERE entry_id = id
+               AND NOT EXISTS (SELECT 1 FROM map_sessions s WHERE s.id = r.id)
+               GROUP BY season_id, player_id"""
+        )
+
+        written = 0
+        for scope in scopes:
+            pending = {
+                run.id for run in self.get_open_session_heads(scope["season_id"], scope["player_id"])
+            }
+            rows = self.db.fetchall(
+                """SELECT * FROM runs
+                   WHERE season_id IS ? AND player_id IS ? AND start_ts >= ?
+                   ORDER BY start_ts, id""",
+                (scope["season_id"], scope["player_id"], scope["since"]),
+            )
+            tracker = SessionTracker()
+            for row in rows:
+                for entry_id in tracker.add_run(self._row_to_run(row)):
+                    if entry_id in pending and self.finalize_map_session(entry_id):
+                        written += 1
+        return written
+
+    def _row_to_map_session(self, row) -> MapSession:
+        return MapSession(
+            id=row["id"],
+            zone_signature=row["zone_signature"],
+            start_ts=datetime.fromisoformat(row["start_ts"]),
+            end_ts=datetime.fromisoformat(row["end_ts"]) if row["end_ts"] else None,
+            run_ids=json.loads(row["run_ids"]),
+            level_id=row["level_id"],
+            is_nightmare=bool(row["is_nightmare"]),
+            duration_seconds=row["duration_seconds"],
+            fe_gained=row["fe_gained"],
+            total_value=row["total_value"],
+            map_cost_fe=row["map_cost_fe"],
+            map_cost_has_unpriced=bool(row["map_cost_has_unpriced"]),
+            season_id=row["season_id"],
+            player_id=row["player_id"],
+        )
+
+    def get_runs_all_seasons(self, limit: int = 20, player_id: Optional[str] = None) -> list[Run]:
+        """
+        Get recent runs across the live season and every attached archive.
+
+        This is the explicit cross-season path for history views; regular
+        queries only touch the partition of the season they ask for.
+        """
+        if player_id is not None:
+            rows = self.db.fetchall(
+                """SELECT * FROM runs_all
+                   WHERE (player_id IS NULL OR player_id = ?)
+                   ORDER BY start_ts DESC LIMIT ?""",
+                (player_id, limit),
+            )
+        else:
+            rows = self.db.fetchall(
+                "SELECT * FROM runs_all ORDER BY start_ts DESC LIMIT ?", (limit,)
+            )
+        return [self._row_to_run(row) for row in rows]
+
     def get_unique_zones(self, season_id: Optional[int] = None, player_id: Optional[str] = None) -> list[str]:
         """Get all unique zone signatures from runs, optionally filtered by season/player."""
         # Use provided values or fall back to context
@@ -153,9 +632,10 @@ class Repository:
             return []
 
         if season_id is not None:
+            schema = self._partition(season_id)
             # Filter: show data where season/player matches OR is NULL (legacy/untagged)
             rows = self.db.fetchall(
-                """SELECT DISTINCT zone_signature FROM runs
+                f"""SELECT DISTINCT zone_signature FROM {schema}.runs
                    WHERE (season_id IS NULL OR season_id = ?)
                    AND (player_id IS NULL OR player_id = ?)
                    ORDER BY zone_signature""",
@@ -233,7 +713,9 @@ class Repository:
             )
         return [self._row_to_delta(row) for row in rows]
 
-    def get_run_summary(self, run_id: int, include_excluded: bool = False) -> dict[int, int]:
+    def get_run_summary(
+        self, run_id: int, include_excluded: bool = False, season_id: Optional[int] = None
+    ) -> dict[int, int]:
         """
         Get aggregated delta per item for a run (excludes map costs).
 
@@ -241,15 +723,17 @@ class Repository:
             run_id: The run ID to get summary for.
             include_excluded: If True, include excluded pages (e.g., Gear).
                               Default False filters out excluded pages.
+            season_id: Season the run belongs to, to read archived seasons.
 
         Returns:
             Dict mapping config_base_id -> total delta
         """
+        schema = self._partition(season_id)
         # Always exclude Spv3Open (map costs) from loot summary
         if include_excluded or not EXCLUDED_PAGES:
             rows = self.db.fetchall(
-                """SELECT config_base_id, SUM(delta) as total_delta
-                   FROM item_deltas
+                f"""SELECT config_base_id, SUM(delta) as total_delta
+                   FROM {schema}.item_deltas
                    WHERE run_id = ? AND (proto_name IS NULL OR proto_name != 'Spv3Open')
                    GROUP BY config_base_id""",
                 (run_id,),
@@ -258,7 +742,7 @@ class Repository:
             placeholders = ",".join("?" * len(EXCLUDED_PAGES))
             rows = self.db.fetchall(
                 f"""SELECT config_base_id, SUM(delta) as total_delta
-                   FROM item_deltas
+                   FROM {schema}.item_deltas
                    WHERE run_id = ? AND page_id NOT IN ({placeholders})
                    AND (proto_name IS NULL OR proto_name != 'Spv3Open')
                    GROUP BY config_base_id""",
@@ -266,6 +750,247 @@ class Repository:
             )
         return {row["config_base_id"]: row["total_delta"] for row in rows}
 
+    def get_run_summaries(
+        self, run_ids: list[int], include_excluded: bool = False, season_id: Optional[int] = None
+    ) -> dict[int, dict[int, int]]:
+        """
+        Get loot summaries for many runs with one grouped query.
+
+        Same rules as get_run_summary (map costs and excluded pages left out).
+
+        Returns:
+            Dict mapping run_id -> {config_base_id: total delta}; every
+            requested run is present, possibly with an empty summary.
+        """
+        summaries: dict[int, dict[int, int]] = {run_id: {} for run_id in run_ids}
+        if not run_ids:
+            return summaries
+
+        schema = self._partition(season_id)
+        run_placeholders = ",".join("?" * len(run_ids))
+        page_filter = ""
+        params: tuple = tuple(run_ids)
+        if not include_excluded and EXCLUDED_PAGES:
+            page_filter = f"AND page_id NOT IN ({','.join('?' * len(EXCLUDED_PAGES))})"
+            params += tuple(EXCLUDED_PAGES)
+
+        rows = self.db.fetchall(
+            f"""SELECT run_id, config_base_id, SUM(delta) as total_delta
+               FROM {schema}.item_deltas
+               WHERE run_id IN ({run_placeholders}) {page_filter}
+               AND (proto_name IS NULL OR proto_name != 'Spv3Open')
+               GROUP BY run_id, config_base_id""",
+            params,
+        )
+        for row in rows:
+            summaries[row["run_id"]][row["config_base_id"]] = row["total_delta"]
+        return summaries
+
+    def get_run_cost_summaries(
+        self, run_ids: list[int], season_id: Optional[int] = None
+    ) -> dict[int, dict[int, int]]:
+        """
+        Get map cost (Spv3Open) summaries for many runs with one grouped query.
+
+        Returns:
+            Dict mapping run_id -> {config_base_id: total delta (negative)}.
+        """
+        summaries: dict[int, dict[int, int]] = {run_id: {} for run_id in run_ids}
+        if not run_ids:
+            return summaries
+
+        schema = self._partition(season_id)
+        placeholders = ",".join("?" * len(run_ids))
+        rows = self.db.fetchall(
+            f"""SELECT run_id, config_base_id, SUM(delta) as total_delta
+               FROM {schema}.item_deltas
+               WHERE run_id IN ({placeholders}) AND proto_name = 'Spv3Open'
+               GROUP BY run_id, config_base_id""",
+            tuple(run_ids),
+        )
+        for row in rows:
+            summaries[row["run_id"]][row["config_base_id"]] = row["total_delta"]
+        return summaries
+
+    def iter_run_export(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        sessions: bool = False,
+        batch_size: int = 500,
+        as_of: bool = False,
+    ) -> Iterator[list[dict]]:
+        """
+        Yield every run (or listing entry) with its loot, costs and values.
+
+        One grouped query walks the runs oldest first, joined to their
+        per-item delta sums and item names, and is read off the cursor in
+        batches; each yielded batch holds the runs completed by that batch
+        of rows. Memory stays constant however long the history is.
+
+        Covers the current player context if one is set, else every run.
+
+        Args:
+            since: Only runs (entries) that started at or after this time
+            until: Only runs (entries) that started before this time
+            sessions: One record per listing entry (split runs of one map
+                      merged) instead of one per run
+            batch_size: Rows fetched from the cursor at a time
+            as_of: Value each record at the prices in effect when it ended
+                   (see get_prices_as_of) instead of today's
+
+        Yields:
+            Lists of dicts with id, run_ids, zone_signature, level_id,
+            is_nightmare, start_ts, end_ts, duration_seconds, fe_gained,
+            total_value, map_cost_fe, map_cost_has_unpriced, loot and
+            map_costs (lists of config_base_id, name, quantity, price_fe,
+            total_value_fe).
+        """
+        context = ""
+        params: list = []
+        if self._current_season_id is not None:
+            context = "AND (season_id IS NULL OR season_id = ?) AND (player_id IS NULL OR player_id = ?)"
+            params += [self._current_season_id, self._current_player_id]
+
+        duration = "(julianday(end_ts) - julianday(start_ts)) * 86400.0"
+        if sessions:
+            units = f"""SELECT entry_id AS unit_id, MIN(start_ts) AS start_ts, MAX(end_ts) AS end_ts,
+                               SUM({duration}) AS duration_seconds, group_concat(id) AS run_ids
+                        FROM runs WHERE entry_id IS NOT NULL {context}
+                        GROUP BY entry_id"""
+            members = "r.entry_id = u.unit_id"
+        else:
+            units = f"""SELECT id AS unit_id, start_ts, end_ts,
+                               {duration} AS duration_seconds, CAST(id AS TEXT) AS run_ids
+                        FROM runs WHERE is_hub = 0 {context}"""
+            members = "r.id = u.unit_id"
+
+        # Map costs (Spv3Open) count from any page; loot skips excluded pages
+        page_filter = ""
+        if EXCLUDED_PAGES:
+            page_filter = (
+                "AND (d.proto_name = 'Spv3Open' "
+                f"OR d.page_id NOT IN ({','.join('?' * len(EXCLUDED_PAGES))}))"
+            )
+            params += list(EXCLUDED_PAGES)
+
+        where = []
+        if since is not None:
+            where.append("u.start_ts >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            where.append("u.start_ts < ?")
+            params.append(until.isoformat())
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+        sql = f"""WITH units AS ({units})
+                  SELECT u.unit_id, u.start_ts, u.end_ts, u.duration_seconds, u.run_ids,
+                         h.zone_signature, h.level_id, h.level_type,
+                         d.config_base_id, COALESCE(d.proto_name = 'Spv3Open', 0) AS is_cost,
+                         SUM(d.delta) AS quantity, i.name_en
+                  FROM units u
+                  JOIN runs h ON h.id = u.unit_id
+                  JOIN runs r ON {members}
+                  LEFT JOIN item_deltas d ON d.run_id = r.id {page_filter}
+                  LEFT JOIN items i ON i.config_base_id = d.config_base_id
+                  {where_sql}
+                  GROUP BY u.start_ts, u.unit_id, d.config_base_id, is_cost
+                  ORDER BY u.start_ts, u.unit_id"""
+
+        prices: dict[int, Optional[float]] = {}
+        history = PriceHistory() if as_of else None
+        tax_multiplier = self.get_trade_tax_multiplier()
+        unit = None
+        lines: list = []
+
+        for rows in self.db.iterate(sql, tuple(params), batch_size=batch_size):
+            new_ids = {
+                row["config_base_id"] for row in rows
+                if row["config_base_id"] is not None and row["config_base_id"] not in prices
+            }
+            if new_ids:
+                prices.update(self.get_effective_prices(sorted(new_ids)))
+                if history is not None:
+                    history.update(self.get_price_history(sorted(new_ids)))
+
+            records = []
+            for row in rows:
+                if unit is None or row["unit_id"] != unit["unit_id"]:
+                    if unit is not None:
+                        records.append(
+                            self._export_record(unit, lines, prices, tax_multiplier, history)
+                        )
+                    unit, lines = row, []
+                if row["config_base_id"] is not None and row["quantity"]:
+                    lines.append(row)
+            if records:
+                yield records
+
+        if unit is not None:
+            yield [self._export_record(unit, lines, prices, tax_multiplier, history)]
+
+    def _export_record(
+        self,
+        unit,
+        lines: list,
+        prices: dict[int, Optional[float]],
+        tax_multiplier: float,
+        history: Optional[PriceHistory] = None,
+    ) -> dict:
+        """
+        Build an iter_run_export record from a unit's grouped item rows.
+
+        With a price history, items are valued as of the unit's end.
+        """
+        from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+        loot: dict[int, int] = {}
+        costs: dict[int, int] = {}
+        names: dict[int, Optional[str]] = {}
+        for line in lines:
+            (costs if line["is_cost"] else loot)[line["config_base_id"]] = line["quantity"]
+            names[line["config_base_id"]] = line["name_en"]
+
+        if history is not None:
+            when = datetime.fromisoformat(unit["end_ts"] or unit["start_ts"])
+            prices = history.prices_at(names, when, prices)
+
+        fe_gained, total_value = self.value_summary(loot, prices, tax_multiplier)
+        total_cost, unpriced = self.value_cost_summary(costs, prices, tax_multiplier)
+
+        def item_lines(summary: dict[int, int]) -> list[dict]:
+            result = []
+            for config_id, quantity in summary.items():
+                price_fe = 1.0 if config_id == FE_CONFIG_BASE_ID else prices.get(config_id)
+                item_total = price_fe * abs(quantity) if price_fe else None
+                result.append({
+                    "config_base_id": config_id,
+                    "name": names.get(config_id) or f"Unknown {config_id}",
+                    "quantity": quantity,
+                    "price_fe": price_fe,
+                    "total_value_fe": round(item_total, 2) if item_total else None,
+                })
+            return sorted(result, key=lambda x: abs(x["quantity"]), reverse=True)
+
+        return {
+            "id": unit["unit_id"],
+            "run_ids": sorted(int(run_id) for run_id in unit["run_ids"].split(",")),
+            "zone_signature": unit["zone_signature"],
+            "level_id": unit["level_id"],
+            "is_nightmare": unit["level_type"] == LEVEL_TYPE_NIGHTMARE,
+            "start_ts": datetime.fromisoformat(unit["start_ts"]),
+            "end_ts": datetime.fromisoformat(unit["end_ts"]) if unit["end_ts"] else None,
+            "duration_seconds": (
+                round(unit["duration_seconds"], 3) if unit["duration_seconds"] is not None else None
+            ),
+            "fe_gained": fe_gained,
+            "total_value": round(total_value, 2),
+            "map_cost_fe": round(total_cost, 2),
+            "map_cost_has_unpriced": bool(unpriced),
+            "loot": item_lines(loot),
+            "map_costs": item_lines(costs),
+        }
+
     def _row_to_delta(self, row) -> ItemDelta:
         keys = row.keys()
         season_id = row["season_id"] if "season_id" in keys else None
@@ -439,6 +1164,117 @@ class Repository:
             return None
         return self._row_to_item(row)
 
+    def get_items(self, config_base_ids: list[int]) -> dict[int, Item]:
+        """Get many items by ConfigBaseId with one query (missing ids are left out)."""
+        if not config_base_ids:
+            return {}
+        placeholders = ",".join("?" * len(config_base_ids))
+        rows = self.db.fetchall(
+            f"SELECT * FROM items WHERE config_base_id IN ({placeholders})",
+            tuple(config_base_ids),
+        )
+        return {row["config_base_id"]: self._row_to_item(row) for row in rows}
+
+    def get_prefetch_icon_urls(self, recent_runs: int = 50) -> list[str]:
+        """
+        Get icon URLs of items in the current inventory and recent loot.
+
+        Used to warm the icon cache in the background. Empty when no player
+        context is set.
+        """
+        if self._current_player_id is None:
+            return []
+        rows = self.db.fetchall(
+            """SELECT DISTINCT icon_url FROM items
+               WHERE icon_url IS NOT NULL AND icon_url != ''
+               AND config_base_id IN (
+                   SELECT config_base_id FROM slot_state WHERE player_id = ?
+                   UNION
+                   SELECT config_base_id FROM run_loot
+                   WHERE kind = 'loot' AND run_id IN (
+                       SELECT id FROM runs
+                       WHERE (season_id IS NULL OR season_id = ?)
+                       AND (player_id IS NULL OR player_id = ?)
+                       ORDER BY start_ts DESC LIMIT ?
+                   )
+               )""",
+            (
+                self._current_player_id,
+                self._current_season_id,
+                self._current_player_id,
+                recent_runs,
+            ),
+        )
+        return [row["icon_url"] for row in rows]
+
+    def search_items(
+        self, search: Optional[str] = None, limit: int = 100, offset: int = 0
+    ) -> tuple[list[Item], int]:
+        """
+        Search items by English or Chinese name.
+
+        Matches substrings of either name, case-insensitively. Exact name
+        matches rank first, then names starting with the term, then other
+        matches (by FTS relevance when the search index is used), then by
+        name. Terms of 3+ characters use the items_fts trigram index;
+        shorter terms are too short for trigrams and scan the items table.
+
+        Args:
+            search: Search term (None or blank lists all items by name)
+            limit: Page size
+            offset: Number of results to skip
+
+        Returns:
+            (items on this page, total number of matches)
+        """
+        term = (search or "").strip()
+        if not term:
+            total = self.db.fetchone("SELECT COUNT(*) FROM items")[0]
+            rows = self.db.fetchall(
+                """SELECT * FROM items
+                   ORDER BY COALESCE(name_en, ''), config_base_id
+                   LIMIT ? OFFSET ?""",
+                (limit, offset),
+            )
+            return [self._row_to_item(row) for row in rows], total
+
+        escaped = _like_pattern(term)
+        prefix = escaped + "%"
+        order = """CASE
+                       WHEN lower(i.name_en) = lower(?) OR i.name_cn = ? THEN 0
+                       WHEN i.name_en LIKE ? ESCAPE '\\' OR i.name_cn LIKE ? ESCAPE '\\' THEN 1
+                       ELSE 2
+                   END"""
+        order_params = (term, term, prefix, prefix)
+
+        if self.db.has_item_search_index and len(term) >= 3:
+            match = '"' + term.replace('"', '""') + '"'
+            total = self.db.fetchone(
+                "SELECT COUNT(*) FROM items_fts WHERE items_fts MATCH ?", (match,)
+            )[0]
+            rows = self.db.fetchall(
+                f"""SELECT i.* FROM items_fts f
+                    JOIN items i ON i.config_base_id = f.rowid
+                    WHERE items_fts MATCH ?
+                    ORDER BY {order}, f.rank, COALESCE(i.name_en, ''), i.config_base_id
+                    LIMIT ? OFFSET ?""",
+                (match, *order_params, limit, offset),
+            )
+        else:
+            pattern = "%" + escaped + "%"
+            where = """(i.name_en LIKE ? ESCAPE '\\' OR i.name_cn LIKE ? ESCAPE '\\')"""
+            total = self.db.fetchone(
+                f"SELECT COUNT(*) FROM items i WHERE {where}", (pattern, pattern)
+            )[0]
+            rows = self.db.fetchall(
+                f"""SELECT i.* FROM items i
+                    WHERE {where}
+                    ORDER BY {order}, COALESCE(i.name_en, ''), i.config_base_id
+                    LIMIT ? OFFSET ?""",
+                (pattern, pattern, *order_params, limit, offset),
+            )
+        return [self._row_to_item(row) for row in rows], total
+
     def get_item_name(self, config_base_id: int) -> str:
         """Get item name, falling back to Unknown <id> if not found."""
         item = self.get_item(config_base_id)
@@ -452,9 +1288,11 @@ class Repository:
         return [self._row_to_item(row) for row in rows]
 
     def get_item_count(self) -> int:
-        """Get total number of items in database."""
-        row = self.db.fetchone("SELECT COUNT(*) as cnt FROM items")
-        return row["cnt"] if row else 0
+        """Get total number of items in database (from the maintained items counter)."""
+        row = self.db.fetchone(
+            "SELECT value FROM counters WHERE name = 'items' AND season_id = 0 AND player_id = ''"
+        )
+        return row["value"] if row else 0
 
     def update_item_name(self, config_base_id: int, name_en: str) -> None:
         """Update an item's English name."""
@@ -498,9 +1336,10 @@ class Repository:
         # Use provided value or fall back to context
         season_id = season_id if season_id is not None else self._current_season_id
         season_id_filter = season_id if season_id is not None else 0
+        schema = self._partition(season_id)
 
         row = self.db.fetchone(
-            "SELECT * FROM prices WHERE config_base_id = ? AND season_id = ?",
+            f"SELECT * FROM {schema}.prices WHERE config_base_id = ? AND season_id = ?",
             (config_base_id, season_id_filter),
         )
         if not row:
@@ -536,8 +1375,6 @@ class Repository:
 
         Returns the price in FE, or None if no price available.
         """
-        from datetime import datetime
-
         season_id = season_id if season_id is not None else self._current_season_id
         season_id_filter = season_id if season_id is not None else 0
 
@@ -549,11 +1386,55 @@ class Repository:
         )
 
         # Get local price with timestamp
+        schema = self._partition(season_id)
         local_row = self.db.fetchone(
-            "SELECT price_fe, updated_at FROM prices WHERE config_base_id = ? AND season_id = ?",
+            f"SELECT price_fe, updated_at FROM {schema}.prices WHERE config_base_id = ? AND season_id = ?",
             (config_base_id, season_id_filter),
         )
 
+        return self._pick_effective_price(cloud_row, local_row)
+
+    def get_effective_prices(
+        self, config_base_ids: list[int], season_id: Optional[int] = None
+    ) -> dict[int, Optional[float]]:
+        """
+        Get effective prices for many items with one query per price source.
+
+        Same cloud-first rules as get_effective_price.
+
+        Returns:
+            Dict mapping config_base_id -> price in FE (None if unpriced).
+        """
+        if not config_base_ids:
+            return {}
+
+        season_id = season_id if season_id is not None else self._current_season_id
+        season_id_filter = season_id if season_id is not None else 0
+        schema = self._partition(season_id)
+        placeholders = ",".join("?" * len(config_base_ids))
+
+        cloud_rows = self.db.fetchall(
+            f"""SELECT config_base_id, price_fe_median, cloud_updated_at, unique_devices
+               FROM cloud_price_cache
+               WHERE config_base_id IN ({placeholders}) AND season_id = ? AND unique_devices >= 1""",
+            (*config_base_ids, season_id_filter),
+        )
+        local_rows = self.db.fetchall(
+            f"""SELECT config_base_id, price_fe, updated_at FROM {schema}.prices
+               WHERE config_base_id IN ({placeholders}) AND season_id = ?""",
+            (*config_base_ids, season_id_filter),
+        )
+        cloud = {row["config_base_id"]: row for row in cloud_rows}
+        local = {row["config_base_id"]: row for row in local_rows}
+
+        return {
+            config_id: self._pick_effective_price(cloud.get(config_id), local.get(config_id))
+            for config_id in config_base_ids
+        }
+
+    @staticmethod
+    def _pick_effective_price(cloud_row, local_row) -> Optional[float]:
+        """Choose between a cloud and a local price row (cloud unless local is newer)."""
         cloud_price = cloud_row["price_fe_median"] if cloud_row else None
         local_price = local_row["price_fe"] if local_row else None
 
@@ -596,18 +1477,167 @@ class Repository:
             # Default to cloud
             return cloud_price
 
+    def get_price_history(
+        self, config_base_ids: list[int], season_id: Optional[int] = None
+    ) -> PriceHistory:
+        """
+        Load the local price history of some items in one query.
+
+        Args:
+            config_base_ids: Items to load
+            season_id: Season to read (default: current context)
+
+        Returns:
+            PriceHistory ready for as-of lookups.
+        """
+        history = PriceHistory()
+        if not config_base_ids:
+            return history
+
+        season_id = season_id if season_id is not None else self._current_season_id
+        placeholders = ",".join("?" * len(config_base_ids))
+        rows = self.db.fetchall(
+            f"""SELECT config_base_id, ts, price_fe FROM price_history
+               WHERE config_base_id IN ({placeholders}) AND season_id = ?
+               ORDER BY config_base_id, ts""",
+            (*config_base_ids, season_id if season_id is not None else 0),
+        )
+        for row in rows:
+            history.add(row["config_base_id"], datetime.fromisoformat(row["ts"]), row["price_fe"])
+        return history
+
+    def get_prices_as_of(
+        self, config_base_ids: list[int], when: datetime, season_id: Optional[int] = None
+    ) -> dict[int, Optional[float]]:
+        """
+        Get the prices that were in effect at a given time.
+
+        Each item gets its last exchange price observed at or before when;
+        items not observed by then fall back to their current effective
+        price (see get_effective_prices).
+
+        Returns:
+            Dict mapping config_base_id -> price in FE (None if unpriced).
+        """
+        current = self.get_effective_prices(config_base_ids, season_id)
+        history = self.get_price_history(config_base_ids, season_id)
+        return history.prices_at(config_base_ids, when, current)
+
+    def _get_run_time(self, run_id: int, season_id: Optional[int] = None) -> Optional[datetime]:
+        """When a run's loot is valued as of: its end, or its start while active."""
+        schema = self._partition(season_id)
+        row = self.db.fetchone(
+            f"SELECT COALESCE(end_ts, start_ts) AS ts FROM {schema}.runs WHERE id = ?",
+            (run_id,),
+        )
+        return datetime.fromisoformat(row["ts"]) if row else None
+
     def get_all_prices(self, season_id: Optional[int] = None) -> list[Price]:
         """Get all prices, filtered by season (no cross-season mixing)."""
         # Use provided value or fall back to context
         season_id = season_id if season_id is not None else self._current_season_id
         season_id_filter = season_id if season_id is not None else 0
+        schema = self._partition(season_id)
 
         rows = self.db.fetchall(
-            "SELECT * FROM prices WHERE season_id = ?",
+            f"SELECT * FROM {schema}.prices WHERE season_id = ?",
             (season_id_filter,),
         )
         return [self._row_to_price(row) for row in rows]
 
+    def get_price_listing(
+        self,
+        search: Optional[str] = None,
+        source: Optional[str] = None,
+        sort_by: str = "name",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        season_id: Optional[int] = None,
+    ) -> tuple[list[tuple[Price, str]], int]:
+        """
+        Get prices with their item names in one prices LEFT JOIN items query.
+
+        Args:
+            search: Only items whose English or Chinese name contains this
+            source: Only prices from this source (e.g. "exchange", "manual")
+            sort_by: Key of PRICE_SORT_COLUMNS
+            descending: Sort descending instead of ascending
+            limit: Page size (None for all)
+            offset: Number of prices to skip
+            season_id: Season to list (defaults to current context)
+
+        Returns:
+            ([(price, item name or "Unknown <id>"), ...], total matching prices)
+        """
+        season_id = season_id if season_id is not None else self._current_season_id
+        season_id_filter = season_id if season_id is not None else 0
+        schema = self._partition(season_id)
+
+        where = ["p.season_id = ?"]
+        params: list = [season_id_filter]
+        if search and search.strip():
+            pattern = "%" + _like_pattern(search.strip()) + "%"
+            where.append("(i.name_en LIKE ? ESCAPE '\\' OR i.name_cn LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        if source:
+            where.append("p.source = ?")
+            params.append(source)
+        where_sql = " AND ".join(where)
+
+        from_sql = f"""FROM {schema}.prices p
+                       LEFT JOIN items i ON i.config_base_id = p.config_base_id
+                       WHERE {where_sql}"""
+        total = self.db.fetchone(f"SELECT COUNT(*) {from_sql}", tuple(params))[0]
+
+        direction = "DESC" if descending else "ASC"
+        order = f"{PRICE_SORT_COLUMNS.get(sort_by, PRICE_SORT_COLUMNS['name'])} {direction}, p.config_base_id"
+        page_sql = ""
+        if limit is not None:
+            page_sql = "LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        rows = self.db.fetchall(
+            f"""SELECT p.*, COALESCE(i.name_en, 'Unknown ' || p.config_base_id) AS name
+                {from_sql}
+                ORDER BY {order}
+                {page_sql}""",
+            tuple(params),
+        )
+        return [(self._row_to_price(row), row["name"]) for row in rows], total
+
+    def iter_price_export(
+        self, season_id: Optional[int] = None, batch_size: int = 500
+    ) -> Iterator[list[dict]]:
+        """
+        Yield seed-file price entries in batches, sorted by English name.
+
+        Rows are read from the cursor batch by batch, so the export never
+        holds every price in memory.
+        """
+        season_id = season_id if season_id is not None else self._current_season_id
+        season_id_filter = season_id if season_id is not None else 0
+        schema = self._partition(season_id)
+
+        for rows in self.db.iterate(
+            f"""SELECT p.config_base_id, i.name_en, p.price_fe, p.source
+                FROM {schema}.prices p
+                LEFT JOIN items i ON i.config_base_id = p.config_base_id
+                WHERE p.season_id = ?
+                ORDER BY COALESCE(i.name_en, ''), p.config_base_id""",
+            (season_id_filter,),
+            batch_size=batch_size,
+        ):
+            yield [
+                {
+                    "id": str(row["config_base_id"]),
+                    "name_en": row["name_en"],
+                    "price_fe": row["price_fe"],
+                    "source": row["source"],
+                }
+                for row in rows
+            ]
+
     def get_price_count(self, season_id: Optional[int] = None) -> int:
         """Get total number of prices in database, filtered by season."""
         # Use provided value or fall back to context
@@ -689,45 +1719,61 @@ class Repository:
             return 0.875  # 7/8 = 87.5% after 12.5% tax
         return 1.0
 
-    def get_run_value(self, run_id: int) -> tuple[int, float]:
+    def get_run_value(
+        self, run_id: int, season_id: Optional[int] = None, as_of: bool = False
+    ) -> tuple[int, float]:
         """
         Calculate total value of a run's loot.
 
+        Args:
+            run_id: The run ID to value.
+            season_id: Season the run belongs to, to value archived runs
+                       against that season's prices.
+            as_of: Value at the prices in effect when the run ended
+                   (see get_prices_as_of) instead of today's.
+
         Returns:
             Tuple of (raw_fe_gained, total_value_fe)
             - raw_fe_gained: Just the FE currency picked up
             - total_value_fe: FE + value of other items based on prices
               (with trade tax applied to non-FE items if enabled)
         """
-        from titrack.parser.patterns import FE_CONFIG_BASE_ID
-
-        summary = self.get_run_summary(run_id)
-        raw_fe = summary.get(FE_CONFIG_BASE_ID, 0)
-        total_value = float(raw_fe)
-
-        tax_multiplier = self.get_trade_tax_multiplier()
-
-        for config_id, quantity in summary.items():
-            if config_id == FE_CONFIG_BASE_ID:
-                continue
-            if quantity <= 0:
-                continue
-
-            # Use effective price (cloud-first, local overrides if newer)
-            price_fe = self.get_effective_price(config_id)
-
-            if price_fe and price_fe > 0:
-                # Apply trade tax to non-FE items (would need to sell them)
-                total_value += price_fe * quantity * tax_multiplier
+        summary = self.get_run_summary(run_id, season_id=season_id)
+        prices = self._run_prices(run_id, list(summary), season_id, as_of)
+        return self.value_summary(summary, prices, self.get_trade_tax_multiplier())
+
+    def _run_prices(
+        self, run_id: int, config_base_ids: list[int], season_id: Optional[int], as_of: bool
+    ) -> dict[int, Optional[float]]:
+        """Prices to value a run with: effective prices, or those in effect at the run."""
+        when = self._get_run_time(run_id, season_id) if as_of else None
+        if when is not None:
+            return self.get_prices_as_of(config_base_ids, when, season_id)
+        # Use effective prices (cloud-first, local overrides if newer)
+        return self.get_effective_prices(config_base_ids, season_id)
+
+    @staticmethod
+    def value_summary(
+        summary: dict[int, int], prices: dict[int, Optional[float]], tax_multiplier: float
+    ) -> tuple[int, float]:
+        """
+        Value a loot summary against already-resolved prices.
 
-        return raw_fe, total_value
+        Returns:
+            Tuple of (raw_fe_gained, total_value_fe), as get_run_value.
+        """
+        return value_summary(summary, prices, tax_multiplier)
 
-    def get_run_cost(self, run_id: int) -> tuple[dict[int, int], float, list[int]]:
+    def get_run_cost(
+        self, run_id: int, season_id: Optional[int] = None, as_of: bool = False
+    ) -> tuple[dict[int, int], float, list[int]]:
         """
         Get map costs for a run (Spv3Open consumption).
 
         Args:
             run_id: The run ID to get costs for.
+            season_id: Season the run belongs to, to read archived seasons.
+            as_of: Value at the prices in effect when the run ended.
 
         Returns:
             Tuple of (cost_summary, total_cost_fe, unpriced_config_ids)
@@ -735,34 +1781,493 @@ class Repository:
             - total_cost_fe: Sum of priced items only (absolute value)
             - unpriced_config_ids: List of items without known prices
         """
+        schema = self._partition(season_id)
         rows = self.db.fetchall(
-            """SELECT config_base_id, SUM(delta) as total_delta
-               FROM item_deltas
+            f"""SELECT config_base_id, SUM(delta) as total_delta
+               FROM {schema}.item_deltas
                WHERE run_id = ? AND proto_name = 'Spv3Open'
                GROUP BY config_base_id""",
             (run_id,),
         )
         summary = {row["config_base_id"]: row["total_delta"] for row in rows}
 
-        total_cost = 0.0
-        unpriced: list[int] = []
+        prices = self._run_prices(run_id, list(summary), season_id, as_of)
+        total_cost, unpriced = self.value_cost_summary(
+            summary, prices, self.get_trade_tax_multiplier()
+        )
+        return summary, total_cost, unpriced
+
+    @staticmethod
+    def value_cost_summary(
+        summary: dict[int, int], prices: dict[int, Optional[float]], tax_multiplier: float
+    ) -> tuple[float, list[int]]:
+        """
+        Value a map cost summary against already-resolved prices.
+
+        Returns:
+            Tuple of (total_cost_fe, unpriced_config_ids), as get_run_cost.
+        """
+        return value_cost_summary(summary, prices, tax_multiplier)
+
+    # --- Data Versions ---
+
+    def get_data_version(self) -> int:
+        """
+        Get the global data version.
+
+        The sum of all data_versions counters, which triggers bump on every
+        write the UI shows (runs, deltas, inventory, prices, settings, items,
+        map sessions, net worth snapshots). It only ever grows, so any change
+        yields a new value.
+        """
+        row = self.db.fetchone("SELECT COALESCE(SUM(version), 0) as version FROM data_versions")
+        return row["version"] if row else 0
+
+    def get_data_versions(self, names: list[str]) -> dict[str, int]:
+        """Get individual data version counters (0 for ones never bumped)."""
+        placeholders = ",".join("?" * len(names))
+        rows = self.db.fetchall(
+            f"SELECT name, version FROM data_versions WHERE name IN ({placeholders})",
+            tuple(names),
+        )
+        versions = {name: 0 for name in names}
+        versions.update((row["name"], row["version"]) for row in rows)
+        return versions
+
+    # --- Net Worth ---
+
+    def insert_net_worth_snapshot(
+        self, timestamp: datetime, net_worth_fe: float, total_fe: int
+    ) -> None:
+        """Record a net worth snapshot for the current player context."""
+        self.db.execute(
+            """INSERT INTO net_worth_snapshots
+               (season_id, player_id, timestamp, net_worth_fe, total_fe)
+               VALUES (?, ?, ?, ?, ?)""",
+            (
+                self._current_season_id or 0,
+                self._current_player_id or "",
+                timestamp.isoformat(),
+                round(net_worth_fe, 2),
+                total_fe,
+            ),
+        )
+
+    def get_net_worth_history(
+        self, since: Optional[datetime] = None
+    ) -> list[tuple[datetime, float, int]]:
+        """
+        Get net worth snapshots for the current player context, oldest first.
+
+        Args:
+            since: Only snapshots at or after this time. The last snapshot
+                before it is included too, so a chart starts at the value
+                held when the window opened.
+
+        Returns:
+            List of (timestamp, net_worth_fe, total_fe).
+        """
+        if self._current_player_id is None:
+            return []
+
+        context = (self._current_season_id or 0, self._current_player_id)
+        sql = """SELECT timestamp, net_worth_fe, total_fe FROM net_worth_snapshots
+                 WHERE season_id = ? AND player_id = ?"""
+        if since is None:
+            rows = self.db.fetchall(sql + " ORDER BY timestamp, id", context)
+        else:
+            rows = self.db.fetchall(
+                f"""SELECT * FROM (
+                        {sql} AND timestamp < ? ORDER BY timestamp DESC, id DESC LIMIT 1
+                    )
+                    UNION ALL
+                    SELECT * FROM ({sql} AND timestamp >= ? ORDER BY timestamp, id)""",
+                (*context, since.isoformat(), *context, since.isoformat()),
+            )
+        return [
+            (datetime.fromisoformat(row["timestamp"]), row["net_worth_fe"], row["total_fe"])
+            for row in rows
+        ]
+
+    def get_latest_net_worth_snapshot(self) -> Optional[tuple[datetime, float, int]]:
+        """Get the most recent net worth snapshot for the current player context."""
+        if self._current_player_id is None:
+            return None
+
+        row = self.db.fetchone(
+            """SELECT timestamp, net_worth_fe, total_fe FROM net_worth_snapshots
+               WHERE season_id = ? AND player_id = ?
+               ORDER BY timestamp DESC, id DESC LIMIT 1""",
+            (self._current_season_id or 0, self._current_player_id),
+        )
+        if row is None:
+            return None
+        return datetime.fromisoformat(row["timestamp"]), row["net_worth_fe"], row["total_fe"]
+
+    # --- Run Stats ---
+
+    def get_run_stats(self) -> dict:
+        """
+        Get totals over all ended non-hub runs in the current context.
+
+        Values come from run_value_totals, which triggers keep current as
+        loot is recorded, runs end and prices change (a price change only
+        revalues the runs holding that item), so no loot or prices are
+        scanned here. Runs are valued at their own season's prices (legacy
+        runs without one at the current season's, from their few run_values
+        rows). The result is memoized until a run starts, ends or is removed, or a
+        price changes (tracked in data_versions by triggers).
+
+        Returns:
+            Dict with entries (listing entries with an ended run), fe_gained,
+            total_value (FE plus taxed item value), map_cost_fe and
+            duration_seconds.
+        """
+        if self._current_player_id is None:
+            return {
+                "entries": 0,
+                "fe_gained": 0,
+                "total_value": 0.0,
+                "map_cost_fe": 0.0,
+                "duration_seconds": 0.0,
+            }
+
+        versions = self.get_data_versions(["runs", "prices"])
         tax_multiplier = self.get_trade_tax_multiplier()
+        key = (
+            self._current_season_id,
+            self._current_player_id,
+            versions["runs"],
+            versions["prices"],
+            tax_multiplier,
+        )
+        cached = self._run_stats_cache
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+
+        if self._current_season_id is not None:
+            run_filter = "AND (season_id IS NULL OR season_id = ?) AND (player_id IS NULL OR player_id = ?)"
+            # Legacy runs are added below, at this season's prices
+            totals_filter = "WHERE season_id = ? AND player_id IN ('', ?)"
+            params: tuple = (self._current_season_id, self._current_player_id)
+        else:
+            run_filter = ""
+            totals_filter = ""
+            params = ()
 
-        for config_id, quantity in summary.items():
-            price_fe = self.get_effective_price(config_id)
-            if price_fe and price_fe > 0:
-                # Use absolute value since quantity is negative (consumption)
-                total_cost += abs(quantity) * price_fe * tax_multiplier
-            else:
-                unpriced.append(config_id)
+        row = self.db.fetchone(
+            f"""SELECT COUNT(DISTINCT entry_id) AS entries,
+                       SUM(ROUND((julianday(end_ts) - julianday(start_ts)) * 86400.0, 3)) AS duration
+                FROM runs
+                WHERE end_ts IS NOT NULL AND is_hub = 0 {run_filter}""",
+            params,
+        )
+        totals = self.db.fetchone(
+            f"""SELECT SUM(fe_gained) AS fe_gained, SUM(item_value) AS item_value,
+                       SUM(map_cost) AS map_cost
+                FROM run_value_totals {totals_filter}""",
+            params,
+        )
+        fe_gained = totals["fe_gained"] or 0
+        item_value = totals["item_value"] or 0.0
+        map_cost = totals["map_cost"] or 0.0
+
+        if self._current_season_id is not None:
+            legacy_item_value, legacy_map_cost = self._run_value_sql()
+            legacy = self.db.fetchone(
+                f"""SELECT SUM(v.fe_gained) AS fe_gained, SUM({legacy_item_value}) AS item_value,
+                           SUM({legacy_map_cost}) AS map_cost
+                    FROM runs r
+                    JOIN run_values v ON v.run_id = r.id
+                    WHERE r.season_id IS NULL AND r.end_ts IS NOT NULL AND r.is_hub = 0
+                    AND (r.player_id IS NULL OR r.player_id = ?)""",
+                (self._current_player_id,),
+            )
+            fe_gained += legacy["fe_gained"] or 0
+            item_value += legacy["item_value"] or 0.0
+            map_cost += legacy["map_cost"] or 0.0
+
+        stats = {
+            "entries": row["entries"] or 0,
+            "fe_gained": fe_gained,
+            # Trade tax applies to non-FE items and to map costs, as in value_summary
+            "total_value": fe_gained + item_value * tax_multiplier,
+            "map_cost_fe": map_cost * tax_multiplier,
+            "duration_seconds": row["duration"] or 0.0,
+        }
+        self._run_stats_cache = (key, stats)
+        return dict(stats)
+
+    def get_run_values(self, run_ids: list[int]) -> dict[int, tuple[int, float, float]]:
+        """
+        Get the persisted values of runs.
 
-        return summary, total_cost, unpriced
+        Returns:
+            Dict mapping run_id -> (fe_gained, total_value, map_cost_fe), with
+            trade tax applied as in value_summary / value_cost_summary. Runs
+            without recorded loot are missing.
+        """
+        if not run_ids:
+            return {}
+        tax_multiplier = self.get_trade_tax_multiplier()
+        item_value, map_cost = self._run_value_sql()
+        placeholders = ",".join("?" * len(run_ids))
+        rows = self.db.fetchall(
+            f"""SELECT v.run_id, v.fe_gained, {item_value} AS item_value, {map_cost} AS map_cost
+                FROM run_values v
+                JOIN runs r ON r.id = v.run_id
+                WHERE v.run_id IN ({placeholders})""",
+            tuple(run_ids),
+        )
+        return {
+            row["run_id"]: (
+                row["fe_gained"],
+                row["fe_gained"] + row["item_value"] * tax_multiplier,
+                row["map_cost"] * tax_multiplier,
+            )
+            for row in rows
+        }
+
+    def _run_value_sql(self) -> tuple[str, str]:
+        """
+        SQL for the untaxed (item_value, map_cost) of a run r joined to its
+        run_values row v, in the current context.
+
+        Legacy runs (no season recorded) are valued at the current season's
+        prices, as they always were; their stored values use legacy prices.
+        """
+        if not self._current_season_id:
+            return "v.item_value", "v.map_cost"
+        item_value, map_cost = legacy_run_value_sql("r.id", self._current_season_id)
+        return (
+            f"CASE WHEN r.season_id IS NULL THEN {item_value} ELSE v.item_value END",
+            f"CASE WHEN r.season_id IS NULL THEN {map_cost} ELSE v.map_cost END",
+        )
+
+    def rebuild_run_values(self) -> int:
+        """
+        Recompute persisted run values and their totals from run loot and
+        current prices.
+
+        Returns:
+            Number of runs valued.
+        """
+        conn = self.db.connection
+        with self.db._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in REBUILD_RUN_VALUES_STATEMENTS:
+                    conn.execute(statement)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._run_stats_cache = None
+        row = self.db.fetchone("SELECT COUNT(*) AS cnt FROM run_values")
+        return row["cnt"] if row else 0
+
+    def get_zone_stats(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        subtract_map_costs: bool = False,
+    ) -> list[dict]:
+        """
+        Get per-zone profitability over finished map sessions in the current context.
+
+        Sessions are valued at query time from the run values of their ended
+        runs (see _valued_sessions_sql), so price and trade tax changes show
+        up here as in /api/runs. One ordered scan of the valued sessions
+        gives each zone's counts and totals and picks its median and p90 as
+        it streams past, so only one zone's values are held in memory at a
+        time.
+
+        Args:
+            since: Only sessions that started at or after this time
+            until: Only sessions that started before this time
+            subtract_map_costs: Value sessions net of their map costs
+
+        Returns:
+            List of dicts (most total value first) with zone_signature,
+            level_id, entries, nightmare_entries, fe_gained, total_value,
+            duration_seconds, mean_value, median_value and p90_value.
+        """
+        if self._current_player_id is None:
+            return []
+
+        conditions = ["s.end_ts IS NOT NULL"]
+        params: list = []
+        if self._current_season_id is not None:
+            conditions.append("(s.season_id IS NULL OR s.season_id = ?)")
+            conditions.append("(s.player_id IS NULL OR s.player_id = ?)")
+            params += [self._current_season_id, self._current_player_id]
+        if since is not None:
+            conditions.append("s.start_ts >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            conditions.append("s.start_ts < ?")
+            params.append(until.isoformat())
+        sessions, value_params = self._valued_sessions_sql(" AND ".join(conditions))
+        value = "total_value - map_cost_fe" if subtract_map_costs else "total_value"
+
+        zones: list[dict] = []
+
+        def add_zone(key: tuple, rows: list) -> None:
+            if not rows:
+                return
+            values = [row[3] for row in rows]  # Ascending
+            n = len(values)
+            total_value = sum(values)
+            zones.append({
+                "zone_signature": key[0],
+                "level_id": key[1],
+                "entries": n,
+                "nightmare_entries": sum(row[2] for row in rows),
+                "fe_gained": sum(row[4] for row in rows),
+                "total_value": total_value,
+                "duration_seconds": sum(row[5] for row in rows),
+                "mean_value": total_value / n,
+                "median_value": (values[(n - 1) // 2] + values[n // 2]) / 2,
+                "p90_value": values[(9 * n + 9) // 10 - 1],  # Nearest rank, ceil(0.9n)
+            })
+
+        key, rows = None, []
+        for batch in self.db.iterate(
+            f"""SELECT zone_signature, level_id, is_nightmare, {value} AS value,
+                       fe_gained, duration_seconds
+                FROM ({sessions})
+                ORDER BY zone_signature, level_id, value""",
+            (*value_params, *params),
+            batch_size=5000,
+        ):
+            for row in batch:
+                if (row[0], row[1]) != key:
+                    add_zone(key, rows)
+                    key, rows = (row[0], row[1]), []
+                rows.append(tuple(row))
+        add_zone(key, rows)
+
+        return sorted(zones, key=lambda z: (-z["total_value"], z["zone_signature"]))
+
+    def get_drop_stats(
+        self,
+        zone_signature: Optional[str] = None,
+        config_base_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """
+        Get per-zone item drop statistics in the current context.
+
+        Read from the zone_drops / zone_runs aggregates (maintained as runs
+        end) joined with effective prices, highest expected value per run
+        first.
+
+        Args:
+            zone_signature: Only this zone
+            config_base_id: Only this item
+            limit: Maximum rows to return
+
+        Returns:
+            List of dicts with zone_signature, level_id, config_base_id,
+            runs (ended runs in the zone), duration_seconds, runs_with_drop,
+            total_quantity, price_fe (None if unpriced) and value_per_run
+            (expected FE per run from this item, trade tax applied).
+        """
+        from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+        if self._current_player_id is None:
+            return []
+
+        if self._current_season_id is not None:
+            scope = "season_id IN (0, ?) AND player_id IN ('', ?)"
+            scope_params: tuple = (self._current_season_id, self._current_player_id)
+        else:
+            scope = "1"
+            scope_params = ()
+
+        filters = []
+        filter_params: list = []
+        if zone_signature is not None:
+            filters.append("d.zone_signature = ?")
+            filter_params.append(zone_signature)
+        if config_base_id is not None:
+            filters.append("d.config_base_id = ?")
+            filter_params.append(config_base_id)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        season_id_filter = self._current_season_id if self._current_season_id is not None else 0
+        rows = self.db.fetchall(
+            f"""WITH zones AS (
+                   SELECT zone_signature, level_id,
+                          SUM(runs) AS runs, SUM(duration_seconds) AS duration_seconds
+                   FROM zone_runs WHERE {scope}
+                   GROUP BY zone_signature, level_id
+               ),
+               drops AS (
+                   SELECT zone_signature, level_id, config_base_id,
+                          SUM(runs_with_drop) AS runs_with_drop,
+                          SUM(total_quantity) AS total_quantity
+                   FROM zone_drops WHERE {scope}
+                   GROUP BY zone_signature, level_id, config_base_id
+               ),
+               valued AS (
+                   SELECT d.*, z.runs, z.duration_seconds,
+                          CASE WHEN d.config_base_id = ? THEN 1.0 ELSE p.price_fe END AS price_fe,
+                          CASE WHEN d.config_base_id = ? THEN 1.0
+                               WHEN p.price_fe > 0 THEN p.price_fe * ?
+                               ELSE 0 END * d.total_quantity / z.runs AS value_per_run
+                   FROM drops d
+                   JOIN zones z ON z.zone_signature = d.zone_signature AND z.level_id = d.level_id
+                   LEFT JOIN effective_prices p
+                       ON p.config_base_id = d.config_base_id AND p.season_id = ?
+                   {where}
+               )
+               SELECT * FROM valued
+               WHERE runs_with_drop > 0
+               ORDER BY value_per_run DESC, runs_with_drop DESC, config_base_id
+               LIMIT ?""",
+            (
+                *scope_params,
+                *scope_params,
+                FE_CONFIG_BASE_ID,
+                FE_CONFIG_BASE_ID,
+                self.get_trade_tax_multiplier(),
+                season_id_filter,
+                *filter_params,
+                limit,
+            ),
+        )
+        return [
+            {**dict(row), "level_id": row["level_id"] or None}
+            for row in rows
+        ]
+
+    def rebuild_zone_drops(self) -> int:
+        """
+        Recompute the drop statistics (zone_runs / zone_drops) from stored runs.
+
+        Returns:
+            Number of (zone, item) rows written.
+        """
+        conn = self.db.connection
+        with self.db._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in REBUILD_ZONE_DROPS_STATEMENTS:
+                    conn.execute(statement)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        row = self.db.fetchone("SELECT COUNT(*) AS cnt FROM zone_drops")
+        return row["cnt"] if row else 0
 
     # --- Data Management ---
 
     def clear_run_data(self) -> int:
         """
-        Clear all run tracking data (runs and item_deltas).
+        Clear all run tracking data (runs, item_deltas, map_sessions, drop stats
+        and run values).
 
         Preserves: items, prices, settings, slot_state, log_position.
 
@@ -781,8 +2286,13 @@ class Repository:
         try:
             # Delete item_deltas first (foreign key reference)
             conn.execute("DELETE FROM item_deltas")
+            conn.execute("DELETE FROM map_sessions")
             # Delete runs
             conn.execute("DELETE FROM runs")
+            conn.execute("DELETE FROM zone_runs")
+            conn.execute("DELETE FROM zone_drops")
+            conn.execute("DELETE FROM run_values")
+            conn.execute("DELETE FROM run_value_totals")
             conn.execute("COMMIT")
         except Exception:
             conn.execute("ROLLBACK")
@@ -793,6 +2303,128 @@ class Repository:
 
         return run_count
 
+    # --- Season Archives ---
+
+    def archive_season(self, season_id: int, force: bool = False) -> dict[str, int]:
+        """
+        Move a finished season's runs, deltas and prices into its archive file.
+
+        The archive (archive/season_<id>.db beside the main database) is
+        attached and rows are copied then removed from the main tables in
+        one transaction. Archiving a season twice merges into the same file.
+
+        Args:
+            season_id: The season to archive. The active season (the player
+                       context's, or the latest recorded one when no context
+                       is set, e.g. from the CLI) is refused unless forced.
+            force: Archive the season even if it looks active.
+
+        Returns:
+            Dict of table name -> rows moved.
+
+        Raises:
+            ValueError: If season_id is the active season and force is False.
+        """
+        active = {self._current_season_id, self.get_latest_season_id()}
+        if season_id in active and not force:
+            raise ValueError("Cannot archive the active season")
+
+        schema = self.db.attach_archive(season_id, create=True)
+        conn = self.db.connection
+
+        # (table, rows belonging to the season) - deltas follow their runs so
+        # the archive's foreign keys stay intact
+        moves = [
+            ("runs", "season_id = ?", (season_id,)),
+            (
+                "item_deltas",
+                "run_id IN (SELECT id FROM main.runs WHERE season_id = ?)"
+                " OR (run_id IS NULL AND season_id = ?)",
+                (season_id, season_id),
+            ),
+            ("prices", "season_id = ?", (season_id,)),
+            ("map_sessions", "season_id = ?", (season_id,)),
+        ]
+
+        moved: dict[str, int] = {}
+        with self.db._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Run values stay in the main database, so archived sessions
+                # keep the values they have now
+                conn.executemany(
+                    """UPDATE map_sessions SET fe_gained = ?, total_value = ?, map_cost_fe = ?,
+                           map_cost_has_unpriced = ?
+                       WHERE id = ?""",
+                    [
+                        (
+                            session.fe_gained,
+                            session.total_value,
+                            session.map_cost_fe,
+                            1 if session.map_cost_has_unpriced else 0,
+                            session.id,
+                        )
+                        for session in self._select_sessions("s.season_id = ?", (season_id,))
+                    ],
+                )
+                for table, where, params in moves:
+                    columns = ", ".join(
+                        row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")
+                    )
+                    cursor = conn.execute(
+                        f"INSERT OR REPLACE INTO {schema}.{table} ({columns}) "
+                        f"SELECT {columns} FROM main.{table} WHERE {where}",
+                        params,
+                    )
+                    moved[table] = cursor.rowcount
+                # Delete children before parents (item_deltas -> runs)
+                for table, where, params in reversed(moves):
+                    conn.execute(f"DELETE FROM main.{table} WHERE {where}", params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return moved
+
+    def get_latest_season_id(self) -> Optional[int]:
+        """Get the season of the most recent run in the main database, if any."""
+        row = self.db.fetchone(
+            """SELECT season_id FROM runs WHERE season_id IS NOT NULL
+               ORDER BY start_ts DESC, id DESC LIMIT 1"""
+        )
+        return row["season_id"] if row else None
+
+    def get_seasons(self) -> list[dict]:
+        """
+        List seasons with run counts, live and archived.
+
+        Returns:
+            List of dicts with season_id, run_count and archived flag,
+            newest season first.
+        """
+        seasons: dict[int, dict] = {}
+        rows = self.db.fetchall(
+            """SELECT season_id, COUNT(*) as cnt FROM runs
+               WHERE season_id IS NOT NULL GROUP BY season_id"""
+        )
+        for row in rows:
+            seasons[row["season_id"]] = {
+                "season_id": row["season_id"],
+                "run_count": row["cnt"],
+                "archived": False,
+            }
+        for season_id in self.db.archived_seasons:
+            schema = self.db.get_archive_schema(season_id)
+            row = self.db.fetchone(f"SELECT COUNT(*) as cnt FROM {schema}.runs")
+            entry = seasons.setdefault(
+                season_id, {"season_id": season_id, "run_count": 0, "archived": True}
+            )
+            entry["run_count"] += row["cnt"] if row else 0
+            entry["archived"] = True
+        return sorted(seasons.values(), key=lambda s: s["season_id"], reverse=True)
+
     # --- Log Position ---
 
     def save_log_position(self, file_path: Path, position: int, file_size: int) -> None:
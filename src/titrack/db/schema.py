@@ -1,6 +1,13 @@
 """Database schema - DDL statements for SQLite."""
 
-SCHEMA_VERSION = 3  # Bumped for cloud sync support
+from titrack.data.inventory import EXCLUDED_PAGES
+from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+# Stored in PRAGMA user_version once the DDL, migrations and backfills below
+# have been applied; bump it whenever any of them change so existing
+# databases run them (once) on their next start. Databases at this version
+# or newer skip them.
+SCHEMA_VERSION = 4
 
 # Settings table - key/value configuration
 CREATE_SETTINGS = """
@@ -23,7 +30,8 @@ CREATE TABLE IF NOT EXISTS runs (
     level_type INTEGER,
     level_uid INTEGER,
     season_id INTEGER,
-    player_id TEXT
+    player_id TEXT,
+    entry_id INTEGER
 )
 """
 
@@ -151,6 +159,721 @@ CREATE TABLE IF NOT EXISTS cloud_price_history (
 )
 """
 
+# Map sessions - finished listing entries with their aggregates, written by
+# the collector when a session closes (id is the head run's id). Money values
+# are read live from the run values of the session's runs; the stored
+# fe_gained / total_value / map_cost_fe / map_cost_has_unpriced are only
+# filled in when the season is archived (see Repository.archive_season).
+CREATE_MAP_SESSIONS = """
+CREATE TABLE IF NOT EXISTS map_sessions (
+    id INTEGER PRIMARY KEY,
+    zone_signature TEXT NOT NULL,
+    level_id INTEGER,
+    is_nightmare INTEGER NOT NULL DEFAULT 0,
+    start_ts TEXT NOT NULL,
+    end_ts TEXT,
+    duration_seconds REAL NOT NULL DEFAULT 0,
+    fe_gained INTEGER NOT NULL DEFAULT 0,
+    total_value REAL NOT NULL DEFAULT 0,
+    map_cost_fe REAL NOT NULL DEFAULT 0,
+    map_cost_has_unpriced INTEGER NOT NULL DEFAULT 0,
+    run_ids TEXT NOT NULL,
+    season_id INTEGER,
+    player_id TEXT,
+    finalized_at TEXT NOT NULL DEFAULT (datetime('now'))
+)
+"""
+
+CREATE_MAP_SESSIONS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_map_sessions_start_ts ON map_sessions(start_ts)
+"""
+
+CREATE_MAP_SESSIONS_END_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_map_sessions_end_ts ON map_sessions(end_ts)
+"""
+
+# Net worth snapshots - recorded by the collector when the inventory's value
+# moved past a threshold (see core.net_worth). season_id 0 / player_id '' for NULL.
+CREATE_NET_WORTH_SNAPSHOTS = """
+CREATE TABLE IF NOT EXISTS net_worth_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    season_id INTEGER NOT NULL DEFAULT 0,
+    player_id TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL,
+    net_worth_fe REAL NOT NULL,
+    total_fe INTEGER NOT NULL
+)
+"""
+
+CREATE_NET_WORTH_SNAPSHOTS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_net_worth_snapshots_context
+ON net_worth_snapshots(season_id, player_id, timestamp)
+"""
+
+# Local price history - every exchange price observation, appended by a
+# trigger as the collector stores it, for valuing runs at the price in effect
+# when they happened (see core.price_history). season_id 0 for NULL.
+CREATE_PRICE_HISTORY = """
+CREATE TABLE IF NOT EXISTS price_history (
+    config_base_id INTEGER NOT NULL,
+    season_id INTEGER NOT NULL DEFAULT 0,
+    ts TEXT NOT NULL,
+    price_fe REAL NOT NULL,
+    PRIMARY KEY (config_base_id, season_id, ts)
+) WITHOUT ROWID
+"""
+
+CREATE_PRICE_HISTORY_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_price_history
+AFTER INSERT ON prices
+WHEN NEW.source = 'exchange'
+BEGIN
+    INSERT OR REPLACE INTO price_history (config_base_id, season_id, ts, price_fe)
+    VALUES (NEW.config_base_id, NEW.season_id, NEW.updated_at, NEW.price_fe);
+END
+"""
+
+# Seed a new history with the exchange prices already stored
+BACKFILL_PRICE_HISTORY = """
+INSERT OR IGNORE INTO price_history (config_base_id, season_id, ts, price_fe)
+SELECT config_base_id, season_id, updated_at, price_fe FROM prices WHERE source = 'exchange'
+"""
+
+# Maintained counters (e.g. listing entries per season/player) so totals
+# don't need a scan. season_id uses 0 and player_id '' for NULL.
+CREATE_COUNTERS = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT NOT NULL,
+    season_id INTEGER NOT NULL DEFAULT 0,
+    player_id TEXT NOT NULL DEFAULT '',
+    value INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, season_id, player_id)
+)
+"""
+
+# Listing entries: runs.entry_id is the id of the run heading the consolidated
+# entry a run is shown under (NULL for hubs); heads have entry_id = id
+CREATE_RUNS_ENTRY_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_runs_entry_id ON runs(entry_id)
+"""
+
+CREATE_RUNS_ENTRY_HEADS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_runs_entry_heads ON runs(start_ts, id) WHERE entry_id = id
+"""
+
+CREATE_RUN_ENTRIES_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_run_entries_head
+AFTER UPDATE OF entry_id ON runs
+WHEN NEW.entry_id = NEW.id AND OLD.entry_id IS NOT NEW.id
+BEGIN
+    INSERT INTO counters (name, season_id, player_id, value)
+    VALUES ('run_entries', COALESCE(NEW.season_id, 0), COALESCE(NEW.player_id, ''), 1)
+    ON CONFLICT (name, season_id, player_id) DO UPDATE SET value = value + 1;
+END
+"""
+
+CREATE_RUN_ENTRIES_UNHEAD_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_run_entries_unhead
+AFTER UPDATE OF entry_id ON runs
+WHEN OLD.entry_id = OLD.id AND NEW.entry_id IS NOT NEW.id
+BEGIN
+    UPDATE counters SET value = value - 1
+    WHERE name = 'run_entries'
+    AND season_id = COALESCE(OLD.season_id, 0) AND player_id = COALESCE(OLD.player_id, '');
+END
+"""
+
+CREATE_RUN_ENTRIES_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_run_entries_delete
+AFTER DELETE ON runs
+WHEN OLD.entry_id = OLD.id
+BEGIN
+    UPDATE counters SET value = value - 1
+    WHERE name = 'run_entries'
+    AND season_id = COALESCE(OLD.season_id, 0) AND player_id = COALESCE(OLD.player_id, '');
+END
+"""
+
+# Row counters for status polling: 'runs' per season/player and 'items'
+# overall. Items are written with INSERT OR REPLACE, which does not fire
+# delete triggers, so new items are counted before the insert instead.
+CREATE_RUN_COUNT_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_run_count_insert
+AFTER INSERT ON runs
+BEGIN
+    INSERT INTO counters (name, season_id, player_id, value)
+    VALUES ('runs', COALESCE(NEW.season_id, 0), COALESCE(NEW.player_id, ''), 1)
+    ON CONFLICT (name, season_id, player_id) DO UPDATE SET value = value + 1;
+END
+"""
+
+CREATE_RUN_COUNT_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_run_count_delete
+AFTER DELETE ON runs
+BEGIN
+    UPDATE counters SET value = value - 1
+    WHERE name = 'runs'
+    AND season_id = COALESCE(OLD.season_id, 0) AND player_id = COALESCE(OLD.player_id, '');
+END
+"""
+
+CREATE_ITEM_COUNT_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_item_count_insert
+BEFORE INSERT ON items
+WHEN NOT EXISTS (SELECT 1 FROM items WHERE config_base_id = NEW.config_base_id)
+BEGIN
+    INSERT INTO counters (name, value) VALUES ('items', 1)
+    ON CONFLICT (name, season_id, player_id) DO UPDATE SET value = value + 1;
+END
+"""
+
+CREATE_ITEM_COUNT_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_item_count_delete
+AFTER DELETE ON items
+BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'items' AND season_id = 0 AND player_id = '';
+END
+"""
+
+# Item name search index. Trigram tokens give substring matching that works
+# for Chinese names too (no word boundaries needed). Kept in sync by triggers;
+# items are written with INSERT OR REPLACE/IGNORE, which fire neither delete
+# triggers nor (when ignored) insert triggers, so the insert trigger replaces
+# any existing index row itself.
+CREATE_ITEMS_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    name_en, name_cn, tokenize = 'trigram'
+)
+"""
+
+CREATE_ITEMS_FTS_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_items_fts_insert
+AFTER INSERT ON items
+BEGIN
+    DELETE FROM items_fts WHERE rowid = NEW.config_base_id;
+    INSERT INTO items_fts (rowid, name_en, name_cn)
+    VALUES (NEW.config_base_id, NEW.name_en, NEW.name_cn);
+END
+"""
+
+CREATE_ITEMS_FTS_UPDATE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_items_fts_update
+AFTER UPDATE OF name_en, name_cn ON items
+BEGIN
+    DELETE FROM items_fts WHERE rowid = OLD.config_base_id;
+    INSERT INTO items_fts (rowid, name_en, name_cn)
+    VALUES (NEW.config_base_id, NEW.name_en, NEW.name_cn);
+END
+"""
+
+CREATE_ITEMS_FTS_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_items_fts_delete
+AFTER DELETE ON items
+BEGIN
+    DELETE FROM items_fts WHERE rowid = OLD.config_base_id;
+END
+"""
+
+# Created separately from POST_MIGRATION_STATEMENTS: FTS5 is optional in
+# SQLite builds, and search falls back to LIKE when it is missing
+ITEMS_FTS_STATEMENTS = [
+    CREATE_ITEMS_FTS,
+    CREATE_ITEMS_FTS_INSERT_TRIGGER,
+    CREATE_ITEMS_FTS_UPDATE_TRIGGER,
+    CREATE_ITEMS_FTS_DELETE_TRIGGER,
+]
+
+# Run loot - per-run item totals materialized from item_deltas by triggers.
+# kind is 'cost' for map costs (Spv3Open) and 'loot' for everything else;
+# loot on excluded pages (Gear) is left out, as in Repository.get_run_summary.
+CREATE_RUN_LOOT = """
+CREATE TABLE IF NOT EXISTS run_loot (
+    run_id INTEGER NOT NULL,
+    config_base_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, config_base_id, kind)
+)
+"""
+
+_EXCLUDED_PAGES_SQL = ", ".join(str(p) for p in sorted(EXCLUDED_PAGES)) or "NULL"
+
+CREATE_RUN_LOOT_INSERT_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS trg_run_loot_insert
+AFTER INSERT ON item_deltas
+WHEN NEW.run_id IS NOT NULL
+AND (NEW.proto_name = 'Spv3Open' OR NEW.page_id NOT IN ({_EXCLUDED_PAGES_SQL}))
+BEGIN
+    INSERT INTO run_loot (run_id, config_base_id, kind, quantity)
+    VALUES (
+        NEW.run_id,
+        NEW.config_base_id,
+        CASE WHEN NEW.proto_name = 'Spv3Open' THEN 'cost' ELSE 'loot' END,
+        NEW.delta
+    )
+    ON CONFLICT (run_id, config_base_id, kind) DO UPDATE SET quantity = quantity + excluded.quantity;
+END
+"""
+
+CREATE_RUN_LOOT_DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_run_loot_delete
+AFTER DELETE ON runs
+BEGIN
+    DELETE FROM run_loot WHERE run_id = OLD.id;
+END
+"""
+
+# Effective price of one (config_base_id, season_id) from its local row l and
+# cloud row c: cloud price unless the local one is newer (same rules as
+# Repository.get_effective_price)
+_EFFECTIVE_PRICE_SQL = """
+    CASE
+        WHEN c.price_fe_median IS NULL THEN l.price_fe
+        WHEN l.price_fe IS NULL THEN c.price_fe_median
+        WHEN c.cloud_updated_at IS NOT NULL AND l.updated_at IS NOT NULL THEN
+            CASE
+                WHEN julianday(l.updated_at) > julianday(c.cloud_updated_at) THEN l.price_fe
+                ELSE c.price_fe_median
+            END
+        WHEN l.updated_at IS NOT NULL THEN l.price_fe
+        ELSE c.price_fe_median
+    END"""
+
+CREATE_EFFECTIVE_PRICES_VIEW = f"""
+CREATE VIEW IF NOT EXISTS effective_prices AS
+SELECT
+    k.config_base_id,
+    k.season_id,{_EFFECTIVE_PRICE_SQL} AS price_fe
+FROM (
+    SELECT config_base_id, season_id FROM prices
+    UNION
+    SELECT config_base_id, season_id FROM cloud_price_cache WHERE unique_devices >= 1
+) AS k
+LEFT JOIN prices AS l
+    ON l.config_base_id = k.config_base_id AND l.season_id = k.season_id
+LEFT JOIN cloud_price_cache AS c
+    ON c.config_base_id = k.config_base_id AND c.season_id = k.season_id AND c.unique_devices >= 1
+"""
+
+# Data versions - bumped by triggers so derived results (e.g. run stats)
+# can be cached until the data they depend on changes
+CREATE_DATA_VERSIONS = """
+CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def _version_trigger(name: str, event: str, table: str, version: str) -> str:
+    """DDL for a trigger bumping a data version after changes to a table."""
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_version_{name}
+AFTER {event} ON {table}
+BEGIN
+    INSERT INTO data_versions (name, version) VALUES ('{version}', 1)
+    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+END
+"""
+
+
+# 'runs' changes when runs are added, end or are removed, or an ended run
+# gets late loot; 'prices' on any local or cloud price change
+CREATE_LATE_LOOT_VERSION_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS trg_version_late_loot
+AFTER INSERT ON item_deltas
+WHEN NEW.run_id IS NOT NULL
+AND (SELECT end_ts FROM runs WHERE id = NEW.run_id) IS NOT NULL
+BEGIN
+    INSERT INTO data_versions (name, version) VALUES ('runs', 1)
+    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+END
+"""
+
+DATA_VERSION_TRIGGERS = [
+    _version_trigger("runs_insert", "INSERT", "runs", "runs"),
+    _version_trigger("runs_end", "UPDATE OF end_ts", "runs", "runs"),
+    _version_trigger("runs_delete", "DELETE", "runs", "runs"),
+    _version_trigger("prices_insert", "INSERT", "prices", "prices"),
+    _version_trigger("prices_update", "UPDATE", "prices", "prices"),
+    _version_trigger("prices_delete", "DELETE", "prices", "prices"),
+    _version_trigger("cloud_prices_insert", "INSERT", "cloud_price_cache", "prices"),
+    _version_trigger("cloud_prices_update", "UPDATE", "cloud_price_cache", "prices"),
+    _version_trigger("cloud_prices_delete", "DELETE", "cloud_price_cache", "prices"),
+    # Remaining writes that show up on the dashboard; all of these together
+    # make up the global data version (Repository.get_data_version)
+    _version_trigger("runs_entry", "UPDATE OF entry_id", "runs", "runs"),
+    _version_trigger("deltas_insert", "INSERT", "item_deltas", "deltas"),
+    _version_trigger("slot_state_insert", "INSERT", "slot_state", "inventory"),
+    _version_trigger("slot_state_update", "UPDATE", "slot_state", "inventory"),
+    _version_trigger("slot_state_delete", "DELETE", "slot_state", "inventory"),
+    _version_trigger("settings_insert", "INSERT", "settings", "settings"),
+    _version_trigger("settings_update", "UPDATE", "settings", "settings"),
+    _version_trigger("settings_delete", "DELETE", "settings", "settings"),
+    _version_trigger("items_insert", "INSERT", "items", "items"),
+    _version_trigger("items_update", "UPDATE", "items", "items"),
+    _version_trigger("items_delete", "DELETE", "items", "items"),
+    _version_trigger("sessions_insert", "INSERT", "map_sessions", "sessions"),
+    _version_trigger("sessions_update", "UPDATE", "map_sessions", "sessions"),
+    _version_trigger("sessions_delete", "DELETE", "map_sessions", "sessions"),
+    _version_trigger("net_worth_insert", "INSERT", "net_worth_snapshots", "net_worth"),
+]
+
+# Drop statistics - per zone and item, how many ended runs dropped the item
+# (net positive loot) and how much in total, plus each zone's ended run count
+# and duration. Kept up to date by triggers as runs end (and on loot that
+# arrives after a run ended), so drop rates never rescan item_deltas.
+# level_id, season_id and player_id use 0 / 0 / '' for NULL.
+CREATE_ZONE_RUNS = """
+CREATE TABLE IF NOT EXISTS zone_runs (
+    zone_signature TEXT NOT NULL,
+    level_id INTEGER NOT NULL DEFAULT 0,
+    season_id INTEGER NOT NULL DEFAULT 0,
+    player_id TEXT NOT NULL DEFAULT '',
+    runs INTEGER NOT NULL DEFAULT 0,
+    duration_seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (zone_signature, level_id, season_id, player_id)
+)
+"""
+
+CREATE_ZONE_DROPS = """
+CREATE TABLE IF NOT EXISTS zone_drops (
+    zone_signature TEXT NOT NULL,
+    level_id INTEGER NOT NULL DEFAULT 0,
+    season_id INTEGER NOT NULL DEFAULT 0,
+    player_id TEXT NOT NULL DEFAULT '',
+    config_base_id INTEGER NOT NULL,
+    runs_with_drop INTEGER NOT NULL DEFAULT 0,
+    total_quantity INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (zone_signature, level_id, season_id, player_id, config_base_id)
+)
+"""
+
+_ZONE_KEY = "COALESCE({r}.level_id, 0), COALESCE({r}.season_id, 0), COALESCE({r}.player_id, '')"
+
+_COUNT_ZONE_RUN = f"""
+    INSERT INTO zone_runs (zone_signature, level_id, season_id, player_id, runs, duration_seconds)
+    VALUES (
+        NEW.zone_signature, {_ZONE_KEY.format(r="NEW")}, 1,
+        ROUND((julianday(NEW.end_ts) - julianday(NEW.start_ts)) * 86400.0, 3)
+    )
+    ON CONFLICT (zone_signature, level_id, season_id, player_id) DO UPDATE SET
+        runs = runs + 1,
+        duration_seconds = duration_seconds + excluded.duration_seconds;
+"""
+
+# Runs are counted when they end; their loot is folded in at the same time
+CREATE_ZONE_DROPS_RUN_END_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS trg_zone_drops_run_end
+AFTER UPDATE OF end_ts ON runs
+WHEN OLD.end_ts IS NULL AND NEW.end_ts IS NOT NULL AND NEW.is_hub = 0
+BEGIN
+{_COUNT_ZONE_RUN}
+
+    INSERT INTO zone_drops
+        (zone_signature, level_id, season_id, player_id, config_base_id, runs_with_drop, total_quantity)
+    SELECT NEW.zone_signature, {_ZONE_KEY.format(r="NEW")}, config_base_id, 1, quantity
+    FROM run_loot
+    WHERE run_id = NEW.id AND kind = 'loot' AND quantity > 0
+    ON CONFLICT (zone_signature, level_id, season_id, player_id, config_base_id) DO UPDATE SET
+        runs_with_drop = runs_with_drop + 1,
+        total_quantity = total_quantity + excluded.total_quantity;
+END
+"""
+
+# Runs stored already ended (imports); their loot arrives as late loot
+CREATE_ZONE_DROPS_RUN_INSERT_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS trg_zone_drops_run_insert
+AFTER INSERT ON runs
+WHEN NEW.end_ts IS NOT NULL AND NEW.is_hub = 0
+BEGIN
+{_COUNT_ZONE_RUN}
+END
+"""
+
+# Loot recorded for a run that already ended: apply the change in its net
+# positive quantity (run_loot rows are inserted, then updated in place)
+def _late_drop_trigger(event: str, old_quantity: str) -> str:
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_zone_drops_late_{event.lower()}
+AFTER {event} ON run_loot
+WHEN NEW.kind = 'loot' AND (NEW.quantity > 0 OR {old_quantity} > 0)
+AND (SELECT end_ts IS NOT NULL AND is_hub = 0 FROM runs WHERE id = NEW.run_id)
+BEGIN
+    INSERT INTO zone_drops
+        (zone_signature, level_id, season_id, player_id, config_base_id, runs_with_drop, total_quantity)
+    SELECT r.zone_signature, {_ZONE_KEY.format(r="r")}, NEW.config_base_id,
+           (NEW.quantity > 0) - ({old_quantity} > 0),
+           MAX(NEW.quantity, 0) - MAX({old_quantity}, 0)
+    FROM runs r WHERE r.id = NEW.run_id
+    ON CONFLICT (zone_signature, level_id, season_id, player_id, config_base_id) DO UPDATE SET
+        runs_with_drop = runs_with_drop + excluded.runs_with_drop,
+        total_quantity = total_quantity + excluded.total_quantity;
+END
+"""
+
+
+CREATE_ZONE_DROPS_LATE_INSERT_TRIGGER = _late_drop_trigger("INSERT", "0")
+CREATE_ZONE_DROPS_LATE_UPDATE_TRIGGER = _late_drop_trigger("UPDATE", "OLD.quantity")
+
+# Bulk rebuild of zone_runs / zone_drops from stored runs and run_loot
+REBUILD_ZONE_DROPS_STATEMENTS = [
+    "DELETE FROM zone_runs",
+    "DELETE FROM zone_drops",
+    f"""INSERT INTO zone_runs (zone_signature, level_id, season_id, player_id, runs, duration_seconds)
+        SELECT r.zone_signature, {_ZONE_KEY.format(r="r")}, COUNT(*),
+               SUM(ROUND((julianday(r.end_ts) - julianday(r.start_ts)) * 86400.0, 3))
+        FROM runs r
+        WHERE r.end_ts IS NOT NULL AND r.is_hub = 0
+        GROUP BY 1, 2, 3, 4""",
+    f"""INSERT INTO zone_drops
+            (zone_signature, level_id, season_id, player_id, config_base_id, runs_with_drop, total_quantity)
+        SELECT r.zone_signature, {_ZONE_KEY.format(r="r")}, l.config_base_id, COUNT(*), SUM(l.quantity)
+        FROM runs r
+        JOIN run_loot l ON l.run_id = r.id
+        WHERE r.end_ts IS NOT NULL AND r.is_hub = 0 AND l.kind = 'loot' AND l.quantity > 0
+        GROUP BY 1, 2, 3, 4, 5""",
+]
+
+# Persisted run values. valued_prices is the price vector runs are valued
+# at (positive effective prices, 0 if unpriced), run_values the untaxed
+# loot value and map cost of each run against it, and run_value_totals their
+# sums over ended non-hub runs per season/player. Loot changes add their
+# difference; a price change revalues only the runs holding that item (found
+# through idx_run_loot_item) and moves the totals by the same difference.
+# season_id uses 0 and player_id '' for NULL; runs are valued at their own
+# season's prices. Trade tax is applied when reading. Legacy runs (no season
+# recorded) are stored at legacy (season 0) prices, but have always been
+# valued at the prices of the season being viewed, so readers with a season
+# context revalue them (see legacy_run_value_sql).
+CREATE_VALUED_PRICES = """
+CREATE TABLE IF NOT EXISTS valued_prices (
+    config_base_id INTEGER NOT NULL,
+    season_id INTEGER NOT NULL,
+    price_fe REAL NOT NULL DEFAULT 0,
+    previous_fe REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (config_base_id, season_id)
+)
+"""
+
+CREATE_RUN_VALUES = """
+CREATE TABLE IF NOT EXISTS run_values (
+    run_id INTEGER PRIMARY KEY,
+    season_id INTEGER NOT NULL DEFAULT 0,
+    player_id TEXT NOT NULL DEFAULT '',
+    fe_gained INTEGER NOT NULL DEFAULT 0,
+    item_value REAL NOT NULL DEFAULT 0,
+    map_cost REAL NOT NULL DEFAULT 0
+)
+"""
+
+CREATE_RUN_VALUE_TOTALS = """
+CREATE TABLE IF NOT EXISTS run_value_totals (
+    season_id INTEGER NOT NULL,
+    player_id TEXT NOT NULL,
+    fe_gained INTEGER NOT NULL DEFAULT 0,
+    item_value REAL NOT NULL DEFAULT 0,
+    map_cost REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (season_id, player_id)
+)
+"""
+
+# Inverted index: item -> runs that contain it
+CREATE_RUN_LOOT_ITEM_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_run_loot_item ON run_loot(config_base_id, run_id)
+"""
+
+_RUN_KEY = "COALESCE({r}.season_id, 0), COALESCE({r}.player_id, '')"
+
+
+def _loot_value_sql(kind: str, config_base_id: str, quantity: str, price: str) -> tuple[str, str, str]:
+    """(fe_gained, item_value, map_cost) contributed by one run_loot row."""
+    return (
+        f"CASE WHEN {kind} = 'loot' AND {config_base_id} = {FE_CONFIG_BASE_ID} THEN {quantity} ELSE 0 END",
+        f"CASE WHEN {kind} = 'loot' AND {config_base_id} != {FE_CONFIG_BASE_ID}"
+        f" THEN MAX({quantity}, 0) * {price} ELSE 0 END",
+        f"CASE WHEN {kind} = 'cost' THEN ABS({quantity}) * {price} ELSE 0 END",
+    )
+
+
+def _run_loot_value_trigger(event: str, old_quantity: str) -> str:
+    """Apply a run_loot row's change (new minus old contribution) to its run."""
+    price = f"""COALESCE((SELECT price_fe FROM valued_prices
+                 WHERE config_base_id = NEW.config_base_id AND season_id = COALESCE(r.season_id, 0)), 0)"""
+    new = _loot_value_sql("NEW.kind", "NEW.config_base_id", "NEW.quantity", price)
+    old = _loot_value_sql("NEW.kind", "NEW.config_base_id", old_quantity, price)
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_run_values_{event.split()[0].lower()}
+AFTER {event} ON run_loot
+BEGIN
+    INSERT INTO run_values (run_id, season_id, player_id, fe_gained, item_value, map_cost)
+    SELECT r.id, {_RUN_KEY.format(r="r")},
+           ({new[0]}) - ({old[0]}), ({new[1]}) - ({old[1]}), ({new[2]}) - ({old[2]})
+    FROM runs r WHERE r.id = NEW.run_id
+    ON CONFLICT (run_id) DO UPDATE SET
+        fe_gained = fe_gained + excluded.fe_gained,
+        item_value = item_value + excluded.item_value,
+        map_cost = map_cost + excluded.map_cost;
+
+    INSERT INTO run_value_totals (season_id, player_id, fe_gained, item_value, map_cost)
+    SELECT {_RUN_KEY.format(r="r")},
+           ({new[0]}) - ({old[0]}), ({new[1]}) - ({old[1]}), ({new[2]}) - ({old[2]})
+    FROM runs r WHERE r.id = NEW.run_id AND r.end_ts IS NOT NULL AND r.is_hub = 0
+    ON CONFLICT (season_id, player_id) DO UPDATE SET
+        fe_gained = fe_gained + excluded.fe_gained,
+        item_value = item_value + excluded.item_value,
+        map_cost = map_cost + excluded.map_cost;
+END
+"""
+
+
+CREATE_RUN_VALUES_INSERT_TRIGGER = _run_loot_value_trigger("INSERT", "0")
+CREATE_RUN_VALUES_UPDATE_TRIGGER = _run_loot_value_trigger("UPDATE OF quantity", "OLD.quantity")
+
+
+def _run_value_totals_sql(sign: str, run: str, condition: str = "") -> str:
+    """Add (sign '') or remove (sign '-') a run's values to/from the totals."""
+    return f"""
+    INSERT INTO run_value_totals (season_id, player_id, fe_gained, item_value, map_cost)
+    SELECT season_id, player_id, {sign}fe_gained, {sign}item_value, {sign}map_cost
+    FROM run_values WHERE run_id = {run}.id{condition}
+    ON CONFLICT (season_id, player_id) DO UPDATE SET
+        fe_gained = fe_gained + excluded.fe_gained,
+        item_value = item_value + excluded.item_value,
+        map_cost = map_cost + excluded.map_cost;"""
+
+
+CREATE_RUN_VALUES_RUN_END_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS trg_run_values_run_end
+AFTER UPDATE OF end_ts ON runs
+WHEN OLD.end_ts IS NULL AND NEW.end_ts IS NOT NULL AND NEW.is_hub = 0
+BEGIN{_run_value_totals_sql("", "NEW")}
+END
+"""
+
+CREATE_RUN_VALUES_RUN_DELETE_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS trg_run_values_run_delete
+AFTER DELETE ON runs
+BEGIN{_run_value_totals_sql("-", "OLD", " AND OLD.end_ts IS NOT NULL AND OLD.is_hub = 0")}
+    DELETE FROM run_values WHERE run_id = OLD.id;
+END
+"""
+
+
+def _revalue_trigger(name: str, event: str, table: str, row: str, when: str = "") -> str:
+    """
+    DDL for a trigger revaluing runs after a price row changes.
+
+    The item's new effective price is stored in valued_prices (keeping the
+    one runs were valued at in previous_fe); runs holding the item in that
+    season, and the totals, then move by quantity * the difference.
+    """
+    key = "{t}config_base_id = " + row + ".config_base_id AND {t}season_id = " + row + ".season_id"
+    diff = f"(SELECT price_fe - previous_fe FROM valued_prices WHERE {key.format(t='')})"
+    loot = f"""CASE WHEN {row}.config_base_id = {FE_CONFIG_BASE_ID} THEN 0 ELSE
+                   COALESCE((SELECT MAX(quantity, 0) FROM run_loot
+                             WHERE run_id = {{run}} AND config_base_id = {row}.config_base_id
+                               AND kind = 'loot'), 0) END"""
+    cost = f"""COALESCE((SELECT ABS(quantity) FROM run_loot
+                         WHERE run_id = {{run}} AND config_base_id = {row}.config_base_id
+                           AND kind = 'cost'), 0)"""
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_revalue_{name}
+AFTER {event} ON {table}{when}
+BEGIN
+    INSERT INTO valued_prices (config_base_id, season_id, price_fe, previous_fe)
+    SELECT {row}.config_base_id, {row}.season_id, COALESCE(MAX(({_EFFECTIVE_PRICE_SQL}), 0), 0), 0
+    FROM (SELECT 1) AS k
+    LEFT JOIN prices AS l ON {key.format(t="l.")}
+    LEFT JOIN cloud_price_cache AS c ON {key.format(t="c.")} AND c.unique_devices >= 1
+    WHERE true
+    ON CONFLICT (config_base_id, season_id) DO UPDATE SET
+        previous_fe = price_fe,
+        price_fe = excluded.price_fe;
+
+    UPDATE run_value_totals SET
+        item_value = item_value + {diff} * (
+            SELECT COALESCE(SUM({loot.format(run="r.id")}), 0) FROM runs r
+            WHERE r.id IN (SELECT run_id FROM run_loot WHERE config_base_id = {row}.config_base_id)
+              AND r.end_ts IS NOT NULL AND r.is_hub = 0
+              AND COALESCE(r.season_id, 0) = run_value_totals.season_id
+              AND COALESCE(r.player_id, '') = run_value_totals.player_id),
+        map_cost = map_cost + {diff} * (
+            SELECT COALESCE(SUM({cost.format(run="r.id")}), 0) FROM runs r
+            WHERE r.id IN (SELECT run_id FROM run_loot WHERE config_base_id = {row}.config_base_id)
+              AND r.end_ts IS NOT NULL AND r.is_hub = 0
+              AND COALESCE(r.season_id, 0) = run_value_totals.season_id
+              AND COALESCE(r.player_id, '') = run_value_totals.player_id)
+    WHERE season_id = {row}.season_id AND {diff} != 0;
+
+    UPDATE run_values SET
+        item_value = item_value + {diff} * {loot.format(run="run_values.run_id")},
+        map_cost = map_cost + {diff} * {cost.format(run="run_values.run_id")}
+    WHERE season_id = {row}.season_id AND {diff} != 0
+      AND run_id IN (SELECT run_id FROM run_loot WHERE config_base_id = {row}.config_base_id);
+END
+"""
+
+
+# A row moved to another item or season (e.g. migrate_legacy_prices) also
+# takes its price away from the old one
+_MOVED = "\nWHEN OLD.config_base_id != NEW.config_base_id OR OLD.season_id != NEW.season_id"
+
+REVALUE_TRIGGERS = [
+    _revalue_trigger("prices_insert", "INSERT", "prices", "NEW"),
+    _revalue_trigger("prices_update", "UPDATE", "prices", "NEW"),
+    _revalue_trigger("prices_delete", "DELETE", "prices", "OLD"),
+    _revalue_trigger("prices_move", "UPDATE", "prices", "OLD", _MOVED),
+    _revalue_trigger("cloud_prices_insert", "INSERT", "cloud_price_cache", "NEW"),
+    _revalue_trigger("cloud_prices_update", "UPDATE", "cloud_price_cache", "NEW"),
+    _revalue_trigger("cloud_prices_delete", "DELETE", "cloud_price_cache", "OLD"),
+    _revalue_trigger("cloud_prices_move", "UPDATE", "cloud_price_cache", "OLD", _MOVED),
+]
+
+# Bulk rebuild of valued_prices / run_values / run_value_totals
+_REBUILD_VALUES = _loot_value_sql("l.kind", "l.config_base_id", "l.quantity", "COALESCE(p.price_fe, 0)")
+
+
+def legacy_run_value_sql(run: str, season_id: int) -> tuple[str, str]:
+    """
+    SQL for the untaxed (item_value, map_cost) of a legacy run at one season's prices.
+
+    Args:
+        run: SQL expression for the run's id.
+        season_id: Season whose prices to use.
+    """
+    source = f"""FROM run_loot l
+        LEFT JOIN valued_prices p
+            ON p.config_base_id = l.config_base_id AND p.season_id = {int(season_id)}
+        WHERE l.run_id = {run}"""
+    return (
+        f"(SELECT COALESCE(SUM({_REBUILD_VALUES[1]}), 0) {source})",
+        f"(SELECT COALESCE(SUM({_REBUILD_VALUES[2]}), 0) {source})",
+    )
+
+
+REBUILD_RUN_VALUES_STATEMENTS = [
+    "DELETE FROM valued_prices",
+    "DELETE FROM run_values",
+    "DELETE FROM run_value_totals",
+    """INSERT INTO valued_prices (config_base_id, season_id, price_fe, previous_fe)
+        SELECT config_base_id, season_id, price_fe, 0 FROM effective_prices WHERE price_fe > 0""",
+    f"""INSERT INTO run_values (run_id, season_id, player_id, fe_gained, item_value, map_cost)
+        SELECT r.id, {_RUN_KEY.format(r="r")},
+               SUM({_REBUILD_VALUES[0]}), SUM({_REBUILD_VALUES[1]}), SUM({_REBUILD_VALUES[2]})
+        FROM runs r
+        JOIN run_loot l ON l.run_id = r.id
+        LEFT JOIN valued_prices p
+            ON p.config_base_id = l.config_base_id AND p.season_id = COALESCE(r.season_id, 0)
+        GROUP BY r.id""",
+    """INSERT INTO run_value_totals (season_id, player_id, fe_gained, item_value, map_cost)
+        SELECT v.season_id, v.player_id, SUM(v.fe_gained), SUM(v.item_value), SUM(v.map_cost)
+        FROM run_values v
+        JOIN runs r ON r.id = v.run_id
+        WHERE r.end_ts IS NOT NULL AND r.is_hub = 0
+        GROUP BY v.season_id, v.player_id""",
+]
+
 ALL_CREATE_STATEMENTS = [
     CREATE_SETTINGS,
     CREATE_RUNS,
@@ -165,4 +888,68 @@ ALL_CREATE_STATEMENTS = [
     CREATE_CLOUD_SYNC_QUEUE,
     CREATE_CLOUD_PRICE_CACHE,
     CREATE_CLOUD_PRICE_HISTORY,
+    CREATE_COUNTERS,
+    CREATE_MAP_SESSIONS,
+    CREATE_MAP_SESSIONS_INDEX,
+    CREATE_MAP_SESSIONS_END_INDEX,
+    CREATE_NET_WORTH_SNAPSHOTS,
+    CREATE_NET_WORTH_SNAPSHOTS_INDEX,
+    CREATE_DATA_VERSIONS,
+    CREATE_EFFECTIVE_PRICES_VIEW,
+]
+
+# Indexes and triggers on migrated columns - run after migrations
+POST_MIGRATION_STATEMENTS = [
+    CREATE_RUNS_ENTRY_INDEX,
+    CREATE_RUNS_ENTRY_HEADS_INDEX,
+    CREATE_RUN_ENTRIES_INSERT_TRIGGER,
+    CREATE_RUN_ENTRIES_UNHEAD_TRIGGER,
+    CREATE_RUN_ENTRIES_DELETE_TRIGGER,
+    CREATE_RUN_LOOT,
+    CREATE_RUN_LOOT_INSERT_TRIGGER,
+    CREATE_RUN_LOOT_DELETE_TRIGGER,
+    *DATA_VERSION_TRIGGERS,
+    CREATE_LATE_LOOT_VERSION_TRIGGER,
+    CREATE_RUN_COUNT_INSERT_TRIGGER,
+    CREATE_RUN_COUNT_DELETE_TRIGGER,
+    CREATE_ITEM_COUNT_INSERT_TRIGGER,
+    CREATE_ITEM_COUNT_DELETE_TRIGGER,
+    CREATE_ZONE_RUNS,
+    CREATE_ZONE_DROPS,
+    CREATE_ZONE_DROPS_RUN_END_TRIGGER,
+    CREATE_ZONE_DROPS_RUN_INSERT_TRIGGER,
+    CREATE_ZONE_DROPS_LATE_INSERT_TRIGGER,
+    CREATE_ZONE_DROPS_LATE_UPDATE_TRIGGER,
+    CREATE_VALUED_PRICES,
+    CREATE_RUN_VALUES,
+    CREATE_RUN_VALUE_TOTALS,
+    CREATE_RUN_LOOT_ITEM_INDEX,
+    CREATE_RUN_VALUES_INSERT_TRIGGER,
+    CREATE_RUN_VALUES_UPDATE_TRIGGER,
+    CREATE_RUN_VALUES_RUN_END_TRIGGER,
+    CREATE_RUN_VALUES_RUN_DELETE_TRIGGER,
+    *REVALUE_TRIGGERS,
+    CREATE_PRICE_HISTORY,
+    CREATE_PRICE_HISTORY_TRIGGER,
 ]
+
+# Tables that are partitioned by season: finished seasons are moved out of the
+# main database into per-season archive files (archive/season_<id>.db)
+ARCHIVE_CREATE_STATEMENTS = [
+    CREATE_RUNS,
+    CREATE_RUNS_INDEX,
+    CREATE_ITEM_DELTAS,
+    CREATE_ITEM_DELTAS_INDEX,
+    CREATE_ITEM_DELTAS_CONFIG_INDEX,
+    CREATE_PRICES,
+    CREATE_MAP_SESSIONS,
+    CREATE_MAP_SESSIONS_INDEX,
+    CREATE_MAP_SESSIONS_END_INDEX,
+]
+
+ARCHIVED_TABLES = ["runs", "item_deltas", "prices", "map_sessions"]
+
+
+def qualify_ddl(statement: str, schema: str) -> str:
+    """Rewrite a CREATE ... IF NOT EXISTS statement to target an attached schema."""
+    return statement.replace("IF NOT EXISTS ", f"IF NOT EXISTS {schema}.", 1)
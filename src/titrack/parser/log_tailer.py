@@ -37,6 +37,21 @@ class LogTailer:
         """Last known file size."""
         return self._file_size
 
+    def get_lag_bytes(self) -> Optional[int]:
+        """
+        Get how far the read position is behind the end of the file.
+
+        Returns:
+            Unread bytes, or None if the file doesn't exist.
+        """
+        current_size = self._get_file_size()
+        if current_size is None:
+            return None
+        # A file smaller than our position has rotated; it is read from the start
+        if current_size < self._position:
+            return current_size
+        return current_size - self._position
+
     def set_position(self, position: int, file_size: int) -> None:
         """
         Set position for resuming (e.g., from database).
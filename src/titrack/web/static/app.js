@@ -11,6 +11,9 @@ let lastInventoryHash = null;
 let lastStatsHash = null;
 let lastPlayerHash = null;
 const failedIcons = new Set(); // Track icons that failed to load
+let iconSprite = null; // Sprite sheet map from /api/icons/sprite
+let iconSpriteKey = null; // Id set the current sprite is complete for
+let iconSpriteState = null; // Id set and missing ids of the last sprite fetched
 
 // Chart instances
 let cumulativeValueChart = null;
@@ -53,6 +56,28 @@ async function fetchStatus() {
     return fetchJson('/status');
 }
 
+// Points per chart series; the server downsamples longer histories (LTTB)
+const CHART_MAX_POINTS = 500;
+
+async function fetchDashboard(sortBy = inventorySortBy, sortOrder = inventorySortOrder) {
+    // Revalidate every time: an unchanged dashboard comes back as a 304
+    // and the browser serves the cached body
+    try {
+        const response = await fetch(
+            `${API_BASE}/dashboard?page_size=20&sort_by=${sortBy}&sort_order=${sortOrder}&hours=24`
+                + `&max_points=${CHART_MAX_POINTS}`,
+            { cache: 'no-cache' }
+        );
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching /dashboard:', error);
+        return null;
+    }
+}
+
 async function fetchStats() {
     return fetchJson('/runs/stats');
 }
@@ -69,8 +94,8 @@ async function fetchInventory(sortBy = inventorySortBy, sortOrder = inventorySor
     return fetchJson(`/inventory?sort_by=${sortBy}&sort_order=${sortOrder}`);
 }
 
-async function fetchStatsHistory(hours = 24) {
-    return fetchJson(`/stats/history?hours=${hours}`);
+async function fetchIconSprite(configIds) {
+    return fetchJson(`/icons/sprite?ids=${configIds.join(',')}`);
 }
 
 async function fetchPlayer() {
@@ -378,6 +403,16 @@ let lastActiveRunHash = null;
 
 let lastActiveRunId = null;
 
+// Time since the active run started, counted on the client so a cached
+// (304) dashboard still shows a running clock
+function activeRunDuration(data) {
+    const started = Date.parse(data.start_ts);
+    if (Number.isNaN(started)) {
+        return data.duration_seconds;
+    }
+    return Math.max(0, (Date.now() - started) / 1000);
+}
+
 function renderActiveRun(data, forceRender = false) {
     const panel = document.getElementById('active-run-panel');
     const zoneEl = document.getElementById('active-run-zone');
@@ -407,7 +442,7 @@ function renderActiveRun(data, forceRender = false) {
     });
     if (!forceRender && newHash === lastActiveRunHash) {
         // Just update duration (always changes)
-        durationEl.textContent = `(${formatDuration(data.duration_seconds)})`;
+        durationEl.textContent = `(${formatDuration(activeRunDuration(data))})`;
         return;
     }
     lastActiveRunHash = newHash;
@@ -416,7 +451,7 @@ function renderActiveRun(data, forceRender = false) {
     // Show panel and update content
     panel.classList.remove('hidden');
     zoneEl.textContent = data.zone_name;
-    durationEl.textContent = `(${formatDuration(data.duration_seconds)})`;
+    durationEl.textContent = `(${formatDuration(activeRunDuration(data))})`;
 
     // Show value with cost info if map costs are enabled
     if (data.map_cost_fe !== null && data.map_cost_fe !== undefined && data.map_cost_fe > 0) {
@@ -1048,6 +1083,12 @@ const chartOptions = {
     },
 };
 
+// Columnar {t: [epoch ms], v: []} series -> chart points
+function seriesPoints(series) {
+    if (!series?.t) return [];
+    return series.t.map((t, i) => ({ x: t, y: series.v[i] }));
+}
+
 function renderCharts(data, forceRender = false) {
     const newHash = simpleHash(data);
     if (!forceRender && newHash === lastStatsHash) {
@@ -1056,16 +1097,10 @@ function renderCharts(data, forceRender = false) {
     lastStatsHash = newHash;
 
     // Prepare data for cumulative value chart
-    const cumulativeValueData = (data?.cumulative_value || []).map(p => ({
-        x: new Date(p.timestamp),
-        y: p.value,
-    }));
+    const cumulativeValueData = seriesPoints(data?.cumulative_value);
 
     // Prepare data for value/hour chart
-    const valueRateData = (data?.value_per_hour || []).map(p => ({
-        x: new Date(p.timestamp),
-        y: p.value,
-    }));
+    const valueRateData = seriesPoints(data?.value_per_hour);
 
     // Render or update Cumulative Value chart
     const cumulativeValueCtx = document.getElementById('cumulative-value-chart');
@@ -1399,16 +1434,29 @@ document.getElementById('help-modal').addEventListener('click', (e) => {
 
 async function refreshAll(forceRender = false) {
     try {
-        const [status, stats, runs, inventory, statsHistory, player, cloudStatus, activeRun] = await Promise.all([
-            fetchStatus(),
-            fetchStats(),
-            fetchRuns(),
-            fetchInventory(),
-            fetchStatsHistory(24),
+        const [dashboard, player, cloudStatus] = await Promise.all([
+            fetchDashboard(),
             fetchPlayer(),
-            fetchCloudStatus(),
-            fetchActiveRun()
+            fetchCloudStatus()
         ]);
+        const status = dashboard?.status ?? null;
+        const stats = dashboard?.stats ?? null;
+        const runs = dashboard?.runs ?? null;
+        const inventory = dashboard?.inventory ?? null;
+        const statsHistory = dashboard?.history ?? null;
+        const activeRun = dashboard?.active_run ?? null;
+
+        // One sprite sheet for every icon the tables show. Not awaited: the
+        // tables render with <img> icons first and again once it arrives
+        loadIconSprite([
+            ...(inventory?.items ?? []).map(i => i.config_base_id),
+            ...(activeRun?.loot ?? []).map(i => i.config_base_id)
+        ]).then(changed => {
+            if (changed) {
+                renderInventory(lastInventoryData, true);
+                renderActiveRun(activeRun, true);
+            }
+        });
 
         lastRunsData = runs;
         lastInventoryData = inventory;
@@ -1560,11 +1608,54 @@ function handleIconError(img) {
     img.style.display = 'none';
 }
 
+async function loadIconSprite(configIds) {
+    // Fetch a new sprite sheet when the set of icons changes, and again while
+    // the server is still downloading some of them. Returns true if the
+    // sheet changed (icons not on it keep using <img>).
+    const ids = [...new Set(configIds.filter(Boolean))].sort((a, b) => a - b).slice(0, 500);
+    const key = ids.join(',');
+    if (ids.length === 0 || key === iconSpriteKey) {
+        return false;
+    }
+    const sprite = await fetchIconSprite(ids);
+    if (!sprite) {
+        return false;
+    }
+    const state = `${key}|${sprite.missing.join(',')}`;
+    const changed = state !== iconSpriteState;
+    iconSprite = sprite;
+    iconSpriteState = state;
+    // Done once nothing is missing or nothing new arrived since the last try
+    if (sprite.missing.length === 0 || !changed) {
+        iconSpriteKey = key;
+    }
+    return changed;
+}
+
+function getSpriteIconHtml(configBaseId, cssClass) {
+    const cell = iconSprite?.icons?.[configBaseId];
+    if (!cell) {
+        return null;
+    }
+    // Percent offsets/sizes make the cell scale to whatever size the CSS class sets
+    const { columns, rows, cell_size: size } = iconSprite;
+    const posX = columns > 1 ? (cell.x / size) * 100 / (columns - 1) : 0;
+    const posY = rows > 1 ? (cell.y / size) * 100 / (rows - 1) : 0;
+    const style = `background-image: url('${iconSprite.sheet_url}'); `
+        + `background-size: ${columns * 100}% ${rows * 100}%; `
+        + `background-position: ${posX}% ${posY}%`;
+    return `<span class="${cssClass} sprite-icon" style="${style}"></span>`;
+}
+
 function getIconHtml(configBaseId, cssClass) {
     // Don't render icons that have previously failed
     if (!configBaseId || failedIcons.has(String(configBaseId))) {
         return '';
     }
+    const spriteHtml = getSpriteIconHtml(configBaseId, cssClass);
+    if (spriteHtml) {
+        return spriteHtml;
+    }
     // Use proxy endpoint to fetch icons (handles CDN headers server-side)
     const proxyUrl = `/api/icons/${configBaseId}`;
     return `<img src="${proxyUrl}" alt="" class="${cssClass}" data-config-id="${configBaseId}" onerror="handleIconError(this)">`;
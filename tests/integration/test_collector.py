@@ -7,10 +7,11 @@ from pathlib import Path
 import pytest
 
 from titrack.collector.collector import Collector
-from titrack.core.models import ItemDelta, Run
+from titrack.core.models import ItemDelta, Price, Run
 from titrack.db.connection import Database
 from titrack.db.repository import Repository
 from titrack.parser.patterns import FE_CONFIG_BASE_ID
+from titrack.parser.player_parser import PlayerInfo
 
 
 SAMPLE_LOG = """\
@@ -143,6 +144,23 @@ class TestCollectorIntegration:
         # Deltas during map run: 50 + 75 + 75 = 200
         assert summary[FE_CONFIG_BASE_ID] == 200
 
+    def test_map_session_finalized_on_hub(self, test_env):
+        """Test that returning to a hub writes the map's session."""
+        db = test_env["db"]
+        log_path = test_env["log_path"]
+        repo = Repository(db)
+
+        collector = Collector(db=db, log_path=log_path)
+        collector.initialize()
+        collector.process_file(from_beginning=True)
+
+        rows = db.fetchall("SELECT id FROM map_sessions")
+        assert len(rows) == 1
+
+        session = repo.get_map_sessions([rows[0]["id"]])[rows[0]["id"]]
+        assert session.fe_gained == 200
+        assert session.run_ids == [session.id]
+
     def test_slot_state_persistence(self, test_env):
         """Test that slot state is persisted to database."""
         db = test_env["db"]
@@ -299,3 +317,65 @@ class TestCollectorIntegration:
         # Final state should be 550
         fe_state = repo.get_slot_state(102, 0)
         assert fe_state.num == 550
+
+
+class TestNetWorthSnapshots:
+    """Net worth snapshots recorded as the collector processes the log."""
+
+    PLAYER = PlayerInfo(name="Qwyzzle", level=90, season_id=1, hero_id=1, player_id="p1")
+
+    def _snapshots(self, db):
+        return [
+            (row["net_worth_fe"], row["total_fe"])
+            for row in db.fetchall("SELECT * FROM net_worth_snapshots ORDER BY id")
+        ]
+
+    def test_snapshot_when_value_moves(self, test_env):
+        db = test_env["db"]
+        repo = Repository(db)
+        repo.set_player_context(1, "p1")
+        repo.upsert_price(Price(
+            config_base_id=200100, price_fe=20.0, source="manual",
+            updated_at=datetime(2026, 1, 26), season_id=1,
+        ))
+
+        collector = Collector(db=db, log_path=test_env["log_path"], player_info=self.PLAYER)
+        collector.initialize()
+        collector.process_file(from_beginning=True)
+
+        # 700 FE + 3 x 20 FE
+        assert self._snapshots(db) == [(760.0, 700)]
+
+        # Nothing changed - no new snapshot
+        collector.process_file()
+        assert len(self._snapshots(db)) == 1
+
+        # A price change outside the log is picked up from the data version
+        repo.upsert_price(Price(
+            config_base_id=200100, price_fe=40.0, source="manual",
+            updated_at=datetime(2026, 1, 26, 1), season_id=1,
+        ))
+        collector.process_file()
+        assert self._snapshots(db)[-1] == (820.0, 700)
+
+    def test_small_changes_are_not_recorded(self, test_env):
+        db = test_env["db"]
+        log_path = test_env["log_path"]
+
+        collector = Collector(db=db, log_path=log_path, player_info=self.PLAYER)
+        collector.initialize()
+        collector.process_file(from_beginning=True)
+        with open(log_path, "a") as f:
+            f.write(
+                "[2026.01.26-10.10.00:001][  0]GameLog: Display: [Game] BagMgr@:Modfy BagItem "
+                "PageId = 102 SlotId = 0 ConfigBaseId = 100300 Num = 703\n"
+            )
+        collector.process_file()
+
+        assert self._snapshots(db) == [(700.0, 700)]
+
+        # A restarted collector continues from the stored snapshot
+        restarted = Collector(db=db, log_path=log_path, player_info=self.PLAYER)
+        restarted.initialize()
+        restarted.process_file()
+        assert len(self._snapshots(db)) == 1
@@ -0,0 +1,57 @@
+"""Shared helpers for inserting test runs and item deltas."""
+
+from datetime import datetime, timedelta
+
+from titrack.core.models import EventContext, ItemDelta, Run
+
+
+def at(minute=0, second=0, hour=10):
+    """A time on the day the test runs happen (10:00 by default)."""
+    return datetime(2026, 1, 26, hour, minute, second)
+
+
+def add_run(
+    repo, start, uid=None, zone="Map_Test", level_type=3, is_hub=False, ended=True,
+    duration=30, loot=None, cost=None, season_id=1,
+):
+    """
+    Insert a run of duration seconds for player p1 and return its id.
+
+    loot and cost map config_base_id -> quantity picked up / spent opening
+    the map; they are recorded before the run ends, as the collector does.
+    """
+    run_id = repo.insert_run(Run(
+        id=None,
+        zone_signature="Hub" if is_hub else zone,
+        start_ts=start,
+        is_hub=is_hub,
+        level_type=None if is_hub else level_type,
+        level_uid=uid,
+        season_id=season_id,
+        player_id="p1",
+    ))
+    for config_base_id, quantity in (loot or {}).items():
+        add_delta(
+            repo, run_id, config_base_id, quantity, start + timedelta(seconds=10),
+            season_id=season_id,
+        )
+    for config_base_id, quantity in (cost or {}).items():
+        add_delta(
+            repo, run_id, config_base_id, -quantity, start + timedelta(seconds=1),
+            proto_name="Spv3Open", page_id=103, season_id=season_id,
+        )
+    if ended:
+        repo.update_run_end(run_id, start + timedelta(seconds=duration))
+    return run_id
+
+
+def add_delta(
+    repo, run_id, config_base_id, delta, timestamp=None,
+    proto_name="PickItems", page_id=102, season_id=1,
+):
+    """Record an item delta of player p1 (at 10:00:10 by default)."""
+    repo.insert_delta(ItemDelta(
+        page_id=page_id, slot_id=0, config_base_id=config_base_id, delta=delta,
+        context=EventContext.PICK_ITEMS, proto_name=proto_name, run_id=run_id,
+        timestamp=timestamp or at(0, 10), season_id=season_id, player_id="p1",
+    ))
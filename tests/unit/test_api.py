@@ -1,5 +1,6 @@
 """Tests for API routes."""
 
+import json
 from datetime import datetime, timedelta
 
 import pytest
@@ -11,6 +12,8 @@ from titrack.db.connection import Database
 from titrack.db.repository import Repository
 from titrack.parser.patterns import FE_CONFIG_BASE_ID
 
+from tests.unit.helpers import add_run, at
+
 
 @pytest.fixture
 def db(tmp_path):
@@ -113,6 +116,45 @@ class TestStatusEndpoint:
         data = response.json()
         assert data["status"] == "ok"
         assert data["collector_running"] is False
+        assert data["collector_lag_bytes"] is None
+
+    def test_status_counts_runs_in_context(self, db, repo):
+        start = datetime(2026, 1, 26, 10, 0, 0)
+        for season_id, player_id in ((1, "p1"), (1, "p1"), (1, "p2"), (None, None)):
+            repo.insert_run(Run(
+                id=None, zone_signature="Map", start_ts=start, end_ts=start,
+                season_id=season_id, player_id=player_id,
+            ))
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        # Own runs plus untagged legacy runs
+        assert client.get("/api/status").json()["run_count"] == 3
+
+        app.state.repo.clear_run_data()
+        assert client.get("/api/status").json()["run_count"] == 0
+
+    def test_status_reports_collector_health(self, db, tmp_path):
+        from titrack.collector.collector import Collector
+
+        log_path = tmp_path / "UE_game.log"
+        log_path.write_text(
+            "[2026.01.26-10.00.00:000][  0]GameLog: Display: [Game] ItemChange@ ProtoName=PickItems start\n"
+        )
+        collector = Collector(db, log_path)
+        app = create_app(db, log_path=log_path, collector_running=True, collector=collector)
+        client = TestClient(app)
+
+        data = client.get("/api/status").json()
+        assert data["collector_lag_bytes"] == log_path.stat().st_size
+        assert data["last_poll_at"] is None
+
+        collector.process_file()
+        data = client.get("/api/status").json()
+        assert data["collector_lag_bytes"] == 0
+        assert data["last_event_at"] is not None
+        assert data["last_poll_at"] is not None
 
 
 class TestRunsEndpoints:
@@ -144,6 +186,27 @@ class TestRunsEndpoints:
         assert data["id"] == 1
         assert data["fe_gained"] == 100
 
+    def test_get_run_with_historical_prices(self, seeded_db, repo):
+        now = datetime.now()
+        repo.upsert_price(Price(
+            config_base_id=200001, price_fe=4.0, source="exchange",
+            updated_at=now - timedelta(hours=1),
+        ))
+        repo.upsert_price(Price(
+            config_base_id=200001, price_fe=6.0, source="exchange",
+            updated_at=now + timedelta(minutes=1),
+        ))
+        repo.insert_delta(ItemDelta(
+            page_id=102, slot_id=1, config_base_id=200001, delta=2,
+            context=EventContext.PICK_ITEMS, proto_name="PickItems", run_id=1, timestamp=now,
+        ))
+        client = TestClient(create_app(seeded_db))
+
+        assert client.get("/api/runs/1").json()["total_value"] == 112.0
+        data = client.get("/api/runs/1?historical_prices=true").json()
+        assert data["total_value"] == 108.0
+        assert {item["config_base_id"]: item["price_fe"] for item in data["loot"]}[200001] == 4.0
+
     def test_get_run_not_found(self, client):
         response = client.get("/api/runs/999")
         assert response.status_code == 404
@@ -204,6 +267,21 @@ class TestItemsEndpoints:
         assert len(data["items"]) == 1
         assert data["items"][0]["name_en"] == "Flame Elementium"
 
+    def test_search_items_paginated(self, db, repo):
+        repo.upsert_items_batch([
+            Item(config_base_id=990000 + i, name_en=f"Qwyzzle {i}", name_cn=None,
+                 type_cn=None, icon_url=None, url_en=None, url_cn=None)
+            for i in range(5)
+        ])
+        client = TestClient(create_app(db))
+
+        response = client.get("/api/items?search=qwyzzle&limit=2&page=3")
+
+        data = response.json()
+        assert data["total"] == 5
+        assert (data["page"], data["page_size"]) == (3, 2)
+        assert [i["name_en"] for i in data["items"]] == ["Qwyzzle 4"]
+
     def test_get_item_by_id(self, seeded_db):
         app = create_app(seeded_db)
         client = TestClient(app)
@@ -238,6 +316,132 @@ class TestStatsEndpoints:
         assert len(data["cumulative_value"]) == 1
         assert data["cumulative_value"][0]["value"] == 100  # FE from seeded run (no prices)
 
+    def test_history_window_uses_stored_baseline(self, db, repo):
+        """Sessions before the window count towards the cumulative start only."""
+        now = datetime.now()
+        # (minutes ago, fe) - one map long before the window, one in the
+        # one-hour lead-in and two inside the last hour
+        for minutes_ago, fe in ((300, 1000), (75, 60), (30, 40), (10, 20)):
+            run_id = add_run(
+                repo, now - timedelta(minutes=minutes_ago + 5), minutes_ago, duration=300,
+                loot={FE_CONFIG_BASE_ID: fe},
+            )
+            repo.set_player_context(1, "p1")
+            repo.finalize_map_session(run_id)
+
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        data = client.get("/api/stats/history?hours=1").json()
+
+        assert [p["value"] for p in data["cumulative_fe"]] == [1100, 1120]
+        # The first point's window reaches back into the lead-in map
+        assert data["value_per_hour"][0]["value"] == round(100 / 600 * 3600, 2)
+        assert data["value_per_hour"][1]["value"] == round(60 / 600 * 3600, 2)
+
+    def test_listing_stats_and_history_agree_after_price_change(self, db, repo):
+        now = datetime.now()
+        repo.set_player_context(1, "p1")
+        for minutes_ago in (50, 20):
+            run_id = add_run(
+                repo, now - timedelta(minutes=minutes_ago + 5), minutes_ago, duration=300,
+                loot={FE_CONFIG_BASE_ID: 30, 990001: 2},
+            )
+            repo.finalize_map_session(run_id)
+        # Prices and tax change after the sessions were finalized
+        repo.upsert_price(Price(config_base_id=990001, price_fe=7.0, source="manual", season_id=1))
+        repo.set_setting("trade_tax_enabled", "true")
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        runs = client.get("/api/runs").json()["runs"]
+        stats = client.get("/api/runs/stats").json()
+        history = client.get("/api/stats/history?hours=2").json()
+
+        expected = 2 * (30 + 14 * 0.875)
+        assert sum(r["total_value"] for r in runs) == pytest.approx(expected)
+        assert stats["total_value"] == pytest.approx(expected)
+        assert history["cumulative_value"][-1]["value"] == pytest.approx(expected)
+
+    def test_open_entries_are_valued_in_one_read(self, db, repo):
+        now = datetime.now()
+        repo.set_player_context(1, "p1")
+        repo.upsert_price(Price(config_base_id=990001, price_fe=5.0, source="manual", season_id=1))
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        def add_open_entry(minutes_ago):
+            # Ended but never finalized into a map session
+            add_run(
+                repo, now - timedelta(minutes=minutes_ago + 5), minutes_ago, duration=300,
+                loot={FE_CONFIG_BASE_ID: 10, 990001: 2},
+            )
+
+        def history_statements():
+            statements = []
+            db.connection.set_trace_callback(statements.append)
+            try:
+                data = client.get("/api/stats/history?hours=2").json()
+            finally:
+                db.connection.set_trace_callback(None)
+            return data, len(statements)
+
+        add_open_entry(50)
+        _, one_entry = history_statements()
+        for minutes_ago in (40, 30, 20, 10):
+            add_open_entry(minutes_ago)
+        data, five_entries = history_statements()
+
+        assert [p["value"] for p in data["cumulative_value"]] == [20, 40, 60, 80, 100]
+        assert five_entries == one_entry
+
+    def test_history_series_is_columnar_and_downsampled(self, db, repo):
+        now = datetime.now()
+        repo.set_player_context(1, "p1")
+        for i in range(20):
+            run_id = add_run(
+                repo, now - timedelta(minutes=61 - i * 3), i, duration=60,
+                loot={FE_CONFIG_BASE_ID: 500 if i == 9 else 10},
+            )
+            repo.finalize_map_session(run_id)
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        full = client.get("/api/stats/history?hours=2").json()
+        data = client.get("/api/stats/history/series?hours=2&max_points=5").json()
+
+        assert data["total_points"] == 20
+        rate = data["value_per_hour"]
+        assert len(rate["t"]) == len(rate["v"]) == 5
+        assert max(rate["v"]) == max(p["value"] for p in full["value_per_hour"])
+        fe = data["cumulative_fe"]
+        assert fe["v"][-1] == full["cumulative_fe"][-1]["value"] == 690
+        assert fe["t"][-1] == int(
+            datetime.fromisoformat(full["cumulative_fe"][-1]["timestamp"]).timestamp() * 1000
+        )
+        assert client.get("/api/stats/history/series?max_points=2").status_code == 422
+
+    def test_net_worth_series(self, db, repo):
+        now = datetime.now()
+        repo.set_player_context(1, "p1")
+        for hours_ago, value in [(30, 100.0), (20, 150.0), (2, 400.0), (1, 380.0)]:
+            repo.insert_net_worth_snapshot(now - timedelta(hours=hours_ago), value, int(value))
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        data = client.get("/api/stats/net-worth").json()
+        window = client.get("/api/stats/net-worth?hours=12").json()
+
+        assert data["total_points"] == 4
+        assert data["net_worth"]["v"] == [100.0, 150.0, 400.0, 380.0]
+        assert data["total_fe"]["v"][-1] == 380
+        # The window opens with the value held at its start
+        assert window["net_worth"]["v"] == [150.0, 400.0, 380.0]
 
 class TestPricesEndpoints:
     def test_list_prices_empty(self, client):
@@ -289,6 +493,136 @@ class TestPricesEndpoints:
         assert data["price_fe"] == 1.0
         assert data["name"] == "Flame Elementium"
 
+    @pytest.fixture
+    def priced_db(self, db, repo):
+        repo.upsert_items_batch([
+            Item(config_base_id=990000 + i, name_en=f"Qwyzzle {i}", name_cn=None,
+                 type_cn=None, icon_url=None, url_en=None, url_cn=None)
+            for i in range(4)
+        ])
+        repo.upsert_prices_batch([
+            Price(config_base_id=990000 + i, price_fe=float(10 - i),
+                  source="manual" if i % 2 else "exchange",
+                  updated_at=datetime(2026, 1, 1) + timedelta(hours=i))
+            for i in range(4)
+        ] + [
+            Price(config_base_id=990099, price_fe=1.0, source="manual",
+                  updated_at=datetime(2026, 1, 1))
+        ])
+        return db
+
+    def test_list_prices_filter_sort_page(self, priced_db):
+        client = TestClient(create_app(priced_db))
+
+        data = client.get(
+            "/api/prices?search=qwyzzle&sort_by=price&sort_order=desc&page=2&page_size=2"
+        ).json()
+
+        assert data["total"] == 4
+        assert (data["page"], data["page_size"]) == (2, 2)
+        assert [p["name"] for p in data["prices"]] == ["Qwyzzle 2", "Qwyzzle 3"]
+
+        manual = client.get("/api/prices?source=manual").json()
+        assert [p["name"] for p in manual["prices"]] == [
+            "Qwyzzle 1", "Qwyzzle 3", "Unknown 990099",
+        ]
+
+    def test_export_streams_seed_document(self, priced_db, repo):
+        client = TestClient(create_app(priced_db))
+
+        with client.stream("GET", "/api/prices/export") as response:
+            chunks = list(response.iter_bytes())
+
+        assert response.headers["content-disposition"].endswith("titrack_prices_seed.json")
+        data = json.loads(b"".join(chunks))
+        assert data["meta"]["count"] == 5
+        assert data["prices"][0] == {
+            "id": "990099", "name_en": None, "price_fe": 1.0, "source": "manual",
+        }
+        assert [p["id"] for p in data["prices"][1:]] == [str(990000 + i) for i in range(4)]
+
+    def test_export_reads_in_batches(self, priced_db, repo):
+        batches = list(repo.iter_price_export(batch_size=2))
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+
+class TestZoneAnalyticsEndpoint:
+    def test_zone_analytics(self, db, repo):
+        repo.set_player_context(1, "p1")
+        for i, fe in enumerate([60, 120]):
+            run_id = add_run(repo, at(i), i, zone="Map_A", loot={FE_CONFIG_BASE_ID: fe})
+            repo.finalize_map_session(run_id)
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        response = client.get("/api/stats/zones/analytics")
+
+        assert response.status_code == 200
+        zone = response.json()["zones"][0]
+        assert zone["runs"] == 2
+        assert zone["median_value"] == 90.0
+        assert zone["avg_duration_seconds"] == 30.0
+        assert zone["fe_per_hour"] == 180 / (60 / 3600)
+        assert zone["nightmare_share"] == 0.0
+
+
+class TestDropStatsEndpoint:
+    def test_drop_stats(self, db, repo):
+        repo.set_player_context(1, "p1")
+        for i in range(2):
+            add_run(repo, at(i), i, zone="Map_A", loot={FE_CONFIG_BASE_ID: 30 * (i + 1)})
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        response = client.get("/api/stats/drops?zone_signature=Map_A")
+
+        assert response.status_code == 200
+        drop = response.json()["drops"][0]
+        assert drop["config_base_id"] == FE_CONFIG_BASE_ID
+        assert (drop["runs"], drop["runs_with_drop"], drop["drop_rate"]) == (2, 2, 1.0)
+        assert drop["value_per_run"] == 45.0
+        assert drop["value_per_hour"] == 90 / (60 / 3600)
+        assert client.get("/api/stats/drops?zone_signature=Map_B").json()["drops"] == []
+
+
+class TestExportEndpoint:
+    def test_export_runs_ndjson(self, seeded_db):
+        client = TestClient(create_app(seeded_db))
+
+        with client.stream("GET", "/api/export/runs") as response:
+            body = b"".join(response.iter_bytes())
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"].endswith("titrack_runs.ndjson")
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        assert len(records) == 1
+        assert records[0]["zone_signature"] == "TestZone"
+        assert records[0]["fe_gained"] == 100
+        assert records[0]["loot"][0]["config_base_id"] == FE_CONFIG_BASE_ID
+
+    def test_export_runs_csv(self, seeded_db):
+        client = TestClient(create_app(seeded_db))
+
+        response = client.get("/api/export/runs?format=csv&unit=session")
+
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.splitlines()
+        assert lines[0].startswith("id,run_ids,zone_name,")
+        assert len(lines) == 2
+        assert ",loot,100300,Flame Elementium,100," in lines[1]
+
+    def test_export_runs_since_filter(self, seeded_db):
+        client = TestClient(create_app(seeded_db))
+        since = (datetime.now() + timedelta(hours=1)).isoformat()
+
+        response = client.get("/api/export/runs", params={"since": since})
+
+        assert response.status_code == 200
+        assert response.content == b""
+
 
 class TestIconsEndpoint:
     def test_get_icon_no_item(self, client):
@@ -317,3 +651,398 @@ class TestIconsEndpoint:
         response = client.get("/api/icons/999888")
         assert response.status_code == 404
         assert "No icon available" in response.json()["detail"]
+
+
+class TestRunsPagination:
+    @pytest.fixture
+    def paged_client(self, db, repo):
+        """Six listing entries for one player: five split maps and a nightmare."""
+        start = datetime(2026, 1, 26, 10, 0, 0)
+        minute = 0
+        for uid in range(1, 6):
+            # Each map is entered twice (split run) then a hub visit
+            for _ in range(2):
+                repo.insert_run(Run(
+                    id=None, zone_signature=f"Map_{uid}",
+                    start_ts=start + timedelta(minutes=minute),
+                    end_ts=start + timedelta(minutes=minute + 1),
+                    level_type=3, level_uid=uid, season_id=1, player_id="p1",
+                ))
+                minute += 1
+            if uid == 5:
+                repo.insert_run(Run(
+                    id=None, zone_signature="Map_5",
+                    start_ts=start + timedelta(minutes=minute),
+                    end_ts=start + timedelta(minutes=minute + 1),
+                    level_type=11, level_uid=uid, season_id=1, player_id="p1",
+                ))
+                minute += 1
+            repo.insert_run(Run(
+                id=None, zone_signature="Hub",
+                start_ts=start + timedelta(minutes=minute),
+                end_ts=start + timedelta(minutes=minute + 1),
+                is_hub=True, season_id=1, player_id="p1",
+            ))
+            minute += 1
+
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        return TestClient(app)
+
+    def test_total_counts_consolidated_entries(self, paged_client):
+        data = paged_client.get("/api/runs?page_size=100").json()
+        assert data["total"] == 6
+        assert len(data["runs"]) == 6
+        assert data["next_cursor"] is None
+
+    def test_cursor_walks_all_entries_once(self, paged_client):
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/runs?page_size=2" + (f"&cursor={cursor}" if cursor else "")
+            data = paged_client.get(url).json()
+            assert data["total"] == 6
+            seen += [(r["id"], r["is_nightmare"]) for r in data["runs"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        full = paged_client.get("/api/runs?page_size=100").json()["runs"]
+        assert seen == [(r["id"], r["is_nightmare"]) for r in full]
+        assert all(r["consolidated_run_ids"] for r in full if not r["is_nightmare"])
+
+    def test_invalid_cursor(self, paged_client):
+        response = paged_client.get("/api/runs?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+
+class TestRunsQueryCount:
+    @pytest.fixture
+    def busy_db(self, db, repo):
+        """Thirty single-run maps, each with several items and a map cost."""
+        for i in range(30):
+            add_run(
+                repo, at(2 * i), i + 1, zone=f"Map_{i}", duration=60,
+                loot={config_id: 5 for config_id in (FE_CONFIG_BASE_ID, 200001, 200002, 200003)},
+                cost={300001: 1},
+            )
+            repo.upsert_price(Price(config_base_id=200001, price_fe=2.0, source="manual", season_id=1))
+        repo.set_setting("map_costs_enabled", "true")
+        return db
+
+    def _count_queries(self, db, client, url):
+        statements = []
+        db.connection.set_trace_callback(statements.append)
+        try:
+            response = client.get(url)
+        finally:
+            db.connection.set_trace_callback(None)
+        assert response.status_code == 200
+        return len(statements), response.json()
+
+    def test_list_runs_query_count_is_bounded(self, busy_db):
+        app = create_app(busy_db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        small, data = self._count_queries(busy_db, client, "/api/runs?page_size=2")
+        large, data = self._count_queries(busy_db, client, "/api/runs?page_size=20")
+
+        assert len(data["runs"]) == 20
+        assert data["runs"][0]["fe_gained"] == 5
+        assert data["runs"][0]["total_value"] == 15.0
+        assert data["runs"][0]["map_cost_items"][0]["config_base_id"] == 300001
+        # Query count does not grow with the number of runs on the page
+        assert large == small
+        assert large <= 15
+
+    def test_get_stats_query_count_is_bounded(self, busy_db):
+        app = create_app(busy_db)
+        app.state.repo.set_player_context(1, "p1")
+        client = TestClient(app)
+
+        count, data = self._count_queries(busy_db, client, "/api/runs/stats")
+        assert data["total_runs"] == 30
+        assert data["total_fe"] == 150
+        assert count <= 15
+
+
+class TestDashboardEndpoint:
+    @pytest.fixture
+    def dashboard_app(self, db, repo):
+        """App with one finished run and some FE in the bag for player p1."""
+        now = datetime.now()
+        add_run(
+            repo, now - timedelta(minutes=5), 1, duration=300, loot={FE_CONFIG_BASE_ID: 100}
+        )
+        repo.upsert_slot_state(SlotState(
+            page_id=102, slot_id=0, config_base_id=FE_CONFIG_BASE_ID, num=500,
+            updated_at=now, player_id="p1",
+        ))
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        return app
+
+    def test_dashboard_returns_all_sections(self, dashboard_app):
+        client = TestClient(dashboard_app)
+
+        response = client.get("/api/dashboard")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"]["run_count"] == 1
+        assert data["stats"]["total_fe"] == 100
+        assert len(data["runs"]["runs"]) == 1
+        assert data["active_run"] is None
+        assert data["inventory"]["total_fe"] == 500
+        assert data["history"]["cumulative_fe"]["v"] == [100]
+        assert response.headers["etag"]
+
+    def test_unchanged_dashboard_is_not_modified(self, db, dashboard_app):
+        client = TestClient(dashboard_app)
+        etag = client.get("/api/dashboard").headers["etag"]
+
+        statements = []
+        db.connection.set_trace_callback(statements.append)
+        try:
+            response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+        finally:
+            db.connection.set_trace_callback(None)
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        # Only the data version is read
+        assert len(statements) == 1
+
+    def test_writes_change_the_etag(self, dashboard_app, repo):
+        client = TestClient(dashboard_app)
+        etag = client.get("/api/dashboard").headers["etag"]
+
+        repo.set_setting("trade_tax_enabled", "true")
+        response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+
+        repo.upsert_slot_state(SlotState(
+            page_id=102, slot_id=0, config_base_id=FE_CONFIG_BASE_ID, num=600,
+            updated_at=datetime.now(), player_id="p1",
+        ))
+        response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["inventory"]["total_fe"] == 600
+
+    def test_context_change_changes_the_etag(self, dashboard_app):
+        client = TestClient(dashboard_app)
+        etag = client.get("/api/dashboard").headers["etag"]
+
+        dashboard_app.state.repo.set_player_context(2, "p1")
+        response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["stats"]["total_fe"] == 0
+
+    def test_sections_match_their_endpoints(self, dashboard_app):
+        client = TestClient(dashboard_app)
+
+        data = client.get("/api/dashboard").json()
+
+        assert data["stats"] == client.get("/api/runs/stats").json()
+        assert data["runs"] == client.get("/api/runs").json()
+        assert data["inventory"] == client.get("/api/inventory").json()
+        assert data["history"] == client.get("/api/stats/history/series").json()
+
+
+class TestResponseCache:
+    @pytest.fixture
+    def cached_app(self, db, repo):
+        repo.upsert_price(Price(config_base_id=200001, price_fe=2.0, source="manual", season_id=1))
+        app = create_app(db)
+        app.state.repo.set_player_context(1, "p1")
+        return app
+
+    def test_repeated_request_is_served_from_cache(self, cached_app):
+        client = TestClient(cached_app)
+
+        first = client.get("/api/prices")
+        second = client.get("/api/prices")
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.json() == first.json()
+        # Other query params are cached separately
+        assert client.get("/api/prices?x=1").headers["x-cache"] == "MISS"
+
+    def test_price_write_invalidates(self, cached_app, repo):
+        client = TestClient(cached_app)
+        client.get("/api/prices")
+
+        repo.upsert_price(Price(config_base_id=200001, price_fe=3.0, source="manual", season_id=1))
+        response = client.get("/api/prices")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert response.json()["prices"][0]["price_fe"] == 3.0
+
+    def test_concurrent_identical_requests_compute_once(self):
+        import asyncio
+
+        import httpx
+        from fastapi import FastAPI
+
+        from titrack.api.cache import ResponseCache, ResponseCacheMiddleware
+        from titrack.db.repository import PlayerContext
+
+        class StubRepo:
+            context = PlayerContext(1, "p1")
+
+            def get_data_version(self):
+                return 1
+
+        app = FastAPI()
+        app.state.repo = StubRepo()
+        app.add_middleware(ResponseCacheMiddleware, cache=ResponseCache())
+        calls = []
+
+        @app.get("/api/runs/stats")
+        async def slow_stats():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"total_runs": 1}
+
+        async def fetch_many():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(client.get("/api/runs/stats") for _ in range(5)))
+
+        responses = asyncio.run(fetch_many())
+
+        assert len(calls) == 1
+        assert all(r.json() == {"total_runs": 1} for r in responses)
+
+
+class TestCompression:
+    @pytest.fixture
+    def compressed_app(self):
+        from fastapi import FastAPI
+        from fastapi.responses import StreamingResponse
+
+        from titrack.api.compression import CompressionMiddleware
+
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+        @app.get("/large")
+        def large():
+            return {"items": [{"id": i, "name": f"Item {i}"} for i in range(500)]}
+
+        @app.get("/small")
+        def small():
+            return {"ok": True}
+
+        @app.get("/stream")
+        def stream():
+            return StreamingResponse(
+                (f"line {i}\n".encode() for i in range(1000)), media_type="text/plain"
+            )
+
+        return app
+
+    def test_large_response_is_gzipped(self, compressed_app):
+        client = TestClient(compressed_app)
+
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()["items"]) == 500
+
+    def test_small_response_is_not_compressed(self, compressed_app):
+        client = TestClient(compressed_app)
+
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_identity_when_client_does_not_accept(self, compressed_app):
+        client = TestClient(compressed_app)
+
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert len(response.json()["items"]) == 500
+
+    def test_streaming_response_is_compressed_in_chunks(self, compressed_app):
+        client = TestClient(compressed_app)
+
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.splitlines()[-1] == "line 999"
+
+    def test_app_uses_compression(self, db):
+        client = TestClient(create_app(db))
+
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers.get("content-encoding") == "gzip"
+
+
+class TestDatabaseExecutor:
+    @pytest.fixture
+    def executor_app(self):
+        import threading
+        import time
+
+        from fastapi import APIRouter, FastAPI
+
+        from titrack.api.executor import db_route
+
+        router = APIRouter()
+
+        @db_route(router.get("/read"))
+        def read_route():
+            return {"thread": threading.current_thread().name}
+
+        @db_route(router.post("/write"), write=True)
+        def write_route():
+            return {"thread": threading.current_thread().name}
+
+        @db_route(router.get("/slow"), timeout=0.05)
+        def slow_route():
+            time.sleep(0.3)
+            return {}
+
+        app = FastAPI()
+        app.include_router(router)
+        app.state.read_route = read_route
+        return app
+
+    def test_reads_and_writes_use_separate_pools(self, executor_app):
+        client = TestClient(executor_app)
+
+        assert client.get("/read").json()["thread"].startswith("titrack-db-read")
+        assert client.post("/write").json()["thread"].startswith("titrack-db-write")
+
+    def test_timeout_returns_503(self, executor_app):
+        client = TestClient(executor_app)
+
+        response = client.get("/slow")
+
+        assert response.status_code == 503
+        assert "timed out" in response.json()["detail"]
+
+    def test_decorated_function_stays_sync(self, executor_app):
+        # Other routes (e.g. the dashboard) call route functions directly
+        assert "thread" in executor_app.state.read_route()
+
+    def test_app_routes_run_on_db_executor(self):
+        import inspect
+
+        from titrack.api.routes import runs
+
+        route = next(r for r in runs.router.routes if r.path == "/api/runs/stats")
+
+        assert inspect.iscoroutinefunction(route.endpoint)
+        assert not inspect.iscoroutinefunction(runs.get_stats)
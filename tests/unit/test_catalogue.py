@@ -0,0 +1,101 @@
+"""Tests for the prebuilt item catalogue."""
+
+import json
+import sqlite3
+
+import pytest
+
+from titrack.db.catalogue import apply_catalogue, build_catalogue, get_catalogue_version
+from titrack.db.schema import CREATE_ITEMS, CREATE_SETTINGS
+
+
+def write_seed(path, items):
+    path.write_text(json.dumps({"meta": {}, "items": items}), encoding="utf-8")
+
+
+SEED_ITEMS = [
+    {"id": "100300", "name_en": "Flame Elementium", "name_cn": "初火源质", "type_cn": None,
+     "img": "https://example.com/fe.webp", "url_en": None, "url_cn": None},
+    {"id": "200001", "name_en": None, "name_cn": "测试", "type_cn": "材料",
+     "img": "https://example.com/a.webp", "url_en": None, "url_cn": None},
+]
+
+
+@pytest.fixture
+def conn():
+    """Bare main database with the settings and items tables."""
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.execute(CREATE_SETTINGS)
+    connection.execute(CREATE_ITEMS)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    seed = tmp_path / "seed.json"
+    write_seed(seed, SEED_ITEMS)
+    out = tmp_path / "items.db"
+    build_catalogue(seed, out)
+    return seed, out
+
+
+class TestBuildCatalogue:
+    def test_build_writes_items_and_version(self, tmp_path):
+        seed = tmp_path / "seed.json"
+        write_seed(seed, SEED_ITEMS)
+        out = tmp_path / "items.db"
+
+        assert build_catalogue(seed, out) == 2
+        assert get_catalogue_version(out) is not None
+
+        rows = sqlite3.connect(out).execute("SELECT config_base_id FROM items").fetchall()
+        assert sorted(r[0] for r in rows) == [100300, 200001]
+
+    def test_version_changes_with_seed(self, tmp_path, catalogue):
+        seed, out = catalogue
+        first = get_catalogue_version(out)
+
+        write_seed(seed, SEED_ITEMS[:1])
+        build_catalogue(seed, out)
+        assert get_catalogue_version(out) != first
+
+
+class TestApplyCatalogue:
+    def test_first_run_inserts_everything(self, conn, catalogue):
+        _, out = catalogue
+        assert apply_catalogue(conn.cursor(), out) == 2
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+
+    def test_same_version_is_noop(self, conn, catalogue):
+        _, out = catalogue
+        apply_catalogue(conn.cursor(), out)
+        assert apply_catalogue(conn.cursor(), out) == 0
+
+    def test_update_applies_only_diff(self, conn, catalogue):
+        seed, out = catalogue
+        apply_catalogue(conn.cursor(), out)
+
+        changed = [dict(SEED_ITEMS[0], img="https://example.com/fe2.webp"), SEED_ITEMS[1],
+                   {"id": "300001", "name_en": "New Item", "img": None}]
+        write_seed(seed, changed)
+        build_catalogue(seed, out)
+
+        # One changed icon + one new item
+        assert apply_catalogue(conn.cursor(), out) == 2
+        icon = conn.execute("SELECT icon_url FROM items WHERE config_base_id = 100300").fetchone()[0]
+        assert icon == "https://example.com/fe2.webp"
+
+    def test_local_name_kept_when_catalogue_has_none(self, conn, catalogue):
+        seed, out = catalogue
+        apply_catalogue(conn.cursor(), out)
+        conn.execute("UPDATE items SET name_en = 'Hand Named' WHERE config_base_id = 200001")
+
+        write_seed(seed, [SEED_ITEMS[0], dict(SEED_ITEMS[1], type_cn="其他")])
+        build_catalogue(seed, out)
+        apply_catalogue(conn.cursor(), out)
+
+        row = conn.execute(
+            "SELECT name_en, type_cn FROM items WHERE config_base_id = 200001"
+        ).fetchone()
+        assert row == ("Hand Named", "其他")
@@ -0,0 +1,54 @@
+"""Tests for CLI commands."""
+
+from datetime import datetime
+
+from titrack.cli.commands import cmd_archive_season, create_parser
+from titrack.core.models import Run
+from titrack.db.connection import Database
+from titrack.db.repository import Repository
+
+
+def _seed_seasons(db_path):
+    db = Database(db_path)
+    db.connect()
+    repo = Repository(db)
+    for season_id, hour in ((1, 9), (2, 10)):
+        repo.insert_run(Run(
+            id=None, zone_signature="Map_Test",
+            start_ts=datetime(2026, 1, 26, hour), end_ts=datetime(2026, 1, 26, hour, 5),
+            season_id=season_id, player_id="p1",
+        ))
+    db.close()
+
+
+def _run_count(db_path, season_id):
+    db = Database(db_path)
+    db.connect()
+    row = db.fetchone("SELECT COUNT(*) AS cnt FROM main.runs WHERE season_id = ?", (season_id,))
+    db.close()
+    return row["cnt"]
+
+
+class TestArchiveSeasonCommand:
+    def test_refuses_latest_season_without_force(self, tmp_path, capsys):
+        db_path = tmp_path / "tracker.db"
+        _seed_seasons(db_path)
+        parser = create_parser()
+
+        assert cmd_archive_season(parser.parse_args(["--db", str(db_path), "archive-season", "2"])) == 1
+        assert "Cannot archive the active season" in capsys.readouterr().out
+        assert _run_count(db_path, 2) == 1
+
+        assert cmd_archive_season(parser.parse_args(["--db", str(db_path), "archive-season", "1"])) == 0
+        assert _run_count(db_path, 1) == 0
+        assert (tmp_path / "archive" / "season_1.db").exists()
+
+    def test_force_archives_latest_season(self, tmp_path):
+        db_path = tmp_path / "tracker.db"
+        _seed_seasons(db_path)
+        args = create_parser().parse_args(
+            ["--db", str(db_path), "archive-season", "2", "--force"]
+        )
+
+        assert cmd_archive_season(args) == 0
+        assert _run_count(db_path, 2) == 0
@@ -0,0 +1,84 @@
+"""Tests for run consolidation grouping."""
+
+from datetime import datetime
+
+from titrack.core.consolidation import (
+    LEVEL_TYPE_NIGHTMARE,
+    LEVEL_TYPE_NORMAL,
+    SessionTracker,
+    assign_entry_ids,
+    group_sessions,
+)
+from titrack.core.models import Run
+
+
+def make_run(run_id, minute, is_hub=False, level_uid=None, level_type=LEVEL_TYPE_NORMAL):
+    return Run(
+        id=run_id,
+        zone_signature="Hub" if is_hub else "Map",
+        start_ts=datetime(2026, 1, 26, 10, minute, 0),
+        is_hub=is_hub,
+        level_type=None if is_hub else level_type,
+        level_uid=level_uid,
+    )
+
+
+class TestGroupSessions:
+    def test_same_uid_is_one_session(self):
+        runs = [make_run(1, 0, level_uid=7), make_run(2, 1, level_uid=7)]
+        assert [[r.id for r in s] for s in group_sessions(runs)] == [[1, 2]]
+
+    def test_hub_breaks_session(self):
+        runs = [
+            make_run(1, 0, level_uid=7),
+            make_run(2, 1, is_hub=True),
+            make_run(3, 2, level_uid=7),
+        ]
+        assert [[r.id for r in s] for s in group_sessions(runs)] == [[1], [3]]
+
+    def test_missing_uid_is_own_session(self):
+        runs = [make_run(1, 0), make_run(2, 1)]
+        assert [[r.id for r in s] for s in group_sessions(runs)] == [[1], [2]]
+
+
+class TestAssignEntryIds:
+    def test_nightmare_gets_own_entry(self):
+        runs = [
+            make_run(1, 0, level_uid=7),
+            make_run(2, 1, level_uid=7, level_type=LEVEL_TYPE_NIGHTMARE),
+            make_run(3, 2, level_uid=7),
+            make_run(4, 3, is_hub=True),
+        ]
+        assert assign_entry_ids(runs) == {1: 1, 2: 2, 3: 1, 4: None}
+
+    def test_head_is_first_normal_run(self):
+        runs = [
+            make_run(1, 0, level_uid=7, level_type=LEVEL_TYPE_NIGHTMARE),
+            make_run(2, 1, level_uid=7),
+            make_run(3, 2, level_uid=7),
+        ]
+        assert assign_entry_ids(runs) == {1: 1, 2: 2, 3: 2}
+
+
+class TestSessionTracker:
+    def test_hub_closes_session(self):
+        tracker = SessionTracker()
+        assert tracker.add_run(make_run(1, 0, level_uid=7)) == []
+        assert tracker.add_run(make_run(2, 1, level_uid=7)) == []
+        assert tracker.add_run(make_run(3, 2, is_hub=True)) == [1]
+        assert tracker.open_heads == []
+
+    def test_new_instance_closes_session(self):
+        tracker = SessionTracker()
+        tracker.add_run(make_run(1, 0, level_uid=7))
+        assert tracker.add_run(make_run(2, 1, level_uid=8)) == [1]
+        assert [r.id for r in tracker.open_heads] == [2]
+
+    def test_nightmare_closes_when_next_run_starts(self):
+        tracker = SessionTracker()
+        tracker.add_run(make_run(1, 0, level_uid=7))
+        tracker.add_run(make_run(2, 1, level_uid=7, level_type=LEVEL_TYPE_NIGHTMARE))
+        # Back in the same map: nightmare entry done, map entry still open
+        assert tracker.add_run(make_run(3, 2, level_uid=7)) == [2]
+        assert [r.id for r in tracker.open_heads] == [1]
+        assert tracker.close_all() == [1]
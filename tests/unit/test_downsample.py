@@ -0,0 +1,35 @@
+"""Tests for chart series downsampling."""
+
+import pytest
+
+from titrack.core.downsample import downsample, lttb_indices
+
+
+class TestLttb:
+    def test_short_series_is_returned_whole(self):
+        assert lttb_indices([1, 2, 3], [5, 6, 7], 10) == [0, 1, 2]
+
+    def test_keeps_endpoints_and_point_count(self):
+        xs = list(range(1000))
+        ys = [x % 7 for x in xs]
+
+        indices = lttb_indices(xs, ys, 50)
+
+        assert len(indices) == 50
+        assert indices[0] == 0 and indices[-1] == 999
+        assert indices == sorted(set(indices))
+
+    def test_keeps_spikes(self):
+        xs = list(range(100))
+        ys = [0.0] * 100
+        ys[37] = 100.0
+        ys[71] = -50.0
+
+        kept_x, kept_y = downsample(xs, ys, 10)
+
+        assert 37 in kept_x and 71 in kept_x
+        assert max(kept_y) == 100.0 and min(kept_y) == -50.0
+
+    def test_rejects_too_few_points(self):
+        with pytest.raises(ValueError):
+            lttb_indices([1, 2, 3, 4], [1, 2, 3, 4], 2)
@@ -0,0 +1,320 @@
+"""Tests for the icon cache."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from titrack.api.app import create_app
+from titrack.api.icon_cache import CachedIcon, IconCache, fetch_url
+from titrack.core.models import Item
+from titrack.db.connection import Database
+from titrack.db.repository import Repository
+
+ICONS = {
+    "/a.webp": b"RIFF-icon-a",
+    "/b.png": b"PNG-icon-b",
+    "/same-as-a.webp": b"RIFF-icon-a",
+}
+
+
+class CDNHandler(BaseHTTPRequestHandler):
+    """Stand-in CDN serving ICONS (slowly, to exercise concurrency)."""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+        data = ICONS.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def cdn():
+    """Local HTTP server standing in for the icon CDN."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CDNHandler)
+    server.requests = []
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    server.base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIconCache:
+    def test_fetch_once_then_serve_from_memory(self, cdn, tmp_path):
+        cache = IconCache(tmp_path / "icons")
+
+        first = cache.get(cdn.base + "/a.webp")
+        second = cache.get(cdn.base + "/a.webp")
+
+        assert first.data == ICONS["/a.webp"]
+        assert second is first
+        assert cdn.requests == ["/a.webp"]
+
+    def test_disk_cache_survives_restart(self, cdn, tmp_path):
+        IconCache(tmp_path / "icons").get(cdn.base + "/a.webp")
+
+        restarted = IconCache(tmp_path / "icons")
+        icon = restarted.get(cdn.base + "/a.webp")
+
+        assert icon.data == ICONS["/a.webp"]
+        assert cdn.requests == ["/a.webp"]
+        assert restarted.fetches == 0
+
+    def test_identical_icons_share_one_blob(self, cdn, tmp_path):
+        cache = IconCache(tmp_path / "icons")
+
+        a = cache.get(cdn.base + "/a.webp")
+        same = cache.get(cdn.base + "/same-as-a.webp")
+
+        assert a.etag == same.etag
+        assert len(list((tmp_path / "icons" / "blobs").rglob("*"))) == 2  # one dir + one blob
+
+    def test_corrupt_blob_is_refetched(self, cdn, tmp_path):
+        cache = IconCache(tmp_path / "icons")
+        icon = cache.get(cdn.base + "/a.webp")
+        (tmp_path / "icons" / "blobs" / icon.digest[:2] / icon.digest).write_bytes(b"trunc")
+
+        restarted = IconCache(tmp_path / "icons")
+
+        assert restarted.get(cdn.base + "/a.webp").data == ICONS["/a.webp"]
+        assert restarted.fetches == 1
+
+    def test_memory_tier_is_bounded(self, cdn, tmp_path):
+        cache = IconCache(tmp_path / "icons", max_memory_bytes=15)
+
+        cache.get(cdn.base + "/a.webp")
+        cache.get(cdn.base + "/b.png")
+
+        assert cache.memory_bytes <= 15
+        # Evicted from memory, still served from disk without a download
+        assert cache.get(cdn.base + "/a.webp").data == ICONS["/a.webp"]
+        assert cache.fetches == 2
+
+    def test_failed_url_is_retried_after_ttl(self, cdn, tmp_path):
+        clock = FakeClock()
+        cache = IconCache(tmp_path / "icons", negative_ttl=60, clock=clock)
+
+        assert cache.get(cdn.base + "/missing.webp") is None
+        assert cache.get(cdn.base + "/missing.webp") is None
+        assert cdn.requests == ["/missing.webp"]
+
+        clock.now = 61
+        assert cache.get(cdn.base + "/missing.webp") is None
+        assert cdn.requests == ["/missing.webp", "/missing.webp"]
+
+    def test_concurrent_gets_share_one_download(self, cdn, tmp_path):
+        cdn.delay = 0.1
+        cache = IconCache(tmp_path / "icons")
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get(cdn.base + "/a.webp")))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(results) == 5 and all(r.data == ICONS["/a.webp"] for r in results)
+        assert cdn.requests == ["/a.webp"]
+
+    def test_prefetch_downloads_concurrently(self, cdn, tmp_path):
+        cdn.delay = 0.2
+        cache = IconCache(tmp_path / "icons")
+        urls = [cdn.base + path for path in ICONS] + [cdn.base + "/missing.webp"]
+
+        start = time.perf_counter()
+        downloaded = cache.prefetch(urls)
+        elapsed = time.perf_counter() - start
+
+        assert downloaded == 3
+        assert elapsed < 0.6  # 4 downloads of 0.2s each, run in parallel
+        assert all(cache.get_cached(cdn.base + path) for path in ICONS)
+        # Nothing left to do on a second pass
+        assert cache.prefetch(urls) == 0
+
+    def test_fetch_url_returns_none_on_error(self, cdn):
+        assert fetch_url(cdn.base + "/missing.webp") is None
+        assert fetch_url(cdn.base + "/a.webp") == ICONS["/a.webp"]
+
+
+class TestIconEndpoint:
+    @pytest.fixture
+    def icon_app(self, cdn, tmp_path):
+        db = Database(tmp_path / "test.db")
+        db.connect()
+        repo = Repository(db)
+        repo.upsert_item(Item(
+            config_base_id=100,
+            name_en="Ember",
+            name_cn=None,
+            type_cn=None,
+            icon_url=cdn.base + "/b.png",
+            url_en=None,
+            url_cn=None,
+        ))
+        cache = IconCache(tmp_path / "icons")
+        yield create_app(db, icon_cache=cache), cache
+        db.close()
+
+    def test_icon_is_served_with_strong_etag(self, icon_app, cdn):
+        app, cache = icon_app
+        client = TestClient(app)
+
+        response = client.get("/api/icons/100")
+
+        assert response.status_code == 200
+        assert response.content == ICONS["/b.png"]
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["etag"] == cache.get_cached(cdn.base + "/b.png").etag
+
+    def test_matching_etag_returns_304(self, icon_app):
+        app, _ = icon_app
+        client = TestClient(app)
+        etag = client.get("/api/icons/100").headers["etag"]
+
+        response = client.get("/api/icons/100", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_prefetch_covers_inventory(self, icon_app, cdn):
+        from titrack.core.models import SlotState
+
+        app, cache = icon_app
+        app.state.repo.set_player_context(1, "p1")
+        app.state.repo.upsert_slot_state(
+            SlotState(page_id=102, slot_id=0, config_base_id=100, num=3, player_id="p1")
+        )
+
+        assert app.state.repo.get_prefetch_icon_urls() == [cdn.base + "/b.png"]
+        with TestClient(app):
+            # Startup kicks off the prefetch in the background
+            for _ in range(50):
+                if cache.get_cached(cdn.base + "/b.png"):
+                    break
+                time.sleep(0.02)
+
+        assert cdn.requests == ["/b.png"]
+
+
+class TestSpriteSheet:
+    @pytest.fixture
+    def sprite_app(self, cdn, tmp_path):
+        db = Database(tmp_path / "test.db")
+        db.connect()
+        repo = Repository(db)
+        for config_base_id, path in [(100, "/b.png"), (101, "/a.webp"), (102, None)]:
+            repo.upsert_item(Item(
+                config_base_id=config_base_id,
+                name_en=f"Item {config_base_id}",
+                name_cn=None,
+                type_cn=None,
+                icon_url=cdn.base + path if path else None,
+                url_en=None,
+                url_cn=None,
+            ))
+        yield create_app(db, icon_cache=IconCache(tmp_path / "icons"))
+        db.close()
+
+    def test_build_lays_icons_out_on_a_grid(self):
+        from titrack.api.sprites import build_sprite_sheet
+
+        icon = CachedIcon(data=b"x", digest="d")
+        sheet = build_sprite_sheet(
+            {i: (icon, "image/png") for i in (3, 1, 2)}, missing=[9], cell_size=10
+        )
+
+        assert (sheet.columns, sheet.rows) == (2, 2)
+        assert sheet.offsets == {1: (0, 0), 2: (10, 0), 3: (0, 10)}
+        assert sheet.missing == [9]
+        assert sheet.svg.count(b"<image ") == 3
+
+    def _wait_for_icons(self, app, cdn, paths):
+        # Uncached icons are downloaded in the background
+        cache = app.state.icon_cache
+        for _ in range(100):
+            if all(cache.get_cached(cdn.base + path) for path in paths):
+                return
+            time.sleep(0.02)
+        raise AssertionError("icons were not prefetched")
+
+    def test_uncached_icons_are_missing_until_prefetched(self, sprite_app, cdn):
+        cdn.delay = 0.2
+        client = TestClient(sprite_app)
+
+        start = time.perf_counter()
+        first = client.get("/api/icons/sprite?ids=100,101").json()
+
+        # Answered from the cache without waiting for the CDN
+        assert time.perf_counter() - start < 0.2
+        assert first["icons"] == {}
+        assert first["missing"] == [100, 101]
+
+        self._wait_for_icons(sprite_app, cdn, ["/a.webp", "/b.png"])
+        second = client.get("/api/icons/sprite?ids=100,101").json()
+        assert set(second["icons"]) == {"100", "101"}
+        assert second["missing"] == []
+
+    def test_sprite_map_and_sheet(self, sprite_app, cdn):
+        client = TestClient(sprite_app)
+        client.get("/api/icons/sprite?ids=102,101,100,999")
+        self._wait_for_icons(sprite_app, cdn, ["/a.webp", "/b.png"])
+
+        response = client.get("/api/icons/sprite?ids=102,101,100,999")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["icons"]) == {"100", "101"}
+        assert data["missing"] == [102, 999]
+        assert sorted(cdn.requests) == ["/a.webp", "/b.png"]
+
+        sheet = client.get(data["sheet_url"])
+        assert sheet.status_code == 200
+        assert sheet.headers["content-type"] == "image/svg+xml"
+        assert "immutable" in sheet.headers["cache-control"]
+        assert sheet.content.count(b"<image ") == 2
+
+        revalidated = client.get(data["sheet_url"], headers={"If-None-Match": sheet.headers["etag"]})
+        assert revalidated.status_code == 304
+
+    def test_same_set_reuses_sheet(self, sprite_app, cdn):
+        client = TestClient(sprite_app)
+        client.get("/api/icons/sprite?ids=100,101")
+        self._wait_for_icons(sprite_app, cdn, ["/a.webp", "/b.png"])
+
+        first = client.get("/api/icons/sprite?ids=100,101").json()
+        second = client.get("/api/icons/sprite?ids=101,100,100").json()
+
+        assert second["sheet_url"] == first["sheet_url"]
+        assert len(cdn.requests) == 2
+
+    def test_invalid_ids(self, sprite_app):
+        client = TestClient(sprite_app)
+
+        assert client.get("/api/icons/sprite?ids=1,abc").status_code == 400
+        assert client.get("/api/icons/sprite/unknown.svg").status_code == 404
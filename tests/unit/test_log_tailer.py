@@ -63,6 +63,17 @@ class TestLogTailer:
         lines = list(tailer.read_new_lines())
         assert lines == ["Partial line"]
 
+    def test_lag_bytes(self, temp_log):
+        tailer = LogTailer(temp_log)
+        assert tailer.get_lag_bytes() == temp_log.stat().st_size
+
+        list(tailer.read_new_lines())
+        assert tailer.get_lag_bytes() == 0
+
+        with open(temp_log, "a") as f:
+            f.write("Line 4\n")
+        assert tailer.get_lag_bytes() == len("Line 4\n")
+
     def test_position_tracking(self, temp_log):
         tailer = LogTailer(temp_log)
         list(tailer.read_new_lines())
@@ -0,0 +1,75 @@
+"""Tests for incremental net worth tracking."""
+
+import pytest
+
+from titrack.core.net_worth import NetWorthTracker
+from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+
+def full_value(quantities, prices, tax_multiplier=1.0):
+    """Net worth valued from scratch, as the inventory endpoint does."""
+    total = 0.0
+    for config_base_id, quantity in quantities.items():
+        if config_base_id == FE_CONFIG_BASE_ID:
+            total += quantity
+        elif prices.get(config_base_id):
+            total += quantity * prices[config_base_id] * tax_multiplier
+    return total
+
+
+class TestNetWorthTracker:
+    def test_initial_value(self):
+        tracker = NetWorthTracker(
+            {FE_CONFIG_BASE_ID: 100, 990001: 4, 990002: 7},
+            {990001: 2.5, 990002: None},
+            tax_multiplier=0.875,
+        )
+
+        assert tracker.value == 100 + 4 * 2.5 * 0.875
+        assert tracker.total_fe == 100
+
+    def test_incremental_changes_match_full_valuation(self):
+        quantities = {FE_CONFIG_BASE_ID: 50, 990001: 2}
+        prices = {990001: 10.0, 990002: 3.0}
+        tracker = NetWorthTracker(dict(quantities), dict(prices))
+
+        steps = [
+            ("qty", FE_CONFIG_BASE_ID, 25),
+            ("qty", 990002, 6),
+            ("price", 990001, 12.5),
+            ("qty", 990001, -2),
+            ("price", 990002, None),
+            ("qty", 990003, 1),
+            ("price", 990003, 40.0),
+        ]
+        for kind, config_base_id, amount in steps:
+            if kind == "qty":
+                tracker.add_quantity(config_base_id, amount)
+                quantities[config_base_id] = quantities.get(config_base_id, 0) + amount
+            else:
+                tracker.set_price(config_base_id, amount)
+                prices[config_base_id] = amount
+            assert tracker.value == pytest.approx(full_value(quantities, prices))
+
+        assert sorted(tracker.item_ids) == sorted([990002, 990003, FE_CONFIG_BASE_ID])
+
+    def test_tax_multiplier_change(self):
+        tracker = NetWorthTracker({FE_CONFIG_BASE_ID: 100, 990001: 8}, {990001: 10.0})
+
+        tracker.set_tax_multiplier(0.875)
+
+        assert tracker.value == pytest.approx(100 + 80 * 0.875)
+
+    def test_snapshot_threshold(self):
+        tracker = NetWorthTracker(
+            {FE_CONFIG_BASE_ID: 10000}, min_change_fe=10.0, min_change_ratio=0.005
+        )
+        assert tracker.should_snapshot()
+        tracker.mark_snapshot()
+        assert not tracker.should_snapshot()
+
+        # 0.5% of 10000 is 50 FE
+        tracker.add_quantity(FE_CONFIG_BASE_ID, 49)
+        assert not tracker.should_snapshot()
+        tracker.add_quantity(FE_CONFIG_BASE_ID, -100)
+        assert tracker.should_snapshot()
@@ -0,0 +1,35 @@
+"""Tests for as-of price lookups."""
+
+from datetime import datetime
+
+from titrack.core.price_history import PriceHistory
+
+
+def at(hour: int) -> datetime:
+    return datetime(2026, 1, 26, hour)
+
+
+class TestPriceHistory:
+    def test_price_in_effect(self):
+        history = PriceHistory([(1, at(10), 5.0), (1, at(14), 8.0), (2, at(12), 1.5)])
+
+        assert history.price_at(1, at(9)) is None
+        assert history.price_at(1, at(10)) == 5.0
+        assert history.price_at(1, at(13)) == 5.0
+        assert history.price_at(1, at(20)) == 8.0
+        assert history.price_at(3, at(20)) is None
+        assert len(history) == 3
+
+    def test_out_of_order_observations(self):
+        history = PriceHistory([(1, at(14), 8.0), (1, at(10), 5.0), (1, at(12), 6.0)])
+
+        assert [history.price_at(1, at(h)) for h in (11, 12, 13, 15)] == [5.0, 6.0, 6.0, 8.0]
+
+    def test_prices_at_falls_back(self):
+        history = PriceHistory([(1, at(10), 5.0)])
+        history.update(PriceHistory([(2, at(10), 2.0)]))
+
+        prices = history.prices_at([1, 2, 3, 4], at(11), {1: 9.0, 3: 7.0})
+
+        assert prices == {1: 5.0, 2: 2.0, 3: 7.0, 4: None}
+        assert history.prices_at([1], at(9), {1: 9.0}) == {1: 9.0}
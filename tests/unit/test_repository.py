@@ -16,6 +16,9 @@ from titrack.core.models import (
 )
 from titrack.db.connection import Database
 from titrack.db.repository import Repository
+from titrack.db.schema import SCHEMA_VERSION
+
+from tests.unit.helpers import add_delta, add_run, at
 
 
 @pytest.fixture
@@ -53,6 +56,34 @@ class TestSettingsRepository:
         assert repo.get_setting("key") == "value2"
 
 
+class TestSchemaVersion:
+    """Tests for the one-time schema setup."""
+
+    def test_up_to_date_database_skips_schema_setup(self, db):
+        assert db.fetchone("PRAGMA user_version")[0] == SCHEMA_VERSION
+        db.execute("DROP VIEW effective_prices")
+        db.close()
+        db.connect()
+
+        assert db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'effective_prices'") is None
+
+        db.execute("PRAGMA user_version = 0")
+        db.close()
+        db.connect()
+
+        assert db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'effective_prices'")
+        assert db.fetchone("PRAGMA user_version")[0] == SCHEMA_VERSION
+
+    def test_newer_database_skips_schema_setup(self, db):
+        db.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        db.execute("DROP VIEW effective_prices")
+        db.close()
+        db.connect()
+
+        assert db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'effective_prices'") is None
+        assert db.fetchone("PRAGMA user_version")[0] == SCHEMA_VERSION + 1
+
+
 class TestRunsRepository:
     """Tests for runs CRUD."""
 
@@ -297,6 +328,89 @@ class TestItemsRepository:
 
         assert repo.get_item_count() == 5
 
+    def test_item_count_ignores_updates(self, repo):
+        before = repo.get_item_count()
+        item = Item(
+            config_base_id=999001, name_en="Counted", name_cn=None, type_cn=None,
+            icon_url=None, url_en=None, url_cn=None,
+        )
+        repo.upsert_item(item)
+        repo.upsert_item(item)
+
+        assert repo.get_item_count() == before + 1
+
+
+class TestItemSearch:
+    """Tests for the items_fts search index."""
+
+    @staticmethod
+    def _item(config_base_id, name_en, name_cn=None):
+        return Item(
+            config_base_id=config_base_id, name_en=name_en, name_cn=name_cn, type_cn=None,
+            icon_url=None, url_en=None, url_cn=None,
+        )
+
+    @pytest.fixture
+    def searchable(self, repo):
+        repo.upsert_items_batch([
+            self._item(990001, "Ancient Qwyzzle Core", "古代奇物核心"),
+            self._item(990002, "Qwyzzle", "奇物"),
+            self._item(990003, "Qwyzzle Shard", "奇物碎片"),
+            self._item(990004, "Unrelated", "无关"),
+        ])
+        return repo
+
+    def test_index_is_available(self, db):
+        assert db.has_item_search_index
+
+    def test_substring_search_ranks_exact_then_prefix(self, searchable):
+        items, total = searchable.search_items("qwyzzle")
+
+        assert total == 3
+        assert [i.config_base_id for i in items] == [990002, 990003, 990001]
+
+    def test_chinese_substring_search(self, searchable):
+        items, total = searchable.search_items("奇物碎")
+
+        assert total == 1
+        assert items[0].config_base_id == 990003
+
+    def test_short_terms_fall_back_to_scan(self, searchable):
+        items, _ = searchable.search_items("奇物")
+
+        assert {i.config_base_id for i in items} >= {990001, 990002, 990003}
+        assert items[0].config_base_id == 990002  # exact match first
+
+    def test_pagination(self, searchable):
+        first, total = searchable.search_items("qwyzzle", limit=2, offset=0)
+        second, _ = searchable.search_items("qwyzzle", limit=2, offset=2)
+
+        assert total == 3
+        assert [i.config_base_id for i in first + second] == [990002, 990003, 990001]
+
+    def test_index_follows_edits(self, searchable):
+        searchable.update_item_name(990004, "Renamed Qwyzzle Relic")
+        searchable.upsert_item(self._item(990003, "Replaced Shard", "碎片"))
+
+        items, total = searchable.search_items("qwyzzle")
+
+        assert total == 3
+        assert items[0].config_base_id == 990002
+        assert {i.config_base_id for i in items[1:]} == {990001, 990004}
+
+    def test_like_wildcards_are_literal(self, searchable):
+        assert searchable.search_items("qwy%zle") == ([], 0)
+
+    def test_index_backfilled_for_existing_database(self, db, searchable):
+        db.execute("DROP TABLE items_fts")
+        db.execute("PRAGMA user_version = 0")
+        db.close()
+        db.connect()
+
+        items, total = Repository(db).search_items("qwyzzle")
+
+        assert total == 3
+
 
 class TestPricesRepository:
     """Tests for prices CRUD."""
@@ -332,3 +446,762 @@ class TestLogPositionRepository:
     def test_get_position_when_empty(self, repo):
         result = repo.get_log_position()
         assert result is None
+
+
+class TestSeasonArchive:
+    """Tests for moving finished seasons into archive databases."""
+
+    def test_archive_moves_season_out_of_main(self, db, repo):
+        old_run = add_run(repo, at(hour=9), season_id=1, loot={100300: 50})
+        add_run(repo, at(hour=10), season_id=2, loot={100300: 70})
+        repo.upsert_price(Price(config_base_id=200001, price_fe=3.0, source="manual", season_id=1))
+        repo.set_player_context(2, "p1")
+
+        moved = repo.archive_season(1)
+
+        assert moved == {"runs": 1, "item_deltas": 1, "prices": 1, "map_sessions": 0}
+        assert db.get_archive_path(1).exists()
+        main_runs = db.fetchone("SELECT COUNT(*) as cnt FROM main.runs")
+        assert main_runs["cnt"] == 1
+
+        # Current season only sees its own partition
+        assert [r.season_id for r in repo.get_recent_runs()] == [2]
+
+        # Explicit season reads go to the archive
+        archived = repo.get_recent_runs(season_id=1)
+        assert [r.id for r in archived] == [old_run]
+        assert repo.get_run_value(old_run, season_id=1) == (50, 50.0)
+        assert repo.get_price(200001, season_id=1).price_fe == 3.0
+
+    def test_cannot_archive_active_season(self, repo):
+        repo.set_player_context(2, "p1")
+        with pytest.raises(ValueError):
+            repo.archive_season(2)
+
+    def test_latest_season_is_active_without_context(self, repo):
+        add_run(repo, at(hour=9), season_id=1, loot={100300: 50})
+        add_run(repo, at(hour=10), season_id=2, loot={100300: 70})
+
+        with pytest.raises(ValueError):
+            repo.archive_season(2)
+        assert repo.archive_season(1)["runs"] == 1
+        assert repo.archive_season(2, force=True)["runs"] == 1
+
+    def test_archived_sessions_keep_their_values(self, repo):
+        old_run = add_run(repo, at(hour=9), season_id=1, loot={100300: 50})
+        repo.finalize_map_session(old_run)
+        add_run(repo, at(hour=10), season_id=2, loot={100300: 70})
+        repo.set_player_context(2, "p1")
+
+        assert repo.archive_season(1)["map_sessions"] == 1
+
+        [session] = repo.get_finished_sessions(season_id=1)
+        assert (session.id, session.fe_gained, session.total_value) == (old_run, 50, 50.0)
+
+    def test_cross_season_and_reattach(self, db, repo):
+        add_run(repo, at(hour=9), season_id=1, loot={100300: 50})
+        add_run(repo, at(hour=10), season_id=2, loot={100300: 70})
+        repo.set_player_context(2, "p1")
+        repo.archive_season(1)
+
+        runs = repo.get_runs_all_seasons(player_id="p1")
+        assert [r.season_id for r in runs] == [2, 1]
+
+        # Archives are re-attached when the database is reopened
+        db.close()
+        db.connect()
+        assert db.archived_seasons == [1]
+        seasons = {s["season_id"]: s for s in repo.get_seasons()}
+        assert seasons[1] == {"season_id": 1, "run_count": 1, "archived": True}
+        assert seasons[2]["archived"] is False
+
+
+class TestRunEntries:
+    """Tests for maintained listing entries (consolidated runs)."""
+
+    def test_insert_assigns_entries_and_counter(self, repo):
+        repo.set_player_context(1, "p1")
+        ids = []
+        for minute, uid, is_hub in [(0, 7, False), (1, 7, False), (2, None, True), (3, 7, False)]:
+            ids.append(repo.insert_run(Run(
+                id=None,
+                zone_signature="Map_Test",
+                start_ts=datetime(2026, 1, 26, 10, minute, 0),
+                is_hub=is_hub,
+                level_type=None if is_hub else 3,
+                level_uid=uid,
+                season_id=1,
+                player_id="p1",
+            )))
+
+        entries = repo.get_run_entries(limit=10)
+        assert [[r.id for r in entry] for entry in entries] == [[ids[3]], [ids[0], ids[1]]]
+        assert repo.get_run_entry_count() == 2
+
+        repo.clear_run_data()
+        assert repo.get_run_entry_count() == 0
+
+    def test_migration_backfills_entries(self):
+        import sqlite3
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "old.db"
+            conn = sqlite3.connect(db_path)
+            conn.execute(
+                """CREATE TABLE runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, zone_signature TEXT NOT NULL,
+                    start_ts TEXT NOT NULL, end_ts TEXT, is_hub INTEGER NOT NULL DEFAULT 0,
+                    level_id INTEGER, level_type INTEGER, level_uid INTEGER,
+                    season_id INTEGER, player_id TEXT)"""
+            )
+            conn.executemany(
+                "INSERT INTO runs (zone_signature, start_ts, is_hub, level_type, level_uid, season_id, player_id)"
+                " VALUES ('Map', ?, ?, ?, ?, 1, 'p1')",
+                [
+                    ("2026-01-26T10:00:00", 0, 3, 7),
+                    ("2026-01-26T10:01:00", 0, 3, 7),
+                    ("2026-01-26T10:02:00", 0, 11, 7),
+                    ("2026-01-26T10:03:00", 1, None, None),
+                ],
+            )
+            conn.commit()
+            conn.close()
+
+            database = Database(db_path)
+            database.connect()
+            repo = Repository(database)
+            repo.set_player_context(1, "p1")
+
+            assert repo.get_run_entry_count() == 2
+            entries = repo.get_run_entries(limit=10)
+            assert [[r.id for r in entry] for entry in entries] == [[3], [1, 2]]
+            database.close()
+
+
+class TestMapSessions:
+    """Tests for finalized map sessions."""
+
+    def test_finalize_aggregates_entry(self, repo):
+        repo.set_player_context(1, "p1")
+        first = add_run(repo, at(0), 7, loot={100300: 40})
+        second = add_run(repo, at(1), 7, loot={100300: 60})
+
+        session = repo.finalize_map_session(first)
+
+        assert session.run_ids == [first, second]
+        assert session.fe_gained == 100
+        assert session.total_value == 100.0
+        assert session.duration_seconds == 60.0
+        assert repo.get_map_sessions([first])[first].fe_gained == 100
+
+    def test_rebuild_finalizes_only_closed_entries(self, repo):
+        repo.set_player_context(1, "p1")
+        closed = add_run(repo, at(0), 7, loot={100300: 40})
+        add_run(repo, at(1), is_hub=True)
+        still_open = add_run(repo, at(2), 8, loot={100300: 10})
+
+        assert repo.rebuild_map_sessions() == 1
+        assert [s.id for s in repo.get_finished_sessions()] == [closed]
+        assert [[r.id for r in entry] for entry in repo.get_open_entries()] == [[still_open]]
+        # Nothing left to do the second time
+        assert repo.rebuild_map_sessions() == 0
+
+    def test_session_values_follow_prices_and_tax(self, repo):
+        repo.set_player_context(1, "p1")
+        first = add_run(repo, at(0), 7, loot={100300: 40})
+        repo.insert_delta(ItemDelta(
+            page_id=102, slot_id=1, config_base_id=990001, delta=2,
+            context=EventContext.PICK_ITEMS, proto_name="PickItems", run_id=first,
+            timestamp=datetime(2026, 1, 26, 10, 0, 20), season_id=1, player_id="p1",
+        ))
+        repo.upsert_price(Price(
+            config_base_id=990001, price_fe=5.0, source="manual",
+            updated_at=datetime(2026, 1, 26), season_id=1,
+        ))
+        assert repo.finalize_map_session(first).total_value == 50.0
+
+        repo.upsert_price(Price(
+            config_base_id=990001, price_fe=9.0, source="manual",
+            updated_at=datetime(2026, 1, 27), season_id=1,
+        ))
+        repo.set_setting("trade_tax_enabled", "true")
+
+        session = repo.get_map_sessions([first])[first]
+        assert session.total_value == 40 + 18 * 0.875
+        assert repo.get_session_totals() == (40, session.total_value)
+        assert repo.get_run_stats()["total_value"] == session.total_value
+
+    def test_session_totals_follow_finalize_and_clear(self, repo):
+        repo.set_player_context(1, "p1")
+        first = add_run(repo, at(0), 7, loot={100300: 40})
+        second = add_run(repo, at(1), 8, loot={100300: 60})
+        repo.finalize_map_session(first)
+        repo.finalize_map_session(second)
+        # Re-finalizing replaces the session's contribution
+        repo.finalize_map_session(first)
+
+        assert repo.get_session_totals() == (100, 100.0)
+
+        repo.clear_run_data()
+        assert repo.get_session_totals() == (0, 0.0)
+
+
+class TestRunStats:
+    """Tests for the SQL run stats aggregate."""
+
+    def test_aggregates_ended_runs(self, repo):
+        repo.set_player_context(1, "p1")
+        repo.upsert_price(Price(config_base_id=200001, price_fe=2.0, source="manual", season_id=1))
+        repo.upsert_price(Price(config_base_id=300001, price_fe=10.0, source="manual", season_id=1))
+        first = add_run(repo, at(0), 7)
+        second = add_run(repo, at(1), 7)
+        hub = add_run(repo, at(2), is_hub=True)
+        active = add_run(repo, at(3), 8, ended=False)
+
+        add_delta(repo, first, 100300, 40)
+        add_delta(repo, first, 200001, 5)
+        add_delta(repo, first, 200001, -1)  # Picked up then used
+        add_delta(repo, first, 300001, -1, proto_name="Spv3Open", page_id=103)
+        add_delta(repo, first, 400001, 1, page_id=100)  # Gear page is excluded
+        add_delta(repo, second, 100300, 60)
+        add_delta(repo, hub, 100300, 1000)
+        add_delta(repo, active, 100300, 1000)
+
+        stats = repo.get_run_stats()
+
+        # Split runs of one map count once; hubs and the active run are left out
+        assert stats == {
+            "entries": 1,
+            "fe_gained": 100,
+            "total_value": 108.0,
+            "map_cost_fe": 10.0,
+            "duration_seconds": 60.0,
+        }
+
+    def test_applies_trade_tax(self, repo):
+        repo.set_player_context(1, "p1")
+        repo.set_setting("trade_tax_enabled", "true")
+        repo.upsert_price(Price(config_base_id=200001, price_fe=8.0, source="manual", season_id=1))
+        run_id = add_run(repo, at(0), 7)
+        add_delta(repo, run_id, 100300, 10)
+        add_delta(repo, run_id, 200001, 1)
+
+        # FE is not taxed, items are
+        assert repo.get_run_stats()["total_value"] == 17.0
+
+    def test_memoized_until_price_change(self, repo, db):
+        repo.set_player_context(1, "p1")
+        run_id = add_run(repo, at(0), 7)
+        add_delta(repo, run_id, 200001, 2)
+        assert repo.get_run_stats()["total_value"] == 0.0
+
+        statements = []
+        db.connection.set_trace_callback(statements.append)
+        try:
+            repo.get_run_stats()
+        finally:
+            db.connection.set_trace_callback(None)
+        # Only the version and setting lookups, no aggregate
+        assert not any("run_loot" in s for s in statements)
+
+        repo.upsert_price(Price(config_base_id=200001, price_fe=3.0, source="manual", season_id=1))
+        assert repo.get_run_stats()["total_value"] == 6.0
+
+    def test_memo_invalidated_by_run_end(self, repo):
+        repo.set_player_context(1, "p1")
+        run_id = add_run(repo, at(0), 7, ended=False)
+        add_delta(repo, run_id, 100300, 25)
+        assert repo.get_run_stats()["entries"] == 0
+
+        repo.update_run_end(run_id, datetime(2026, 1, 26, 10, 1, 0))
+        stats = repo.get_run_stats()
+        assert stats["entries"] == 1
+        assert stats["fe_gained"] == 25
+
+    def test_migration_materializes_existing_loot(self):
+        import sqlite3
+
+        from titrack.db.schema import CREATE_ITEM_DELTAS, CREATE_RUNS
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "old.db"
+            conn = sqlite3.connect(db_path)
+            conn.execute(CREATE_RUNS)
+            conn.execute(CREATE_ITEM_DELTAS)
+            conn.execute(
+                "INSERT INTO runs (id, zone_signature, start_ts, end_ts, level_type, level_uid,"
+                " season_id, player_id, entry_id)"
+                " VALUES (1, 'Map', '2026-01-26T10:00:00', '2026-01-26T10:02:00', 3, 7, 1, 'p1', 1)"
+            )
+            conn.executemany(
+                "INSERT INTO item_deltas (page_id, slot_id, config_base_id, delta, context,"
+                " proto_name, run_id, timestamp, season_id, player_id)"
+                " VALUES (102, 0, 100300, ?, 'PickItems', 'PickItems', 1, '2026-01-26T10:01:00', 1, 'p1')",
+                [(30,), (12,)],
+            )
+            conn.commit()
+            conn.close()
+
+            database = Database(db_path)
+            database.connect()
+            repo = Repository(database)
+            repo.set_player_context(1, "p1")
+
+            stats = repo.get_run_stats()
+            assert stats["fe_gained"] == 42
+            assert stats["duration_seconds"] == 120.0
+            database.close()
+
+
+class TestRunExport:
+    """Tests for the streamed run history export."""
+
+    @pytest.fixture
+    def history(self, repo):
+        repo.set_player_context(1, "p1")
+        repo.upsert_item(Item(
+            config_base_id=990001, name_en="Qwyzzle Ore", name_cn=None, type_cn=None,
+            icon_url=None, url_en=None, url_cn=None,
+        ))
+        repo.upsert_price(Price(
+            config_base_id=990001, price_fe=2.0, source="manual",
+            updated_at=datetime(2026, 1, 26), season_id=1,
+        ))
+        first = add_run(repo, at(0), 7)
+        second = add_run(repo, at(1), 7)  # Split run of the same map
+        add_run(repo, at(2), is_hub=True)
+        third = add_run(repo, at(3), 8)
+
+        add_delta(repo, first, 100300, 40)
+        add_delta(repo, first, 990001, 3)
+        add_delta(repo, first, 990001, -1, proto_name="Spv3Open")
+        add_delta(repo, first, 990002, 1, page_id=100)  # Gear page, excluded
+        add_delta(repo, second, 100300, 60)
+        return first, second, third
+
+    def _records(self, repo, **kwargs):
+        return [record for batch in repo.iter_run_export(**kwargs) for record in batch]
+
+    def test_exports_runs_with_loot_and_costs(self, repo, history):
+        first, second, third = history
+
+        records = self._records(repo)
+
+        assert [r["id"] for r in records] == [first, second, third]
+        run = records[0]
+        assert run["fe_gained"] == 40
+        assert run["total_value"] == 46.0
+        assert run["map_cost_fe"] == 2.0
+        assert run["duration_seconds"] == 30.0
+        assert [(line["name"], line["quantity"]) for line in run["loot"]] == [
+            ("Flame Elementium", 40), ("Qwyzzle Ore", 3),
+        ]
+        assert [(line["config_base_id"], line["quantity"]) for line in run["map_costs"]] == [
+            (990001, -1),
+        ]
+        assert records[2]["loot"] == [] and records[2]["map_costs"] == []
+
+    def test_sessions_merge_split_runs(self, repo, history):
+        first, second, third = history
+
+        records = self._records(repo, sessions=True)
+
+        assert [r["run_ids"] for r in records] == [[first, second], [third]]
+        assert records[0]["fe_gained"] == 100
+        assert records[0]["duration_seconds"] == 60.0
+
+    def test_since_until_and_small_batches(self, repo, history):
+        first, second, third = history
+
+        window = self._records(
+            repo, since=datetime(2026, 1, 26, 10, 1), until=datetime(2026, 1, 26, 10, 3)
+        )
+        batched = self._records(repo, batch_size=1)
+
+        assert [r["id"] for r in window] == [second]
+        assert batched == self._records(repo)
+
+    def test_writes_between_batches_do_not_change_the_rows(self, repo, history):
+        first, second, third = history
+        batches = repo.db.iterate("SELECT id FROM runs ORDER BY id", batch_size=1)
+
+        read = [row["id"] for row in next(batches)]
+        repo.db.execute("DELETE FROM runs WHERE id = ?", (third,))
+        add_run(repo, at(4), 9)
+        read += [row["id"] for batch in batches for row in batch]
+
+        assert read == [first, second, third - 1, third]  # third - 1 is the hub run
+
+
+class TestZoneStats:
+    """Tests for the per-zone analytics over map sessions."""
+
+    def _add_entry(self, repo, minute, zone, fe, uid, level_type=3, cost=0):
+        run_id = add_run(
+            repo, at(minute), uid, zone=zone, level_type=level_type,
+            loot={100300: fe}, cost={990001: cost} if cost else None,
+        )
+        repo.finalize_map_session(run_id)
+        return run_id
+
+    def test_groups_entries_by_zone(self, repo):
+        repo.set_player_context(1, "p1")
+        for minute, fe in enumerate([10, 40, 20, 30]):
+            self._add_entry(repo, minute, "Map_A", fe, uid=minute)
+        self._add_entry(repo, 4, "Map_A", 100, uid=4, level_type=11)
+        self._add_entry(repo, 5, "Map_B", 5, uid=5)
+
+        zones = repo.get_zone_stats()
+
+        assert [z["zone_signature"] for z in zones] == ["Map_A", "Map_B"]
+        a = zones[0]
+        assert (a["entries"], a["nightmare_entries"]) == (5, 1)
+        assert a["fe_gained"] == 200
+        assert a["duration_seconds"] == 150.0
+        assert a["mean_value"] == 40.0
+        assert a["median_value"] == 30.0
+        assert a["p90_value"] == 100.0
+        assert zones[1]["median_value"] == 5.0
+
+    def test_even_count_median_and_window(self, repo):
+        repo.set_player_context(1, "p1")
+        for minute, fe in enumerate([10, 40, 20, 30]):
+            self._add_entry(repo, minute, "Map_A", fe, uid=minute)
+
+        assert repo.get_zone_stats()[0]["median_value"] == 25.0
+
+        window = repo.get_zone_stats(
+            since=datetime(2026, 1, 26, 10, 1), until=datetime(2026, 1, 26, 10, 3)
+        )
+        assert window[0]["entries"] == 2
+        assert window[0]["fe_gained"] == 60
+
+    def test_open_entries_are_not_counted(self, repo):
+        repo.set_player_context(1, "p1")
+        self._add_entry(repo, 0, "Map_A", 10, uid=1)
+        repo.insert_run(Run(
+            id=None, zone_signature="Map_A", start_ts=datetime(2026, 1, 26, 10, 1),
+            level_type=3, level_uid=2, season_id=1, player_id="p1",
+        ))
+
+        assert repo.get_zone_stats()[0]["entries"] == 1
+
+    def test_map_costs_subtracted_when_asked(self, repo):
+        repo.set_player_context(1, "p1")
+        repo.upsert_price(Price(
+            config_base_id=990001, price_fe=4.0, source="manual",
+            updated_at=datetime(2026, 1, 26), season_id=1,
+        ))
+        self._add_entry(repo, 0, "Map_A", 50, uid=1, cost=2)
+
+        assert repo.get_zone_stats()[0]["total_value"] == 50.0
+        assert repo.get_zone_stats(subtract_map_costs=True)[0]["total_value"] == 42.0
+
+    def test_values_follow_price_and_tax_changes(self, repo):
+        repo.set_player_context(1, "p1")
+        self._add_entry(repo, 0, "Map_A", 50, uid=1, cost=2)
+        self._add_entry(repo, 1, "Map_A", 10, uid=2, cost=1)
+
+        repo.upsert_price(Price(
+            config_base_id=990001, price_fe=6.0, source="manual",
+            updated_at=datetime(2026, 1, 27), season_id=1,
+        ))
+        repo.set_setting("trade_tax_enabled", "true")
+
+        [zone] = repo.get_zone_stats(subtract_map_costs=True)
+        assert zone["total_value"] == 60 - 18 * 0.875
+        assert zone["median_value"] == (10 - 6 * 0.875 + 50 - 12 * 0.875) / 2
+        assert zone["p90_value"] == 50 - 12 * 0.875
+
+
+class TestDropStats:
+    """Tests for the incrementally maintained per-zone drop statistics."""
+
+    def _table(self, repo):
+        return [
+            tuple(row)
+            for row in repo.db.fetchall(
+                "SELECT * FROM zone_drops ORDER BY zone_signature, config_base_id"
+            )
+        ] + [
+            tuple(row)
+            for row in repo.db.fetchall("SELECT * FROM zone_runs ORDER BY zone_signature")
+        ]
+
+    def test_updated_when_run_ends(self, repo):
+        repo.set_player_context(1, "p1")
+        first = add_run(repo, at(0), 0, zone="Map_A", ended=False)
+        add_delta(repo, first, 100300, 30)
+        add_delta(repo, first, 990001, 2)
+
+        assert repo.get_drop_stats() == []
+
+        repo.update_run_end(first, at(0, 30))
+        second = add_run(repo, at(1), 1, zone="Map_A", ended=False)
+        add_delta(repo, second, 100300, 10, at(1, 10))
+        repo.update_run_end(second, at(1, 30))
+
+        stats = {row["config_base_id"]: row for row in repo.get_drop_stats()}
+        fe = stats[100300]
+        assert (fe["runs"], fe["runs_with_drop"], fe["total_quantity"]) == (2, 2, 40)
+        assert fe["duration_seconds"] == 60.0
+        assert fe["value_per_run"] == 20.0
+        assert (stats[990001]["runs_with_drop"], stats[990001]["price_fe"]) == (1, None)
+
+    def test_late_loot_after_run_end(self, repo):
+        repo.set_player_context(1, "p1")
+        run_id = add_run(repo, at(0), 0, zone="Map_A", ended=False)
+        repo.update_run_end(run_id, at(0, 30))
+
+        add_delta(repo, run_id, 990001, 3)
+        add_delta(repo, run_id, 990001, -3)
+        add_delta(repo, run_id, 990002, 1)
+
+        stats = repo.get_drop_stats()
+        assert [row["config_base_id"] for row in stats] == [990002]
+        assert stats[0]["runs"] == 1
+
+    def test_rebuild_matches_incremental(self, repo):
+        repo.set_player_context(1, "p1")
+        for minute in range(3):
+            run_id = add_run(repo, at(minute), minute, zone=f"Map_{minute % 2}", ended=False)
+            add_delta(repo, run_id, 100300, minute + 1, at(minute, 10))
+            repo.update_run_end(run_id, at(minute, 30))
+            add_delta(repo, run_id, 990001, 2, at(minute, 10))
+        # Imported runs are stored already ended
+        repo.insert_run(Run(
+            id=None, zone_signature="Map_1", start_ts=datetime(2026, 1, 26, 11, 0),
+            end_ts=datetime(2026, 1, 26, 11, 1), level_type=3, level_uid=9,
+            season_id=1, player_id="p1",
+        ))
+        incremental = self._table(repo)
+
+        assert repo.rebuild_zone_drops() == 4
+        assert self._table(repo) == incremental
+
+    def test_sorted_by_value_per_run(self, repo):
+        repo.set_player_context(1, "p1")
+        repo.upsert_price(Price(
+            config_base_id=990001, price_fe=50.0, source="manual",
+            updated_at=datetime(2026, 1, 26), season_id=1,
+        ))
+        for minute in range(4):
+            run_id = add_run(repo, at(minute), minute, zone="Map_A", ended=False)
+            add_delta(repo, run_id, 100300, 20, at(minute, 10))
+            if minute == 0:
+                add_delta(repo, run_id, 990001, 1, at(minute, 10))
+            repo.update_run_end(run_id, at(minute, 30))
+
+        stats = repo.get_drop_stats()
+        assert [row["config_base_id"] for row in stats] == [100300, 990001]
+        assert stats[1]["value_per_run"] == 12.5
+
+        repo.set_setting("trade_tax_enabled", "true")
+        assert repo.get_drop_stats(config_base_id=990001)[0]["value_per_run"] == 10.9375
+
+
+class TestNetWorthHistory:
+    """Tests for stored net worth snapshots."""
+
+    def test_history_is_per_context(self, repo):
+        repo.set_player_context(1, "p1")
+        repo.insert_net_worth_snapshot(datetime(2026, 1, 26, 10, 0), 100.0, 100)
+        repo.insert_net_worth_snapshot(datetime(2026, 1, 26, 11, 0), 250.555, 120)
+        repo.set_player_context(1, "p2")
+        repo.insert_net_worth_snapshot(datetime(2026, 1, 26, 10, 30), 5.0, 5)
+
+        repo.set_player_context(1, "p1")
+        assert repo.get_net_worth_history() == [
+            (datetime(2026, 1, 26, 10, 0), 100.0, 100),
+            (datetime(2026, 1, 26, 11, 0), 250.56, 120),
+        ]
+
+    def test_window_starts_with_value_in_effect(self, repo):
+        repo.set_player_context(1, "p1")
+        for hour, value in [(8, 10.0), (9, 20.0), (11, 30.0)]:
+            repo.insert_net_worth_snapshot(datetime(2026, 1, 26, hour, 0), value, 0)
+
+        history = repo.get_net_worth_history(since=datetime(2026, 1, 26, 10, 0))
+
+        assert [value for _, value, _ in history] == [20.0, 30.0]
+
+    def test_latest_snapshot(self, repo):
+        repo.set_player_context(1, "p1")
+        assert repo.get_latest_net_worth_snapshot() is None
+
+        for hour, value in [(11, 30.0), (8, 10.0)]:
+            repo.insert_net_worth_snapshot(datetime(2026, 1, 26, hour, 0), value, 3)
+        repo.set_player_context(1, "p2")
+        repo.insert_net_worth_snapshot(datetime(2026, 1, 26, 12, 0), 99.0, 9)
+
+        repo.set_player_context(1, "p1")
+        assert repo.get_latest_net_worth_snapshot() == (datetime(2026, 1, 26, 11, 0), 30.0, 3)
+
+
+class TestRunValues:
+    """Tests for persisted run values revalued incrementally on price changes."""
+
+    def _price(self, repo, config_base_id, price_fe, season_id=1):
+        repo.upsert_price(Price(
+            config_base_id=config_base_id, price_fe=price_fe, source="manual",
+            updated_at=datetime(2026, 1, 26), season_id=season_id,
+        ))
+
+    def _tables(self, repo):
+        return {
+            table: [
+                tuple(round(v, 6) if isinstance(v, float) else v for v in row)
+                for row in repo.db.fetchall(f"SELECT * FROM {table} ORDER BY 1, 2")
+            ]
+            for table in ("run_values", "run_value_totals")
+        }
+
+    def test_loot_and_run_end_update_values(self, repo):
+        repo.set_player_context(1, "p1")
+        self._price(repo, 990001, 5.0)
+        first = add_run(
+            repo, at(0), 0, zone="Map_A", loot={100300: 40, 990001: 2}, cost={990001: 1}
+        )
+        open_run = add_run(repo, at(1), 1, zone="Map_A", loot={100300: 7}, ended=False)
+
+        values = repo.get_run_values([first, open_run])
+        assert values[first] == (40, 50.0, 5.0)
+        assert values[open_run] == (7, 7.0, 0.0)
+        # Only ended runs count towards the totals
+        stats = repo.get_run_stats()
+        assert (stats["fe_gained"], stats["total_value"], stats["map_cost_fe"]) == (40, 50.0, 5.0)
+
+        repo.update_run_end(open_run, datetime(2026, 1, 26, 10, 1, 30))
+        assert repo.get_run_stats()["fe_gained"] == 47
+
+    def test_price_change_revalues_only_affected_runs(self, repo):
+        repo.set_player_context(1, "p1")
+        self._price(repo, 990001, 5.0)
+        with_item = add_run(repo, at(0), 0, zone="Map_A", loot={100300: 10, 990001: 3})
+        without_item = add_run(repo, at(1), 1, zone="Map_A", loot={100300: 20, 990002: 1})
+        repo.set_setting("trade_tax_enabled", "true")
+
+        self._price(repo, 990001, 9.0)
+
+        values = repo.get_run_values([with_item, without_item])
+        assert values[with_item] == (10, 10 + 27 * 0.875, 0.0)
+        assert values[without_item] == (20, 20.0, 0.0)
+        assert repo.get_run_stats()["total_value"] == 30 + 27 * 0.875
+
+        # A price appearing for an item that had none
+        self._price(repo, 990002, 4.0)
+        assert repo.get_run_values([without_item])[without_item][1] == 20 + 4 * 0.875
+
+    def test_other_season_prices_do_not_apply(self, repo):
+        repo.set_player_context(1, "p1")
+        run_id = add_run(repo, at(0), 0, zone="Map_A", loot={990001: 2})
+
+        self._price(repo, 990001, 100.0, season_id=2)
+
+        assert repo.get_run_values([run_id])[run_id] == (0, 0.0, 0.0)
+
+    def test_incremental_matches_rebuild(self, repo):
+        repo.set_player_context(1, "p1")
+        self._price(repo, 990001, 5.0)
+        add_run(repo, at(0), 0, zone="Map_A", loot={100300: 10, 990001: 3}, cost={990002: 2})
+        late = add_run(repo, at(1), 1, zone="Map_A", loot={990002: 1})
+        add_run(repo, at(2), 2, zone="Map_A", loot={990001: 1}, ended=False)
+        self._price(repo, 990002, 2.5)
+        self._price(repo, 990001, 6.0)
+        # Late loot on an ended run
+        repo.insert_delta(ItemDelta(
+            page_id=102, slot_id=1, config_base_id=990001, delta=4,
+            context=EventContext.PICK_ITEMS, proto_name="PickItems", run_id=late,
+            timestamp=datetime(2026, 1, 26, 10, 5), season_id=1, player_id="p1",
+        ))
+        repo.db.execute("DELETE FROM item_deltas WHERE run_id = ?", (late - 1,))
+        repo.db.execute("DELETE FROM runs WHERE id = ?", (late - 1,))
+        incremental = self._tables(repo)
+
+        assert repo.rebuild_run_values() == 2
+        assert self._tables(repo) == incremental
+
+    def test_prices_moved_between_seasons_revalue_both(self, repo):
+        repo.set_player_context(1, "p1")
+        run_id = add_run(repo, at(0), 0, zone="Map_A", loot={990001: 2})
+        self._price(repo, 990001, 5.0, season_id=0)
+        assert repo.get_run_values([run_id])[run_id] == (0, 0.0, 0.0)
+
+        assert repo.migrate_legacy_prices(1) == 1
+
+        assert repo.get_run_values([run_id])[run_id] == (0, 10.0, 0.0)
+        rows = repo.db.fetchall("SELECT season_id, price_fe FROM valued_prices ORDER BY season_id")
+        assert [tuple(row) for row in rows] == [(0, 0.0), (1, 5.0)]
+        incremental = self._tables(repo)
+        repo.rebuild_run_values()
+        assert self._tables(repo) == incremental
+
+    def test_legacy_runs_valued_at_viewed_season(self, repo):
+        legacy = add_run(
+            repo, at(0), 0, zone="Map_A", loot={100300: 3, 990001: 2}, cost={990002: 1},
+            season_id=None,
+        )
+        self._price(repo, 990001, 2.0, season_id=0)
+        self._price(repo, 990001, 5.0, season_id=1)
+        self._price(repo, 990002, 4.0, season_id=1)
+
+        # Without a season the legacy prices apply, as stored
+        repo.set_player_context(None, "p1")
+        assert repo.get_run_values([legacy])[legacy] == (3, 7.0, 0.0)
+
+        repo.set_player_context(1, "p1")
+        assert repo.get_run_values([legacy])[legacy] == (3, 13.0, 4.0)
+        stats = repo.get_run_stats()
+        assert (stats["fe_gained"], stats["total_value"], stats["map_cost_fe"]) == (3, 13.0, 4.0)
+
+
+class TestPriceHistory:
+    """Tests for the local price history and as-of valuation."""
+
+    def _exchange_price(self, repo, config_base_id, price_fe, hour, source="exchange"):
+        repo.upsert_price(Price(
+            config_base_id=config_base_id, price_fe=price_fe, source=source,
+            updated_at=datetime(2026, 1, 26, hour), season_id=1,
+        ))
+
+    def test_exchange_observations_are_kept(self, repo):
+        repo.set_player_context(1, "p1")
+        self._exchange_price(repo, 200001, 5.0, 10)
+        self._exchange_price(repo, 200001, 8.0, 14)
+        self._exchange_price(repo, 200001, 99.0, 15, source="manual")
+
+        history = repo.get_price_history([200001, 200002])
+
+        assert len(history) == 2
+        assert history.price_at(200001, datetime(2026, 1, 26, 12)) == 5.0
+        assert history.price_at(200001, datetime(2026, 1, 26, 16)) == 8.0
+        # The manual edit is today's price but not an observation
+        assert repo.get_price(200001).price_fe == 99.0
+
+    def test_run_valued_as_of_its_end(self, repo):
+        repo.set_player_context(1, "p1")
+        self._exchange_price(repo, 200001, 5.0, 10)
+        self._exchange_price(repo, 200002, 1.0, 13)
+        run_id = add_run(repo, at(hour=12), loot={100300: 20, 200001: 2, 200002: 3})
+        self._exchange_price(repo, 200001, 8.0, 14)
+
+        # Today's prices
+        assert repo.get_run_value(run_id) == (20, 20 + 16.0 + 3.0)
+        # 200001 at its 10:00 price; 200002 wasn't observed yet so today's
+        assert repo.get_run_value(run_id, as_of=True) == (20, 20 + 10.0 + 3.0)
+
+        record = next(repo.iter_run_export(as_of=True))[0]
+        assert record["total_value"] == 33.0
+        assert {line["config_base_id"]: line["price_fe"] for line in record["loot"]}[200001] == 5.0
+
+    def test_history_backfilled_from_stored_prices(self, db, repo):
+        self._exchange_price(repo, 200001, 5.0, 10)
+        # A database from before price_history (and user_version) existed
+        db.execute("DROP TABLE price_history")
+        db.execute("PRAGMA user_version = 0")
+        db.close()
+        db.connect()
+
+        assert repo.get_price_history([200001], season_id=1).price_at(
+            200001, datetime(2026, 1, 26, 11)
+        ) == 5.0
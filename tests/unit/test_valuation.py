@@ -0,0 +1,100 @@
+"""Tests for run valuation."""
+
+import random
+
+import pytest
+
+from titrack.core.valuation import value_cost_summary, value_runs, value_summary
+from titrack.parser.patterns import FE_CONFIG_BASE_ID
+
+PRICES = {200: 10.0, 201: 0.3, 202: None, 203: 0.0}
+
+
+def random_runs(count: int, seed: int = 1):
+    """Loot and cost summaries with a mix of FE, priced, unpriced and lost items."""
+    rng = random.Random(seed)
+    item_ids = [FE_CONFIG_BASE_ID, 200, 201, 202, 203, 204] + list(range(300, 340))
+    prices = dict(PRICES)
+    prices.update({item_id: round(rng.uniform(0.01, 500), 3) for item_id in range(300, 340)})
+    summaries = {}
+    cost_summaries = {}
+    for run_id in range(1, count + 1):
+        items = rng.sample(item_ids, rng.randint(0, 12))
+        summaries[run_id] = {item_id: rng.randint(-50, 5000) for item_id in items}
+        if rng.random() < 0.7:
+            costs = rng.sample(item_ids[1:], rng.randint(1, 3))
+            cost_summaries[run_id] = {item_id: -rng.randint(1, 4) for item_id in costs}
+    return list(summaries), summaries, cost_summaries, prices
+
+
+class TestValueSummary:
+    def test_fe_at_par_and_tax_on_items(self):
+        summary = {FE_CONFIG_BASE_ID: 100, 200: 3, 201: 10, 202: 5}
+
+        fe, value = value_summary(summary, PRICES, 0.875)
+
+        assert fe == 100
+        assert value == pytest.approx(100 + 30 * 0.875 + 3 * 0.875)
+
+    def test_lost_items_and_negative_fe(self):
+        fe, value = value_summary({FE_CONFIG_BASE_ID: -20, 200: -2}, PRICES, 1.0)
+
+        assert (fe, value) == (-20, -20.0)
+
+    def test_cost_summary(self):
+        total, unpriced = value_cost_summary({200: -2, 202: -1, 203: -1}, PRICES, 0.875)
+
+        assert total == pytest.approx(17.5)
+        assert unpriced == [202, 203]
+
+
+class TestValueRuns:
+    def test_python_path_matches_per_run_functions(self):
+        run_ids, summaries, cost_summaries, prices = random_runs(50)
+
+        valuations = value_runs(
+            run_ids + [999], summaries, cost_summaries, prices, 0.875, use_numpy=False
+        )
+
+        for run_id in run_ids:
+            fe, value = value_summary(summaries[run_id], prices, 0.875)
+            cost, unpriced = value_cost_summary(cost_summaries.get(run_id, {}), prices, 0.875)
+            assert valuations[run_id] == (fe, value, cost, unpriced)
+        assert valuations[999] == (0, 0.0, 0.0, [])
+        assert valuations[1].net_value == valuations[1].total_value - valuations[1].total_cost
+
+    def test_run_prices_override_shared_prices(self):
+        summaries = {1: {FE_CONFIG_BASE_ID: 5, 200: 2}, 2: {200: 2}}
+        cost_summaries = {1: {201: -1}, 2: {201: -1}}
+
+        valuations = value_runs(
+            [1, 2], summaries, cost_summaries, PRICES, 1.0,
+            use_numpy=False, run_prices={2: {200: 4.0, 201: None}},
+        )
+
+        assert valuations[1] == (5, 25.0, 0.3, [])
+        assert valuations[2] == (0, 8.0, 0.0, [201])
+
+    @pytest.mark.parametrize("tax_multiplier", [1.0, 0.875])
+    def test_numpy_path_is_bit_identical(self, tax_multiplier):
+        pytest.importorskip("numpy")
+        run_ids, summaries, cost_summaries, prices = random_runs(2000, seed=7)
+        run_ids.append(999)
+
+        # Some runs valued at their own (e.g. historical) prices
+        run_prices = {
+            run_id: {item_id: price * 0.5 for item_id, price in prices.items() if price}
+            for run_id in run_ids[::3]
+        }
+
+        for own_prices in (None, run_prices):
+            expected = value_runs(
+                run_ids, summaries, cost_summaries, prices, tax_multiplier,
+                use_numpy=False, run_prices=own_prices,
+            )
+            actual = value_runs(
+                run_ids, summaries, cost_summaries, prices, tax_multiplier,
+                use_numpy=True, run_prices=own_prices,
+            )
+            assert actual == expected
+        assert all(type(v.fe_gained) is int for v in actual.values())
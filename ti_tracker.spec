@@ -13,8 +13,8 @@ block_cipher = None
 
 # Data files to include
 datas = [
-    # Item database seed file
-    ('tlidb_items_seed_en.json', '.'),
+    # Prebuilt item catalogue (generated by `python -m titrack build-catalogue`)
+    ('tlidb_items_en.db', '.'),
     # Static web files
     ('src/titrack/web/static', 'titrack/web/static'),
     # README for users